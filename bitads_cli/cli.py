@@ -3,48 +3,102 @@
 import argparse
 import asyncio
 
-from bitads_cli.commands.campaigns import (
-    async_list_unique_links,
-    async_list_campaigns,
-    async_campaign_info,
-)
-from bitads_cli.commands.orders import async_miner_order_history
-from bitads_cli.commands.two_fa import async_list_2fa_codes
-from common import dependencies
-from common.environ import Environ
-
-
-def get_services():
-    database_manager = dependencies.get_database_manager(
-        subtensor_network=Environ.SUBTENSOR_NETWORK
-    )
-    return {
-        "two_factor_service": dependencies.get_two_factor_service(database_manager),
-        "unique_link_service": dependencies.get_miner_unique_link_service(
-            database_manager
-        ),
-        "campaign_service": dependencies.get_campaign_service(database_manager),
-        "order_history_service": dependencies.get_order_history_service(
-            database_manager
-        ),
-    }
+# Commands and services are imported by the selected subcommand only, the
+# services pull in SQLAlchemy and pydantic and take longer than the listing.
+
+
+def get_database_manager():
+    from common.db.database import DatabaseManager
+    from common.environ import Environ
+
+    return DatabaseManager(subtensor_network=Environ.SUBTENSOR_NETWORK)
+
+
+def get_main_database():
+    """
+    The main database read directly, for the listing commands. None if it is
+    not a SQLite file, the services read it then.
+    """
+    from bitads_cli.readonly import MainDatabase
+
+    return MainDatabase.from_environ()
+
+
+def get_two_factor_service():
+    database = get_main_database()
+    if database:
+        return database
+    from common.services.two_factor.impl import TwoFactorServiceImpl
+
+    return TwoFactorServiceImpl(get_database_manager())
+
+
+def get_campaign_service():
+    database = get_main_database()
+    if database:
+        return database
+    from common.services.campaign.impl import CampaignServiceImpl
+
+    return CampaignServiceImpl(get_database_manager())
+
+
+def get_unique_link_service():
+    database = get_main_database()
+    if database:
+        return database
+    from common.services.unique_link.impl import MinerUniqueLinkServiceImpl
+
+    return MinerUniqueLinkServiceImpl(get_database_manager())
+
+
+def get_order_history_service():
+    from common.services.order_history.impl import OrderHistoryServiceImpl
+
+    return OrderHistoryServiceImpl(get_database_manager())
 
 
 def run_async_function(func, *args):
     asyncio.run(func(*args))
 
 
+def list_2fa_codes(args):
+    from bitads_cli.commands.two_fa import async_list_2fa_codes
+
+    run_async_function(async_list_2fa_codes, get_two_factor_service())
+
+
+def list_unique_links(args):
+    from bitads_cli.commands.campaigns import async_list_unique_links
+
+    run_async_function(
+        async_list_unique_links, get_unique_link_service(), get_campaign_service()
+    )
+
+
+def list_campaigns(args):
+    from bitads_cli.commands.campaigns import async_list_campaigns
+
+    run_async_function(async_list_campaigns, get_campaign_service())
+
+
+def campaign_info(args):
+    from bitads_cli.commands.campaigns import async_campaign_info
+
+    run_async_function(async_campaign_info, get_campaign_service(), args.campaign_id)
+
+
+def miner_order_history(args):
+    from bitads_cli.commands.orders import async_miner_order_history
+
+    run_async_function(async_miner_order_history, get_order_history_service())
+
+
 def main():
-    services = get_services()
     parser = argparse.ArgumentParser(description="bacli CLI")
     subparsers = parser.add_subparsers(dest="command", help="Main subcommands")
 
     parser_2fa = subparsers.add_parser("2fa", help="2FA commands")
-    parser_2fa.set_defaults(
-        func=lambda args: run_async_function(
-            async_list_2fa_codes, services["two_factor_service"]
-        )
-    )
+    parser_2fa.set_defaults(func=list_2fa_codes)
 
     # 'campaigns' parent command
     parser_campaigns = subparsers.add_parser(
@@ -62,20 +116,11 @@ def main():
         help="If no unique link for a campaign is visible, please ensure that your mining script is running. "
         "The miner will receive tasks via the Ping synapse after some time. "
         "You may monitor the miner neuron’s logs for updates regarding the receipt of these links.",
-    ).set_defaults(
-        func=lambda args: run_async_function(
-            async_list_unique_links,  # This function handles the history command
-            services["unique_link_service"],  # Pass the required service
-            services["campaign_service"],  # Pass the required service
-        )
-    )
+    ).set_defaults(func=list_unique_links)
 
     # 'list' subcommand under 'campaigns'
     subparser_campaigns.add_parser("list", help="List all campaigns").set_defaults(
-        func=lambda args: run_async_function(
-            async_list_campaigns,  # This function handles the history command
-            services["campaign_service"],  # Pass the required service
-        )
+        func=list_campaigns
     )
 
     # 'info' subcommand under 'campaigns'
@@ -85,13 +130,7 @@ def main():
     parser_info.add_argument(
         "campaign_id", type=str, help="The ID of the campaign to retrieve info for"
     )
-    parser_info.set_defaults(
-        func=lambda args: run_async_function(
-            async_campaign_info,  # This function handles the history command
-            services["campaign_service"],  # Pass the required service
-            args.campaign_id,
-        )
-    )
+    parser_info.set_defaults(func=campaign_info)
 
     # Orders Commands
     parser_orders = subparsers.add_parser("orders", help="Orders-related commands")
@@ -103,12 +142,7 @@ def main():
     parser_orders_history = orders_subparsers.add_parser(
         "history", help="Show order history"
     )
-    parser_orders_history.set_defaults(
-        func=lambda args: run_async_function(
-            async_miner_order_history,  # This function handles the history command
-            services["order_history_service"],  # Pass the required service
-        )
-    )
+    parser_orders_history.set_defaults(func=miner_order_history)
 
     args = parser.parse_args()
     if hasattr(args, "func"):
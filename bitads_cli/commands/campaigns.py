@@ -1,7 +1,6 @@
 import json
 import operator
 
-import pycountry
 import rich
 from rich.table import Table
 from collections import defaultdict
@@ -110,6 +109,9 @@ async def async_campaign_info(campaign_service, campaign_id: str):
             else "N/A"
         ),
     )
+    # Only this command needs the country names, which take a while to import
+    import pycountry
+
     countries = map(
         operator.attrgetter("name"),
         filter(
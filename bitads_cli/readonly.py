@@ -0,0 +1,98 @@
+"""
+Read-only access to the main database for the listing commands.
+
+The SQLite file is read with the standard library, so listing does not
+import SQLAlchemy, pydantic or bittensor. ``MainDatabase`` has the methods
+of the services the commands call, and returns rows with the same
+attributes as their schemas.
+"""
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Optional
+
+from common.environ import Environ
+
+# CampaignStatus.ACTIVATED, not imported to keep pydantic out
+_ACTIVATED = 1
+_SQLITE_PREFIX = "sqlite:///"
+_DATETIME_COLUMNS = {
+    "created_at",
+    "updated_at",
+    "date_started",
+    "date_approved",
+}
+
+
+def _row(cursor: sqlite3.Cursor, values: tuple) -> SimpleNamespace:
+    row = SimpleNamespace()
+    for (name, *_), value in zip(cursor.description, values):
+        if name in _DATETIME_COLUMNS and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        setattr(row, name, value)
+    return row
+
+
+class MainDatabase:
+    """
+    Main database of a neuron opened read-only.
+
+    A missing database file reads as empty.
+
+    Args:
+        path (str): Path of the SQLite file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def from_environ(cls) -> Optional["MainDatabase"]:
+        """
+        Opens the main database the neurons use, as ``DatabaseManager`` names it.
+
+        Returns:
+            Optional[MainDatabase]: None if the database is not a SQLite file.
+        """
+        network = "test" if Environ.SUBTENSOR_NETWORK == "test" else "finney"
+        url = Environ.DB_URL_TEMPLATE.format(name="main", network=network)
+        if not url.startswith(_SQLITE_PREFIX):
+            return None
+        return cls(url[len(_SQLITE_PREFIX) :])
+
+    def _query(self, sql: str, *params) -> List[SimpleNamespace]:
+        if not os.path.exists(self.path):
+            return []
+        connection = sqlite3.connect(
+            f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True
+        )
+        try:
+            connection.row_factory = _row
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    async def get_active_campaigns(self) -> List[SimpleNamespace]:
+        return self._query("SELECT * FROM campaign WHERE status = ?", _ACTIVATED)
+
+    async def get_campaign_by_id(self, id_: str) -> Optional[SimpleNamespace]:
+        rows = self._query(
+            "SELECT * FROM campaign WHERE product_unique_id = ? LIMIT 1", id_
+        )
+        return rows[0] if rows else None
+
+    async def get_unique_links_for_campaign(
+        self, campaign_id: str
+    ) -> List[SimpleNamespace]:
+        return self._query(
+            "SELECT * FROM miner_unique_link WHERE campaign_id = ? "
+            "ORDER BY created_at DESC",
+            campaign_id,
+        )
+
+    async def get_last_codes(self, limit: int = 5) -> List[SimpleNamespace]:
+        return self._query(
+            "SELECT * FROM two_factor_codes ORDER BY created_at DESC LIMIT ?", limit
+        )
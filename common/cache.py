@@ -0,0 +1,221 @@
+"""
+Async caching of read-mostly lookups.
+
+Classes:
+    AsyncTTLCache: Bounded async cache with single-flight loads and stale-while-revalidate.
+
+Functions:
+    cached: Caches the results of a coroutine function or method.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from functools import update_wrapper
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+from common import metrics
+
+log = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class _Entry(NamedTuple):
+    value: Any
+    loaded_at: float
+
+
+class AsyncTTLCache(Generic[V]):
+    """
+    Bounded async cache of loaded values.
+
+    A value is fresh for ``ttl`` after it was loaded. For ``stale_ttl`` more
+    it is still returned, while one background load replaces it. Concurrent
+    misses of a key share one load; a failed load is not cached and its
+    exception is raised to every caller waiting for it. At most ``max_size``
+    keys are kept, the least recently used dropped first. A load in flight
+    when its key is invalidated or the cache cleared is not cached, it may
+    have read the data before the write that invalidated it.
+
+    Args:
+        name (str): Name of the cache in the metrics.
+        ttl (timedelta): How long a loaded value is fresh.
+        max_size (int, optional): Keys kept at most.
+        stale_ttl (timedelta, optional): How long an expired value is still returned.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: timedelta,
+        max_size: int = 1024,
+        stale_ttl: timedelta = timedelta(0),
+    ):
+        self.name = name
+        self.ttl = ttl.total_seconds()
+        self.stale_ttl = stale_ttl.total_seconds()
+        self.max_size = max_size
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._loads: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        """
+        Returns the cached value of ``key``, loading it with ``load`` if needed.
+
+        Raises:
+            Exception: The exception raised by ``load`` on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.loaded_at
+            if age < self.ttl:
+                self._count("hit")
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale")
+                self._entries.move_to_end(key)
+                if key not in self._loads:
+                    self._start_load(key, load).add_done_callback(
+                        self._log_refresh_failure
+                    )
+                return entry.value
+        self._count("miss")
+        task = self._loads.get(key) or self._start_load(key, load)
+        # A cancelled caller must not cancel the load others wait for
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._loads.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._loads.clear()
+
+    def _start_load(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, load))
+        self._loads[key] = task
+        return task
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        task = asyncio.current_task()
+        try:
+            value = await load()
+            # Forgotten by invalidate or clear while loading, the value may be outdated
+            if self._loads.get(key) is task:
+                self._entries[key] = _Entry(value, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            if self._loads.get(key) is task:
+                del self._loads[key]
+
+    def _log_refresh_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            log.warning(
+                f"Refresh of cache {self.name} failed, serving the stale value",
+                exc_info=task.exception(),
+            )
+
+    def _count(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        elif result == "stale":
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+        metrics.CACHE_REQUESTS.inc(cache=self.name, result=result)
+
+
+def _default_key(*args, **kwargs) -> Hashable:
+    return args, tuple(sorted(kwargs.items()))
+
+
+class _CachedFunction:
+    def __init__(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        key: Callable[..., Hashable],
+        **options,
+    ):
+        update_wrapper(self, func)
+        self.func = func
+        self.key = key
+        self.options = options
+        self.attribute = f"_{func.__name__}_cache"
+        self.cache = AsyncTTLCache(func.__qualname__, **options)
+
+    async def __call__(self, *args, **kwargs):
+        return await self.cache.get(
+            self.key(*args, **kwargs), lambda: self.func(*args, **kwargs)
+        )
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # One cache per instance, so ``self`` stays out of the keys
+        cache = instance.__dict__.get(self.attribute)
+        if cache is None:
+            cache = AsyncTTLCache(self.func.__qualname__, **self.options)
+            instance.__dict__[self.attribute] = cache
+
+        async def method(*args, **kwargs):
+            return await cache.get(
+                self.key(*args, **kwargs),
+                lambda: self.func(instance, *args, **kwargs),
+            )
+
+        update_wrapper(method, self.func)
+        method.cache = cache
+        return method
+
+
+def cached(
+    ttl: timedelta,
+    max_size: int = 1024,
+    stale_ttl: timedelta = timedelta(0),
+    key: Optional[Callable[..., Hashable]] = None,
+):
+    """
+    Caches the results of a coroutine function or method in an ``AsyncTTLCache``.
+
+    Methods get one cache per instance. The cache is reachable as the
+    ``cache`` attribute of the function or bound method, e.g. to clear it
+    after a write.
+
+    Args:
+        ttl (timedelta): How long a result is fresh.
+        max_size (int, optional): Results kept at most.
+        stale_ttl (timedelta, optional): How long an expired result is still returned
+            while it is refreshed.
+        key (Callable[..., Hashable], optional): Cache key of the call arguments,
+            ``self`` excluded. Defaults to the arguments themselves.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> _CachedFunction:
+        return _CachedFunction(
+            func, key or _default_key, ttl=ttl, max_size=max_size, stale_ttl=stale_ttl
+        )
+
+    return decorator
@@ -0,0 +1,234 @@
+"""
+Parallel multi-peer download of database snapshots.
+
+Manifests are collected from every peer, the snapshot served by the most
+peers is chosen and its chunks are downloaded in parallel, each chunk from whichever peer serves
+the same snapshot. Every chunk is verified against the manifest before it is
+written, so a partial download is resumed by re-verifying the chunks already
+on disk and fetching only the missing ones.
+
+Classes:
+    SnapshotBootstrapper: Downloads snapshots from several peers.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from common.clients.snapshot.client import SnapshotClient
+from common.schemas.snapshot import SnapshotManifest
+
+log = logging.getLogger(__name__)
+
+_COPY_BUFFER = 1024 * 1024
+
+
+class SnapshotBootstrapper:
+    """
+    Downloads snapshots from several peers.
+
+    Args:
+        clients (Sequence[SnapshotClient]): Clients of the peers.
+        workers (int, optional): Number of chunks downloaded in parallel.
+        attempts (int, optional): Failures after which a peer is no longer asked.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[SnapshotClient],
+        workers: int = 8,
+        attempts: int = 3,
+    ):
+        self.clients = clients
+        self.workers = workers
+        self.attempts = attempts
+        self._failures = Counter()
+        self._lock = threading.Lock()
+
+    def collect_manifests(
+        self,
+    ) -> Dict[str, List[Tuple[SnapshotClient, SnapshotManifest]]]:
+        """
+        Asks every peer for its manifests in parallel.
+
+        Returns:
+            Dict[str, List[Tuple[SnapshotClient, SnapshotManifest]]]: Offers per database.
+        """
+
+        def get_manifests(client: SnapshotClient):
+            try:
+                return client, client.get_manifests()
+            except Exception as ex:
+                log.warning(f"Unable to get manifests from {client}: {ex}")
+                return client, []
+
+        offers = defaultdict(list)
+        with ThreadPoolExecutor(self.workers) as executor:
+            for client, manifests in executor.map(get_manifests, self.clients):
+                for manifest in manifests:
+                    offers[manifest.db].append((client, manifest))
+        return offers
+
+    @staticmethod
+    def select(
+        offers: List[Tuple[SnapshotClient, SnapshotManifest]]
+    ) -> Tuple[SnapshotManifest, List[SnapshotClient]]:
+        """
+        Chooses the snapshot served by the most peers, the freshest on a tie.
+
+        Peers serve the same snapshot when their checksums match, chunks are
+        only requested from those peers. Creation times are reported by the
+        peers, so a time in the future counts as now and a single peer can
+        not win by claiming one.
+
+        Returns:
+            Tuple[SnapshotManifest, List[SnapshotClient]]: The snapshot and the peers serving it.
+        """
+        groups = defaultdict(list)
+        for client, manifest in offers:
+            groups[manifest.sha256, manifest.size, tuple(manifest.chunks)].append(
+                (client, manifest)
+            )
+        now = datetime.utcnow()
+        group = max(
+            groups.values(),
+            key=lambda items: (
+                len(items),
+                max(min(m.created_at, now) for _, m in items),
+            ),
+        )
+        return group[0][1], [client for client, _ in group]
+
+    def _is_valid_chunk(self, fd: int, manifest: SnapshotManifest, index: int) -> bool:
+        start = index * manifest.chunk_size
+        length = min(manifest.chunk_size, manifest.size - start)
+        data = os.pread(fd, length, start)
+        return (
+            len(data) == length
+            and hashlib.sha256(data).hexdigest() == manifest.chunks[index]
+        )
+
+    def _download_chunk(
+        self,
+        fd: int,
+        manifest: SnapshotManifest,
+        clients: List[SnapshotClient],
+        index: int,
+    ) -> None:
+        start = index * manifest.chunk_size
+        end = min(start + manifest.chunk_size, manifest.size) - 1
+        # Chunks start on different peers to spread the load
+        ordered = clients[index % len(clients):] + clients[: index % len(clients)]
+        with self._lock:
+            healthy = [c for c in ordered if self._failures[c] < self.attempts]
+        for client in healthy or ordered:
+            try:
+                data = client.get_range(manifest, start, end)
+                if hashlib.sha256(data).hexdigest() != manifest.chunks[index]:
+                    raise ValueError(f"checksum mismatch of chunk {index}")
+                os.pwrite(fd, data, start)
+                return
+            except Exception as ex:
+                log.warning(f"Unable to get chunk {index} of {manifest.db} from {client}: {ex}")
+                with self._lock:
+                    self._failures[client] += 1
+        raise RuntimeError(f"No peer served chunk {index} of {manifest.db}")
+
+    def download(
+        self, manifest: SnapshotManifest, clients: List[SnapshotClient], path: str
+    ) -> None:
+        """
+        Downloads a snapshot and replaces ``path`` with the decompressed database.
+
+        The compressed download is kept in ``<path>.gz.part`` until it is
+        complete, a failed download is resumed by the next call.
+
+        Args:
+            manifest (SnapshotManifest): Snapshot to download.
+            clients (List[SnapshotClient]): Peers serving the snapshot.
+            path (str): Target database file.
+
+        Raises:
+            RuntimeError: If a chunk could not be downloaded or the file does not match its checksums.
+        """
+        part_path = f"{path}.gz.part"
+        fd = os.open(part_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, manifest.size)
+            missing = [
+                index
+                for index in range(len(manifest.chunks))
+                if not self._is_valid_chunk(fd, manifest, index)
+            ]
+            log.info(
+                f"Downloading {len(missing)} of {len(manifest.chunks)} chunks "
+                f"of {manifest.db} from {len(clients)} peers"
+            )
+            with ThreadPoolExecutor(self.workers) as executor:
+                futures = [
+                    executor.submit(self._download_chunk, fd, manifest, clients, index)
+                    for index in missing
+                ]
+                for future in futures:
+                    future.result()
+        finally:
+            os.close(fd)
+
+        sha256 = hashlib.sha256()
+        with open(part_path, "rb") as file:
+            while data := file.read(_COPY_BUFFER):
+                sha256.update(data)
+        if sha256.hexdigest() != manifest.sha256:
+            os.remove(part_path)
+            raise RuntimeError(f"Checksum mismatch of {manifest.db} snapshot")
+
+        tmp_path = f"{path}.tmp"
+        try:
+            raw_sha256 = hashlib.sha256()
+            with gzip.open(part_path, "rb") as source, open(tmp_path, "wb") as target:
+                while data := source.read(_COPY_BUFFER):
+                    raw_sha256.update(data)
+                    target.write(data)
+            if raw_sha256.hexdigest() != manifest.raw_sha256:
+                raise RuntimeError(f"Checksum mismatch of {manifest.db} database")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        os.remove(part_path)
+
+    def bootstrap(
+        self,
+        paths: Dict[str, str],
+        offers: Optional[Dict[str, List[Tuple[SnapshotClient, SnapshotManifest]]]] = None,
+    ) -> Set[str]:
+        """
+        Downloads the snapshots of several databases.
+
+        Args:
+            paths (Dict[str, str]): Target file per database.
+            offers (Dict[str, List[Tuple[SnapshotClient, SnapshotManifest]]], optional):
+                Result of ``collect_manifests``, collected when not given.
+
+        Returns:
+            Set[str]: Databases that were downloaded.
+        """
+        if offers is None:
+            offers = self.collect_manifests()
+        fetched = set()
+        for db, path in paths.items():
+            if not offers.get(db):
+                log.warning(f"No peer serves a snapshot of {db}")
+                continue
+            manifest, clients = self.select(offers[db])
+            try:
+                self.download(manifest, clients, path)
+                fetched.add(db)
+            except Exception:
+                log.exception(f"Unable to download {db} snapshot, run again to resume")
+        return fetched
@@ -0,0 +1,102 @@
+"""
+Client for the database snapshots served by neuron proxies.
+
+Classes:
+    SnapshotClient: Reads snapshot manifests and byte ranges of snapshots from one peer.
+"""
+from typing import List, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from common.clients.base import BaseHTTPClient
+from common.peer_auth import PeerSigner
+from common.schemas.snapshot import SnapshotManifest
+
+
+class SnapshotClient(BaseHTTPClient):
+    """
+    Reads snapshot manifests and byte ranges of snapshots from one peer.
+
+    Errors are raised instead of logged, the bootstrapper retries them on other peers.
+
+    Args:
+        base_url (str): Base URL of the peer proxy, e.g. ``https://1.2.3.4``.
+        timeout (float, optional): Connect and read timeout of a request in seconds.
+        verify (bool, optional): Whether the TLS certificate is verified, proxies use self-signed ones.
+        signer (PeerSigner, optional): Signs the requests, peers only serve snapshots
+            to validators with a permit.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30,
+        verify: bool = False,
+        signer: Optional[PeerSigner] = None,
+        **headers,
+    ):
+        super().__init__(base_url, **headers)
+        self.timeout = timeout
+        self.verify = verify
+        self.signer = signer
+        self._session = requests.Session()
+
+    def __repr__(self) -> str:
+        return f"SnapshotClient({self._base_url})"
+
+    def _get(
+        self, endpoint: str, params: Optional[dict] = None, headers=None, **kwargs
+    ) -> requests.Response:
+        url = self._base_url + endpoint
+        # The query is encoded here, the signature covers it as sent
+        query = urlencode(params or {})
+        headers = {**self._headers, **(headers or {})}
+        if self.signer:
+            headers.update(self.signer.get_headers("GET", urlsplit(url).path, query))
+        response = self._session.get(
+            f"{url}?{query}" if query else url,
+            headers=headers,
+            timeout=self.timeout,
+            verify=self.verify,
+            **kwargs,
+        )
+        response.raise_for_status()
+        return response
+
+    def get_manifests(self) -> List[SnapshotManifest]:
+        """
+        Returns the manifests of the snapshots available on the peer.
+        """
+        return [
+            SnapshotManifest.model_validate(item)
+            for item in self._get("/get_database/manifest").json()
+        ]
+
+    def get_range(self, manifest: SnapshotManifest, start: int, end: int) -> bytes:
+        """
+        Returns bytes ``start`` to ``end`` (inclusive) of a snapshot.
+
+        Args:
+            manifest (SnapshotManifest): Manifest of the snapshot, its checksum guards
+                against reading a snapshot replaced in the meantime.
+            start (int): First byte.
+            end (int): Last byte.
+
+        Raises:
+            ValueError: If the peer does not serve this snapshot range anymore.
+        """
+        response = self._get(
+            "/get_database",
+            params=dict(db=manifest.db),
+            headers={
+                "Range": f"bytes={start}-{end}",
+                "If-Range": f'"{manifest.sha256}"',
+            },
+            stream=True,
+        )
+        with response:
+            if response.status_code != 206:
+                # The whole new snapshot would follow, do not read it
+                raise ValueError(f"Snapshot {manifest.db} changed on {self._base_url}")
+            return response.content
@@ -19,12 +19,15 @@ Context Managers:
 
 """
 
+import time
 from contextlib import contextmanager
 from typing import Literal, Generator, Optional
 
 from sqlalchemy import create_engine, Engine
 from sqlalchemy.orm import sessionmaker, Session
 
+from common import metrics
+from common.db.partitions import HistoryPartitions
 from common.environ import Environ
 
 
@@ -87,10 +90,14 @@ class DatabaseManager:
         active_sessionmaker (sessionmaker): SQLAlchemy session maker for 'active' database.
         history_sessionmaker (sessionmaker): SQLAlchemy session maker for 'history' database.
         main_sessionmaker (sessionmaker): SQLAlchemy session maker for 'main' database.
+        history_partitions (HistoryPartitions): Monthly partitions of the 'history' database.
     """
 
     def __init__(
-        self, neuron_type: Optional[str] = None, subtensor_network: Optional[str] = None
+        self,
+        neuron_type: Optional[str] = None,
+        subtensor_network: Optional[str] = None,
+        db_url_template: Optional[str] = None,
     ):
         """
         Initializes the DatabaseManager instance.
@@ -98,25 +105,34 @@ class DatabaseManager:
         Args:
             neuron_type (str): Type of neuron.
             subtensor_network (str): Name of the subtensor network.
+            db_url_template (str, optional): Template for database URLs. Defaults to Environ.DB_URL_TEMPLATE.
         """
         subtensor_network = (
             "finney" if "test" != subtensor_network else subtensor_network
         )
+        db_url_template = db_url_template or Environ.DB_URL_TEMPLATE
         if neuron_type:
             self.active_db = _create_engine(
-                Environ.DB_URL_TEMPLATE.format(
+                db_url_template.format(
                     name=f"{neuron_type}_active", network=subtensor_network
                 )
             )
             self.history_db = _create_engine(
-                Environ.DB_URL_TEMPLATE.format(
+                db_url_template.format(
                     name=f"{neuron_type}_history", network=subtensor_network
                 )
             )
             self.active_sessionmaker = _create_sessionmaker(self.active_db)
             self.history_sessionmaker = _create_sessionmaker(self.history_db)
+            self.history_partitions = HistoryPartitions(
+                neuron_type,
+                subtensor_network,
+                db_url_template,
+                _create_engine,
+                self.history_db,
+            )
         self.main_db = _create_engine(
-            Environ.DB_URL_TEMPLATE.format(name=f"main", network=subtensor_network)
+            db_url_template.format(name=f"main", network=subtensor_network)
         )
         self.main_sessionmaker = _create_sessionmaker(self.main_db)
 
@@ -141,6 +157,7 @@ class DatabaseManager:
         if not session_maker:
             raise ValueError("Invalid db_type. Must be 'main', 'active', or 'history'.")
         session = session_maker()
+        started = time.perf_counter()
         try:
             yield session
             session.commit()
@@ -149,3 +166,6 @@ class DatabaseManager:
             raise e
         finally:
             session.close()
+            metrics.DB_SESSION_SECONDS.observe(
+                time.perf_counter() - started, db_type=db_type
+            )
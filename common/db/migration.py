@@ -1,9 +1,11 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
-from sqlalchemy import inspect, exists, asc, desc
+from sqlalchemy import inspect, exists, asc, desc, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import TypeVar, Type
 
+from common.db.partitions import HistoryPartitions, partition_key
 from common.validator.environ import Environ
 
 BATCH_SIZE = 1000
@@ -68,4 +70,55 @@ def transfer_data(
             if existing_record:
                 active_session.delete(existing_record)
 
-        active_session.commit()
\ No newline at end of file
+        active_session.commit()
+
+
+def transfer_data_to_partitions(
+    active_session: Session,
+    partitions: HistoryPartitions,
+    target_entity: Type[T],
+    created_at_from: datetime,
+):
+    """
+    Moves rows created before ``created_at_from`` to the monthly history partition
+    of their ``created_at``. Rows already present in a partition are not copied again.
+    """
+    primary_key = inspect(target_entity).primary_key
+    while True:
+        data_batch = (
+            active_session.query(target_entity)
+            .where(target_entity.created_at < created_at_from)
+            .order_by(asc(target_entity.created_at))
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        if not data_batch:
+            break
+
+        by_partition = defaultdict(list)
+        for record in data_batch:
+            by_partition[partition_key(record.created_at)].append(record)
+
+        for key, records in by_partition.items():
+            with partitions.get_session(key, target_entity.__table__) as history_session:
+                keys = [
+                    tuple(getattr(record, column.key) for column in primary_key)
+                    for record in records
+                ]
+                existing_keys = {
+                    tuple(row)
+                    for row in history_session.query(*primary_key)
+                    .filter(tuple_(*primary_key).in_(keys))
+                    .all()
+                }
+                for record_key, record in zip(keys, records):
+                    if record_key in existing_keys:
+                        continue
+                    historical_record = target_entity()
+                    map_entity_fields(record, historical_record)
+                    history_session.add(historical_record)
+
+        for record in data_batch:
+            active_session.delete(record)
+
+        active_session.commit()
@@ -0,0 +1,274 @@
+"""
+Monthly partitions of the history database.
+
+Every month of history lives in its own SQLite file next to the legacy
+history file, e.g. ``validator_history_2024_12_finney.db``. Writes go to the
+partition of the row's ``created_at``; reads spanning several months fan out
+to every matching partition and merge the results. Dropping or archiving a
+month is a file operation.
+
+The legacy single history file stays readable through the router as the
+oldest partition, nothing is moved out of it.
+
+Classes:
+    HistoryPartitions: Creates, routes to and drops history partitions.
+
+Functions:
+    partition_key: Returns the partition key of a date.
+"""
+import glob
+import heapq
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import Engine, Table, inspect, make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+T = TypeVar("T")
+
+LEGACY_KEY = "legacy"
+
+_KEY_PATTERN = re.compile(r"(\d{4}_\d{2})")
+
+
+def partition_key(value: date) -> str:
+    """
+    Returns the partition key of a date.
+
+    Args:
+        value (date): A date or datetime, usually ``created_at``.
+
+    Returns:
+        str: ``YYYY_MM`` key of the month.
+    """
+    return f"{value.year:04d}_{value.month:02d}"
+
+
+class HistoryPartitions:
+    """
+    Creates, routes to and drops monthly history partitions.
+
+    Args:
+        neuron_type (str): Type of neuron, part of the file name.
+        subtensor_network (str): Name of the subtensor network, part of the file name.
+        db_url_template (str): Template with ``name`` and ``network`` placeholders.
+        engine_factory (Callable[[str], Engine]): Creates an engine for a URL.
+        legacy_engine (Engine, optional): The single history database that predates partitions.
+    """
+
+    def __init__(
+        self,
+        neuron_type: str,
+        subtensor_network: str,
+        db_url_template: str,
+        engine_factory: Callable[[str], Engine],
+        legacy_engine: Optional[Engine] = None,
+    ):
+        self.neuron_type = neuron_type
+        self.subtensor_network = subtensor_network
+        self.db_url_template = db_url_template
+        self.engine_factory = engine_factory
+        self.legacy_engine = legacy_engine
+        self._engines: Dict[str, Engine] = {}
+        self._sessionmakers: Dict[str, sessionmaker] = {}
+        self._tables: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def get_url(self, key: str) -> str:
+        return self.db_url_template.format(
+            name=f"{self.neuron_type}_history_{key}", network=self.subtensor_network
+        )
+
+    def get_path(self, key: str) -> Optional[str]:
+        """
+        Returns the file of a partition, None for non file databases.
+        """
+        return make_url(self.get_url(key)).database or None
+
+    def get_engine(self, key: str) -> Engine:
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                path = self.get_path(key)
+                if path and os.path.dirname(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                engine = self._engines[key] = self.engine_factory(self.get_url(key))
+                self._sessionmakers[key] = sessionmaker(
+                    autocommit=False, autoflush=False, bind=engine
+                )
+            return engine
+
+    def list_partitions(self) -> List[str]:
+        """
+        Returns the keys of the existing partitions, oldest first.
+        """
+        keys = set(self._engines)
+        pattern = self.get_path("*")
+        if pattern:
+            for path in glob.glob(pattern):
+                match = _KEY_PATTERN.search(
+                    os.path.basename(path)[len(f"{self.neuron_type}_history_"):]
+                )
+                if match:
+                    keys.add(match.group(1))
+        return sorted(keys)
+
+    def select_partitions(
+        self,
+        created_at_from: Optional[date] = None,
+        created_at_to: Optional[date] = None,
+    ) -> List[str]:
+        """
+        Returns the keys of the partitions overlapping a ``created_at`` range, oldest first.
+
+        Args:
+            created_at_from (date, optional): Inclusive lower bound.
+            created_at_to (date, optional): Inclusive upper bound.
+        """
+        low = partition_key(created_at_from) if created_at_from else None
+        high = partition_key(created_at_to) if created_at_to else None
+        return [
+            key
+            for key in self.list_partitions()
+            if (low is None or key >= low) and (high is None or key <= high)
+        ]
+
+    def _create_table(self, key: str, engine: Engine, table: Table) -> None:
+        """
+        Creates a table in a partition, or adds the columns declared since the
+        partition was created. Added columns are nullable or have a server default.
+        """
+        if (key, table.name) in self._tables:
+            return
+        table.create(engine, checkfirst=True)
+        existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+        with engine.begin() as connection:
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = (
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                    f"{column.type.compile(engine.dialect)}"
+                )
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg.text}"
+                connection.exec_driver_sql(ddl)
+        self._tables.add((key, table.name))
+
+    @contextmanager
+    def get_session(
+        self, key: str, *tables: Table
+    ) -> Generator[Session, None, None]:
+        """
+        Provides a session of a partition, creating the partition when needed.
+
+        Args:
+            key (str): Partition key, ``LEGACY_KEY`` for the legacy history database.
+            *tables (Table): Tables created in the partition if they do not exist yet.
+
+        Yields:
+            Session: A SQLAlchemy session object.
+        """
+        if key == LEGACY_KEY:
+            session = Session(bind=self.legacy_engine, autoflush=False)
+        else:
+            engine = self.get_engine(key)
+            for table in tables:
+                self._create_table(key, engine, table)
+            session = self._sessionmakers[key]()
+        try:
+            yield session
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+
+    def query(
+        self,
+        func: Callable[[Session], Iterable[T]],
+        created_at_from: Optional[date] = None,
+        created_at_to: Optional[date] = None,
+        order_by: Optional[Callable[[T], Any]] = None,
+        limit: Optional[int] = None,
+        include_legacy: bool = True,
+    ) -> List[T]:
+        """
+        Runs ``func`` on every partition of a ``created_at`` range and merges the results.
+
+        Args:
+            func (Callable[[Session], Iterable[T]]): Reads from one partition and returns
+                detached values such as schemas. It must apply the ``created_at`` filter
+                itself, partitions are only pruned by month.
+            created_at_from (date, optional): Inclusive lower bound used to prune partitions.
+            created_at_to (date, optional): Inclusive upper bound used to prune partitions.
+            order_by (Callable[[T], Any], optional): Sort key, every partition result must
+                already be sorted by it. Results are concatenated oldest partition first without it.
+            limit (int, optional): Maximum number of merged results.
+            include_legacy (bool, optional): Whether the legacy history database is read too.
+
+        Returns:
+            List[T]: Merged results.
+        """
+        keys = self.select_partitions(created_at_from, created_at_to)
+        if include_legacy and self.legacy_engine is not None:
+            keys.insert(0, LEGACY_KEY)
+        results = []
+        for key in keys:
+            with self.get_session(key) as session:
+                results.append(list(func(session)))
+        merged = (
+            heapq.merge(*results, key=order_by)
+            if order_by
+            else (item for result in results for item in result)
+        )
+        return list(islice(merged, limit))
+
+    def _dispose(self, key: str) -> None:
+        with self._lock:
+            engine = self._engines.pop(key, None)
+            self._sessionmakers.pop(key, None)
+            self._tables = {table for table in self._tables if table[0] != key}
+        if engine is not None:
+            engine.dispose()
+
+    def drop(self, key: str) -> None:
+        """
+        Deletes the file of a partition.
+
+        Args:
+            key (str): Partition key.
+        """
+        self._dispose(key)
+        path = self.get_path(key)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def archive(self, key: str, directory: str) -> str:
+        """
+        Moves the file of a partition to ``directory``.
+
+        Args:
+            key (str): Partition key.
+            directory (str): Archive directory, created if missing.
+
+        Returns:
+            str: Path of the archived file.
+        """
+        self._dispose(key)
+        path = self.get_path(key)
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, os.path.basename(path))
+        shutil.move(path, target)
+        return target
+
+    def dispose(self) -> None:
+        for key in list(self._engines):
+            self._dispose(key)
@@ -0,0 +1,284 @@
+"""
+Opt-in SQL query profiler.
+
+Hooks SQLAlchemy engine events of a ``DatabaseManager`` and aggregates the
+executed statements by fingerprint (the statement with literals and expanded
+parameter lists collapsed). Each fingerprint is attributed to the calling
+function in ``common/db/repositories``. Slow statements are captured together
+with their ``EXPLAIN QUERY PLAN`` output on SQLite.
+
+Rows are the number of rows returned by ORM selects and the number of rows
+affected by DML statements.
+
+Classes:
+    QueryStats: Aggregated statistics of one fingerprint.
+    QueryProfiler: Collects statistics from the attached engines.
+
+Functions:
+    fingerprint: Normalizes a statement so equal queries aggregate together.
+
+Attributes:
+    PROFILER: The profiler attached by ``common.dependencies.get_database_manager``.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import ORMExecuteState
+
+from common.db.database import DatabaseManager
+from common.environ import Environ
+
+_REPOSITORIES_DIR = os.path.join("common", "db", "repositories") + os.sep
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalizes a statement so equal queries aggregate together.
+
+    Args:
+        statement (str): SQL statement as sent to the driver.
+
+    Returns:
+        str: The statement with literals replaced by ``?``, parameter lists
+        collapsed to ``(?...)`` and whitespace collapsed.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(?...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame:
+        filename = frame.f_code.co_filename
+        if _REPOSITORIES_DIR in filename:
+            module = os.path.splitext(os.path.basename(filename))[0]
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "other"
+
+
+class QueryStats:
+    """
+    Aggregated statistics of one fingerprint.
+    """
+
+    def __init__(self, db_type: str, caller: str, statement: str, sample_size: int):
+        self.db_type = db_type
+        self.caller = caller
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.durations: Deque[float] = deque(maxlen=sample_size)
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.durations.append(duration)
+
+    def p95(self) -> float:
+        durations = sorted(self.durations)
+        if not durations:
+            return 0.0
+        return durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            db_type=self.db_type,
+            caller=self.caller,
+            statement=self.statement,
+            count=self.count,
+            total_ms=round(self.total * 1000, 3),
+            mean_ms=round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            p95_ms=round(self.p95() * 1000, 3),
+            max_ms=round(self.max * 1000, 3),
+            rows=self.rows,
+        )
+
+
+class QueryProfiler:
+    """
+    Collects statement statistics from the attached engines.
+
+    Args:
+        slow_query_seconds (float, optional): Statements at least this slow are captured with their plan.
+        max_slow_queries (int, optional): Number of slowest statements kept.
+        sample_size (int, optional): Durations kept per fingerprint for the p95.
+    """
+
+    def __init__(
+        self,
+        slow_query_seconds: float = 0.1,
+        max_slow_queries: int = 50,
+        sample_size: int = 1000,
+    ):
+        self.slow_query_seconds = slow_query_seconds
+        self.max_slow_queries = max_slow_queries
+        self.sample_size = sample_size
+        self.started_at = time.time()
+        self._stats: Dict[Tuple[str, str, str], QueryStats] = {}
+        self._slow_queries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._engines: List[Engine] = []
+
+    def attach(self, database_manager: DatabaseManager) -> None:
+        """
+        Starts profiling every engine and session maker of ``database_manager``.
+
+        Args:
+            database_manager (DatabaseManager): Manager whose databases are profiled.
+        """
+        for db_type in ("main", "active", "history"):
+            engine = getattr(database_manager, f"{db_type}_db", None)
+            if engine is None or engine in self._engines:
+                continue
+            self._engines.append(engine)
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(
+                engine, "after_cursor_execute", self._after_factory(db_type)
+            )
+            event.listen(
+                getattr(database_manager, f"{db_type}_sessionmaker"),
+                "do_orm_execute",
+                self._do_orm_execute,
+                retval=True,
+            )
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _after_factory(self, db_type: str):
+        def after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany
+        ):
+            duration = time.perf_counter() - conn.info["query_started"].pop()
+            key = (db_type, _caller(), fingerprint(statement))
+            with self._lock:
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = QueryStats(*key, self.sample_size)
+                stats.add(duration)
+                if cursor.rowcount is not None and cursor.rowcount > 0:
+                    stats.rows += cursor.rowcount
+            keys = getattr(self._local, "keys", None)
+            if keys is not None:
+                keys.append(key)
+            if duration >= self.slow_query_seconds:
+                self._add_slow_query(
+                    key, duration, statement, parameters, cursor, executemany
+                )
+
+        return after_cursor_execute
+
+    def _do_orm_execute(self, orm_execute_state: ORMExecuteState):
+        if not orm_execute_state.is_select:
+            return None
+        self._local.keys = keys = []
+        try:
+            frozen = orm_execute_state.invoke_statement().freeze()
+        finally:
+            self._local.keys = None
+        if keys:
+            with self._lock:
+                stats = self._stats.get(keys[0])
+                if stats is not None:
+                    stats.rows += len(frozen.data)
+        return frozen()
+
+    def _add_slow_query(self, key, duration, statement, parameters, cursor, executemany):
+        with self._lock:
+            if (
+                len(self._slow_queries) >= self.max_slow_queries
+                and duration <= self._slow_queries[-1]["duration_ms"] / 1000
+            ):
+                return
+        plan = None
+        if not executemany and type(cursor).__module__.startswith("sqlite3"):
+            try:
+                plan = [
+                    row[-1]
+                    for row in cursor.connection.execute(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                ]
+            except Exception as ex:
+                plan = [f"Unable to explain: {ex}"]
+        entry = dict(
+            db_type=key[0],
+            caller=key[1],
+            statement=statement,
+            duration_ms=round(duration * 1000, 3),
+            captured_at=time.time(),
+            plan=plan,
+        )
+        with self._lock:
+            self._slow_queries.append(entry)
+            self._slow_queries.sort(key=lambda item: item["duration_ms"], reverse=True)
+            del self._slow_queries[self.max_slow_queries:]
+
+    def snapshot(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns the collected statistics ordered by total time.
+
+        Args:
+            limit (int, optional): Maximum number of fingerprints returned.
+
+        Returns:
+            Dict[str, Any]: ``queries`` statistics and ``slow_queries`` with their plans.
+        """
+        with self._lock:
+            queries = sorted(
+                (stats.to_dict() for stats in self._stats.values()),
+                key=lambda item: item["total_ms"],
+                reverse=True,
+            )
+            slow_queries = list(self._slow_queries)
+        return dict(
+            started_at=self.started_at,
+            queries=queries[:limit] if limit else queries,
+            slow_queries=slow_queries,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow_queries.clear()
+            self.started_at = time.time()
+
+    def dump(self, path: str) -> None:
+        """
+        Writes a snapshot to ``path`` as JSON, replacing the previous dump.
+
+        Args:
+            path (str): Target file.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+
+PROFILER = QueryProfiler(Environ.DB_PROFILER_SLOW_QUERY_MS / 1000)
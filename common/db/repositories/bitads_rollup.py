@@ -0,0 +1,267 @@
+"""
+Daily rollups of bitads_data.
+
+Writes to bitads_data mark the days they touch as dirty, ``refresh``
+recomputes the rollups of the dirty days from the raw rows. Rollups are not
+touched when raw rows move to history, so they keep covering days whose rows
+are no longer in the active database.
+
+Functions:
+    mark_dirty: Marks the days of the given dates as dirty.
+    refresh: Recomputes the rollups of the dirty days.
+    rebuild: Recomputes the rollups of every day.
+    get_aggregated_data: Aggregates visits and completed sales of full days.
+    get_miners_reputation: Sums sales of full days per miner.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from common.schemas.aggregated import AggregatedData, AggregationSchema
+from common.schemas.sales import SalesStatus
+from common.validator.db.entities.active import (
+    BitAdsDailyRollup,
+    BitAdsData,
+    BitAdsRollupDirtyDay,
+    MinerAssignment,
+)
+
+_ROLLUP_COLUMNS = (
+    "visits",
+    "visits_unique",
+    "completed_sales",
+    "completed_refunds",
+    "completed_sales_amount",
+    "sale_rows",
+    "sales",
+)
+
+
+def mark_dirty(session: Session, *values: Optional[datetime]) -> None:
+    """
+    Marks the days of the given dates as dirty, None values are ignored.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        *values (datetime): Dates of written rows, e.g. ``created_at`` and ``sale_date``.
+    """
+    days = {value.date() for value in values if value is not None}
+    if not days:
+        return
+    session.execute(
+        sqlite_insert(BitAdsRollupDirtyDay)
+        .values([dict(day=day) for day in days])
+        .on_conflict_do_nothing()
+    )
+
+
+def _day_ranges(column, days: Iterable[date]):
+    return or_(
+        *(
+            and_(
+                column >= datetime.combine(day, time()),
+                column < datetime.combine(day + timedelta(days=1), time()),
+            )
+            for day in days
+        )
+    )
+
+
+def _compute(session: Session, days: Optional[List[date]]) -> List[Dict]:
+    rows = defaultdict(lambda: dict.fromkeys(_ROLLUP_COLUMNS, 0))
+    completed = BitAdsData.sales_status == SalesStatus.COMPLETED
+    created_day = func.date(BitAdsData.created_at)
+    visits_stmt = select(
+        BitAdsData.campaign_id,
+        BitAdsData.campaign_item,
+        created_day,
+        func.count(),
+        func.sum(case((BitAdsData.is_unique, 1), else_=0)),
+        func.sum(case((completed, BitAdsData.sales), else_=0)),
+        func.sum(case((completed, BitAdsData.refund), else_=0)),
+        func.sum(case((completed, BitAdsData.sale_amount), else_=0)),
+    ).where(
+        BitAdsData.campaign_id.is_not(None),
+        BitAdsData.campaign_item.is_not(None),
+        BitAdsData.created_at.is_not(None),
+    )
+    sale_day = func.date(BitAdsData.sale_date)
+    sales_stmt = select(
+        BitAdsData.campaign_id,
+        BitAdsData.campaign_item,
+        sale_day,
+        func.count(),
+        func.sum(BitAdsData.sales),
+    ).where(
+        BitAdsData.campaign_id.is_not(None),
+        BitAdsData.campaign_item.is_not(None),
+        BitAdsData.sale_date.is_not(None),
+    )
+    if days is not None:
+        visits_stmt = visits_stmt.where(_day_ranges(BitAdsData.created_at, days))
+        sales_stmt = sales_stmt.where(_day_ranges(BitAdsData.sale_date, days))
+    visits_stmt = visits_stmt.group_by(
+        BitAdsData.campaign_id, BitAdsData.campaign_item, created_day
+    )
+    sales_stmt = sales_stmt.group_by(
+        BitAdsData.campaign_id, BitAdsData.campaign_item, sale_day
+    )
+
+    for campaign_id, campaign_item, day, *values in session.execute(visits_stmt):
+        row = rows[campaign_id, campaign_item, day]
+        for column, value in zip(_ROLLUP_COLUMNS[:5], values):
+            row[column] = value or 0
+    for campaign_id, campaign_item, day, sale_rows, sales in session.execute(
+        sales_stmt
+    ):
+        row = rows[campaign_id, campaign_item, day]
+        row["sale_rows"] = sale_rows
+        row["sales"] = sales or 0
+
+    return [
+        dict(
+            campaign_id=campaign_id,
+            campaign_item=campaign_item,
+            day=date.fromisoformat(day),
+            **values,
+        )
+        for (campaign_id, campaign_item, day), values in rows.items()
+    ]
+
+
+def refresh(session: Session) -> int:
+    """
+    Recomputes the rollups of the dirty days from the raw rows.
+
+    The dirty days are taken with a write statement first, so concurrent
+    writers wait for the refresh and no write is lost between reading the raw
+    rows and clearing the dirty days.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+
+    Returns:
+        int: Number of recomputed days.
+    """
+    days = list(
+        session.scalars(delete(BitAdsRollupDirtyDay).returning(BitAdsRollupDirtyDay.day))
+    )
+    if not days:
+        return 0
+    session.execute(delete(BitAdsDailyRollup).where(BitAdsDailyRollup.day.in_(days)))
+    rows = _compute(session, days)
+    if rows:
+        session.execute(insert(BitAdsDailyRollup), rows)
+    return len(days)
+
+
+def rebuild(session: Session) -> int:
+    """
+    Recomputes the rollups of every day present in bitads_data.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+
+    Returns:
+        int: Number of rollup rows.
+    """
+    session.execute(delete(BitAdsRollupDirtyDay))
+    session.execute(delete(BitAdsDailyRollup))
+    rows = _compute(session, None)
+    if rows:
+        session.execute(insert(BitAdsDailyRollup), rows)
+    return len(rows)
+
+
+def get_aggregated_data(
+    session: Session, *campaign_ids: str, from_day: date, to_day: date
+) -> AggregatedData:
+    """
+    Aggregates rolled up visits and completed sales, the rollup counterpart of
+    ``bitads_data.get_aggregated_data``.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        *campaign_ids (str): Campaign IDs to filter the data (default: all).
+        from_day (date): First day (inclusive).
+        to_day (date): Last day (exclusive).
+
+    Returns:
+        AggregatedData: Aggregations per campaign and miner hotkey.
+    """
+    query = (
+        session.query(
+            BitAdsDailyRollup.campaign_id,
+            MinerAssignment.hotkey,
+            func.sum(BitAdsDailyRollup.visits).label("visits"),
+            func.sum(BitAdsDailyRollup.visits_unique).label("visits_unique"),
+            func.sum(BitAdsDailyRollup.completed_sales).label("total_sales"),
+            func.sum(BitAdsDailyRollup.completed_refunds).label("total_refunds"),
+            func.sum(BitAdsDailyRollup.completed_sales_amount).label("sales_amount"),
+        )
+        .join(
+            MinerAssignment, BitAdsDailyRollup.campaign_item == MinerAssignment.unique_id
+        )
+        .where(BitAdsDailyRollup.day >= from_day, BitAdsDailyRollup.day < to_day)
+    )
+    if campaign_ids:
+        query = query.where(
+            BitAdsDailyRollup.campaign_id.in_(campaign_ids),
+            MinerAssignment.campaign_id.in_(campaign_ids),
+        )
+    query = query.group_by(BitAdsDailyRollup.campaign_id, MinerAssignment.hotkey)
+    # Rows rolled up only for their sale_date have no visits on the day
+    query = query.having(func.sum(BitAdsDailyRollup.visits) > 0)
+
+    aggregations = defaultdict(dict)
+    for result in query.all():
+        aggregations[result.campaign_id][result.hotkey] = AggregationSchema(
+            visits=result.visits,
+            visits_unique=result.visits_unique,
+            total_sales=result.total_sales,
+            total_refunds=result.total_refunds,
+            sales_amount=result.sales_amount,
+        )
+    return AggregatedData(data=aggregations)
+
+
+def get_miners_reputation(
+    session: Session, *campaign_ids: str, from_day: date, to_day: date
+) -> Dict[str, int]:
+    """
+    Sums rolled up sales per miner hotkey, the rollup counterpart of
+    ``bitads_data.get_miners_reputation``.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        *campaign_ids (str): Campaign IDs to filter the data (default: all).
+        from_day (date): First sale day (inclusive).
+        to_day (date): Last sale day (exclusive).
+
+    Returns:
+        Dict[str, int]: A dictionary mapping miner hotkeys to their total sales.
+    """
+    query = (
+        session.query(
+            MinerAssignment.hotkey,
+            func.sum(BitAdsDailyRollup.sales).label("total_sales"),
+        )
+        .join(
+            MinerAssignment, BitAdsDailyRollup.campaign_item == MinerAssignment.unique_id
+        )
+        .where(BitAdsDailyRollup.day >= from_day, BitAdsDailyRollup.day < to_day)
+    )
+    if campaign_ids:
+        query = query.where(
+            BitAdsDailyRollup.campaign_id.in_(campaign_ids),
+            MinerAssignment.campaign_id.in_(campaign_ids),
+        )
+    query = query.group_by(MinerAssignment.hotkey).having(
+        func.sum(BitAdsDailyRollup.sale_rows) > 0
+    )
+    # noinspection PyTypeChecker
+    return dict(query.all())
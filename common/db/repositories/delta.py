@@ -0,0 +1,258 @@
+"""
+Export and idempotent apply of changed rows for the delta sync between neurons.
+
+Rows are read in ``(updated_at, primary key)`` order after a watermark and
+applied with bulk upserts. An upsert never replaces a row that was updated
+later locally, so applying the same batch twice or an older batch is a no-op.
+Deleted rows are not propagated, rows moved to history are migrated by every
+neuron on its own. The processing state of the order queue is not synced
+either, every neuron leases and processes its queue on its own.
+
+Sales, refunds and their status are scored, so a peer only adds them with
+rows missing locally and never replaces them on rows known locally.
+
+Functions:
+    export_rows: Returns rows changed after a watermark.
+    apply_batch: Upserts the rows of a batch.
+    get_watermark: Returns the position of the delta sync of a table from a peer.
+    set_watermark: Stores the position of the delta sync of a table from a peer.
+"""
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import DateTime, PickleType, and_, or_, select
+from sqlalchemy import Enum as EnumType
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from common.db.repositories import bitads_rollup
+from common.schemas.delta import DeltaBatch, Watermark
+from common.schemas.shopify import OrderDetails
+from common.validator.db.entities.active import (
+    BitAdsData,
+    DeltaWatermark,
+    MinerAssignment,
+    OrderQueue,
+)
+
+TABLES = {
+    entity.__tablename__: entity for entity in (BitAdsData, OrderQueue, MinerAssignment)
+}
+
+# Lease and processing state of the local queue, a peer's lease or result
+# must not replace it. New rows get the defaults and are processed locally.
+_LOCAL_COLUMNS = {
+    OrderQueue.__tablename__: {
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "lease_token",
+        "last_processing_date",
+    },
+}
+
+# Scored columns, taken from a peer only with rows missing locally
+_PROTECTED_COLUMNS = {
+    BitAdsData.__tablename__: {
+        "sales_status",
+        "sales",
+        "sale_amount",
+        "refund",
+        "order_info",
+        "refund_info",
+        "sale_date",
+        "validator_block",
+        "validator_hotkey",
+    },
+    OrderQueue.__tablename__: {"order_info", "refund_info"},
+    MinerAssignment.__tablename__: {"hotkey", "campaign_id"},
+}
+
+# Keeps the statements below the SQLite variable limit
+_UPSERT_BATCH_SIZE = 500
+
+
+def _key_column(entity):
+    return entity.__table__.primary_key.columns.values()[0]
+
+
+def _synced_columns(entity) -> list:
+    local = _LOCAL_COLUMNS.get(entity.__tablename__, ())
+    return [column for column in entity.__table__.columns if column.name not in local]
+
+
+def _dump(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, EnumType):
+        return value.name if isinstance(value, Enum) else value
+    if isinstance(column.type, DateTime):
+        return value.isoformat()
+    if isinstance(column.type, PickleType) and isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    return value
+
+
+def _load(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, EnumType) and column.type.enum_class:
+        return column.type.enum_class[value]
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, PickleType):
+        # Every pickled column of the synced tables holds order details
+        return OrderDetails.model_validate(value)
+    return value
+
+
+def export_rows(
+    session: Session,
+    table: str,
+    after: Optional[Watermark] = None,
+    limit: int = 1000,
+    settle: timedelta = timedelta(seconds=5),
+) -> DeltaBatch:
+    """
+    Returns rows changed after a watermark.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        table (str): One of ``TABLES``.
+        after (Watermark, optional): Position of the last row already received.
+        limit (int, optional): Maximum number of rows.
+        settle (timedelta, optional): Rows updated more recently are left for the
+            next batch, so writes still in flight are not skipped by the watermark.
+
+    Returns:
+        DeltaBatch: The rows and the watermark of the last one.
+    """
+    entity = TABLES[table]
+    key = _key_column(entity)
+    columns = _synced_columns(entity)
+    stmt = select(*columns).where(
+        entity.updated_at.is_not(None),
+        entity.updated_at <= datetime.utcnow() - settle,
+    )
+    if after is not None:
+        stmt = stmt.where(
+            or_(
+                entity.updated_at > after.updated_at,
+                and_(entity.updated_at == after.updated_at, key > after.id),
+            )
+        )
+    stmt = stmt.order_by(entity.updated_at, key).limit(limit)
+    rows = session.execute(stmt).all()
+    watermark = None
+    if rows:
+        last = rows[-1]._mapping
+        watermark = Watermark(updated_at=last["updated_at"], id=last[key.name])
+    return DeltaBatch(
+        table=table,
+        columns=[column.name for column in columns],
+        rows=[[_dump(column, value) for column, value in zip(columns, row)] for row in rows],
+        next=watermark,
+        has_more=len(rows) == limit,
+    )
+
+
+def apply_batch(session: Session, batch: DeltaBatch) -> int:
+    """
+    Upserts the rows of a batch, rows updated later locally are kept and
+    the scored columns of rows known locally are never replaced.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        batch (DeltaBatch): Batch returned by ``export_rows`` on a peer.
+
+    Returns:
+        int: Number of rows in the batch.
+    """
+    entity = TABLES[batch.table]
+    table = entity.__table__
+    key = _key_column(entity)
+    # Columns unknown locally are ignored, e.g. when the peer runs a newer
+    # schema, and so is the queue state exported by older peers
+    columns = {column.name: column for column in _synced_columns(entity)}
+    indexes = [
+        (i, columns[name]) for i, name in enumerate(batch.columns) if name in columns
+    ]
+    protected = _PROTECTED_COLUMNS.get(batch.table, ())
+    updated = [
+        column
+        for _, column in indexes
+        if column is not key and column.name not in protected
+    ]
+    values = [
+        {column.name: _load(column, row[i]) for i, column in indexes}
+        for row in batch.rows
+    ]
+    for start in range(0, len(values), _UPSERT_BATCH_SIZE):
+        chunk = values[start:start + _UPSERT_BATCH_SIZE]
+        if entity is BitAdsData:
+            _mark_rollups_dirty(session, chunk)
+        stmt = insert(table).values(chunk)
+        if updated:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key],
+                set_={column.name: stmt.excluded[column.name] for column in updated},
+                where=table.c.updated_at.is_(None)
+                | (table.c.updated_at <= stmt.excluded.updated_at),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[key])
+        session.execute(stmt)
+    return len(values)
+
+
+def _mark_rollups_dirty(session: Session, values: List[Dict[str, Any]]) -> None:
+    existing = session.execute(
+        select(BitAdsData.created_at, BitAdsData.sale_date).where(
+            BitAdsData.id.in_([value["id"] for value in values])
+        )
+    ).all()
+    bitads_rollup.mark_dirty(
+        session,
+        *(value.get("created_at") for value in values),
+        *(value.get("sale_date") for value in values),
+        *(date for row in existing for date in row),
+    )
+
+
+def get_watermark(session: Session, source: str, table: str) -> Optional[Watermark]:
+    """
+    Returns the position of the delta sync of a table from a peer.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        source (str): Peer identifier, e.g. its hotkey.
+        table (str): One of ``TABLES``.
+    """
+    entity = session.get(DeltaWatermark, (source, table))
+    return (
+        Watermark(updated_at=entity.updated_at, id=entity.row_id) if entity else None
+    )
+
+
+def set_watermark(
+    session: Session, source: str, table: str, watermark: Watermark
+) -> None:
+    """
+    Stores the position of the delta sync of a table from a peer.
+
+    Args:
+        session (Session): The SQLAlchemy session object.
+        source (str): Peer identifier, e.g. its hotkey.
+        table (str): One of ``TABLES``.
+        watermark (Watermark): Position of the last applied row.
+    """
+    session.merge(
+        DeltaWatermark(
+            source=source,
+            table_name=table,
+            updated_at=watermark.updated_at,
+            row_id=watermark.id,
+        )
+    )
@@ -1,13 +1,18 @@
-from datetime import datetime
-from typing import Optional, List
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import and_, bindparam, case, select, func, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 
-from common.schemas.sales import OrderQueueSchema, OrderQueueStatus
+from common.schemas.sales import OrderQueueSchema, OrderQueueStats, OrderQueueStatus
 from common.validator.db.entities.active import OrderQueue
 
-from common.schemas.shopify import OrderDetails
+from common.schemas.shopify import OrderDetails, SaleData
+from common.validator.schemas import Action
+
+REQUEUE_BATCH_SIZE = 500
 
 
 def add_data(
@@ -44,37 +49,238 @@ def update_data(
     entity.refund_info = refund_info
 
     entity.status = OrderQueueStatus.PENDING
+    entity.attempts = 0
+    now = datetime.utcnow()
+    # A claimed row is due again when its lease expires, the holder's result is dropped
+    if not entity.lease_token or not entity.next_attempt_at or entity.next_attempt_at < now:
+        entity.next_attempt_at = now
+    entity.lease_token = None
+
 
+def upsert_data(
+    session: Session, items: List[Tuple[str, SaleData]], now: Optional[datetime] = None
+) -> List[bool]:
+    """
+    Adds or updates the rows of several sales and refunds in one transaction:
+    one upsert for the orders, one update for refunds of queued orders.
 
-def get_data_for_processing(
-    session: Session, limit: int = 500
+    Items apply in order, as ``add_data`` and ``update_data`` would one by one:
+    a sale sets the order and clears the refund, a refund sets the refund of
+    an order queued before or earlier in ``items``. Updated rows are due again
+    with a fresh attempt budget.
+
+    Returns:
+        List[bool]: Per item, False for a refund without an order.
+    """
+    now = now or datetime.utcnow()
+    refunded = list(
+        {id_ for id_, sale_data in items if sale_data.type == Action.refund}
+    )
+    existing = set()
+    for i in range(0, len(refunded), REQUEUE_BATCH_SIZE):
+        chunk = refunded[i:i + REQUEUE_BATCH_SIZE]
+        existing.update(
+            session.scalars(select(OrderQueue.id).where(OrderQueue.id.in_(chunk)))
+        )
+
+    accepted = []
+    values: Dict[str, dict] = {}
+    for id_, sale_data in items:
+        value = values.get(id_)
+        if sale_data.type == Action.sale:
+            values[id_] = dict(order_info=sale_data.order_details, refund_info=None)
+        elif value or id_ in existing:
+            values[id_] = dict(
+                order_info=value["order_info"] if value else None,
+                refund_info=sale_data.order_details,
+            )
+        else:
+            accepted.append(False)
+            continue
+        accepted.append(True)
+    if not values:
+        return accepted
+
+    leased = and_(
+        OrderQueue.lease_token.is_not(None), OrderQueue.next_attempt_at > now
+    )
+    requeued = dict(
+        updated_at=now,
+        status=OrderQueueStatus.PENDING,
+        attempts=0,
+        # A claimed row is due again when its lease expires, as in ``update_data``
+        next_attempt_at=case((leased, OrderQueue.next_attempt_at), else_=now),
+        lease_token=None,
+    )
+    orders = [
+        dict(
+            id=id_,
+            created_at=now,
+            updated_at=now,
+            last_processing_date=now,
+            status=OrderQueueStatus.PENDING,
+            attempts=0,
+            next_attempt_at=now,
+            **value,
+        )
+        for id_, value in values.items()
+        if value["order_info"] is not None
+    ]
+    if orders:
+        stmt = insert(OrderQueue).values(orders)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OrderQueue.id],
+            set_=dict(
+                order_info=stmt.excluded.order_info,
+                refund_info=stmt.excluded.refund_info,
+                **requeued,
+            ),
+        )
+        session.execute(stmt)
+    # Refunds of orders queued before keep their order
+    refunds = [
+        dict(id_=id_, refund_info=value["refund_info"])
+        for id_, value in values.items()
+        if value["order_info"] is None
+    ]
+    if refunds:
+        session.execute(
+            update(OrderQueue.__table__)
+            .where(OrderQueue.id == bindparam("id_"))
+            .values(**requeued),
+            refunds,
+        )
+    return accepted
+
+
+def claim(
+    session: Session, limit: int, lease: timedelta, now: Optional[datetime] = None
 ) -> List[OrderQueueSchema]:
-    # Query to select rows where status is not 'PROCESSED' and order by last_processing_date ascending
-    stmt = (
-        select(OrderQueue)
-        .where(OrderQueue.status != OrderQueueStatus.PROCESSED)
-        .order_by(OrderQueue.last_processing_date.asc())
+    """
+    Leases up to ``limit`` due rows, oldest due first.
+
+    Claimed rows get a new lease token, one more attempt and are not due again
+    before the lease expires, so concurrent processors never get the same row
+    and rows of a crashed processor come back on their own.
+    """
+    now = now or datetime.utcnow()
+    due = (
+        select(OrderQueue.id)
+        .where(OrderQueue.next_attempt_at <= now)
+        .order_by(OrderQueue.next_attempt_at.asc())
         .limit(limit)
     )
+    stmt = (
+        update(OrderQueue)
+        .where(OrderQueue.id.in_(due.scalar_subquery()))
+        .values(
+            lease_token=uuid.uuid4().hex,
+            next_attempt_at=now + lease,
+            attempts=OrderQueue.attempts + 1,
+        )
+        .returning(OrderQueue)
+        .execution_options(synchronize_session=False)
+    )
+    rows = session.scalars(stmt).all()
+    return sorted(
+        (OrderQueueSchema.model_validate(row) for row in rows),
+        key=lambda item: item.last_processing_date,
+    )
 
-    # Execute the query
-    result = session.execute(stmt)
 
-    # Fetch all rows
-    rows = result.scalars().all()
+def get_backoff(attempts: int, retry_backoff: timedelta, max_backoff: timedelta) -> timedelta:
+    """Delay before the next attempt, doubling with every attempt made."""
+    return min(retry_backoff * 2 ** max(attempts - 1, 0), max_backoff)
 
-    # Return as Pydantic models
-    return [OrderQueueSchema.model_validate(row) for row in rows]
 
+def complete(
+    session: Session,
+    id_: str,
+    lease_token: str,
+    status: OrderQueueStatus,
+    max_attempts: int,
+    retry_backoff: timedelta,
+    max_backoff: timedelta,
+    now: Optional[datetime] = None,
+) -> Optional[OrderQueueStatus]:
+    """
+    Records the result of a claimed row.
 
-def update_status(session: Session, id_: str, status: OrderQueueStatus):
+    Processed rows leave the queue, failed rows are due again after a backoff
+    or are dead lettered once ``max_attempts`` attempts were made.
+
+    Returns:
+        Optional[OrderQueueStatus]: The new status, None if the lease was lost.
+    """
     entity = session.get(OrderQueue, id_)
+    if not entity or entity.lease_token != lease_token:
+        return None
+    now = now or datetime.utcnow()
+    entity.lease_token = None
+    entity.last_processing_date = now
+    if status == OrderQueueStatus.PROCESSED:
+        entity.next_attempt_at = None
+    elif entity.attempts >= max_attempts:
+        status = OrderQueueStatus.DEAD_LETTER
+        entity.next_attempt_at = None
+    else:
+        entity.next_attempt_at = now + get_backoff(
+            entity.attempts, retry_backoff, max_backoff
+        )
     entity.status = status
-    entity.last_processing_date = datetime.utcnow()
+    return status
+
+
+def requeue(session: Session, ids: Optional[List[str]] = None) -> None:
+    """
+    Makes rows due at once with a fresh attempt budget, every row when ``ids`` is None.
+    """
+    stmt = update(OrderQueue).values(
+        status=OrderQueueStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+        lease_token=None,
+    )
+    if ids is None:
+        session.execute(stmt)
+        return
+    for i in range(0, len(ids), REQUEUE_BATCH_SIZE):
+        session.execute(
+            stmt.where(OrderQueue.id.in_(ids[i:i + REQUEUE_BATCH_SIZE]))
+        )
 
 
 def get_all_ids(session: Session) -> List[str]:
     # Query the database for all `id` values in the `order_queue` table
     result = session.query(OrderQueue.id).all()
     # Extract the ids from the query result (which is a list of tuples)
-    return [row[0] for row in result]
\ No newline at end of file
+    return [row[0] for row in result]
+
+
+def count_by_status(session: Session) -> Dict[OrderQueueStatus, int]:
+    # Count rows per status in a single grouped query, a scan of the whole
+    # table, so it is not run every processing cycle
+    stmt = select(OrderQueue.status, func.count()).group_by(OrderQueue.status)
+    return {status: count for status, count in session.execute(stmt).all()}
+
+
+def get_stats(session: Session, now: Optional[datetime] = None) -> OrderQueueStats:
+    """
+    Ready and leased rows, read through the ``next_attempt_at`` index.
+    """
+    now = now or datetime.utcnow()
+    ready, oldest = session.execute(
+        select(func.count(), func.min(OrderQueue.next_attempt_at)).where(
+            OrderQueue.next_attempt_at <= now
+        )
+    ).one()
+    leased = session.execute(
+        select(func.count()).where(
+            OrderQueue.next_attempt_at > now, OrderQueue.lease_token.is_not(None)
+        )
+    ).scalar_one()
+    return OrderQueueStats(
+        ready=ready,
+        leased=leased,
+        oldest_ready_seconds=(now - oldest).total_seconds() if oldest else 0.0,
+    )
@@ -34,11 +34,14 @@ Functions:
 
 - get_max_date_excluding_hotkey(session: Session, exclude_hotkey: str) -> Optional[datetime]:
     Retrieves the maximum creation date of visitor entities excluding a specific hotkey.
+
+- get_visits_version(session: Session) -> int:
+    Retrieves a number that changes whenever visitor entities are inserted or removed.
 """
 from datetime import datetime
 from typing import Optional, List, Set
 
-from sqlalchemy import exists, select, update, and_, func
+from sqlalchemy import exists, select, update, and_, func, literal_column
 from sqlalchemy.orm import Session
 
 from common.miner.db.entities.active import Visitor
@@ -244,6 +247,24 @@ def get_max_date_excluding_hotkey(
     return max_date
 
 
+def get_visits_version(session: Session) -> int:
+    """
+    Retrieves a number that changes whenever visitor entities are inserted or removed.
+
+    The largest SQLite rowid grows with every insert, including visits synced
+    with an older creation date, and is read from the end of the table b-tree
+    without scanning it.
+
+    Args:
+        session (Session): The database session object.
+
+    Returns:
+        int: The largest rowid of the visitors table, 0 if the table is empty.
+    """
+    stmt = select(func.max(literal_column("rowid"))).select_from(Visitor)
+    return session.execute(stmt).scalar() or 0
+
+
 def get_visits_by_campaign_item(
     session: Session, campaign_item: str, limit: int = 500, offset: int = 0
 ) -> List[VisitorSchema]:
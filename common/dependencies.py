@@ -1,4 +1,5 @@
-from typing import Annotated, Optional
+from functools import lru_cache
+from typing import Annotated, Awaitable, Callable, Optional
 
 import bittensor as bt
 from fastapi import Depends
@@ -6,9 +7,12 @@ from fastapi import Depends
 import neurons
 from common.clients.bitads.base import BitAdsClient
 from common.clients.bitads.impl import SyncBitAdsClient
+from common.db import profiler
 from common.db.database import Database, DatabaseManager
 from common.environ import Environ
 from common.helpers import const
+from common.peer_auth import PeerSigner, PeerVerifier
+from common.seen_ids import SeenIds
 from common.services.bitads.base import BitAdsService
 from common.services.bitads.impl import BitAdsServiceImpl
 from common.services.campaign.base import CampaignService
@@ -16,11 +20,17 @@ from common.services.campaign.impl import CampaignServiceImpl
 from common.services.geoip.base import GeoIpService
 from common.services.geoip.impl import GeoIpServiceImpl
 from common.services.metagraph.base import MetagraphService
-from common.services.metagraph.impl import BittensorMetagraphService
+from common.services.metagraph.impl import (
+    BittensorMetagraphService,
+    MetagraphSnapshot,
+    SharedMetagraphService,
+)
 from common.services.miner_assignment.base import MinerAssignmentService
 from common.services.miner_assignment.impl import MinerAssignmentServiceImpl
 from common.services.order_history.base import OrderHistoryService
 from common.services.order_history.impl import OrderHistoryServiceImpl
+from common.services.snapshot.base import SnapshotService
+from common.services.snapshot.impl import SnapshotServiceImpl
 from common.services.two_factor.base import TwoFactorService
 from common.services.two_factor.impl import TwoFactorServiceImpl
 from common.services.unique_link.base import MinerUniqueLinkService
@@ -46,9 +56,10 @@ def get_main_db(db_url: str) -> Database:
     return Database(db_url)
 
 
+@lru_cache(maxsize=None)
 def get_geo_ip_service() -> GeoIpService:
     """
-    Creates and returns a GeoIP service instance.
+    Creates and returns a GeoIP service instance, one per process.
 
     Returns:
         GeoIpService: Initialized GeoIpService implementation using Environ.GEO2_LITE_DB_PATH.
@@ -81,14 +92,19 @@ def get_database_manager(
 
     Notes:
         This function initializes a DatabaseManager instance for managing database connections based on the provided parameters.
+        The SQL profiler is attached when Environ.DB_PROFILER is set.
     """
-    return DatabaseManager(neuron_type, subtensor_network)
+    database_manager = DatabaseManager(neuron_type, subtensor_network)
+    if Environ.DB_PROFILER:
+        profiler.PROFILER.attach(database_manager)
+    return database_manager
 
 
 def get_bitads_service(
-    database_manager: Annotated[DatabaseManager, Depends(get_database_manager)]
+    database_manager: Annotated[DatabaseManager, Depends(get_database_manager)],
+    seen_visits: Optional[SeenIds] = None,
 ) -> BitAdsService:
-    return BitAdsServiceImpl(database_manager)
+    return BitAdsServiceImpl(database_manager, seen_visits=seen_visits)
 
 
 def create_bitads_client(
@@ -207,5 +223,24 @@ def get_order_history_service(database_manager: DatabaseManager) -> OrderHistory
     return OrderHistoryServiceImpl(database_manager)
 
 
+def get_snapshot_service(database_manager: DatabaseManager) -> SnapshotService:
+    return SnapshotServiceImpl(database_manager, Environ.SNAPSHOT_DIR)
+
+
 def get_metagraph_service() -> MetagraphService:
-    return BittensorMetagraphService()
\ No newline at end of file
+    return BittensorMetagraphService()
+
+
+def get_shared_metagraph_service(
+    get_snapshot: Callable[[], Awaitable[MetagraphSnapshot]]
+) -> MetagraphService:
+    return SharedMetagraphService(get_snapshot)
+
+
+def get_peer_verifier(metagraph_service: MetagraphService) -> PeerVerifier:
+    """Accepts requests signed by validators with a permit in the metagraph."""
+    return PeerVerifier(metagraph_service.has_validator_permit)
+
+
+def get_peer_signer(wallet: bt.wallet) -> PeerSigner:
+    return PeerSigner(wallet.get_hotkey())
@@ -1,4 +1,5 @@
 import json
+from datetime import timedelta
 from os import environ
 
 
@@ -18,6 +19,19 @@ class Environ:
                            Defaults to an empty list ([]).
         MINERS (list): List of miners parsed from environment variables as a JSON array.
                        Defaults to an empty list ([]).
+        DB_PROFILER (bool): Whether SQL statements are profiled. Defaults to False.
+        DB_PROFILER_SLOW_QUERY_MS (int): Statements at least this slow are captured with their plan.
+                                         Defaults to 100.
+        DB_PROFILER_DUMP_PERIOD (timedelta): Period of the neuron profile dumps. Defaults to 15 minutes.
+        SNAPSHOT_DIR (str): Directory of the database snapshots served by /get_database.
+                            Defaults to 'databases/snapshots'.
+        SNAPSHOT_PERIOD (timedelta): Period of the database snapshots. Defaults to 60 minutes.
+        SYNC_VISITS_CACHE_TTL (timedelta): Lifetime of the SyncVisits pages cached by the miner axon.
+                                           Defaults to 10 seconds.
+        PROXY_WORKERS (int): Number of proxy worker processes. With more than one, a single writer process
+                             runs the writes of every worker. Defaults to 1.
+        METAGRAPH_REFRESH_PERIOD (timedelta): Period of the metagraph refresh of the validator proxy.
+                                              Defaults to 5 minutes.
     """
     MAIN_DB_URL: str = environ.get("MAIN_DB_URL", "sqlite+aiosqlite:///main.db")
     GEO2_LITE_DB_PATH: str = environ.get("GEO2_LITE_DB_PATH", "GeoLite2-Country.mmdb")
@@ -28,3 +42,19 @@ class Environ:
     VALIDATORS: list = json.loads(environ.get("VALIDATORS", "[]"))
     MINERS: list = json.loads(environ.get("MINERS", "[]"))
     NEURON_TYPE = environ.get("NEURON_TYPE", "neuron")
+    DB_PROFILER: bool = environ.get("DB_PROFILER", "false").lower() == "true"
+    DB_PROFILER_SLOW_QUERY_MS: int = int(environ.get("DB_PROFILER_SLOW_QUERY_MS", 100))
+    DB_PROFILER_DUMP_PERIOD: timedelta = timedelta(
+        minutes=int(environ.get("DB_PROFILER_DUMP_PERIOD", 15))
+    )
+    SNAPSHOT_DIR: str = environ.get("SNAPSHOT_DIR", "databases/snapshots")
+    SNAPSHOT_PERIOD: timedelta = timedelta(
+        minutes=int(environ.get("SNAPSHOT_PERIOD", 60))
+    )
+    SYNC_VISITS_CACHE_TTL: timedelta = timedelta(
+        seconds=int(environ.get("SYNC_VISITS_CACHE_TTL", 10))
+    )
+    PROXY_WORKERS: int = int(environ.get("PROXY_WORKERS", 1))
+    METAGRAPH_REFRESH_PERIOD: timedelta = timedelta(
+        minutes=int(environ.get("METAGRAPH_REFRESH_PERIOD", 5))
+    )
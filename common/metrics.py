@@ -0,0 +1,378 @@
+"""
+Prometheus-style metrics registry.
+
+A small in-process registry of counters, gauges and histograms rendered in the
+Prometheus text exposition format, plus the metrics recorded by the proxies and
+the neurons.
+
+Classes:
+    Counter: Monotonically increasing value per label set.
+    Gauge: Value per label set that can go up and down.
+    Histogram: Bucketed observations per label set.
+    Registry: Collection of metrics rendered together.
+
+Functions:
+    observe_dendrite_responses: Records latency and failures of dendrite responses.
+    start_http_exporter: Serves the registry over HTTP from a daemon thread.
+
+Metrics:
+    HTTP_REQUEST_SECONDS: Proxy request latency per route.
+    DB_SESSION_SECONDS: Time a ``DatabaseManager.get_session`` session is held, per db_type.
+    DENDRITE_REQUEST_SECONDS: Dendrite call latency per synapse type.
+    DENDRITE_FAILURES: Failed dendrite calls per synapse type and status code.
+    ORDER_QUEUE_DEPTH: Order queue rows per status, refreshed every 10 minutes.
+    ORDER_QUEUE_READY: Order queue rows due for processing.
+    ORDER_QUEUE_LEASED: Order queue rows claimed by a processor.
+    ORDER_QUEUE_OLDEST_READY_SECONDS: How long the oldest due order queue row has waited.
+    MINER_SYNC_LAG_SECONDS: Age of the newest visit synced from each miner.
+    CACHE_REQUESTS: Cache lookups per cache and result (hit, stale or miss).
+    STARTUP_PHASE_SECONDS: Duration of each startup phase of a neuron.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing value per label set.
+    """
+
+    type_ = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        Increments the counter of a label set.
+
+        Args:
+            amount (float, optional): Non-negative increment. Defaults to 1.
+            **labels: Label values.
+
+        Raises:
+            ValueError: If ``amount`` is negative or labels do not match.
+        """
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """
+    Value per label set that can go up and down.
+    """
+
+    type_ = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def remove(self, **labels) -> None:
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """
+    Bucketed observations per label set.
+    """
+
+    type_ = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Records an observation for a label set.
+
+        Args:
+            value (float): Observed value, e.g. seconds.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = counts, total + value, count + 1
+
+    def get_count(self, **labels) -> int:
+        values = self._values.get(self._key(labels))
+        return values[2] if values else 0
+
+    def get_sum(self, **labels) -> float:
+        values = self._values.get(self._key(labels))
+        return values[1] if values else 0.0
+
+    def _samples(self) -> Iterable[str]:
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """
+    Collection of metrics rendered together.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Renders every registered metric in the Prometheus text format.
+
+        Returns:
+            str: Exposition text ending with a newline.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "bitads_http_request_seconds",
+    "Proxy request latency in seconds.",
+    ("method", "route", "status"),
+)
+DB_SESSION_SECONDS = REGISTRY.histogram(
+    "bitads_db_session_seconds",
+    "Time a database session is held in seconds.",
+    ("db_type",),
+)
+DENDRITE_REQUEST_SECONDS = REGISTRY.histogram(
+    "bitads_dendrite_request_seconds",
+    "Dendrite call latency in seconds.",
+    ("synapse",),
+)
+DENDRITE_FAILURES = REGISTRY.counter(
+    "bitads_dendrite_failures_total",
+    "Failed dendrite calls.",
+    ("synapse", "status_code"),
+)
+ORDER_QUEUE_DEPTH = REGISTRY.gauge(
+    "bitads_order_queue_depth",
+    "Order queue rows.",
+    ("status",),
+)
+ORDER_QUEUE_READY = REGISTRY.gauge(
+    "bitads_order_queue_ready",
+    "Order queue rows due for processing.",
+)
+ORDER_QUEUE_LEASED = REGISTRY.gauge(
+    "bitads_order_queue_leased",
+    "Order queue rows claimed by a processor.",
+)
+ORDER_QUEUE_OLDEST_READY_SECONDS = REGISTRY.gauge(
+    "bitads_order_queue_oldest_ready_seconds",
+    "Time the oldest due order queue row has waited in seconds.",
+)
+MINER_SYNC_LAG_SECONDS = REGISTRY.gauge(
+    "bitads_miner_sync_lag_seconds",
+    "Age of the newest visit synced from a miner in seconds.",
+    ("hotkey",),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "bitads_cache_requests_total",
+    "Cache lookups.",
+    ("cache", "result"),
+)
+STARTUP_PHASE_SECONDS = REGISTRY.gauge(
+    "bitads_startup_phase_seconds",
+    "Duration of a neuron startup phase in seconds.",
+    ("neuron", "phase"),
+)
+
+
+def observe_dendrite_responses(responses: Iterable, timeout: Optional[float] = None) -> None:
+    """
+    Records latency and failures of dendrite responses.
+
+    Args:
+        responses (Iterable[bt.Synapse]): Synapses returned by ``dendrite.forward``.
+        timeout (float, optional): Latency recorded for responses without a process time.
+    """
+    for response in responses:
+        synapse = type(response).__name__
+        dendrite = response.dendrite
+        process_time = getattr(dendrite, "process_time", None)
+        latency = float(process_time) if process_time is not None else timeout
+        if latency is not None:
+            DENDRITE_REQUEST_SECONDS.observe(latency, synapse=synapse)
+        status_code = getattr(dendrite, "status_code", None)
+        if status_code is None or int(status_code) != 200:
+            DENDRITE_FAILURES.inc(synapse=synapse, status_code=str(status_code))
+
+
+def start_http_exporter(
+    port: int, address: str = "0.0.0.0", registry: Registry = REGISTRY
+) -> ThreadingHTTPServer:
+    """
+    Serves ``registry`` on ``/metrics`` from a daemon thread.
+
+    Args:
+        port (int): Port to listen on.
+        address (str, optional): Address to bind. Defaults to all interfaces.
+        registry (Registry, optional): Registry to serve. Defaults to the global one.
+
+    Returns:
+        ThreadingHTTPServer: The running server, ``shutdown()`` stops it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
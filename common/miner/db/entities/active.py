@@ -20,7 +20,7 @@ from datetime import date
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Enum, String, Date, Integer
+from sqlalchemy import DateTime, Enum, String, Date, Integer, Index
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
 
 from common.schemas.device import Device
@@ -74,6 +74,19 @@ class Visitor(Base):
         DateTime, default=datetime.utcnow
     )
 
+    __table_args__ = (
+        # Uniqueness and return in site checks
+        Index(
+            "ix_visitors_ip_address_campaign_id_created_at",
+            "ip_address",
+            "campaign_id",
+            "created_at",
+        ),
+        # Visits sync, the hotkey filter is answered from the index
+        Index("ix_visitors_created_at_miner_hotkey", "created_at", "miner_hotkey"),
+        Index("ix_visitors_campaign_item_created_at", "campaign_item", "created_at"),
+    )
+
     __mapper_args__ = {
         "confirm_deleted_rows": False
     }
@@ -97,6 +110,8 @@ class VisitorActivity(Base):
     )
     count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
+    __table_args__ = (Index("ix_visitor_activity_created_at", "created_at"),)
+
     __mapper_args__ = {
         "confirm_deleted_rows": False
     }
@@ -0,0 +1,148 @@
+"""
+Requests between neurons signed with their hotkeys.
+
+The sender signs the method, path and query of a request together with its
+hotkey, a random nonce and the current time. The receiver checks the
+signature, rejects requests older than ``max_age`` and nonces it has seen
+within that time, and checks that the hotkey may use the route, e.g. that it
+is a validator with a permit in the metagraph.
+
+Classes:
+    PeerAuthError: A request is not signed by a permitted peer.
+    PeerSigner: Signs requests with a hotkey.
+    PeerVerifier: Checks signed requests.
+"""
+import time
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+
+import bittensor as bt
+
+HOTKEY_HEADER = "X-Peer-Hotkey"
+NONCE_HEADER = "X-Peer-Nonce"
+TIMESTAMP_HEADER = "X-Peer-Timestamp"
+SIGNATURE_HEADER = "X-Peer-Signature"
+
+
+class PeerAuthError(Exception):
+    pass
+
+
+def get_message(
+    method: str, path: str, query: str, hotkey: str, nonce: str, timestamp: str
+) -> bytes:
+    """The signed bytes of a request."""
+    return "\n".join((method.upper(), path, query, hotkey, nonce, timestamp)).encode()
+
+
+class PeerSigner:
+    """
+    Signs requests with a hotkey.
+
+    Args:
+        keypair (bt.Keypair): Hotkey of the sending neuron, e.g. ``wallet.get_hotkey()``.
+    """
+
+    def __init__(self, keypair: bt.Keypair):
+        self.keypair = keypair
+
+    def get_headers(self, method: str, path: str, query: str = "") -> Dict[str, str]:
+        """
+        Returns the headers authenticating one request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Path of the URL.
+            query (str, optional): Query string of the URL, as sent.
+        """
+        hotkey = self.keypair.ss58_address
+        nonce = uuid.uuid4().hex
+        timestamp = str(int(time.time()))
+        signature = self.keypair.sign(
+            get_message(method, path, query, hotkey, nonce, timestamp)
+        )
+        return {
+            HOTKEY_HEADER: hotkey,
+            NONCE_HEADER: nonce,
+            TIMESTAMP_HEADER: timestamp,
+            SIGNATURE_HEADER: signature.hex(),
+        }
+
+
+class PeerVerifier:
+    """
+    Checks signed requests.
+
+    Seen nonces are kept in memory, so with several proxy workers a request
+    could be replayed once per worker within ``max_age``.
+
+    Args:
+        is_permitted (Callable[[str], Awaitable[bool]]): Whether a hotkey may use the routes.
+        max_age (timedelta, optional): Largest difference between the signed time
+            and the time of the receiver.
+        max_nonces (int, optional): Nonces kept at most, the oldest dropped first.
+    """
+
+    def __init__(
+        self,
+        is_permitted: Callable[[str], Awaitable[bool]],
+        max_age: timedelta = timedelta(minutes=1),
+        max_nonces: int = 100_000,
+    ):
+        self.is_permitted = is_permitted
+        self.max_age = max_age.total_seconds()
+        self.max_nonces = max_nonces
+        self._nonces: "OrderedDict[str, float]" = OrderedDict()
+
+    async def verify(
+        self,
+        method: str,
+        path: str,
+        query: str,
+        headers: Mapping[str, str],
+        now: Optional[float] = None,
+    ) -> str:
+        """
+        Checks a request and returns the hotkey that signed it.
+
+        Raises:
+            PeerAuthError: If the request is not signed, is too old, was seen
+                before or its hotkey is not permitted.
+        """
+        try:
+            hotkey = headers[HOTKEY_HEADER]
+            nonce = headers[NONCE_HEADER]
+            timestamp = headers[TIMESTAMP_HEADER]
+            signature = bytes.fromhex(headers[SIGNATURE_HEADER])
+            signed_at = int(timestamp)
+        except (KeyError, ValueError):
+            raise PeerAuthError("Request is not signed")
+        now = time.time() if now is None else now
+        if abs(now - signed_at) > self.max_age:
+            raise PeerAuthError("Signature expired")
+        message = get_message(method, path, query, hotkey, nonce, timestamp)
+        try:
+            valid = bt.Keypair(ss58_address=hotkey).verify(message, signature)
+        except Exception:
+            valid = False
+        if not valid:
+            raise PeerAuthError("Invalid signature")
+        self._forget_expired(now)
+        if nonce in self._nonces:
+            raise PeerAuthError("Nonce already used")
+        if not await self.is_permitted(hotkey):
+            raise PeerAuthError(f"{hotkey} is not a permitted validator")
+        self._nonces[nonce] = signed_at
+        while len(self._nonces) > self.max_nonces:
+            self._nonces.popitem(last=False)
+        return hotkey
+
+    def _forget_expired(self, now: float) -> None:
+        # Nonces are kept in arrival order, their times are close to it
+        while self._nonces:
+            nonce, signed_at = next(iter(self._nonces.items()))
+            if now - signed_at <= 2 * self.max_age:
+                break
+            del self._nonces[nonce]
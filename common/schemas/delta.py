@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel
+
+
+class Watermark(BaseModel):
+    """
+    Keyset position in a table ordered by ``updated_at`` and primary key.
+    """
+
+    updated_at: datetime
+    id: str
+
+
+class DeltaBatch(BaseModel):
+    """
+    Rows changed after a watermark.
+
+    Column names are sent once, every row is a list of values in the order of
+    ``columns``. ``next`` is the watermark of the last row, None for an empty
+    batch. ``has_more`` is set when the batch is full.
+    """
+
+    table: str
+    columns: List[str]
+    rows: List[List[Any]]
+    next: Optional[Watermark] = None
+    has_more: bool = False
@@ -16,6 +16,7 @@ class OrderQueueStatus(IntEnum):
     VISIT_NOT_FOUND = 1
     PROCESSED = 2
     ERROR = -1
+    DEAD_LETTER = -2
 
 
 class OrderQueueSchema(BaseModel):
@@ -25,10 +26,28 @@ class OrderQueueSchema(BaseModel):
     created_at: datetime
     last_processing_date: datetime
     status: OrderQueueStatus = OrderQueueStatus.PENDING
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    lease_token: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class OrderQueueStats(BaseModel):
+    """
+    Ready rows and age of the order queue, read through the ``next_attempt_at`` index.
+
+    Attributes:
+        ready (int): Rows due for processing and not leased.
+        leased (int): Rows claimed by a processor whose lease has not expired.
+        oldest_ready_seconds (float): How long the oldest ready row has been due, 0 when none is.
+    """
+
+    ready: int = 0
+    leased: int = 0
+    oldest_ready_seconds: float = 0.0
+
+
 class OrderNotificationStatus(IntEnum):
     NEW = 0
     ORDER = 1
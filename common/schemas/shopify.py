@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import FrozenSet, Optional
+from typing import FrozenSet, List, Optional
 from typing import TypeVar, Generic
 
 from pydantic import BaseModel, Field, ConfigDict
@@ -61,6 +61,19 @@ class SaleData(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
 
+class ShopifySale(BaseModel):
+    """A webhook of a batch, ``id`` is the X-Unique-ID of a single webhook."""
+
+    id: str
+    data: SaleData
+
+
+class ShopifyBatchResult(BaseModel):
+    """IDs of the refunds of a batch rejected for having no order."""
+
+    rejected: List[str] = []
+
+
 class ShopifyData(BaseModel):
     type: Action
     data: SaleData
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class SnapshotManifest(BaseModel):
+    """
+    Describes a compressed database snapshot.
+
+    Checksums are SHA-256 hex digests, ``chunks`` holds one digest per
+    ``chunk_size`` bytes of the compressed file.
+    """
+
+    db: str
+    file: str
+    compression: str = "gzip"
+    size: int
+    sha256: str
+    raw_size: int
+    raw_sha256: str
+    chunk_size: int
+    chunks: List[str]
+    source_mtime: float
+    created_at: datetime
@@ -0,0 +1,194 @@
+"""
+Bounded memory of IDs already stored.
+
+Classes:
+    BloomFilter: Fixed-size set of IDs with false positives but no false negatives.
+    SeenIds: Rotating Bloom filter persisted to a file plus an exact set of recent IDs.
+"""
+import hashlib
+import logging
+import math
+import os
+import struct
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Set of IDs that answers "maybe added" or "never added".
+
+    Args:
+        capacity (int): IDs the filter holds at ``error_rate``.
+        error_rate (float): False positive probability once full.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        # One 32 bit slice of a 64 byte digest per hash
+        self.hashes = min(16, max(1, round(self.size / capacity * math.log(2))))
+        self._slices = struct.Struct(f"<{self.hashes}I")
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, id_: str) -> List[int]:
+        """Bits of the ID, the same in every filter of equal capacity and error rate."""
+        digest = hashlib.blake2b(id_.encode(), digest_size=self._slices.size).digest()
+        size = self.size
+        return [slice_ % size for slice_ in self._slices.unpack(digest)]
+
+    def add(self, id_: str, positions: Optional[List[int]] = None) -> None:
+        bits = self.bits
+        for position in positions or self.positions(id_):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def contains(self, id_: str, positions: Optional[List[int]] = None) -> bool:
+        bits = self.bits
+        for position in positions or self.positions(id_):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __contains__(self, id_: str) -> bool:
+        return self.contains(id_)
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+
+class SeenIds:
+    """
+    IDs already stored, remembered with bounded memory.
+
+    An ID is looked up in an exact set of the ``recent_size`` most recently
+    added IDs first. Otherwise a Bloom filter tells whether it may have been
+    added before. The filter has two generations of ``capacity`` IDs each;
+    when the current one is full the older one is dropped, so memory stays
+    fixed and the oldest IDs are forgotten.
+
+    Only the exact set is trusted to drop an ID. A Bloom filter hit still has
+    to be confirmed by the caller, e.g. against the database, while a miss
+    skips that check. The Bloom filter is saved to ``path``, the exact set
+    is kept in memory only, so a database restored behind the file cannot
+    lose rows.
+
+    Args:
+        path (str, optional): File the Bloom filter is saved to and loaded from.
+        capacity (int, optional): IDs per Bloom filter generation.
+        recent_size (int, optional): IDs in the exact set.
+        error_rate (float, optional): False positive probability of a full generation.
+    """
+
+    _MAGIC = b"SEEN1"
+    _HEADER = struct.Struct("<5sQdQQ")
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = 1_000_000,
+        recent_size: int = 100_000,
+        error_rate: float = 0.01,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.recent_size = recent_size
+        self.error_rate = error_rate
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        if path:
+            self.load()
+
+    def partition(self, ids: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Splits IDs by what is known about them, dropping the recently added ones.
+
+        Returns:
+            Tuple[Set[str], Set[str]]: IDs never added, or at least not since the
+                Bloom filter forgot them, and IDs that may have been added.
+        """
+        new, maybe_seen = set(), set()
+        for id_ in ids:
+            if id_ in self._recent:
+                continue
+            positions = self._current.positions(id_)
+            if self._current.contains(id_, positions) or self._previous.contains(
+                id_, positions
+            ):
+                maybe_seen.add(id_)
+            else:
+                new.add(id_)
+        return new, maybe_seen
+
+    def add(self, ids: Iterable[str]) -> None:
+        for id_ in ids:
+            if id_ in self._recent:
+                self._recent.move_to_end(id_)
+                continue
+            self._recent[id_] = None
+            positions = self._current.positions(id_)
+            if not self._current.contains(id_, positions):
+                if self._current.full:
+                    self._previous = self._current
+                    self._current = BloomFilter(self.capacity, self.error_rate)
+                self._current.add(id_, positions)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    def save(self) -> None:
+        """Writes the Bloom filter to ``path``, replacing the file atomically."""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(
+                self._HEADER.pack(
+                    self._MAGIC,
+                    self.capacity,
+                    self.error_rate,
+                    self._current.count,
+                    self._previous.count,
+                )
+            )
+            file.write(self._current.bits)
+            file.write(self._previous.bits)
+        os.replace(temporary, self.path)
+
+    def load(self) -> None:
+        """Reads the Bloom filter from ``path``, starts empty if it does not match."""
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return
+        current = BloomFilter(self.capacity, self.error_rate)
+        previous = BloomFilter(self.capacity, self.error_rate)
+        size = len(current.bits)
+        try:
+            magic, capacity, error_rate, current.count, previous.count = (
+                self._HEADER.unpack_from(data)
+            )
+        except struct.error:
+            magic = None
+        if (
+            magic != self._MAGIC
+            or (capacity, error_rate) != (self.capacity, self.error_rate)
+            or len(data) != self._HEADER.size + 2 * size
+        ):
+            log.warning(f"Ignoring seen IDs file {self.path} of another format")
+            return
+        offset = self._HEADER.size
+        current.bits[:] = data[offset : offset + size]
+        previous.bits[:] = data[offset + size :]
+        self._current, self._previous = current, previous
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Set, Dict, Tuple, Optional, Any
+from typing import List, Set, Dict, Tuple, Optional, Any, Iterable
 
 from common.miner.schemas import VisitorSchema
 from common.schemas.bitads import BitAdsDataSchema
@@ -42,7 +42,7 @@ class BitAdsService(ABC):
         pass
 
     @abstractmethod
-    async def add_by_visits(self, visits: Set[VisitorSchema]) -> None:
+    async def add_by_visits(self, visits: Iterable[VisitorSchema]) -> None:
         pass
 
     @abstractmethod
@@ -62,9 +62,8 @@ class BitAdsService(ABC):
         pass
 
     @abstractmethod
-    async def update_sale_status_if_needed(
-        self, campaign_id: str, sale_date_from: datetime
-    ) -> None:
+    async def complete_sales(self, cutoffs: Dict[str, datetime]) -> int:
+        """Completes the new sales made before the cutoff of their campaign, returns how many."""
         pass
 
     @abstractmethod
@@ -1,7 +1,8 @@
 import logging
-import operator
 from datetime import datetime
-from typing import List, Set, Dict, Tuple, Optional, Any
+from typing import List, Set, Dict, Tuple, Optional, Any, Iterable
+
+from sqlalchemy.exc import IntegrityError
 
 from common import converters
 from common.db.database import DatabaseManager
@@ -12,6 +13,7 @@ from common.schemas.completed_visit import CompletedVisitSchema
 from common.schemas.paged import PaginationInfo
 from common.schemas.sales import SalesStatus, OrderQueueSchema, OrderQueueStatus
 from common.schemas.shopify import SaleData
+from common.seen_ids import SeenIds
 from common.services.bitads.base import BitAdsService
 from common.validator.schemas import ValidatorTrackingData
 
@@ -19,9 +21,15 @@ log = logging.getLogger(__name__)
 
 
 class BitAdsServiceImpl(BitAdsService):
-    def __init__(self, database_manager: DatabaseManager, ndigits: int = 5):
+    def __init__(
+        self,
+        database_manager: DatabaseManager,
+        ndigits: int = 5,
+        seen_visits: Optional[SeenIds] = None,
+    ):
         self.database_manager = database_manager
         self.ndigits = ndigits
+        self.seen_visits = seen_visits
 
     async def add_or_update_validator_bitads_data(
         self, validator_data: ValidatorTrackingData, sale_data: SaleData
@@ -79,15 +87,47 @@ class BitAdsServiceImpl(BitAdsService):
         with self.database_manager.get_session("active") as session:
             return bitads_data.get_max_date_excluding_hotkey(session, exclude_hotkey)
 
-    async def add_by_visits(self, visits: Set[VisitorSchema]) -> None:
+    async def add_by_visits(self, visits: Iterable[VisitorSchema]) -> None:
+        visits = {visit.id: visit for visit in visits}
+        if self.seen_visits:
+            # Recently stored visits are dropped, only possible ones are checked
+            new_ids, maybe_seen_ids = self.seen_visits.partition(visits)
+        else:
+            new_ids, maybe_seen_ids = set(), set(visits)
+        try:
+            added = self._add_visits(visits, new_ids, maybe_seen_ids)
+        except IntegrityError:
+            # The Bloom filter forgot some of the stored visits
+            log.warning("Visits thought new are stored already, checking them all")
+            added = self._add_visits(visits, set(), new_ids | maybe_seen_ids)
+        if self.seen_visits:
+            self.seen_visits.add(visits)
+            if new_ids:
+                self.seen_visits.save()
+        log.debug(
+            f"Received {len(visits)} visits, "
+            f"{len(visits) - len(new_ids) - len(maybe_seen_ids)} stored recently, "
+            f"{added} added"
+        )
+
+    def _add_visits(
+        self,
+        visits: Dict[str, VisitorSchema],
+        new_ids: Set[str],
+        maybe_seen_ids: Set[str],
+    ) -> int:
         with self.database_manager.get_session("active") as session:
-            existed_ids = bitads_data.filter_existing_ids(
-                session, set(map(operator.attrgetter("id"), visits))
+            existed_ids = (
+                bitads_data.filter_existing_ids(session, maybe_seen_ids)
+                if maybe_seen_ids
+                else set()
             )
-            for visit in visits:
-                if visit.id in existed_ids:
-                    continue
-                bitads_data.add_data(session, BitAdsDataSchema(**visit.model_dump()))
+            ids = new_ids | (maybe_seen_ids - existed_ids)
+            bitads_data.add_new_data(
+                session,
+                (BitAdsDataSchema(**visits[id_].model_dump()) for id_ in ids),
+            )
+            return len(ids)
 
     async def add_by_visit(self, visit: VisitorSchema) -> None:
         with self.database_manager.get_session("active") as session:
@@ -117,12 +157,11 @@ class BitAdsServiceImpl(BitAdsService):
         }
         await self.add_bitads_data(datas)
 
-    async def update_sale_status_if_needed(
-        self, campaign_id: str, sale_to: datetime
-    ) -> None:
-        log.debug(f"Completing sales with date less than: {sale_to}")
+    async def complete_sales(self, cutoffs: Dict[str, datetime]) -> int:
         with self.database_manager.get_session("active") as session:
-            bitads_data.complete_sales_less_than_date(session, campaign_id, sale_to)
+            completed = bitads_data.complete_sales(session, cutoffs)
+        log.debug(f"Completed {completed} sales of {len(cutoffs)} campaigns")
+        return completed
 
     async def add_by_queue_items(
         self, validator_block: int, validator_hotkey: str, items: List[OrderQueueSchema]
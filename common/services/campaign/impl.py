@@ -1,5 +1,7 @@
+from datetime import timedelta
 from typing import List, Optional
 
+from common.cache import cached
 from common.db.database import DatabaseManager
 from common.db.repositories import campaigns
 from common.schemas.bitads import Campaign, CampaignStatus
@@ -18,7 +20,9 @@ class CampaignServiceImpl(CampaignService):
         with self.database_manager.get_session("main") as session:
             for campaign in campaigns_list:
                 campaigns.add_or_update_campaign(session, campaign)
+        self.get_campaign_by_id.cache.clear()
 
+    @cached(ttl=timedelta(seconds=30))
     async def get_campaign_by_id(self, id_: str) -> Optional[Campaign]:
         with self.database_manager.get_session("main") as session:
             return campaigns.get_by_product_unique_id(session, id_)
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from common.schemas.delta import DeltaBatch, Watermark
+
+
+class DeltaService(ABC):
+    @abstractmethod
+    async def export(
+        self, table: str, after: Optional[Watermark] = None, limit: int = 1000
+    ) -> DeltaBatch:
+        pass
+
+    @abstractmethod
+    async def apply(self, source: str, batch: DeltaBatch) -> int:
+        pass
+
+    @abstractmethod
+    async def get_watermark(self, source: str, table: str) -> Optional[Watermark]:
+        pass
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from common.db.database import DatabaseManager
+from common.db.repositories import delta
+from common.schemas.delta import DeltaBatch, Watermark
+from common.services.delta.base import DeltaService
+
+
+class DeltaServiceImpl(DeltaService):
+    def __init__(self, database_manager: DatabaseManager):
+        self.database_manager = database_manager
+
+    async def export(
+        self, table: str, after: Optional[Watermark] = None, limit: int = 1000
+    ) -> DeltaBatch:
+        with self.database_manager.get_session("active") as session:
+            return delta.export_rows(session, table, after, limit)
+
+    async def apply(self, source: str, batch: DeltaBatch) -> int:
+        """
+        Applies a batch and moves the watermark of ``source`` in the same transaction.
+        """
+        with self.database_manager.get_session("active") as session:
+            count = delta.apply_batch(session, batch)
+            if batch.next:
+                delta.set_watermark(session, source, batch.table, batch.next)
+            return count
+
+    async def get_watermark(self, source: str, table: str) -> Optional[Watermark]:
+        with self.database_manager.get_session("active") as session:
+            return delta.get_watermark(session, source, table)
@@ -14,6 +14,9 @@ class GeoIpServiceImpl(GeoIpService):
     abstract base class, retrieving geographical information about an
     IP address using a GeoIP2 database.
 
+    The database is opened on the first lookup and kept open, so every
+    process, e.g. every proxy worker, holds its own reader.
+
     Attributes:
         database_path (str): Path to the GeoIP2 database file.
     """
@@ -25,6 +28,7 @@ class GeoIpServiceImpl(GeoIpService):
             database_path (str): Path to the GeoIP2 database file.
         """
         self.database_path = database_path
+        self._reader: Optional[geoip2.database.Reader] = None
 
     def get_ip_info(self, ip: str) -> Optional[IpAddressInfo]:
         """Retrieves information about the specified IP address.
@@ -41,13 +45,14 @@ class GeoIpServiceImpl(GeoIpService):
             information about the IP address, or `None` if the information
             could not be retrieved.
         """
-        with geoip2.database.Reader(self.database_path) as reader:
-            try:
-                response = reader.country(ip)
-            except geoip2.errors.AddressNotFoundError:
-                return None
-            else:
-                return IpAddressInfo(
-                    country_name=response.country.name,
-                    country_code=response.country.iso_code,
-                )
+        if self._reader is None:
+            self._reader = geoip2.database.Reader(self.database_path)
+        try:
+            response = self._reader.country(ip)
+        except geoip2.errors.AddressNotFoundError:
+            return None
+        else:
+            return IpAddressInfo(
+                country_name=response.country.name,
+                country_code=response.country.iso_code,
+            )
@@ -1,5 +1,4 @@
 from abc import ABC, abstractmethod
-from typing import Any
 
 
 class MetagraphService(ABC):
@@ -8,5 +7,21 @@ class MetagraphService(ABC):
         pass
 
     @abstractmethod
-    async def hotkey_to_uid(self) -> list[dict[str, Any]]:
+    async def get_hotkey_to_uid_json(self) -> bytes:
+        pass
+
+    @abstractmethod
+    async def has_validator_permit(self, hotkey: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def refresh(self) -> None:
+        pass
+
+    @abstractmethod
+    async def start(self) -> None:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
         pass
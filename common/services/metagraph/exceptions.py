@@ -0,0 +1,2 @@
+class MetagraphNotReady(Exception):
+    pass
@@ -1,54 +1,183 @@
 import asyncio
+import json
+import logging
 from datetime import timedelta
-from typing import TypeVar, Any
+from typing import Awaitable, Callable, Dict, FrozenSet, NamedTuple, Optional
 
 import bittensor as bt
 
 from common.environ import Environ
 from common.helpers import const
 from common.services.metagraph.base import MetagraphService
-from common.utils import cache_result
+from common.services.metagraph.exceptions import MetagraphNotReady
+
+log = logging.getLogger(__name__)
+
+MetagraphSource = Callable[[], Awaitable[bt.Metagraph]]
+
+
+async def fetch_metagraph() -> bt.Metagraph:
+    async with bt.AsyncSubtensor(Environ.SUBTENSOR_NETWORK) as subtensor:
+        return await subtensor.metagraph(const.NETUIDS[Environ.SUBTENSOR_NETWORK])
+
+
+class AxonData(NamedTuple):
+    uid: int
+    ip: str
+    coldkey: str
+    stake: float
+
+
+class MetagraphSnapshot(NamedTuple):
+    """
+    What the proxy serves of a metagraph, computed once per refresh.
+
+    Attributes:
+        axons (Dict[str, AxonData]): Axon data by hotkey.
+        hotkey_to_uid_json (bytes): Serialized ``/hotkey_to_uid`` response.
+        validator_permits (FrozenSet[str]): Hotkeys with a validator permit.
+    """
+
+    axons: Dict[str, AxonData]
+    hotkey_to_uid_json: bytes
+    validator_permits: FrozenSet[str]
+
+    @classmethod
+    def from_metagraph(cls, metagraph: bt.Metagraph) -> "MetagraphSnapshot":
+        axons = {}
+        for uid, (hotkey, axon, stake) in enumerate(
+            zip(metagraph.hotkeys, metagraph.axons, metagraph.total_stake)
+        ):
+            axons.setdefault(hotkey, AxonData(uid, axon.ip, axon.coldkey, float(stake)))
+        hotkey_to_uid = [
+            dict(uid=uid, hotkey=hotkey) for uid, hotkey in enumerate(metagraph.hotkeys)
+        ]
+        return cls(
+            axons=axons,
+            hotkey_to_uid_json=json.dumps(hotkey_to_uid, separators=(",", ":")).encode(),
+            validator_permits=frozenset(
+                hotkey
+                for hotkey, permit in zip(metagraph.hotkeys, metagraph.validator_permit)
+                if permit
+            ),
+        )
 
 
 class BittensorMetagraphService(MetagraphService):
-    @cache_result(expiration=timedelta(minutes=5))  # 5 minutes cache
-    async def _get_metagraph_info(self) -> bt.Metagraph | None:
-        async with bt.AsyncSubtensor(Environ.SUBTENSOR_NETWORK) as subtensor:
-            return await subtensor.metagraph(
-                const.NETUIDS[Environ.SUBTENSOR_NETWORK]
-            )
+    """
+    Serves lookups from a metagraph snapshot refreshed in the background.
+
+    Requests never wait on the chain: they read the latest snapshot, which a
+    refresh replaces as a whole. Until the first refresh succeeds, lookups
+    raise ``MetagraphNotReady``.
+
+    Args:
+        source (MetagraphSource, optional): Fetches the metagraph. Defaults to the chain.
+        refresh_period (timedelta, optional): Period of the background refresh.
+        retry_period (timedelta, optional): Delay before retrying a failed refresh
+            while there is no snapshot yet.
+    """
+
+    def __init__(
+        self,
+        source: MetagraphSource = fetch_metagraph,
+        refresh_period: timedelta = Environ.METAGRAPH_REFRESH_PERIOD,
+        retry_period: timedelta = timedelta(seconds=10),
+    ):
+        self.source = source
+        self.refresh_period = refresh_period
+        self.retry_period = retry_period
+        self._snapshot: Optional[MetagraphSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_snapshot(self) -> MetagraphSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise MetagraphNotReady
+        return snapshot
 
     async def get_axon_data(
         self, hotkey: str, ip_address: str = None, coldkey: str = None
     ) -> dict:
-        metagraph_info = await self._get_metagraph_info()
-        try:
-            index = metagraph_info.hotkeys.index(hotkey)
-        except ValueError:
+        axon = self._get_snapshot().axons.get(hotkey)
+        if not axon:
             return dict(exists=False)
-        else:
-            axon = metagraph_info.axons[index]
-            stake = metagraph_info.total_stake[index]
-            ip_address_match = not ip_address or ip_address == axon.ip
-            coldkey_match = not coldkey or coldkey == axon.coldkey
-            if not ip_address_match or not coldkey_match:
-                return dict(exists=False)
-
-            return dict(exists=True, stake=float(stake))
-
-    async def hotkey_to_uid(self) -> list[dict[str, Any]]:
-        metagraph_info = await self._get_metagraph_info()
-        return [
-            dict(uid=i, hotkey=a)
-            for i, a in enumerate(metagraph_info.hotkeys)
-        ]
+        ip_address_match = not ip_address or ip_address == axon.ip
+        coldkey_match = not coldkey or coldkey == axon.coldkey
+        if not ip_address_match or not coldkey_match:
+            return dict(exists=False)
+        return dict(exists=True, stake=axon.stake)
+
+    async def get_hotkey_to_uid_json(self) -> bytes:
+        return self._get_snapshot().hotkey_to_uid_json
+
+    async def get_snapshot(self) -> MetagraphSnapshot:
+        return self._get_snapshot()
+
+    async def has_validator_permit(self, hotkey: str) -> bool:
+        return hotkey in self._get_snapshot().validator_permits
+
+    async def refresh(self) -> None:
+        metagraph = await self.source()
+        self._snapshot = MetagraphSnapshot.from_metagraph(metagraph)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                log.exception("Failed to refresh the metagraph")
+            await asyncio.sleep(
+                (
+                    self.refresh_period if self._snapshot else self.retry_period
+                ).total_seconds()
+            )
+
+
+class SharedMetagraphService(BittensorMetagraphService):
+    """
+    Serves the snapshot of a metagraph service running in another process.
+
+    Workers of a multi-worker proxy copy the snapshot the writer process
+    refreshes, so the proxy keeps one chain connection instead of one per worker.
+
+    Args:
+        get_snapshot (Callable[[], Awaitable[MetagraphSnapshot]]): Returns the
+            snapshot of the refreshing service.
+        refresh_period (timedelta, optional): Period of the copy.
+        retry_period (timedelta, optional): Delay before retrying a failed copy
+            while there is no snapshot yet.
+    """
+
+    def __init__(
+        self,
+        get_snapshot: Callable[[], Awaitable[MetagraphSnapshot]],
+        refresh_period: timedelta = timedelta(minutes=1),
+        retry_period: timedelta = timedelta(seconds=10),
+    ):
+        super().__init__(refresh_period=refresh_period, retry_period=retry_period)
+        self.source_snapshot = get_snapshot
+
+    async def refresh(self) -> None:
+        self._snapshot = await self.source_snapshot()
 
 
 if __name__ == "__main__":
-    service = BittensorMetagraphService()
-    result = asyncio.run(
-        service.get_axon_data(
+    async def main():
+        service = BittensorMetagraphService()
+        await service.refresh()
+        return await service.get_axon_data(
             "5DvTpiniW9s3APmHRYn8FroUWyfnLtrsid5Mtn5EwMXHN2ed"
         )
-    )
-    print(result)
+
+    print(asyncio.run(main()))
@@ -7,10 +7,7 @@ from common.services.migration.base import MigrationService
 
 class MinerMigrationService(MigrationService):
     async def migrate(self, created_at_from: datetime):
-        with self.database_manager.get_session(
-            "active"
-        ) as active_session, self.database_manager.get_session(
-            "history"
-        ) as history_session:
-            migration.transfer_data(active_session, history_session, Visitor, created_at_from)
-            migration.transfer_data(active_session, history_session, VisitorActivity, created_at_from)
+        partitions = self.database_manager.history_partitions
+        with self.database_manager.get_session("active") as active_session:
+            migration.transfer_data_to_partitions(active_session, partitions, Visitor, created_at_from)
+            migration.transfer_data_to_partitions(active_session, partitions, VisitorActivity, created_at_from)
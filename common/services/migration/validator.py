@@ -7,11 +7,7 @@ from common.validator.db.entities.active import BitAdsData, OrderQueue
 
 class ValidatorMigrationService(MigrationService):
     async def migrate(self, created_at_from: datetime):
-
-        with self.database_manager.get_session(
-            "active"
-        ) as active_session, self.database_manager.get_session(
-            "history"
-        ) as history_session:
-            migration.transfer_data(active_session, history_session, BitAdsData, created_at_from)
-            migration.transfer_data(active_session, history_session, OrderQueue, created_at_from)
+        partitions = self.database_manager.history_partitions
+        with self.database_manager.get_session("active") as active_session:
+            migration.transfer_data_to_partitions(active_session, partitions, BitAdsData, created_at_from)
+            migration.transfer_data_to_partitions(active_session, partitions, OrderQueue, created_at_from)
@@ -25,6 +25,9 @@ class MinerService(SettingsContainer, ABC):
 
         add_visits(visits: Set[VisitorSchema]) -> None:
             Adds multiple visitor records.
+
+        get_visits_version() -> int:
+            Retrieves a number that changes whenever visitor records are added or removed.
     """
 
     @abstractmethod
@@ -72,6 +75,15 @@ class MinerService(SettingsContainer, ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_visits_version(self) -> int:
+        """Retrieves a number that changes whenever visitor records are added or removed.
+
+        Returns:
+            int: The current version of the visitor records.
+        """
+        pass
+
     @abstractmethod
     async def get_hotkey_and_block(self) -> Tuple[str, int]:
         pass
@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Set, Tuple, Optional, List
 
+from common.cache import cached
 from common.db.database import DatabaseManager
 from common.db.repositories import recent_activity, user_agent_activity, hotkey_to_block
 from common.db.repositories.visitor import (
@@ -10,8 +11,10 @@ from common.db.repositories.visitor import (
     add_or_update,
     get_visitor,
     get_visits_by_campaign_item,
-    get_visits_by_ip
+    get_visits_by_ip,
+    get_visits_version,
 )
+from common.helpers import const
 from common.miner.schemas import VisitorSchema
 from common.services.miner.base import MinerService
 from common.services.settings.impl import SettingsContainerImpl
@@ -114,6 +117,16 @@ class MinerServiceImpl(SettingsContainerImpl, MinerService):
                     except Exception:
                         session.rollback()
 
+    async def get_visits_version(self) -> int:
+        """Retrieves a number that changes whenever visitor records are added or removed.
+
+        Returns:
+            int: The current version of the visitor records.
+        """
+        with self.database_manager.get_session("active") as session:
+            return get_visits_version(session)
+
+    @cached(ttl=const.BLOCK_DURATION, max_size=1)
     async def get_hotkey_and_block(self) -> Tuple[str, int]:
         with self.database_manager.get_session("main") as session:
             result = hotkey_to_block.get_hotkey_to_block(session)
@@ -124,6 +137,7 @@ class MinerServiceImpl(SettingsContainerImpl, MinerService):
     async def set_hotkey_and_block(self, hotkey: str, block: int) -> None:
         with self.database_manager.get_session("main") as session:
             hotkey_to_block.set_hotkey_and_block(session, hotkey, block)
+        self.get_hotkey_and_block.cache.clear()
 
     async def get_visit_by_id(self, id_: str) -> Optional[VisitorSchema]:
         with self.database_manager.get_session("active") as session:
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
-from common.schemas.sales import OrderQueueSchema, OrderQueueStatus
+from common.schemas.sales import OrderQueueSchema, OrderQueueStats, OrderQueueStatus
 from common.schemas.shopify import SaleData
 
 
@@ -10,14 +10,35 @@ class OrderQueueService(ABC):
     async def add_to_queue(self, id_: str, sale_data: SaleData) -> None:
         pass
 
+    @abstractmethod
+    async def add_batch_to_queue(self, items: List[Tuple[str, SaleData]]) -> List[bool]:
+        """Adds sales and refunds in one transaction, False for each refund without an order."""
+        pass
+
     @abstractmethod
     async def get_data_to_process(self, limit: int = 500) -> List[OrderQueueSchema]:
+        """Claims due rows, each carrying the lease token to report its status with."""
+        pass
+
+    @abstractmethod
+    async def update_queue_status(
+        self, id_to_status: Dict[str, OrderQueueStatus], lease_token: str
+    ) -> Dict[str, OrderQueueStatus]:
+        """Records the results of claimed rows, returns the new status of the rows still leased."""
         pass
 
     @abstractmethod
-    async def update_queue_status(self, id_to_status: Dict[str, OrderQueueStatus]) -> None:
+    async def requeue(self, ids: Optional[List[str]] = None) -> None:
         pass
 
     @abstractmethod
     async def get_all_ids(self) -> List[str]:
         pass
+
+    @abstractmethod
+    async def get_stats(self) -> OrderQueueStats:
+        pass
+
+    @abstractmethod
+    async def count_by_status(self) -> Dict[OrderQueueStatus, int]:
+        pass
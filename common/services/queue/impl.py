@@ -1,47 +1,82 @@
-from typing import List, Dict
+import logging
+from datetime import timedelta
+from typing import List, Dict, Optional, Tuple
 
-from common.schemas.sales import OrderQueueSchema, OrderQueueStatus
+from common.schemas.sales import OrderQueueSchema, OrderQueueStats, OrderQueueStatus
 from common.services.queue.exceptions import RefundNotExpectedWithoutOrder
-from common.validator.schemas import Action
 
 from common.db.database import DatabaseManager
 from common.db.repositories import order_queue
 from common.schemas.shopify import SaleData
 from common.services.queue.base import OrderQueueService
+from common.validator.environ import Environ
+
+log = logging.getLogger(__name__)
 
 
 class OrderQueueServiceImpl(OrderQueueService):
-    def __init__(self, database_manager: DatabaseManager):
+    def __init__(
+        self,
+        database_manager: DatabaseManager,
+        lease: timedelta = Environ.ORDER_QUEUE_LEASE,
+        retry_backoff: timedelta = Environ.ORDER_QUEUE_RETRY_BACKOFF,
+        max_backoff: timedelta = Environ.ORDER_QUEUE_MAX_BACKOFF,
+        max_attempts: int = Environ.ORDER_QUEUE_MAX_ATTEMPTS,
+    ):
         self.database_manager = database_manager
+        self.lease = lease
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
 
     async def add_to_queue(self, id_: str, sale_data: SaleData):
-        with self.database_manager.get_session("active") as session:
-            existed_data = order_queue.get_by_id(session, id_)
-            if existed_data:
-                kwargs = {
-                    "order_info"
-                    if Action.sale == sale_data.type
-                    else "refund_info": sale_data.order_details
-                }
-                order_queue.update_data(session, id_, **kwargs)
-                return
-
-            if sale_data.type == Action.refund:
-                raise RefundNotExpectedWithoutOrder
+        (accepted,) = await self.add_batch_to_queue([(id_, sale_data)])
+        if not accepted:
+            raise RefundNotExpectedWithoutOrder
 
-            order_queue.add_data(session, id_, sale_data.order_details)
+    async def add_batch_to_queue(self, items: List[Tuple[str, SaleData]]) -> List[bool]:
+        with self.database_manager.get_session("active") as session:
+            return order_queue.upsert_data(session, items)
 
     async def get_data_to_process(self, limit: int = 500) -> List[OrderQueueSchema]:
         with self.database_manager.get_session("active") as session:
-            return order_queue.get_data_for_processing(session, limit)
+            return order_queue.claim(session, limit, self.lease)
 
     async def update_queue_status(
-        self, id_to_status: Dict[str, OrderQueueStatus]
-    ) -> None:
+        self, id_to_status: Dict[str, OrderQueueStatus], lease_token: str
+    ) -> Dict[str, OrderQueueStatus]:
+        result = {}
         with self.database_manager.get_session("active") as session:
             for id_, status in id_to_status.items():
-                order_queue.update_status(session, id_, status)
+                new_status = order_queue.complete(
+                    session,
+                    id_,
+                    lease_token,
+                    status,
+                    self.max_attempts,
+                    self.retry_backoff,
+                    self.max_backoff,
+                )
+                if new_status is None:
+                    log.warning(f"Order queue lease lost for id: {id_}")
+                    continue
+                if new_status == OrderQueueStatus.DEAD_LETTER:
+                    log.warning(f"Order queue id {id_} dead lettered after {status.name}")
+                result[id_] = new_status
+        return result
+
+    async def requeue(self, ids: Optional[List[str]] = None) -> None:
+        with self.database_manager.get_session("active") as session:
+            order_queue.requeue(session, ids)
 
     async def get_all_ids(self) -> List[str]:
         with self.database_manager.get_session("active") as session:
             return order_queue.get_all_ids(session)
+
+    async def get_stats(self) -> OrderQueueStats:
+        with self.database_manager.get_session("active") as session:
+            return order_queue.get_stats(session)
+
+    async def count_by_status(self) -> Dict[OrderQueueStatus, int]:
+        with self.database_manager.get_session("active") as session:
+            return order_queue.count_by_status(session)
@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from common.schemas.snapshot import SnapshotManifest
+
+
+class SnapshotService(ABC):
+    @abstractmethod
+    async def create_snapshots(self) -> List[SnapshotManifest]:
+        pass
+
+    @abstractmethod
+    def get_manifests(self) -> List[SnapshotManifest]:
+        pass
+
+    @abstractmethod
+    def get_manifest(self, db: str) -> Optional[SnapshotManifest]:
+        pass
+
+    @abstractmethod
+    def get_path(self, manifest: SnapshotManifest) -> str:
+        pass
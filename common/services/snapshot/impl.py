@@ -0,0 +1,256 @@
+"""
+Consistent, compressed database snapshots.
+
+A snapshot is taken with the SQLite online-backup API, so it is a consistent
+copy even while other processes write to the database. The pages are copied
+a few at a time, writers only wait for one step instead of the whole copy.
+A write between steps restarts the copy; after a few restarts the rest is
+copied in one step, under a single read lock. The copy is gzip
+compressed and described by a JSON manifest with whole-file and per-chunk
+checksums. Files are replaced atomically, a download in progress keeps
+reading the previous snapshot.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import BinaryIO, List, Optional, Sequence
+
+from sqlalchemy import Engine
+
+from common.db.database import DatabaseManager
+from common.schemas.snapshot import SnapshotManifest
+from common.services.snapshot.base import SnapshotService
+
+log = logging.getLogger(__name__)
+
+_COPY_BUFFER = 1024 * 1024
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+class _HashingWriter:
+    """Computes the whole-file and per-chunk digests of the written bytes."""
+
+    def __init__(self, file: BinaryIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.chunks: List[str] = []
+        self._chunk = hashlib.sha256()
+        self._chunk_left = chunk_size
+
+    def write(self, data: bytes) -> int:
+        self.file.write(data)
+        self.size += len(data)
+        self.sha256.update(data)
+        view = memoryview(data)
+        while view:
+            part = view[: self._chunk_left]
+            self._chunk.update(part)
+            self._chunk_left -= len(part)
+            view = view[len(part):]
+            if not self._chunk_left:
+                self.chunks.append(self._chunk.hexdigest())
+                self._chunk = hashlib.sha256()
+                self._chunk_left = self.chunk_size
+        return len(data)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def finish(self) -> List[str]:
+        if self._chunk_left != self.chunk_size:
+            self.chunks.append(self._chunk.hexdigest())
+        return self.chunks
+
+
+def _source_mtime(path: str) -> float:
+    return max(
+        (os.path.getmtime(p) for p in (path, f"{path}-wal") if os.path.exists(p)),
+        default=0.0,
+    )
+
+
+class SnapshotServiceImpl(SnapshotService):
+    """
+    Builds and describes database snapshots in ``directory``.
+
+    Args:
+        database_manager (DatabaseManager): Manager of the databases to snapshot.
+        directory (str): Directory of the snapshots and their manifests.
+        databases (Sequence[str], optional): Databases to snapshot. Monthly history
+            partitions are added as ``history_YYYY_MM``.
+        chunk_size (int, optional): Size of the checksummed chunks of a snapshot.
+        compresslevel (int, optional): Gzip compression level.
+        backup_pages (int, optional): Pages copied per backup step, the read lock
+            on the database is released between steps.
+        backup_sleep (float, optional): Seconds between backup steps.
+        max_backup_restarts (int, optional): Restarts of the stepped copy by writes
+            before the database is copied in one step.
+    """
+
+    def __init__(
+        self,
+        database_manager: DatabaseManager,
+        directory: str,
+        databases: Sequence[str] = ("active", "history"),
+        chunk_size: int = 8 * 1024 * 1024,
+        compresslevel: int = 6,
+        backup_pages: int = 1024,
+        backup_sleep: float = 0.005,
+        max_backup_restarts: int = 3,
+    ):
+        self.database_manager = database_manager
+        self.directory = directory
+        self.databases = databases
+        self.chunk_size = chunk_size
+        self.compresslevel = compresslevel
+        self.backup_pages = backup_pages
+        self.backup_sleep = backup_sleep
+        self.max_backup_restarts = max_backup_restarts
+
+    def _list_databases(self) -> List[str]:
+        databases = list(self.databases)
+        partitions = getattr(self.database_manager, "history_partitions", None)
+        if "history" in databases and partitions is not None:
+            databases.extend(f"history_{key}" for key in partitions.list_partitions())
+        return databases
+
+    def _get_engine(self, db: str) -> Engine:
+        if db.startswith("history_"):
+            return self.database_manager.history_partitions.get_engine(
+                db[len("history_"):]
+            )
+        return getattr(self.database_manager, f"{db}_db")
+
+    def _get_manifest_path(self, db: str) -> str:
+        return os.path.join(self.directory, f"{db}.json")
+
+    async def create_snapshots(self) -> List[SnapshotManifest]:
+        manifests = []
+        for db in self._list_databases():
+            try:
+                manifests.append(await asyncio.to_thread(self.create_snapshot, db))
+            except Exception:
+                log.exception(f"Unable to snapshot {db} database")
+        return manifests
+
+    def create_snapshot(self, db: str) -> SnapshotManifest:
+        """
+        Snapshots a database unless it did not change since the last snapshot.
+
+        Args:
+            db (str): ``main``, ``active``, ``history`` or ``history_YYYY_MM``.
+
+        Returns:
+            SnapshotManifest: Manifest of the current snapshot.
+        """
+        engine = self._get_engine(db)
+        source_mtime = _source_mtime(engine.url.database)
+        manifest = self.get_manifest(db)
+        if manifest and manifest.source_mtime == source_mtime:
+            return manifest
+
+        os.makedirs(self.directory, exist_ok=True)
+        file = f"{db}.db.gz"
+        raw_path = os.path.join(self.directory, f"{db}.db.tmp")
+        gz_path = os.path.join(self.directory, f"{file}.tmp")
+        try:
+            connection = engine.raw_connection()
+            try:
+                target = sqlite3.connect(raw_path)
+                try:
+                    self._backup(db, connection.driver_connection, target)
+                finally:
+                    target.close()
+            finally:
+                connection.close()
+
+            raw_sha256 = hashlib.sha256()
+            with open(gz_path, "wb") as output:
+                writer = _HashingWriter(output, self.chunk_size)
+                with open(raw_path, "rb") as raw, gzip.GzipFile(
+                    filename="", mode="wb", fileobj=writer,
+                    compresslevel=self.compresslevel, mtime=0,
+                ) as compressed:
+                    while data := raw.read(_COPY_BUFFER):
+                        raw_sha256.update(data)
+                        compressed.write(data)
+            manifest = SnapshotManifest(
+                db=db,
+                file=file,
+                size=writer.size,
+                sha256=writer.sha256.hexdigest(),
+                raw_size=os.path.getsize(raw_path),
+                raw_sha256=raw_sha256.hexdigest(),
+                chunk_size=self.chunk_size,
+                chunks=writer.finish(),
+                source_mtime=source_mtime,
+                created_at=datetime.utcnow(),
+            )
+            os.replace(gz_path, os.path.join(self.directory, file))
+            manifest_path = self._get_manifest_path(db)
+            with open(f"{manifest_path}.tmp", "w") as output:
+                output.write(manifest.model_dump_json())
+            os.replace(f"{manifest_path}.tmp", manifest_path)
+        finally:
+            for path in (raw_path, gz_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        log.info(f"Snapshot of {db} database created: {manifest.size} bytes")
+        return manifest
+
+    def _backup(
+        self, db: str, source: sqlite3.Connection, target: sqlite3.Connection
+    ) -> None:
+        restarts = 0
+        remaining = None
+
+        def progress(_, left: int, __) -> None:
+            nonlocal restarts, remaining
+            # A write by another connection restarts the copy from the first page
+            if remaining is not None and left > remaining:
+                restarts += 1
+                if restarts > self.max_backup_restarts:
+                    raise _TooManyRestarts
+            remaining = left
+            # ``sleep`` of backup only applies to busy steps
+            time.sleep(self.backup_sleep)
+
+        try:
+            source.backup(target, pages=self.backup_pages, progress=progress)
+        except _TooManyRestarts:
+            log.warning(
+                f"Snapshot of {db} database restarted {self.max_backup_restarts} "
+                "times by writes, copying it in one step"
+            )
+            source.backup(target)
+
+    def get_manifests(self) -> List[SnapshotManifest]:
+        manifests = []
+        for db in self._list_databases():
+            manifest = self.get_manifest(db)
+            if manifest:
+                manifests.append(manifest)
+        return manifests
+
+    def get_manifest(self, db: str) -> Optional[SnapshotManifest]:
+        if db not in self._list_databases():
+            return None
+        try:
+            with open(self._get_manifest_path(db)) as file:
+                return SnapshotManifest.model_validate(json.load(file))
+        except (OSError, ValueError):
+            return None
+
+    def get_path(self, manifest: SnapshotManifest) -> str:
+        return os.path.join(self.directory, manifest.file)
@@ -1,5 +1,5 @@
 from collections import defaultdict, Counter
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from functools import reduce
 from operator import add
 from typing import Dict, Optional, List, Tuple
@@ -7,6 +7,7 @@ from typing import Dict, Optional, List, Tuple
 from common import formula, utils
 from common.db.database import DatabaseManager
 from common.db.repositories import (
+    bitads_rollup,
     campaign,
     miner_ping,
     miner_assignment, miners_metadata,
@@ -91,6 +92,8 @@ class ValidatorServiceImpl(SettingsContainerImpl, ValidatorService):
             raise ValueError("No active campaigns found")
         # region CPA-part
         cpa_campaign_to_id = {c.id: c for c in campaigns if CampaignType.CPA == c.type}
+        with self.database_manager.get_session("active") as session:
+            bitads_rollup.refresh(session)
         now = datetime.utcnow()
         sale_from = now - const.REWARD_SALE_PERIOD
         reputation_from = now - utils.blocks_to_timedelta(self.settings.mr_blocks)
@@ -295,6 +298,9 @@ class ValidatorServiceImpl(SettingsContainerImpl, ValidatorService):
     ) -> AggregatedData:
         """Retrieves aggregated data for specified block range and campaign IDs.
 
+        Full days between ``sale_from`` and ``sale_to`` are read from the daily
+        rollups, the partial first and last day from the raw rows.
+
         Args:
             from_block (int, optional): Starting block number. Defaults to None.
             to_block (int, optional): Ending block number. Defaults to None.
@@ -304,13 +310,33 @@ class ValidatorServiceImpl(SettingsContainerImpl, ValidatorService):
             AggregatedData: Aggregated data schema containing aggregated data.
         """
         with self.database_manager.get_session("active") as session:
-            return get_aggregated_data(
-                session,
-                *campaign_ids,
-                from_block=from_block,
-                to_block=to_block,
-                from_date=sale_from,
-                to_date=sale_to,
+            full_days = _get_full_days(sale_from, sale_to)
+            if from_block is not None or to_block is not None or not full_days:
+                return get_aggregated_data(
+                    session,
+                    *campaign_ids,
+                    from_block=from_block,
+                    to_block=to_block,
+                    from_date=sale_from,
+                    to_date=sale_to,
+                )
+            first_day, last_day = full_days
+            return _merge_aggregated_data(
+                get_aggregated_data(
+                    session,
+                    *campaign_ids,
+                    from_date=sale_from,
+                    to_date=_day_start(first_day) - _EPSILON,
+                ),
+                bitads_rollup.get_aggregated_data(
+                    session, *campaign_ids, from_day=first_day, to_day=last_day
+                ),
+                get_aggregated_data(
+                    session,
+                    *campaign_ids,
+                    from_date=_day_start(last_day),
+                    to_date=sale_to,
+                ),
             )
 
     def _get_active_campaigns(
@@ -336,6 +362,9 @@ class ValidatorServiceImpl(SettingsContainerImpl, ValidatorService):
     ) -> Dict[str, int]:
         """Retrieves miners' reputation scores for specified block range and campaign IDs.
 
+        Full days between ``sale_from`` and ``sale_to`` are read from the daily
+        rollups, the partial first and last day from the raw rows.
+
         Args:
             from_block (int, optional): Starting block number. Defaults to None.
             to_block (int, optional): Ending block number. Defaults to None.
@@ -345,6 +374,71 @@ class ValidatorServiceImpl(SettingsContainerImpl, ValidatorService):
             Dict[str, int]: Dictionary mapping miner hotkeys to reputation scores.
         """
         with self.database_manager.get_session("active") as session:
-            return get_miners_reputation(
-                session, *campaign_ids, from_date=sale_from, to_date=sale_to
+            full_days = _get_full_days(sale_from, sale_to)
+            if not full_days:
+                return get_miners_reputation(
+                    session, *campaign_ids, from_date=sale_from, to_date=sale_to
+                )
+            first_day, last_day = full_days
+            parts = (
+                get_miners_reputation(
+                    session,
+                    *campaign_ids,
+                    from_date=sale_from,
+                    to_date=_day_start(first_day) - _EPSILON,
+                ),
+                bitads_rollup.get_miners_reputation(
+                    session, *campaign_ids, from_day=first_day, to_day=last_day
+                ),
+                get_miners_reputation(
+                    session,
+                    *campaign_ids,
+                    from_date=_day_start(last_day),
+                    to_date=sale_to,
+                ),
             )
+            reputation = defaultdict(int)
+            for part in parts:
+                for hotkey, sales in part.items():
+                    reputation[hotkey] += sales or 0
+            return dict(reputation)
+
+
+# Raw queries use inclusive upper bounds, the datetime before midnight ends a partial day
+_EPSILON = timedelta(microseconds=1)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time())
+
+
+def _get_full_days(
+    from_date: Optional[datetime], to_date: Optional[datetime]
+) -> Optional[Tuple[date, date]]:
+    """Returns the first full day and the day after the last full day between two dates, if any."""
+    if from_date is None or to_date is None:
+        return None
+    first_day = from_date.date()
+    if from_date != _day_start(first_day):
+        first_day += timedelta(days=1)
+    last_day = to_date.date()
+    return (first_day, last_day) if first_day < last_day else None
+
+
+def _merge_aggregated_data(*datas: AggregatedData) -> AggregatedData:
+    """Sums aggregations of the same campaign and miner hotkey."""
+    merged = defaultdict(dict)
+    for data in datas:
+        for campaign_id, miners_data in data.data.items():
+            for hotkey, aggregation in miners_data.items():
+                current = merged[campaign_id].get(hotkey)
+                if current is None:
+                    merged[campaign_id][hotkey] = aggregation.model_copy()
+                    continue
+                for field in AggregationSchema.model_fields:
+                    setattr(
+                        current,
+                        field,
+                        getattr(current, field) + getattr(aggregation, field),
+                    )
+    return AggregatedData(data=merged)
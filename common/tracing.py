@@ -0,0 +1,331 @@
+"""
+Lightweight span tracing.
+
+Spans nest through a context variable, so a span opened inside an asyncio
+task started by ``asyncio.gather`` becomes a child of the span that was
+active when the task was created. Sampling is decided once per root span;
+children of an unsampled root are no-ops, which keeps the overhead of
+disabled or unsampled tracing to a context variable lookup.
+
+Finished spans are written to a rotating file either as JSON lines or as
+Chrome trace events, the latter can be opened in ``chrome://tracing`` or
+Perfetto.
+
+Classes:
+    Span: A timed operation with attributes.
+    FileExporter: Writes finished spans to a rotating file.
+    Tracer: Creates spans and decides sampling.
+
+Functions:
+    configure: Configures the global tracer.
+    span: Opens a span on the global tracer.
+    record: Records an already finished child span on the global tracer.
+    current_span: Returns the active span or a no-op span.
+    trace_dendrite_responses: Records a child span per dendrite response.
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+FORMAT_JSONL = "jsonl"
+FORMAT_CHROME = "chrome"
+
+
+class Span:
+    """
+    A timed operation with attributes.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_time",
+        "duration",
+        "thread_id",
+        "_started",
+    )
+
+    recording = True
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, duration: Optional[float] = None) -> None:
+        self.duration = (
+            duration if duration is not None else time.perf_counter() - self._started
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(
+            name=self.name,
+            trace_id=self.trace_id,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            start_time=self.start_time,
+            duration=self.duration,
+            attributes=self.attributes,
+        )
+
+    def to_chrome_event(self) -> Dict[str, Any]:
+        return dict(
+            name=self.name,
+            ph="X",
+            ts=int(self.start_time * 1_000_000),
+            dur=int((self.duration or 0) * 1_000_000),
+            pid=os.getpid(),
+            tid=self.thread_id,
+            args=dict(
+                self.attributes,
+                trace_id=self.trace_id,
+                span_id=self.span_id,
+                parent_id=self.parent_id,
+            ),
+        )
+
+
+class _NoopSpan:
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+
+class FileExporter:
+    """
+    Writes finished spans to a rotating file.
+
+    With ``FORMAT_CHROME`` every file starts with ``[`` and every event is
+    followed by a comma, the trace event format allows the closing bracket to
+    be omitted so the file stays loadable while it is being written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fmt: str = FORMAT_JSONL,
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 3,
+    ):
+        if fmt not in (FORMAT_JSONL, FORMAT_CHROME):
+            raise ValueError(f"Unknown trace format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self.fmt == FORMAT_CHROME and self._file.tell() == 0:
+            self._file.write("[\n")
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def export(self, span: Span) -> None:
+        if self.fmt == FORMAT_CHROME:
+            line = json.dumps(span.to_chrome_event(), default=str) + ",\n"
+        else:
+            line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            self._file.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Tracer:
+    """
+    Creates spans and decides sampling.
+
+    Args:
+        exporter: Object with an ``export(span)`` method, tracing is disabled without one.
+        sample_rate (float, optional): Share of root spans that are recorded.
+        random_func (Callable[[], float], optional): Source of randomness for sampling.
+    """
+
+    def __init__(
+        self,
+        exporter=None,
+        sample_rate: float = 0.0,
+        random_func: Callable[[], float] = random.random,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.random_func = random_func
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_rate > 0
+
+    def _start(self, name: str, attributes: Dict[str, Any]):
+        parent = _current_span.get()
+        if parent is None:
+            if not self.enabled or self.random_func() >= self.sample_rate:
+                return NOOP_SPAN
+            return Span(name, uuid.uuid4().hex, attributes=attributes)
+        if not parent.recording:
+            return NOOP_SPAN
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Any]:
+        """
+        Opens a span for the duration of the ``with`` block.
+
+        Args:
+            name (str): Span name, e.g. ``forward.sync_visits``.
+            **attributes: Initial span attributes.
+
+        Yields:
+            Span: The span, or a no-op span when it is not sampled.
+        """
+        current = self._start(name, attributes)
+        token = _current_span.set(current)
+        try:
+            yield current
+        except BaseException as ex:
+            current.set_attribute("error", repr(ex))
+            raise
+        finally:
+            _current_span.reset(token)
+            if current.recording:
+                current.end()
+                self.exporter.export(current)
+
+    def record(self, name: str, duration: float, **attributes) -> None:
+        """
+        Records a child span of the current span that has already finished.
+
+        Args:
+            name (str): Span name.
+            duration (float): Span duration in seconds, the span is assumed to end now.
+            **attributes: Span attributes.
+        """
+        parent = _current_span.get()
+        if parent is None or not parent.recording:
+            return
+        child = Span(name, parent.trace_id, parent.span_id, attributes)
+        child.start_time -= duration
+        child.end(duration)
+        self.exporter.export(child)
+
+
+TRACER = Tracer()
+
+
+def configure(
+    path: Optional[str],
+    sample_rate: float,
+    fmt: str = FORMAT_JSONL,
+    max_bytes: int = 50 * 1024 * 1024,
+    backup_count: int = 3,
+) -> Tracer:
+    """
+    Configures the global tracer, a zero sample rate or no path disables it.
+
+    Returns:
+        Tracer: The global tracer.
+    """
+    if TRACER.exporter is not None:
+        TRACER.exporter.close()
+    TRACER.exporter = (
+        FileExporter(path, fmt, max_bytes, backup_count)
+        if path and sample_rate > 0
+        else None
+    )
+    TRACER.sample_rate = sample_rate
+    return TRACER
+
+
+def span(name: str, **attributes):
+    return TRACER.span(name, **attributes)
+
+
+def record(name: str, duration: float, **attributes) -> None:
+    TRACER.record(name, duration, **attributes)
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def trace_dendrite_responses(responses: Iterable, timeout: Optional[float] = None) -> None:
+    """
+    Records a ``dendrite.call`` child span per dendrite response.
+
+    Args:
+        responses (Iterable[bt.Synapse]): Synapses returned by ``dendrite.forward``.
+        timeout (float, optional): Duration used for responses without a process time.
+    """
+    if not current_span().recording:
+        return
+    for response in responses:
+        dendrite = response.dendrite
+        process_time = getattr(dendrite, "process_time", None)
+        duration = float(process_time) if process_time is not None else timeout or 0.0
+        record(
+            "dendrite.call",
+            duration,
+            hotkey=response.axon.hotkey,
+            status_code=getattr(dendrite, "status_code", None),
+            payload_bytes=len(response.model_dump_json()),
+        )
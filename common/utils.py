@@ -1,11 +1,12 @@
 import os
 import re
 import socket
+import threading
 import time
 from collections import defaultdict
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Optional, Dict, Callable, Any
+from typing import Optional, Dict
 
 import bittensor as bt
 from common.helpers import const
@@ -20,6 +21,9 @@ def execute_periodically(period: timedelta):
     """
     Decorator to execute a coroutine function periodically based on the specified period.
 
+    A call made while a previous one is still running, e.g. from the startup
+    thread of a neuron, is skipped as well.
+
     Args:
         period (timedelta): The time interval between each execution of the decorated function.
 
@@ -28,22 +32,28 @@ def execute_periodically(period: timedelta):
     """
     def decorator(func):
         last_operation_date: Optional[datetime] = None
+        running = threading.Lock()
 
         @wraps(func)
         async def wrapper(*args, **kwargs):
             nonlocal last_operation_date
             if (
-                not last_operation_date
-                or datetime.now() - last_operation_date > period
+                last_operation_date
+                and datetime.now() - last_operation_date <= period
             ):
-                result = await func(*args, **kwargs)
-                last_operation_date = datetime.now()
-                return result
-            else:
                 bt.logging.debug(
                     f"Skipping {func.__name__}, period has not yet passed."
                 )
                 return None
+            if not running.acquire(blocking=False):
+                bt.logging.debug(f"Skipping {func.__name__}, it is still running.")
+                return None
+            try:
+                result = await func(*args, **kwargs)
+                last_operation_date = datetime.now()
+                return result
+            finally:
+                running.release()
 
         return wrapper
 
@@ -150,29 +160,3 @@ def blocks_to_timedelta(blocks: int) -> timedelta:
 
 def timedelta_to_blocks(td: timedelta) -> int:
     return td.total_seconds() // const.BLOCK_DURATION.total_seconds()
-
-
-def cache_result(expiration: timedelta):
-    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
-        cache: dict[str, tuple[Any, float]] = {}
-
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> Any:
-            # Create a cache key from function name and arguments
-            cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            current_time = time.time()
-
-            # Check if we have a valid cached result
-            if cache_key in cache:
-                result, timestamp = cache[cache_key]
-                if current_time - timestamp < expiration.total_seconds():
-                    return result
-
-            # If no valid cache, execute the function
-            result = await func(*args, **kwargs)
-            cache[cache_key] = (result, current_time)
-            return result
-
-        return wrapper
-
-    return decorator
\ No newline at end of file
@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, Any
 from typing import Optional
 
-from sqlalchemy import String, Enum, DateTime, Integer, Boolean, Float, text, PickleType
+from sqlalchemy import String, Enum, Date, DateTime, Integer, Boolean, Float, Index, text, PickleType
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
 
 from common.schemas.campaign import CampaignType
@@ -83,7 +83,9 @@ class BitAdsData(Base):
     country_code: Mapped[Optional[str]]
     is_unique: Mapped[bool]
     device: Mapped[Optional[Device]] = mapped_column(Enum(Device), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, index=True
+    )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         default=datetime.utcnow,
@@ -103,7 +105,9 @@ class BitAdsData(Base):
     sale_amount: Mapped[float] = mapped_column(Float, server_default=text("0.0"))
     order_info: Mapped[Dict[str, Any]] = mapped_column(PickleType, nullable=True)
     refund_info: Mapped[Dict[str, Any]] = mapped_column(PickleType, nullable=True)
-    sale_date: Mapped[Optional[datetime]]  # Needed for updating sales_status
+    sale_date: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, index=True
+    )  # Needed for updating sales_status
 
     # Miner data:
     referer: Mapped[Optional[str]]
@@ -112,16 +116,67 @@ class BitAdsData(Base):
     miner_block: Mapped[Optional[str]]
     return_in_site: Mapped[Optional[bool]]
 
+    __table_args__ = (
+        Index("ix_bitads_data_updated_at_id", "updated_at", "id"),
+        Index(
+            "ix_bitads_data_sales_status_campaign_id_sale_date",
+            "sales_status",
+            "campaign_id",
+            "sale_date",
+        ),
+    )
     __mapper_args__ = {
         "confirm_deleted_rows": False
     }
 
+
+class BitAdsDailyRollup(Base):
+    """
+    Daily totals of bitads_data per campaign item.
+
+    Visit columns are grouped by the day of ``created_at``, ``sale_rows`` and
+    ``sales`` by the day of ``sale_date``, matching the filters of
+    ``get_aggregated_data`` and ``get_miners_reputation``. Rows without
+    ``campaign_id`` or ``campaign_item`` are not rolled up.
+    """
+
+    __tablename__ = "bitads_daily_rollup"
+
+    campaign_id: Mapped[str] = mapped_column(String, primary_key=True)
+    campaign_item: Mapped[str] = mapped_column(String, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    visits: Mapped[int] = mapped_column(Integer, default=0)
+    visits_unique: Mapped[int] = mapped_column(Integer, default=0)
+    completed_sales: Mapped[int] = mapped_column(Integer, default=0)
+    completed_refunds: Mapped[int] = mapped_column(Integer, default=0)
+    completed_sales_amount: Mapped[float] = mapped_column(Float, default=0.0)
+    sale_rows: Mapped[int] = mapped_column(Integer, default=0)
+    sales: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class BitAdsRollupDirtyDay(Base):
+    """
+    Days whose rollups are outdated because bitads_data rows of the day were written.
+    """
+
+    __tablename__ = "bitads_rollup_dirty_days"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+
 class MinerAssignment(Base):
     __tablename__ = "miner_assignment"
 
     unique_id: Mapped[str] = mapped_column(String, primary_key=True)
     hotkey: Mapped[str]
     campaign_id: Mapped[Optional[str]]
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    __table_args__ = (
+        Index("ix_miner_assignment_updated_at_unique_id", "updated_at", "unique_id"),
+    )
 
 
 class OrderQueue(Base):
@@ -140,7 +195,20 @@ class OrderQueue(Base):
     status: Mapped[OrderQueueStatus] = mapped_column(
         Enum(OrderQueueStatus), default=OrderQueueStatus.PENDING
     )
+    attempts: Mapped[int] = mapped_column(
+        Integer, default=0, server_default=text("0"), nullable=False
+    )
+    # Due time of the next attempt, the lease expiry while claimed,
+    # NULL once processed or dead lettered
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=True
+    )
+    lease_token: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
+    __table_args__ = (
+        Index("ix_order_queue_updated_at_id", "updated_at", "id"),
+        Index("ix_order_queue_next_attempt_at", "next_attempt_at"),
+    )
     __mapper_args__ = {
         "confirm_deleted_rows": False
     }
@@ -152,3 +220,16 @@ class MinersMetadata(Base):
     hotkey: Mapped[str] = mapped_column(String, primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     last_offset: Mapped[Optional[datetime]]
+
+
+class DeltaWatermark(Base):
+    """
+    Position of the delta sync of a table from a peer, the last applied row.
+    """
+
+    __tablename__ = "delta_watermarks"
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String, primary_key=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime)
+    row_id: Mapped[str] = mapped_column(String)
@@ -4,12 +4,16 @@ from fastapi import Depends
 
 from common.db.database import DatabaseManager
 from common.dependencies import get_database_manager
+from common.seen_ids import SeenIds
+from common.services.delta.base import DeltaService
+from common.services.delta.impl import DeltaServiceImpl
 from common.services.migration.base import MigrationService
 from common.services.migration.validator import ValidatorMigrationService
 from common.services.queue.base import OrderQueueService
 from common.services.queue.impl import OrderQueueServiceImpl
 from common.services.validator.base import ValidatorService
 from common.services.validator.impl import ValidatorServiceImpl
+from common.validator.environ import Environ
 from neurons.validator.core import CoreValidator
 
 
@@ -48,3 +52,17 @@ def get_migration_service(
     database_manager: Annotated[DatabaseManager, Depends(get_database_manager)]
 ) -> MigrationService:
     return ValidatorMigrationService(database_manager)
+
+
+def get_delta_service(
+    database_manager: Annotated[DatabaseManager, Depends(get_database_manager)]
+) -> DeltaService:
+    return DeltaServiceImpl(database_manager)
+
+
+def get_seen_visits(network: str) -> SeenIds:
+    return SeenIds(
+        Environ.SEEN_VISITS_PATH_TEMPLATE.format(network=network),
+        Environ.SEEN_VISITS_CAPACITY,
+        Environ.SEEN_VISITS_RECENT_SIZE,
+    )
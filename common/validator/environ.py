@@ -23,6 +23,28 @@ class Environ:
         MR_DAYS (timedelta): Number of days to retain data for miner reputation evaluation, as a timedelta. Defaults to 30 days.
         MR_BLOCKS (int): Number of blocks corresponding to MR_DAYS, based on block duration.
         EVALUATE_MINERS_BLOCK_N (int): Number of blocks to consider when evaluating miners. Defaults to 100.
+        ORDER_QUEUE_LEASE (timedelta): How long claimed order queue rows are held by a processor. Defaults to 5 minutes.
+        ORDER_QUEUE_RETRY_BACKOFF (timedelta): Delay after the first failed attempt, doubled with every attempt.
+                                               Defaults to 1 minute.
+        ORDER_QUEUE_MAX_BACKOFF (timedelta): Longest delay between attempts. Defaults to 6 hours.
+        ORDER_QUEUE_MAX_ATTEMPTS (int): Attempts before a row is dead lettered. Defaults to 20.
+        SHOPIFY_BATCH_SIZE (int): Shopify webhooks written to the order queue in one transaction at most.
+                                  Defaults to 500.
+        SHOPIFY_BATCH_DELAY (timedelta): How long a webhook waits for others to share its transaction.
+                                         Defaults to 20 milliseconds.
+        SHOPIFY_IDEMPOTENCY_TTL (timedelta): How long a queued webhook is remembered to skip its retries.
+                                             Defaults to 60 minutes.
+        SHOPIFY_IDEMPOTENCY_SIZE (int): Webhooks remembered at most. Defaults to 100000.
+        SALES_COMPLETION_PERIOD (timedelta): Step in which the refund period cutoffs of sales advance,
+                                             sales are completed at most this late. Defaults to 10 minutes.
+        SEEN_VISITS_PATH_TEMPLATE (str): File of the Bloom filter of visit IDs already stored, by network.
+                                         Defaults to 'databases/seen_visits_{network}.bin'.
+        SEEN_VISITS_CAPACITY (int): Visit IDs per generation of the Bloom filter. Defaults to 1000000.
+        SEEN_VISITS_RECENT_SIZE (int): Most recently stored visit IDs remembered exactly. Defaults to 100000.
+        SYNC_VISITS_MAX_DURATION (timedelta): How long a sync keeps pulling further pages of miners whose
+                                              pages come back full. Defaults to 60 seconds.
+        SYNC_VISITS_MAX_ROWS (int): Visits a sync pulls at most before it stops pulling further pages.
+                                    Defaults to 25000.
     """
 
     ACTIVE_DB_URL: str = environ.get(
@@ -59,3 +81,35 @@ class Environ:
     EVALUATE_MINERS_BLOCK_N: int = int(
         environ.get("EVALUATE_MINERS_BLOCK_N", 100)
     )
+    ORDER_QUEUE_LEASE: timedelta = timedelta(
+        minutes=int(environ.get("ORDER_QUEUE_LEASE", 5))
+    )
+    ORDER_QUEUE_RETRY_BACKOFF: timedelta = timedelta(
+        minutes=int(environ.get("ORDER_QUEUE_RETRY_BACKOFF", 1))
+    )
+    ORDER_QUEUE_MAX_BACKOFF: timedelta = timedelta(
+        hours=int(environ.get("ORDER_QUEUE_MAX_BACKOFF", 6))
+    )
+    ORDER_QUEUE_MAX_ATTEMPTS: int = int(environ.get("ORDER_QUEUE_MAX_ATTEMPTS", 20))
+    SHOPIFY_BATCH_SIZE: int = int(environ.get("SHOPIFY_BATCH_SIZE", 500))
+    SHOPIFY_BATCH_DELAY: timedelta = timedelta(
+        milliseconds=int(environ.get("SHOPIFY_BATCH_DELAY", 20))
+    )
+    SHOPIFY_IDEMPOTENCY_TTL: timedelta = timedelta(
+        minutes=int(environ.get("SHOPIFY_IDEMPOTENCY_TTL", 60))
+    )
+    SHOPIFY_IDEMPOTENCY_SIZE: int = int(
+        environ.get("SHOPIFY_IDEMPOTENCY_SIZE", 100_000)
+    )
+    SALES_COMPLETION_PERIOD: timedelta = timedelta(
+        minutes=int(environ.get("SALES_COMPLETION_PERIOD", 10))
+    )
+    SEEN_VISITS_PATH_TEMPLATE: str = environ.get(
+        "SEEN_VISITS_PATH_TEMPLATE", "databases/seen_visits_{network}.bin"
+    )
+    SEEN_VISITS_CAPACITY: int = int(environ.get("SEEN_VISITS_CAPACITY", 1_000_000))
+    SEEN_VISITS_RECENT_SIZE: int = int(environ.get("SEEN_VISITS_RECENT_SIZE", 100_000))
+    SYNC_VISITS_MAX_DURATION: timedelta = timedelta(
+        seconds=int(environ.get("SYNC_VISITS_MAX_DURATION", 60))
+    )
+    SYNC_VISITS_MAX_ROWS: int = int(environ.get("SYNC_VISITS_MAX_ROWS", 25_000))
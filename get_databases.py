@@ -1,20 +1,21 @@
 import asyncio
 import os.path
 import random
-import socket
-import ssl
+import re
 from typing import Optional, Set
-from urllib.error import URLError
-from urllib.request import urlretrieve
 
 import bittensor as bt
 from common import dependencies
+from common.clients.snapshot.bootstrap import SnapshotBootstrapper
+from common.clients.snapshot.client import SnapshotClient
 
 from common.environ import Environ as CommonEnviron
 from common.helpers import const
 
 bt.logging.on()
 
+_HISTORY_PARTITION = re.compile(r"history_\d{4}_\d{2}", re.ASCII)
+
 
 def get_database_name(database: str):
     return (
@@ -34,16 +35,7 @@ def get_database_path(database: str):
 
 
 async def main():
-    databases_to_retrieve = {"active", "history"}
-
-    socket.setdefaulttimeout(5)
-
-    # noinspection PyProtectedMember
-    ssl._create_default_https_context = ssl._create_unverified_context
-    for database in databases_to_retrieve.copy():
-        if os.path.isfile(get_database_path(database)):
-            databases_to_retrieve.remove(database)
-    if not databases_to_retrieve:
+    if all(os.path.isfile(get_database_path(db)) for db in ("active", "history")):
         bt.logging.info("Databases already exists")
         return
     wallet = bt.wallet(CommonEnviron.WALLET_NAME, CommonEnviron.WALLET_HOTKEY)
@@ -65,44 +57,39 @@ async def main():
             "Please check that your wallet is valid and NEURON_TYPE environment variable is set"
         )
         return
-    try:
-        neurons.remove(hotkey)
-    except KeyError:
-        pass  # All is ok
-    if not neurons:
+    axons = [a for a in metagraph.axons if a.hotkey in neurons and a.hotkey != hotkey]
+    if not axons:
         bt.logging.info("All is ok, but no neurons to fetch database")
         return
-    while neurons:
-        t_neurons = tuple(neurons)
-        random_hotkey = random.choice(t_neurons)
-        neurons.remove(random_hotkey)
+    random.shuffle(axons)
+
+    # Peers only serve snapshots to validators with a permit
+    signer = dependencies.get_peer_signer(wallet)
+    bootstrapper = SnapshotBootstrapper(
+        [SnapshotClient(f"https://{axon.ip}", signer=signer) for axon in axons]
+    )
+    offers = bootstrapper.collect_manifests()
+    # Monthly history partitions of the peers are fetched too. Their names
+    # come from the peers and become file names, only partitions are taken.
+    databases = {"active", "history"} | {
+        db for db in offers if _HISTORY_PARTITION.fullmatch(db)
+    }
+    paths = {
+        database: get_database_path(database)
+        for database in sorted(databases)
+        if not os.path.isfile(get_database_path(database))
+    }
+    if not paths:
+        bt.logging.info("Databases already exists")
+        return
 
-        axon = next(iter(a for a in metagraph.axons if a.hotkey == random_hotkey), None)
-        if not axon:
-            bt.logging.warning(
-                f"How can BitAds return {random_hotkey} as active neuron, but it's not?"
-            )
-            continue
-        for database in databases_to_retrieve.copy():
-            try:
-                response = urlretrieve(
-                    f"https://{axon.ip}/get_database?db={database}",
-                    get_database_path(database),
-                )
-                if response:
-                    databases_to_retrieve.remove(database)
-                    bt.logging.info(
-                        f"We successfully fetch {database} from {random_hotkey}!"
-                    )
-            except URLError:
-                bt.logging.warning(
-                    f"Oops, guess we got a timeout from neuron with hotkey {random_hotkey}. "
-                    f"Let's try another neuron"
-                )
-                break
-    if databases_to_retrieve:
+    bt.logging.info(f"Fetching {', '.join(paths)} from {len(axons)} neurons")
+    os.makedirs(os.path.dirname(get_database_path("active")), exist_ok=True)
+    bootstrapper.bootstrap(paths, offers)
+    missing = [database for database, path in paths.items() if not os.path.isfile(path)]
+    if missing:
         bt.logging.warning(
-            "Unfortunately, we can't fetch existing databases from neurons. "
+            f"Unfortunately, we can't fetch {', '.join(missing)} from neurons. "
             "So we create blank databases"
         )
     else:
@@ -3,6 +3,8 @@ from typing import TypeVar, Tuple, Generic
 
 import bittensor as bt
 
+from template.utils.metagraph_index import MetagraphIndex
+
 Synapse = TypeVar("Synapse", bound=bt.Synapse, covariant=True)
 
 
@@ -21,9 +23,18 @@ class Operation(Generic[Synapse], ABC):
 
 
 class BaseOperation(Operation[Synapse], ABC):
-    def __init__(self, metagraph: bt.metagraph, config: bt.config, **_):
+    def __init__(
+        self,
+        metagraph: bt.metagraph,
+        config: bt.config,
+        metagraph_index: MetagraphIndex = None,
+        **_,
+    ):
         self.metagraph = metagraph
         self.config = config
+        self.metagraph_index = (
+            metagraph_index if metagraph_index is not None else MetagraphIndex(metagraph)
+        )
 
     async def blacklist(self, synapse: Synapse) -> Tuple[bool, str]:
         """
@@ -51,16 +62,13 @@ class BaseOperation(Operation[Synapse], ABC):
 
         In practice it would be wise to blacklist requests from entities that are not validators, or do not have
         enough stake. This can be checked via metagraph.S and metagraph.validator_permit. You can always attain
-        the uid of the sender via a metagraph.hotkeys.index( synapse.dendrite.hotkey ) call.
+        the uid of the sender via a metagraph_index.get_uid( synapse.dendrite.hotkey ) call.
 
         Otherwise, allow the request to be processed further.
         """
         # TODO(developer): Define how miners should blacklist requests.
-        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        if (
-            not self.config.blacklist.allow_non_registered
-            and synapse.dendrite.hotkey not in self.metagraph.hotkeys
-        ):
+        uid = self.metagraph_index.get_uid(synapse.dendrite.hotkey)
+        if not self.config.blacklist.allow_non_registered and uid is None:
             # Ignore requests from un-registered entities.
             bt.logging.trace(
                 f"Blacklisting un-registered hotkey {synapse.dendrite.hotkey}"
@@ -69,7 +77,7 @@ class BaseOperation(Operation[Synapse], ABC):
 
         if self.config.blacklist.force_validator_permit:
             # If the config is set to force validator permit, then we should only allow requests from validators.
-            if not self.metagraph.validator_permit[uid]:
+            if not self.metagraph_index.has_validator_permit(synapse.dendrite.hotkey):
                 bt.logging.warning(
                     f"Blacklisting a request from non-validator hotkey {synapse.dendrite.hotkey}"
                 )
@@ -101,11 +109,8 @@ class BaseOperation(Operation[Synapse], ABC):
         - A higher stake results in a higher priority value.
         """
         # TODO(developer): Define how miners should prioritize requests.
-        caller_uid = self.metagraph.hotkeys.index(
+        prirority = self.metagraph_index.get_stake(
             synapse.dendrite.hotkey
-        )  # Get the caller index.
-        prirority = float(
-            self.metagraph.S[caller_uid]
         )  # Return the stake as the priority.
         bt.logging.trace(
             f"Prioritizing {synapse.dendrite.hotkey} with value: ", prirority
@@ -3,13 +3,16 @@
 # Copyright © 2023 bittensor.com
 import asyncio
 import logging
+import os
+import threading
 import time
 from datetime import timedelta, datetime
-from typing import Type
+from typing import List, Type
 
 import bittensor as bt
 
 from common import dependencies as common_dependencies, utils
+from common.db import profiler
 from common.environ import Environ as CommonEnviron
 from common.helpers import const
 from common.helpers.logging import log_startup, BittensorLoggingFilter
@@ -27,6 +30,7 @@ from neurons.protocol import SyncVisits
 # import base miner class which takes care of most of the boilerplate
 from template.base.miner import BaseMinerNeuron
 from template.mock import MockDendrite
+from template.utils.startup import Stage
 from template.validator.forward import forward_each_axon
 
 
@@ -51,6 +55,21 @@ class CoreMiner(BaseMinerNeuron):
         super(CoreMiner, self).__init__(config=config)
         self.loop = asyncio.get_event_loop()
 
+        with self.startup.phase("services"):
+            self._create_services()
+        self._snapshot_thread = None
+
+        operations = [
+            PingOperation,
+            RecentActivityOperation,
+            SyncVisitsOperation,
+            NotifyOrderOperation,
+        ]
+
+        for operation in map(self._create_operation, operations):
+            self.axon.attach(operation.forward, operation.blacklist, operation.priority)
+
+    def _create_services(self):
         self.bit_ads_client = common_dependencies.create_bitads_client(
             self.wallet, self.config.bitads.url, self.neuron_type
         )
@@ -77,6 +96,9 @@ class CoreMiner(BaseMinerNeuron):
         self.migration_service = dependencies.get_migration_service(
             self.database_manager
         )
+        self.snapshot_service = common_dependencies.get_snapshot_service(
+            self.database_manager
+        )
 
         if self.config.mock:
             self.dendrite = MockDendrite(wallet=self.wallet)
@@ -84,16 +106,12 @@ class CoreMiner(BaseMinerNeuron):
             self.dendrite = bt.dendrite(wallet=self.wallet)
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
-        operations = [
-            PingOperation,
-            RecentActivityOperation,
-            SyncVisitsOperation,
-            NotifyOrderOperation,
+    def startup_stages(self) -> List[Stage]:
+        return [
+            ("migrate_old_data", self._migrate_old_data),
+            ("ping_bitads", self._ping_bitads),
         ]
 
-        for operation in map(self._create_operation, operations):
-            self.axon.attach(operation.forward, operation.blacklist, operation.priority)
-
     def sync(self):
         bt.logging.debug("Start sync")
         try:
@@ -107,6 +125,8 @@ class CoreMiner(BaseMinerNeuron):
             # self.loop.run_until_complete(self.__sync_visits())
             self.loop.run_until_complete(self._send_load_data())
             self.loop.run_until_complete(self._clear_recent_activity())
+            self.loop.run_until_complete(self._dump_db_profile())
+            self.loop.run_until_complete(self._create_db_snapshots())
         except Exception as e:
             bt.logging.exception(f"Error during sync: {str(e)}")
         bt.logging.debug("End sync")
@@ -179,6 +199,30 @@ class CoreMiner(BaseMinerNeuron):
         except Exception as e:
             bt.logging.exception(f"Error in _send_load_data: {str(e)}")
 
+    @execute_periodically(CommonEnviron.SNAPSHOT_PERIOD)
+    async def _create_db_snapshots(self):
+        if self._snapshot_thread and self._snapshot_thread.is_alive():
+            return
+        # Snapshots of large databases take minutes, keep them off the main loop
+        self._snapshot_thread = threading.Thread(
+            target=asyncio.run,
+            args=(self.snapshot_service.create_snapshots(),),
+            name="db-snapshots",
+            daemon=True,
+        )
+        self._snapshot_thread.start()
+
+    @execute_periodically(CommonEnviron.DB_PROFILER_DUMP_PERIOD)
+    async def _dump_db_profile(self):
+        if not profiler.PROFILER.enabled:
+            return
+        try:
+            path = os.path.join(self.config.neuron.full_path, "db_profile.json")
+            profiler.PROFILER.dump(path)
+            bt.logging.debug(f"DB profile dumped to {path}")
+        except Exception as ex:
+            bt.logging.exception(f"DB profile dump exception: {str(ex)}")
+
     async def _set_hotkey_and_block(self):
         try:
             current_block = self.block
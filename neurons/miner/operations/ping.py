@@ -1,4 +1,5 @@
-from typing import Tuple
+import asyncio
+from typing import Dict, Optional, Tuple
 
 import bittensor as bt
 
@@ -28,17 +29,26 @@ class PingOperation(BaseOperation[Ping]):
         self.unique_link_service = unique_link_service
         self.bit_ads_client = bit_ads_client
         self.wallet = wallet
-        self.cache = {}
-        self.reload_cache = True
+        # Loaded once, links are only inserted by this operation
+        self.cache: Optional[Dict[str, MinerUniqueLinkSchema]] = None
+        self._cache_lock = asyncio.Lock()
+        # One link request per campaign at a time, keyed by campaign ID
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+    async def _get_cache(self) -> Dict[str, MinerUniqueLinkSchema]:
+        if self.cache is None:
+            async with self._cache_lock:
+                if self.cache is None:
+                    links = await self.unique_link_service.get_unique_links_for_hotkey(
+                        self.wallet.get_hotkey().ss58_address
+                    )
+                    self.cache = {link.campaign_id: link for link in links}
+        return self.cache
 
     async def forward(self, synapse: Ping) -> Ping:
-        if self.reload_cache:
-            assignments = await self.unique_link_service.get_unique_links_for_hotkey(
-                self.wallet.get_hotkey().ss58_address
-            )
-            self.cache = {a.campaign_id: a for a in assignments}
+        cache = await self._get_cache()
         for campaign in synapse.active_campaigns:
-            unique_link = self.cache.get(campaign.product_unique_id)
+            unique_link = cache.get(campaign.product_unique_id)
             if unique_link:
                 synapse.submitted_tasks.append(
                     GetMinerUniqueIdResponse(
@@ -55,31 +65,37 @@ class PingOperation(BaseOperation[Ping]):
                     ),
                 )
             else:
-                try:
-                    response = await self._get_campaign_unique_id(
-                        campaign.product_unique_id
-                    )
-                    if not response:
-                        raise
-                    synapse.submitted_tasks.append(response)
-                    bt.logging.info(
-                        prefix=LogLevel.BITADS,
-                        msg=green(
-                            f"Successfully created a unique link for campaign ID: {campaign.product_unique_id} "
-                            f"and forwarded it to the Validator: {synapse.dendrite.hotkey}",
-                        ),
-                    )
-                    self.reload_cache = True
-                except Exception as e:
-                    bt.logging.warning(
-                        prefix=LogLevel.BITADS,
-                        msg=red(
-                            f"Error creating unique link for campaign ID: {campaign.product_unique_id}"
-                        ),
-                    )
+                # The link is sent with the next Ping once generated
+                self._schedule_unique_link(campaign.product_unique_id)
         synapse.result = True
         return synapse
 
+    def _schedule_unique_link(self, campaign_id: str) -> asyncio.Task:
+        task = self._in_flight.get(campaign_id)
+        if task is None:
+            task = asyncio.create_task(self._create_unique_link(campaign_id))
+            self._in_flight[campaign_id] = task
+        return task
+
+    async def _create_unique_link(self, campaign_id: str) -> None:
+        try:
+            response = await self._get_campaign_unique_id(campaign_id)
+            if not response:
+                raise ValueError("Empty response")
+            bt.logging.info(
+                prefix=LogLevel.BITADS,
+                msg=green(
+                    f"Successfully created a unique link for campaign ID: {campaign_id}"
+                ),
+            )
+        except Exception:
+            bt.logging.warning(
+                prefix=LogLevel.BITADS,
+                msg=red(f"Error creating unique link for campaign ID: {campaign_id}"),
+            )
+        finally:
+            self._in_flight.pop(campaign_id, None)
+
     async def blacklist(self, synapse: Ping) -> Tuple[bool, str]:
         return await super().blacklist(synapse)
 
@@ -87,17 +103,21 @@ class PingOperation(BaseOperation[Ping]):
         return await super().priority(synapse)
 
     async def _get_campaign_unique_id(self, campaign_id: str):
-        response = self.bit_ads_client.get_miner_unique_id(campaign_id)
+        # Blocking HTTP call, keep it off the event loop of the axon
+        response = await asyncio.to_thread(
+            self.bit_ads_client.get_miner_unique_id, campaign_id
+        )
         if not response:
             return
 
-        await self.unique_link_service.add_unique_link(
-            MinerUniqueLinkSchema(
-                id=response.data.miner_unique_id,
-                campaign_id=campaign_id,
-                hotkey=self.wallet.get_hotkey().ss58_address,
-                link=response.data.link,
-            )
+        link = MinerUniqueLinkSchema(
+            id=response.data.miner_unique_id,
+            campaign_id=campaign_id,
+            hotkey=self.wallet.get_hotkey().ss58_address,
+            link=response.data.link,
         )
+        await self.unique_link_service.add_unique_link(link)
+        cache = await self._get_cache()
+        cache.setdefault(campaign_id, link)
 
         return response
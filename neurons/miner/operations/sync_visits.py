@@ -1,34 +1,81 @@
-from typing import Tuple
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
 
 import bittensor as bt
 
+from common.environ import Environ
+from common.miner.schemas import VisitorSchema
 from common.services.miner.base import MinerService
 from neurons.base.operations import BaseOperation
 from neurons.protocol import SyncVisits
 
+_PageKey = Tuple[Optional[datetime], int]
+
 
 class SyncVisitsOperation(BaseOperation[SyncVisits]):
+    # Validators sync at different offsets, the oldest pages are evicted first
+    MAX_CACHED_PAGES = 64
+
     def __init__(
         self,
         metagraph: bt.metagraph,
         config: bt.config,
         miner_service: MinerService,
+        cache_ttl: float = Environ.SYNC_VISITS_CACHE_TTL.total_seconds(),
         **_,
     ):
         super().__init__(metagraph, config, **_)
         self.miner_service = miner_service
+        self.cache_ttl = cache_ttl
+        # Pages shared by every validator, keyed by offset and limit
+        self._pages: Dict[_PageKey, Tuple[float, Set[VisitorSchema]]] = {}
+        self._in_flight: Dict[Tuple[_PageKey, int], asyncio.Task] = {}
+        self._version: Optional[int] = None
 
     async def forward(self, synapse: SyncVisits) -> SyncVisits:
         bt.logging.debug(
             f"Received SyncVisits synapse. Params: {synapse} from dendrite: {synapse.dendrite.hotkey}"
         )
-        visits = await self.miner_service.get_visits_after(
-            synapse.offset, synapse.limit
-        )
+        visits = await self._get_page(synapse.offset, synapse.limit)
         bt.logging.debug(f"Forwarding visits with ids: {[v.id for v in visits]} to {synapse.dendrite.hotkey}")
         synapse.visits = visits
         return synapse
 
+    async def _get_page(
+        self, offset: Optional[datetime], limit: int
+    ) -> Set[VisitorSchema]:
+        # Visits are also written by the proxy process, the version tells
+        # whether any landed since the pages were read
+        version = await self.miner_service.get_visits_version()
+        if version != self._version:
+            self._pages.clear()
+            self._version = version
+        key = offset, limit
+        page = self._pages.get(key)
+        if page and page[0] > time.monotonic():
+            return page[1]
+
+        # Concurrent requests for the same page share one query
+        task = self._in_flight.get((key, version))
+        if task is None:
+            task = asyncio.create_task(self._load_page(key, version))
+            self._in_flight[key, version] = task
+        return await asyncio.shield(task)
+
+    async def _load_page(self, key: _PageKey, version: int) -> Set[VisitorSchema]:
+        try:
+            visits = await self.miner_service.get_visits_after(*key)
+            if version == self._version:
+                self._pages.pop(key, None)
+                if len(self._pages) >= self.MAX_CACHED_PAGES:
+                    self._pages.pop(next(iter(self._pages)))
+                self._pages[key] = (time.monotonic() + self.cache_ttl, visits)
+            return visits
+        finally:
+            self._in_flight.pop((key, version), None)
+
     async def blacklist(self, synapse: SyncVisits) -> Tuple[bool, str]:
         return await super().blacklist(synapse)
 
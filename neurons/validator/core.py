@@ -4,15 +4,18 @@
 import argparse
 import asyncio
 import logging
+import os
 import random
+import threading
 import time
 from datetime import timedelta, datetime
-from typing import Dict
+from typing import Dict, List, Optional
 
 # Bittensor
 import bittensor as bt
 
-from common import dependencies as common_dependencies, utils
+from common import dependencies as common_dependencies, metrics, tracing, utils
+from common.db import profiler
 from common.environ import Environ as CommonEnviron
 from common.helpers import const
 from common.helpers.logging import LogLevel, log_startup, BittensorLoggingFilter
@@ -34,6 +37,8 @@ from neurons.protocol import (
 # import base validator class which takes care of most of the boilerplate
 from template.base.validator import BaseValidatorNeuron
 from template.utils.config import add_blacklist_args
+from template.utils.startup import Stage
+from template.validator.drain import Page, drain_pages
 from template.validator.forward import forward_each_axon
 
 
@@ -54,6 +59,25 @@ class CoreValidator(BaseValidatorNeuron):
     def __init__(self, config=None):
         super(CoreValidator, self).__init__(config=config)
 
+        with self.startup.phase("services"):
+            self._create_services()
+        self._snapshot_thread = None
+        self.miners = CommonEnviron.MINERS
+        self.validators = CommonEnviron.VALIDATORS
+        self.evaluate_miners_blocks = Environ.EVALUATE_MINERS_BLOCK_N
+        self.miner_ratings = dict()
+        self.last_evaluate_block = 0
+        self.offset = None
+        self._sale_cutoffs: Dict[str, datetime] = {}
+
+        bt.logging.info("load_state()")
+        self.load_state()
+        # Settings, miners and campaigns must be current before the first
+        # forward evaluates the miners, so the ping is not left to the background
+        with self.startup.phase("ping_bitads"):
+            self.loop.run_until_complete(self._ping_bitads())
+
+    def _create_services(self):
         self.bitads_client = common_dependencies.create_bitads_client(
             self.wallet, self.config.bitads.url, self.neuron_type
         )
@@ -65,7 +89,8 @@ class CoreValidator(BaseValidatorNeuron):
             self.database_manager
         )
         self.bitads_service = common_dependencies.get_bitads_service(
-            self.database_manager
+            self.database_manager,
+            seen_visits=dependencies.get_seen_visits(self.subtensor.network),
         )
         self.order_queue_service = dependencies.get_order_queue_service(
             self.database_manager
@@ -79,15 +104,9 @@ class CoreValidator(BaseValidatorNeuron):
         self.migration_service = dependencies.get_migration_service(
             self.database_manager
         )
-        self.miners = CommonEnviron.MINERS
-        self.validators = CommonEnviron.VALIDATORS
-        self.evaluate_miners_blocks = Environ.EVALUATE_MINERS_BLOCK_N
-        self.miner_ratings = dict()
-        self.last_evaluate_block = 0
-        self.offset = None
-
-        bt.logging.info("load_state()")
-        self.load_state()
+        self.snapshot_service = common_dependencies.get_snapshot_service(
+            self.database_manager
+        )
 
     async def forward(self, _: bt.Synapse = None):
         """
@@ -98,12 +117,22 @@ class CoreValidator(BaseValidatorNeuron):
         - Rewarding the miners
         - Updating the scores
         """
-        await self._migrate_old_data()
-        await self.forward_ping()
-        await self.__forward_bitads_data()
-        await self._try_process_order_queue()
-        await self.forward_recent_activity()
-        await self._try_evaluate_miners()
+        with tracing.span("validator.forward", step=self.step):
+            with tracing.span("migrate_old_data"):
+                await self._migrate_old_data()
+            with tracing.span("forward_ping"):
+                await self.forward_ping()
+            with tracing.span("sync_visits"):
+                await self.__forward_bitads_data()
+            with tracing.span("process_order_queue"):
+                await self._try_process_order_queue()
+            with tracing.span("forward_recent_activity"):
+                await self.forward_recent_activity()
+            with tracing.span("evaluate_miners"):
+                await self._try_evaluate_miners()
+        await self._dump_db_profile()
+        await self._export_order_queue_depth()
+        await self._create_db_snapshots()
 
     @execute_periodically(timedelta(minutes=30))
     async def forward_recent_activity(self):
@@ -165,68 +194,73 @@ class CoreValidator(BaseValidatorNeuron):
             bt.logging.info("Start sync BitAds process")
 
             miners_metadata = await self.validator_service.get_miners_metadata()
-            hotkey_to_axon_info: Dict[str, bt.AxonInfo] = {
-                info.hotkey: info for info in self.metagraph.axons
-            }
-
-            semaphore = asyncio.Semaphore(30)
+            hotkey_to_axon_info = self.metagraph_index.hotkey_to_axon
 
-            async def forward(hotkey: str) -> (str, SyncVisits):
+            async def fetch(hotkey: str, offset: Optional[datetime]) -> Page:
                 axon = hotkey_to_axon_info.get(hotkey)
                 if not axon:
-                    return hotkey, SyncVisits()
-
-                metadata = miners_metadata.get(
-                    hotkey, MinersMetadataSchema.default_instance(hotkey)
+                    return Page(hotkey, set(), None)
+                with tracing.span("dendrite.call", hotkey=hotkey) as span:
+                    response = await self.dendrite.forward(
+                        axon, SyncVisits(offset=offset, limit=limit), timeout=timeout
+                    )
+                    metrics.observe_dendrite_responses([response], timeout)
+                    span.set_attributes(
+                        status_code=response.dendrite.status_code,
+                        visits=len(response.visits),
+                    )
+                newest_visit = max(
+                    response.visits, key=lambda item: item.created_at, default=None
                 )
-                response = await self.dendrite.forward(
-                    axon,
-                    SyncVisits(offset=metadata.last_offset, limit=limit),
-                    timeout=timeout,
+                if not newest_visit:
+                    return Page(hotkey, response.visits, None)
+                metrics.MINER_SYNC_LAG_SECONDS.set(
+                    (datetime.utcnow() - newest_visit.created_at).total_seconds(),
+                    hotkey=hotkey,
                 )
-                return response.axon.hotkey, response
+                return Page(hotkey, response.visits, newest_visit.created_at)
 
-            async def forward_with_limit(hotkey: str):
-                async with semaphore:
-                    return await forward(hotkey)
+            async def write(pages: List[Page]):
+                visits = {visit.id: visit for page in pages for visit in page.rows}
+                if visits:
+                    bt.logging.debug(
+                        f"Received visits from miners with ids: {list(visits)}"
+                    )
+                    with tracing.span("db.add_by_visits", rows=len(visits)):
+                        await self.bitads_service.add_by_visits(visits.values())
+                # Offsets advance only once the visits of their page are stored
+                for page in pages:
+                    metadata = miners_metadata.setdefault(
+                        page.hotkey, MinersMetadataSchema.default_instance(page.hotkey)
+                    )
+                    if metadata.last_offset and not page.rows:
+                        continue
+                    metadata.last_offset = page.next_offset
+                    await self.validator_service.add_miner_metadata(metadata)
 
             miners = list(self.miners)
             random.shuffle(miners)
 
-            responses_list = await asyncio.gather(
-                *[forward_with_limit(miner) for miner in miners]
-            )
-
-            responses = dict(responses_list)
-
-            for hotkey, response in responses.items():
-                metadata = miners_metadata.get(
-                    hotkey, MinersMetadataSchema.default_instance(hotkey)
-                )
-                newest_visit = max(
-                    response.visits, key=lambda item: item.created_at, default=None
-                )
-                if metadata.last_offset and not response.visits:
-                    continue
-                metadata.last_offset = newest_visit.created_at if newest_visit else None
-                await self.validator_service.add_miner_metadata(metadata)
-
             await self._update_sales_status_if_needed()
 
-            visits = {
-                visits for synapse in responses.values() for visits in synapse.visits
-            }
-            if not visits:
+            received = await drain_pages(
+                {
+                    hotkey: miners_metadata.get(
+                        hotkey, MinersMetadataSchema.default_instance(hotkey)
+                    ).last_offset
+                    for hotkey in miners
+                },
+                fetch,
+                write,
+                limit=limit,
+                max_duration=Environ.SYNC_VISITS_MAX_DURATION,
+                max_rows=Environ.SYNC_VISITS_MAX_ROWS,
+            )
+            if not received:
                 bt.logging.info("No visits received from miners")
                 return
 
-            bt.logging.debug(
-                f"Received visits from miners with ids: {[v.id for v in visits]}"
-            )
-
-            await self.bitads_service.add_by_visits(visits)
-
-            bt.logging.info("End sync BitAds process")
+            bt.logging.info(f"End sync BitAds process, received {received} visits")
         except Exception as ex:
             bt.logging.exception(f"BitAds data sync exception: {str(ex)}")
 
@@ -246,7 +280,7 @@ class CoreValidator(BaseValidatorNeuron):
 
     def set_weights(self):
         bt.logging.debug(f"Start setting weights: {self.miner_ratings}")
-        hotkey_to_uid = {n.hotkey: n.uid for n in self.metagraph.neurons}
+        hotkey_to_uid = self.metagraph_index.hotkey_to_uid
 
         miner_ratings = {
             uid: self.miner_ratings.get(hotkey, 0.0)
@@ -267,6 +301,13 @@ class CoreValidator(BaseValidatorNeuron):
         else:
             bt.logging.error("set_weights failed", msg)
 
+    def load_state(self):
+        """The state is in the databases and comes from the BitAds ping."""
+        pass
+
+    def startup_stages(self) -> List[Stage]:
+        return [("migrate_old_data", self._migrate_old_data)]
+
     @execute_periodically(const.PING_PERIOD)
     async def _ping_bitads(self):
         try:
@@ -328,16 +369,25 @@ class CoreValidator(BaseValidatorNeuron):
             bt.logging.exception(f"Evaluate miners exception: {str(ex)}")
 
     async def _update_sales_status_if_needed(self):
-        for campaign in await self.campaigns_serivce.get_active_campaigns():
-            sale_to = datetime.utcnow() - timedelta(
-                days=campaign.product_refund_period_duration
-            )
-            await self.bitads_service.update_sale_status_if_needed(
-                campaign.product_unique_id, sale_to
-            )
+        # Cutoffs move in steps of SALES_COMPLETION_PERIOD, cycles between steps are skipped
+        period = Environ.SALES_COMPLETION_PERIOD
+        now = datetime.min + (datetime.utcnow() - datetime.min) // period * period
+        cutoffs = {
+            campaign.product_unique_id: now
+            - timedelta(days=campaign.product_refund_period_duration)
+            for campaign in await self.campaigns_serivce.get_active_campaigns()
+        }
+        if cutoffs == self._sale_cutoffs:
+            return
+        await self.bitads_service.complete_sales(cutoffs)
+        self._sale_cutoffs = cutoffs
 
     async def _try_process_order_queue(self, timeout: float = 1, limit: int = 10):
         try:
+            stats = await self.order_queue_service.get_stats()
+            metrics.ORDER_QUEUE_READY.set(stats.ready)
+            metrics.ORDER_QUEUE_LEASED.set(stats.leased)
+            metrics.ORDER_QUEUE_OLDEST_READY_SECONDS.set(stats.oldest_ready_seconds)
             data_to_process = await self.order_queue_service.get_data_to_process(limit)
             if not data_to_process:
                 bt.logging.info("No data to process in order queue")
@@ -348,9 +398,11 @@ class CoreValidator(BaseValidatorNeuron):
                 current_block, hotkey, data_to_process
             )
             result_to_status = {id_: status for id_, (status, _) in result.items()}
-            await self.order_queue_service.update_queue_status(result_to_status)
-            for _, data in result.values():
-                if not data:
+            recorded = await self.order_queue_service.update_queue_status(
+                result_to_status, data_to_process[0].lease_token
+            )
+            for id_, (_, data) in result.items():
+                if not data or id_ not in recorded:
                     continue
                 hotkey = (
                     await self.miner_assignments_service.get_hotkey_by_campaign_item(
@@ -365,14 +417,42 @@ class CoreValidator(BaseValidatorNeuron):
         except Exception as ex:
             bt.logging.exception(f"Order queue processing exception: {str(ex)}")
 
-    async def _mark_for_reprocess(self):
-        ids = await self.order_queue_service.get_all_ids()
-        await self.order_queue_service.update_queue_status(
-            {id_: OrderQueueStatus.PENDING for id_ in ids}
+    @execute_periodically(CommonEnviron.SNAPSHOT_PERIOD)
+    async def _create_db_snapshots(self):
+        if self._snapshot_thread and self._snapshot_thread.is_alive():
+            return
+        # Snapshots of large databases take minutes, keep them off the main loop
+        self._snapshot_thread = threading.Thread(
+            target=asyncio.run,
+            args=(self.snapshot_service.create_snapshots(),),
+            name="db-snapshots",
+            daemon=True,
         )
+        self._snapshot_thread.start()
 
-    def load_state(self):
-        self.loop.run_until_complete(self._ping_bitads())
+    @execute_periodically(CommonEnviron.DB_PROFILER_DUMP_PERIOD)
+    async def _dump_db_profile(self):
+        if not profiler.PROFILER.enabled:
+            return
+        try:
+            path = os.path.join(self.config.neuron.full_path, "db_profile.json")
+            profiler.PROFILER.dump(path)
+            bt.logging.debug(f"DB profile dumped to {path}")
+        except Exception as ex:
+            bt.logging.exception(f"DB profile dump exception: {str(ex)}")
+
+    @execute_periodically(timedelta(minutes=10))
+    async def _export_order_queue_depth(self):
+        # Counting per status scans the whole table, unlike the ready stats
+        try:
+            depth = await self.order_queue_service.count_by_status()
+            for status in OrderQueueStatus:
+                metrics.ORDER_QUEUE_DEPTH.set(depth.get(status, 0), status=status.name)
+        except Exception as ex:
+            bt.logging.exception(f"Order queue depth exception: {str(ex)}")
+
+    async def _mark_for_reprocess(self):
+        await self.order_queue_service.requeue()
 
 
 # The main function parses the configuration and runs the validator.
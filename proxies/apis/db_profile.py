@@ -0,0 +1,25 @@
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from common.db.profiler import PROFILER
+from proxies.utils.validation import validate_hash
+
+router = APIRouter()
+
+
+@router.get(
+    "/debug/db_profile",
+    dependencies=[Depends(validate_hash)],
+    include_in_schema=False,
+)
+async def get_db_profile(
+    limit: Optional[int] = None, reset: bool = False
+) -> Dict[str, Any]:
+    """Return SQL statistics collected since start or the last reset"""
+    if not PROFILER.enabled:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "DB profiler is disabled")
+    snapshot = PROFILER.snapshot(limit)
+    if reset:
+        PROFILER.reset()
+    return snapshot
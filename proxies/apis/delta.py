@@ -0,0 +1,43 @@
+import gzip
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+
+from common.schemas.delta import Watermark
+from common.services.delta.base import DeltaService
+from proxies.utils.validation import validate_peer
+
+router = APIRouter()
+
+# Batches smaller than this are not worth compressing
+_GZIP_MIN_SIZE = 1024
+
+
+@router.get("/delta/{table}", dependencies=[Depends(validate_peer)])
+async def get_delta(
+    table: Literal["bitads_data", "order_queue", "miner_assignment"],
+    request: Request,
+    updated_after: Optional[datetime] = None,
+    id_after: str = "",
+    limit: int = Query(1000, ge=1, le=5000),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Retrieve rows changed after a watermark, ordered by updated_at and id"""
+    delta_service: DeltaService = getattr(request.app.state, "delta_service", None)
+    if not delta_service:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Delta sync is not available")
+    after = (
+        Watermark(updated_at=updated_after, id=id_after)
+        if updated_after is not None
+        else None
+    )
+    batch = await delta_service.export(table, after, limit)
+    body = batch.model_dump_json().encode()
+    if accept_encoding and "gzip" in accept_encoding and len(body) >= _GZIP_MIN_SIZE:
+        return Response(
+            gzip.compress(body, compresslevel=6),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(body, media_type="application/json")
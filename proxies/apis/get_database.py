@@ -1,31 +1,128 @@
-from typing import Literal
+import os
+import re
+from typing import BinaryIO, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi import Request
-from fastapi.responses import FileResponse
-from sqlalchemy import Engine
+from fastapi.responses import StreamingResponse
 
-from common.db.database import DatabaseManager
+from common.schemas.snapshot import SnapshotManifest
+from common.services.snapshot.base import SnapshotService
+from proxies.utils.validation import validate_peer
 
 router = APIRouter()
 
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_READ_SIZE = 64 * 1024
 
-@router.get("/get_database")
-async def get_database(
-    db: Literal["main", "history", "active"], request: Request
-):
-    """Retrieve version information"""
-    database: DatabaseManager = request.app.state.database_manager
-    if not database:
-        raise HTTPException(404, "DB not found")
 
-    engine: Engine = getattr(database, f"{db}_db")
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single byte range of a ``Range`` header.
+
+    Args:
+        header (str, optional): Value of the ``Range`` header.
+        size (int): Size of the served file.
+
+    Returns:
+        Optional[Tuple[int, int]]: Inclusive first and last byte, None when the
+        whole file is served (no header, multiple or malformed ranges).
+
+    Raises:
+        HTTPException: 416 if the range is not satisfiable.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range, the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _read_file(file: BinaryIO, start: int, length: int):
+    with file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(_READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
 
-    if not engine:
-        return HTTPException(404, "DB not found")
+def _get_snapshot_service(request: Request) -> SnapshotService:
+    snapshot_service: SnapshotService = getattr(
+        request.app.state, "snapshot_service", None
+    )
+    if not snapshot_service:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "DB not found")
+    return snapshot_service
+
+
+@router.get("/get_database/manifest", dependencies=[Depends(validate_peer)])
+async def get_database_manifest(request: Request) -> List[SnapshotManifest]:
+    """Retrieve manifests of the available database snapshots"""
+    return _get_snapshot_service(request).get_manifests()
+
+
+@router.get("/get_database", dependencies=[Depends(validate_peer)])
+async def get_database(
+    db: str,
+    request: Request,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+):
+    """Retrieve the latest gzip compressed snapshot of a database, supports byte ranges"""
+    snapshot_service = _get_snapshot_service(request)
+    manifest = snapshot_service.get_manifest(db)
+    if not manifest:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "DB not found")
+    file = open(snapshot_service.get_path(manifest), "rb")
+    size = os.fstat(file.fileno()).st_size
+    etag = f'"{manifest.sha256}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="{manifest.file}"',
+    }
+    if size != manifest.size:
+        # The snapshot was replaced after its manifest was read
+        file.close()
+        raise HTTPException(
+            status.HTTP_503_SERVICE_UNAVAILABLE, "Snapshot is being replaced"
+        )
 
-    return FileResponse(
-        engine.url.database,
-        media_type="application/octet-stream",
-        filename=engine.url.database,
+    byte_range = None
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except HTTPException:
+            file.close()
+            raise
+    if byte_range is None:
+        return StreamingResponse(
+            _read_file(file, 0, size),
+            media_type="application/gzip",
+            headers={**headers, "Content-Length": str(size)},
+        )
+    start, end = byte_range
+    return StreamingResponse(
+        _read_file(file, start, end - start + 1),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="application/gzip",
+        headers={
+            **headers,
+            "Content-Length": str(end - start + 1),
+            "Content-Range": f"bytes {start}-{end}/{size}",
+        },
     )
@@ -0,0 +1,32 @@
+import time
+
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from common import metrics
+
+router = APIRouter()
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Record request latency per route template, e.g. ``/tracking_data/{id}``."""
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status_code),
+        )
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Expose metrics in the Prometheus text format"""
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
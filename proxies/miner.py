@@ -25,11 +25,14 @@ from common.miner.schemas import VisitorSchema
 from common.schemas.bitads import CampaignStatus
 from common.schemas.campaign import CampaignType
 from common.services.geoip.base import GeoIpService
+from proxies.apis.db_profile import router as db_profile_router
 from proxies.apis.fetch_from_db_test import router as test_router
 from proxies.apis.get_database import router as database_router
 from proxies.apis.logging import router as logs_router
+from proxies.apis.metrics import router as metrics_router, metrics_middleware
 from proxies.apis.two_factor import router as two_factor_router
 from proxies.apis.version import router as version_router
+from proxies import writer
 
 database_manager = common_dependencies.get_database_manager(
     "miner", CommonEnviron.SUBTENSOR_NETWORK
@@ -39,6 +42,36 @@ miner_service = dependencies.get_miner_service(database_manager)
 two_factor_service = common_dependencies.get_two_factor_service(
     database_manager
 )
+snapshot_service = common_dependencies.get_snapshot_service(database_manager)
+# Snapshots are only served to validators with a permit
+metagraph_service = common_dependencies.get_metagraph_service()
+
+
+def _serve_writes() -> None:
+    writer.serve(
+        dict(
+            miner_service=miner_service,
+            two_factor_service=two_factor_service,
+            metagraph_service=metagraph_service,
+        ),
+        database_manager,
+        background=[metagraph_service],
+    )
+
+
+if writer.is_worker():
+    miner_service, two_factor_service, metagraph_service = writer.route_writes(
+        database_manager,
+        miner_service=(miner_service, ["add_visit"]),
+        two_factor_service=(two_factor_service, ["add_from_request"]),
+        metagraph_service=(metagraph_service, ["get_snapshot"]),
+    )
+    # Only the writer refreshes the metagraph, workers copy its snapshot
+    metagraph_service = common_dependencies.get_shared_metagraph_service(
+        metagraph_service.get_snapshot
+    )
+
+peer_verifier = common_dependencies.get_peer_verifier(metagraph_service)
 
 
 # noinspection PyUnresolvedReferences
@@ -46,8 +79,12 @@ two_factor_service = common_dependencies.get_two_factor_service(
 async def lifespan(app: FastAPI):
     app.state.database_manager = database_manager
     app.state.two_factor_service = two_factor_service
+    app.state.snapshot_service = snapshot_service
     app.state.campaign_service = campaign_service
+    app.state.peer_verifier = peer_verifier
+    await metagraph_service.start()
     yield
+    await metagraph_service.close()
 
 
 app = FastAPI(
@@ -64,6 +101,10 @@ app.mount(
 app.include_router(version_router)
 app.include_router(logs_router)
 app.include_router(two_factor_router)
+app.include_router(metrics_router)
+app.include_router(db_profile_router)
+app.include_router(database_router)
+app.middleware("http")(metrics_middleware)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -157,10 +198,15 @@ async def fetch_request_data_and_redirect(
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        app,
+    options = dict(
         host="0.0.0.0",
         port=Environ.PROXY_PORT,
         ssl_certfile="cert.pem",
         ssl_keyfile="key.pem",
     )
+    if CommonEnviron.PROXY_WORKERS > 1:
+        writer.run(
+            "proxies.miner:app", _serve_writes, CommonEnviron.PROXY_WORKERS, **options
+        )
+    else:
+        uvicorn.run(app, **options)
@@ -0,0 +1,204 @@
+"""
+Coalescing of concurrent proxy writes.
+
+Classes:
+    MicroBatcher: Hands items submitted concurrently to one flush call.
+    IdempotencyCache: Bounded set of recently seen keys.
+    OrderIngestion: Queues Shopify webhooks in batches and skips their retries.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import (
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from common.schemas.shopify import SaleData
+from common.services.queue.base import OrderQueueService
+from common.services.queue.exceptions import RefundNotExpectedWithoutOrder
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items submitted concurrently and hands them to ``flush`` together.
+
+    A batch is flushed ``max_delay`` seconds after its first item, or at once
+    when it holds ``max_size`` items. Items keep their submission order.
+
+    Args:
+        flush (Callable[[List[T]], Awaitable[List[R]]]): Handles a batch, returns one result per item.
+        max_size (int): Items that trigger a flush without waiting.
+        max_delay (float): Seconds the first item of a batch waits for others.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], Awaitable[List[R]]],
+        max_size: int,
+        max_delay: float,
+    ):
+        self.flush = flush
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._items: List[T] = []
+        self._futures: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        (result,) = await self.submit_many([item])
+        return result
+
+    async def submit_many(self, items: List[T]) -> List[R]:
+        """
+        Adds items to the next batch and waits for their results.
+
+        Raises:
+            Exception: The exception raised by ``flush`` for the batch.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in items]
+        self._items.extend(items)
+        self._futures.extend(futures)
+        if len(self._items) >= self.max_size:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush_pending)
+        return list(await asyncio.gather(*futures))
+
+    def _flush_pending(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        if items:
+            task = asyncio.create_task(self._flush(items, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, items: List[T], futures: List[asyncio.Future]) -> None:
+        try:
+            results = await self.flush(items)
+        except Exception as ex:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(ex)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Flushes the pending batch and waits for every running flush."""
+        self._flush_pending()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class IdempotencyCache:
+    """
+    Keys seen in the last ``ttl`` seconds, at most ``max_size`` of them,
+    the oldest dropped first.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expires: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        expires = self._expires.get(key)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self._expires[key]
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, key: Hashable) -> None:
+        self._expires[key] = time.monotonic() + self.ttl
+        self._expires.move_to_end(key)
+        while len(self._expires) > self.max_size:
+            self._expires.popitem(last=False)
+
+
+class OrderIngestion:
+    """
+    Queues Shopify webhooks in batches.
+
+    Webhooks arriving together share one ``add_batch_to_queue`` call, so a
+    storm of deliveries costs one transaction per batch instead of one commit
+    each. A webhook queued recently with the same ID, type and order details
+    is a retry and is skipped without a write.
+
+    The remembered webhooks are per process. With several proxy workers a
+    retry served by another worker than the first delivery is written again:
+    the order keeps its single row, keyed by ID, but is requeued and
+    processed once more.
+
+    Args:
+        order_queue (OrderQueueService): Service the batches are written with.
+        max_size (int): Webhooks per batch at most.
+        max_delay (float): Seconds a webhook waits for others.
+        idempotency_ttl (float): Seconds a queued webhook is remembered.
+        idempotency_size (int): Webhooks remembered at most.
+    """
+
+    def __init__(
+        self,
+        order_queue: OrderQueueService,
+        max_size: int,
+        max_delay: float,
+        idempotency_ttl: float,
+        idempotency_size: int,
+    ):
+        self.batcher: MicroBatcher[Tuple[str, SaleData], bool] = MicroBatcher(
+            order_queue.add_batch_to_queue, max_size, max_delay
+        )
+        self.queued = IdempotencyCache(idempotency_ttl, idempotency_size)
+
+    async def add(self, id_: str, sale_data: SaleData) -> None:
+        """
+        Raises:
+            RefundNotExpectedWithoutOrder: For a refund of an order never queued.
+        """
+        (accepted,) = await self.add_many([(id_, sale_data)])
+        if not accepted:
+            raise RefundNotExpectedWithoutOrder
+
+    async def add_many(self, items: List[Tuple[str, SaleData]]) -> List[bool]:
+        """
+        Returns:
+            List[bool]: Per item, False for a refund of an order never queued.
+        """
+        keys = [
+            (id_, sale_data.type, sale_data.order_details)
+            for id_, sale_data in items
+        ]
+        new = [i for i, key in enumerate(keys) if key not in self.queued]
+        result = [True] * len(items)
+        if not new:
+            return result
+        accepted = await self.batcher.submit_many([items[i] for i in new])
+        for i, ok in zip(new, accepted):
+            result[i] = ok
+            if ok:
+                self.queued.add(keys[i])
+        return result
+
+    async def close(self) -> None:
+        await self.batcher.close()
@@ -1,7 +1,10 @@
 from typing import Annotated, Optional
 
 from bitads_security.checkers import check_hash
-from fastapi import Header, Query, HTTPException, status
+from fastapi import Header, Query, HTTPException, Request, status
+
+from common.peer_auth import PeerAuthError, PeerVerifier
+from common.services.metagraph.exceptions import MetagraphNotReady
 
 
 def validate_hash(
@@ -13,3 +16,21 @@ def validate_hash(
 ) -> None:
     if not check_hash(x_unique_id, x_signature, campaign_id, body, sep):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+async def validate_peer(request: Request) -> str:
+    """Checks that a validator with a permit signed the request, returns its hotkey."""
+    verifier: Optional[PeerVerifier] = getattr(request.app.state, "peer_verifier", None)
+    if verifier is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    try:
+        return await verifier.verify(
+            request.method, request.url.path, request.url.query, request.headers
+        )
+    except MetagraphNotReady:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Metagraph is not loaded yet",
+        )
+    except PeerAuthError as ex:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(ex))
@@ -5,6 +5,8 @@ from typing import Annotated, List, Optional, Dict, Any
 
 import uvicorn
 from fastapi import FastAPI, Depends, HTTPException, Header, status, Query
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 from starlette.staticfiles import StaticFiles
 
 from common import dependencies as common_dependencies
@@ -14,16 +16,27 @@ from common.schemas.bitads import BitAdsDataSchema
 from common.schemas.miner_assignment import (
     SetMinerAssignmentsRequest,
 )
-from common.schemas.shopify import ShopifyBody, SaleData
+from common.schemas.shopify import (
+    ShopifyBatchResult,
+    ShopifyBody,
+    ShopifySale,
+    SaleData,
+)
+from common.services.metagraph.exceptions import MetagraphNotReady
 from common.services.queue.exceptions import RefundNotExpectedWithoutOrder
 from common.validator import dependencies
 from common.validator.environ import Environ
+from proxies.apis.db_profile import router as db_profile_router
+from proxies.apis.delta import router as delta_router
 from proxies.apis.fetch_from_db_test import router as test_router
 from proxies.apis.get_database import router as database_router
 from proxies.apis.logging import router as logs_router
+from proxies.apis.metrics import router as metrics_router, metrics_middleware
 from proxies.apis.two_factor import router as two_factor_router
 from proxies.apis.version import router as version_router
+from proxies.utils.batching import OrderIngestion
 from proxies.utils.validation import validate_hash
+from proxies import writer
 
 database_manager = common_dependencies.get_database_manager(
     "validator", CommonEnviron.SUBTENSOR_NETWORK
@@ -37,6 +50,56 @@ miner_assignment_service = common_dependencies.get_miner_assignment_service(
     database_manager
 )
 metagraph_service = common_dependencies.get_metagraph_service()
+snapshot_service = common_dependencies.get_snapshot_service(database_manager)
+delta_service = dependencies.get_delta_service(database_manager)
+
+
+def _serve_writes() -> None:
+    writer.serve(
+        dict(
+            bitads_service=bitads_service,
+            order_queue=order_queue,
+            miner_assignment_service=miner_assignment_service,
+            two_factor_service=two_factor_service,
+            metagraph_service=metagraph_service,
+        ),
+        database_manager,
+        background=[metagraph_service],
+    )
+
+
+if writer.is_worker():
+    (
+        bitads_service,
+        order_queue,
+        miner_assignment_service,
+        two_factor_service,
+        metagraph_service,
+    ) = writer.route_writes(
+        database_manager,
+        bitads_service=(bitads_service, ["add_by_visit"]),
+        order_queue=(order_queue, ["add_to_queue", "add_batch_to_queue"]),
+        miner_assignment_service=(
+            miner_assignment_service,
+            ["set_miner_assignments"],
+        ),
+        two_factor_service=(two_factor_service, ["add_from_request"]),
+        metagraph_service=(metagraph_service, ["get_snapshot"]),
+    )
+    # Only the writer refreshes the metagraph, workers copy its snapshot
+    metagraph_service = common_dependencies.get_shared_metagraph_service(
+        metagraph_service.get_snapshot
+    )
+
+peer_verifier = common_dependencies.get_peer_verifier(metagraph_service)
+# Retries are only recognized by the worker that queued the first delivery
+order_ingestion = OrderIngestion(
+    order_queue,
+    Environ.SHOPIFY_BATCH_SIZE,
+    Environ.SHOPIFY_BATCH_DELAY.total_seconds(),
+    Environ.SHOPIFY_IDEMPOTENCY_TTL.total_seconds(),
+    Environ.SHOPIFY_IDEMPOTENCY_SIZE,
+)
 
 
 logging.basicConfig(
@@ -50,10 +113,16 @@ log = logging.getLogger(__name__)
 # noinspection PyUnresolvedReferences
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Start a background thread that initializes the metagraph after startup."""
+    """Starts the background refresh of the metagraph snapshot after startup."""
     app.state.database_manager = database_manager
     app.state.two_factor_service = two_factor_service
+    app.state.snapshot_service = snapshot_service
+    app.state.delta_service = delta_service
+    app.state.peer_verifier = peer_verifier
+    await metagraph_service.start()
     yield
+    await metagraph_service.close()
+    await order_ingestion.close()
 
 
 app = FastAPI(
@@ -67,6 +136,11 @@ app.include_router(version_router)
 app.include_router(test_router)
 app.include_router(logs_router)
 app.include_router(two_factor_router)
+app.include_router(metrics_router)
+app.include_router(db_profile_router)
+app.include_router(database_router)
+app.include_router(delta_router)
+app.middleware("http")(metrics_middleware)
 
 
 app.mount(
@@ -74,12 +148,20 @@ app.mount(
 )
 
 
+@app.exception_handler(MetagraphNotReady)
+async def metagraph_not_ready_handler(request: Request, exc: MetagraphNotReady):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=dict(detail="Metagraph is not loaded yet"),
+    )
+
+
 @app.put("/shopify/init", dependencies=[Depends(validate_hash)])
 async def init_from_shopify(
     body: ShopifyBody[SaleData], x_unique_id: Annotated[str, Header()]
 ) -> None:
     try:
-        await order_queue.add_to_queue(x_unique_id, body.data)
+        await order_ingestion.add(x_unique_id, body.data)
     except RefundNotExpectedWithoutOrder:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -87,6 +169,19 @@ async def init_from_shopify(
         )
 
 
+@app.put("/shopify/init/batch", dependencies=[Depends(validate_hash)])
+async def init_batch_from_shopify(
+    body: ShopifyBody[List[ShopifySale]],
+) -> ShopifyBatchResult:
+    """Queues several webhooks at once, refunds without an order are returned as rejected"""
+    accepted = await order_ingestion.add_many(
+        [(sale.id, sale.data) for sale in body.data]
+    )
+    return ShopifyBatchResult(
+        rejected=[sale.id for sale, ok in zip(body.data, accepted) if not ok]
+    )
+
+
 @app.get(
     "/tracking_data",
     summary="Retrieve tracking data within a date range",
@@ -163,8 +258,11 @@ async def is_axon_exists(
 
 
 @app.get("/hotkey_to_uid")
-async def hotkey_to_uid() -> List[Dict[str, Any]]:
-    return await metagraph_service.hotkey_to_uid()
+async def hotkey_to_uid() -> Response:
+    return Response(
+        content=await metagraph_service.get_hotkey_to_uid_json(),
+        media_type="application/json",
+    )
 
 
 @app.get("/order_ids")
@@ -184,10 +282,18 @@ async def set_miner_assignments(body: SetMinerAssignmentsRequest):
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        app,
+    options = dict(
         host="0.0.0.0",
         port=Environ.PROXY_PORT,
         ssl_certfile="cert.pem",
         ssl_keyfile="key.pem",
     )
+    if CommonEnviron.PROXY_WORKERS > 1:
+        writer.run(
+            "proxies.validator:app",
+            _serve_writes,
+            CommonEnviron.PROXY_WORKERS,
+            **options,
+        )
+    else:
+        uvicorn.run(app, **options)
@@ -0,0 +1,353 @@
+"""
+Single writer for proxies running several worker processes.
+
+SQLite allows one writer at a time, so when a proxy runs several uvicorn
+workers, the writes of every worker are sent over a Unix socket to one writer
+process, which runs them one after another on the real services. Workers
+keep reading through their own connections, opened with ``query_only`` so a
+write that bypassed the writer fails at once instead of waiting for the
+database lock. Caches such as the GeoIP reader stay per worker.
+
+Messages are length-prefixed pickles. The socket is created in a private
+directory and without permissions for other users, so only the user running
+the proxy can connect.
+
+Classes:
+    WriterServer: Runs the write calls of the workers.
+    WriterClient: Sends write calls to the writer process.
+    RemoteWrites: Service wrapper sending some of its methods to the writer.
+
+Functions:
+    is_worker: Whether the process is a worker of a multi-worker proxy.
+    route_writes: Wraps the services of a worker so their writes go to the writer.
+    serve: Runs the writer process and its background services.
+    run: Runs a proxy app with a writer process and several workers.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import uvicorn
+from sqlalchemy import event
+
+from common.db.database import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+_ROLE = "BITADS_PROXY_ROLE"
+_SOCKET = "BITADS_PROXY_WRITER_SOCKET"
+_HEADER = struct.Struct("!I")
+
+
+async def _send(writer: asyncio.StreamWriter, message: Any) -> None:
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(_HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader) -> Any:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return pickle.loads(await reader.readexactly(size))
+
+
+class WriterServer:
+    """
+    Runs the write calls of the workers, one at a time.
+
+    Args:
+        services (Dict[str, Any]): Services by the name workers call them with.
+        path (str): Path of the Unix socket.
+    """
+
+    def __init__(self, services: Dict[str, Any], path: str):
+        self.services = services
+        self.path = path
+        self._lock = asyncio.Lock()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        # Bound as 0600 at once, pickles of other users must never be read
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, self.path)
+        finally:
+            os.umask(umask)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_id, service, method, args, kwargs = await _receive(reader)
+                response = await self._call(service, method, args, kwargs)
+                await _send(writer, (request_id, *response))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _call(
+        self, service: str, method: str, args: tuple, kwargs: dict
+    ) -> Tuple[bool, Any]:
+        async with self._lock:
+            try:
+                return True, await getattr(self.services[service], method)(
+                    *args, **kwargs
+                )
+            except Exception as ex:
+                log.exception(f"Write {service}.{method} failed")
+                try:
+                    pickle.dumps(ex)
+                except Exception:
+                    ex = RuntimeError(repr(ex))
+                return False, ex
+
+
+class WriterClient:
+    """
+    Sends write calls to the writer process over one connection per worker.
+
+    Concurrent calls share the connection, responses are matched by request ID.
+
+    Args:
+        path (str): Path of the writer's Unix socket.
+        timeout (float, optional): Seconds to wait for a response.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._ids = itertools.count()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        if self._writer is None or self._writer.is_closing():
+            reader, self._writer = await asyncio.open_unix_connection(self.path)
+            self._reader_task = asyncio.create_task(self._read_responses(reader))
+        return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                request_id, ok, value = await _receive(reader)
+                future = self._pending.pop(request_id, None)
+                if future and not future.done():
+                    future.set_result((ok, value))
+        except Exception as ex:
+            error = ConnectionError(f"Connection to the proxy writer lost: {ex!r}")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            if self._writer:
+                self._writer.close()
+            self._writer = None
+
+    async def call(self, service: str, method: str, *args, **kwargs) -> Any:
+        """
+        Runs ``service.method(*args, **kwargs)`` in the writer process.
+
+        Raises:
+            Exception: The exception raised by the method in the writer.
+            ConnectionError: If the writer is not reachable.
+        """
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            async with self._lock:
+                writer = await self._connect()
+                await _send(writer, (request_id, service, method, args, kwargs))
+            ok, value = await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if not ok:
+            raise value
+        return value
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+        if self._reader_task:
+            self._reader_task.cancel()
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+
+class RemoteWrites:
+    """
+    Service wrapper sending the given methods to the writer process.
+
+    Every other attribute is taken from the wrapped service, so reads keep
+    using the worker's own connections.
+    """
+
+    def __init__(
+        self, service: Any, name: str, client: WriterClient, methods: Iterable[str]
+    ):
+        self._service = service
+        self._name = name
+        self._client = client
+        self._methods = frozenset(methods)
+
+    def __getattr__(self, item):
+        if item in self._methods:
+
+            async def call(*args, **kwargs):
+                return await self._client.call(self._name, item, *args, **kwargs)
+
+            return call
+        return getattr(self._service, item)
+
+
+def _engines(database_manager: DatabaseManager) -> List:
+    return [
+        engine
+        for engine in (
+            getattr(database_manager, "active_db", None),
+            getattr(database_manager, "history_db", None),
+            database_manager.main_db,
+        )
+        if engine is not None
+    ]
+
+
+def set_read_only(database_manager: DatabaseManager) -> None:
+    """
+    Opens every new connection of ``database_manager`` with ``query_only``.
+    """
+
+    def set_query_only(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    for engine in _engines(database_manager):
+        engine.dispose()
+        event.listen(engine, "connect", set_query_only)
+
+
+def enable_wal(database_manager: DatabaseManager) -> None:
+    """
+    Switches the databases of ``database_manager`` to WAL, so the workers
+    keep reading while the writer commits. The mode is stored in the file.
+    """
+    for engine in _engines(database_manager):
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode = WAL")
+
+
+def is_worker() -> bool:
+    """Whether the process is a worker of a proxy started by ``run``."""
+    return os.environ.get(_ROLE) == "worker"
+
+
+def route_writes(
+    database_manager: DatabaseManager, **services: Tuple[Any, Iterable[str]]
+) -> List[Any]:
+    """
+    Wraps the services of a worker so their write methods run in the writer.
+
+    Args:
+        database_manager (DatabaseManager): The worker's database manager, made read only.
+        **services (Tuple[Any, Iterable[str]]): Service and its write methods,
+            by the name the writer serves the service with.
+
+    Returns:
+        List[Any]: The wrapped services, in the order given.
+    """
+    set_read_only(database_manager)
+    client = WriterClient(os.environ[_SOCKET])
+    return [
+        RemoteWrites(service, name, client, methods)
+        for name, (service, methods) in services.items()
+    ]
+
+
+def serve(
+    services: Dict[str, Any],
+    database_manager: DatabaseManager,
+    background: Iterable[Any] = (),
+) -> None:
+    """
+    Runs the writer process until it is terminated.
+
+    Args:
+        services (Dict[str, Any]): Services by the name the workers call them with.
+        database_manager (DatabaseManager): Database manager used by the services.
+        background (Iterable[Any], optional): Services started with the writer,
+            e.g. the metagraph refresh shared by the workers.
+    """
+    enable_wal(database_manager)
+
+    async def main() -> None:
+        for service in background:
+            await service.start()
+        await WriterServer(services, os.environ[_SOCKET]).serve_forever()
+
+    asyncio.run(main())
+
+
+def _wait_for_socket(path: str, process, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if not process.is_alive():
+            raise RuntimeError("Proxy writer exited during startup")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Proxy writer did not listen on {path}")
+        time.sleep(0.05)
+
+
+def run(app: str, serve_writes: Callable[[], None], workers: int, **options) -> None:
+    """
+    Runs a proxy app with one writer process and several uvicorn workers.
+
+    Args:
+        app (str): Import string of the app, e.g. "proxies.miner:app".
+        serve_writes (Callable[[], None]): Module level function of the proxy
+            calling ``serve`` with its services.
+        workers (int): Number of uvicorn workers.
+        **options: Options of ``uvicorn.run``, e.g. host and port.
+    """
+    # mkdtemp creates a directory only the current user can enter
+    directory = tempfile.mkdtemp(prefix=f"bitads_proxy_{options.get('port', 8000)}_")
+    path = os.path.join(directory, "writer.sock")
+    os.environ[_SOCKET] = path
+    # Spawned processes inherit the environment at start
+    os.environ[_ROLE] = "writer"
+    process = multiprocessing.get_context("spawn").Process(
+        target=serve_writes, name="proxy-writer", daemon=True
+    )
+    process.start()
+    os.environ[_ROLE] = "worker"
+    try:
+        _wait_for_socket(path, process)
+        uvicorn.run(app, workers=workers, **options)
+    finally:
+        process.terminate()
+        process.join()
+        shutil.rmtree(directory, ignore_errors=True)
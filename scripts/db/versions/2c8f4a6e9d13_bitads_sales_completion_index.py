@@ -0,0 +1,69 @@
+"""bitads_sales_completion_index
+
+Revision ID: 2c8f4a6e9d13
+Revises: 7b3e9f1c2d64
+Create Date: 2026-10-19 19:41:52.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f4a6e9d13'
+down_revision: Union[str, None] = '7b3e9f1c2d64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str) -> None:
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name: str) -> None:
+    globals()["downgrade_%s" % engine_name]()
+
+
+
+
+
+def upgrade_miner_active_engine() -> None:
+    pass
+
+
+def downgrade_miner_active_engine() -> None:
+    pass
+
+
+def upgrade_validator_active_engine() -> None:
+    op.create_index('ix_bitads_data_sales_status_campaign_id_sale_date', 'bitads_data', ['sales_status', 'campaign_id', 'sale_date'], unique=False)
+
+
+def downgrade_validator_active_engine() -> None:
+    op.drop_index('ix_bitads_data_sales_status_campaign_id_sale_date', table_name='bitads_data')
+
+
+def upgrade_miner_history_engine() -> None:
+    pass
+
+
+def downgrade_miner_history_engine() -> None:
+    pass
+
+
+def upgrade_validator_history_engine() -> None:
+    pass
+
+
+def downgrade_validator_history_engine() -> None:
+    pass
+
+
+def upgrade_main_engine() -> None:
+    pass
+
+
+def downgrade_main_engine() -> None:
+    pass
@@ -0,0 +1,101 @@
+"""bitads_daily_rollup
+
+Revision ID: 3f6c1d2a9b7e
+Revises: ab90caf9bbfd
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c1d2a9b7e'
+down_revision: Union[str, None] = 'ab90caf9bbfd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str) -> None:
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name: str) -> None:
+    globals()["downgrade_%s" % engine_name]()
+
+
+
+
+
+def upgrade_miner_active_engine() -> None:
+    pass
+
+
+def downgrade_miner_active_engine() -> None:
+    pass
+
+
+def upgrade_validator_active_engine() -> None:
+    op.create_table(
+        'bitads_daily_rollup',
+        sa.Column('campaign_id', sa.String(), nullable=False),
+        sa.Column('campaign_item', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('visits', sa.Integer(), nullable=False),
+        sa.Column('visits_unique', sa.Integer(), nullable=False),
+        sa.Column('completed_sales', sa.Integer(), nullable=False),
+        sa.Column('completed_refunds', sa.Integer(), nullable=False),
+        sa.Column('completed_sales_amount', sa.Float(), nullable=False),
+        sa.Column('sale_rows', sa.Integer(), nullable=False),
+        sa.Column('sales', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('campaign_id', 'campaign_item', 'day')
+    )
+    op.create_index(op.f('ix_bitads_daily_rollup_day'), 'bitads_daily_rollup', ['day'], unique=False)
+    op.create_table(
+        'bitads_rollup_dirty_days',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_index(op.f('ix_bitads_data_created_at'), 'bitads_data', ['created_at'], unique=False)
+    op.create_index(op.f('ix_bitads_data_sale_date'), 'bitads_data', ['sale_date'], unique=False)
+    # Every existing day is rolled up on the next rating calculation
+    op.execute("""
+        INSERT OR IGNORE INTO bitads_rollup_dirty_days (day)
+        SELECT DISTINCT date(created_at) FROM bitads_data WHERE created_at IS NOT NULL
+        UNION
+        SELECT DISTINCT date(sale_date) FROM bitads_data WHERE sale_date IS NOT NULL
+    """)
+
+
+def downgrade_validator_active_engine() -> None:
+    op.drop_index(op.f('ix_bitads_data_sale_date'), table_name='bitads_data')
+    op.drop_index(op.f('ix_bitads_data_created_at'), table_name='bitads_data')
+    op.drop_table('bitads_rollup_dirty_days')
+    op.drop_index(op.f('ix_bitads_daily_rollup_day'), table_name='bitads_daily_rollup')
+    op.drop_table('bitads_daily_rollup')
+
+
+def upgrade_miner_history_engine() -> None:
+    pass
+
+
+def downgrade_miner_history_engine() -> None:
+    pass
+
+
+def upgrade_validator_history_engine() -> None:
+    pass
+
+
+def downgrade_validator_history_engine() -> None:
+    pass
+
+
+def upgrade_main_engine() -> None:
+    pass
+
+
+def downgrade_main_engine() -> None:
+    pass
@@ -0,0 +1,75 @@
+"""miner_visitor_indexes
+
+Revision ID: 5e1a9c3d7b42
+Revises: 8d2e4b7c1f05
+Create Date: 2026-10-19 16:02:41.118394
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a9c3d7b42'
+down_revision: Union[str, None] = '8d2e4b7c1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str) -> None:
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name: str) -> None:
+    globals()["downgrade_%s" % engine_name]()
+
+
+
+
+
+def upgrade_miner_active_engine() -> None:
+    op.create_index('ix_visitors_ip_address_campaign_id_created_at', 'visitors', ['ip_address', 'campaign_id', 'created_at'], unique=False)
+    op.create_index('ix_visitors_created_at_miner_hotkey', 'visitors', ['created_at', 'miner_hotkey'], unique=False)
+    op.create_index('ix_visitors_campaign_item_created_at', 'visitors', ['campaign_item', 'created_at'], unique=False)
+    op.create_index('ix_visitor_activity_created_at', 'visitor_activity', ['created_at'], unique=False)
+
+
+def downgrade_miner_active_engine() -> None:
+    op.drop_index('ix_visitor_activity_created_at', table_name='visitor_activity')
+    op.drop_index('ix_visitors_campaign_item_created_at', table_name='visitors')
+    op.drop_index('ix_visitors_created_at_miner_hotkey', table_name='visitors')
+    op.drop_index('ix_visitors_ip_address_campaign_id_created_at', table_name='visitors')
+
+
+def upgrade_validator_active_engine() -> None:
+    pass
+
+
+def downgrade_validator_active_engine() -> None:
+    pass
+
+
+def upgrade_miner_history_engine() -> None:
+    pass
+
+
+def downgrade_miner_history_engine() -> None:
+    pass
+
+
+def upgrade_validator_history_engine() -> None:
+    pass
+
+
+def downgrade_validator_history_engine() -> None:
+    pass
+
+
+def upgrade_main_engine() -> None:
+    pass
+
+
+def downgrade_main_engine() -> None:
+    pass
@@ -0,0 +1,83 @@
+"""order_queue_leases
+
+Revision ID: 7b3e9f1c2d64
+Revises: 5e1a9c3d7b42
+Create Date: 2026-10-19 18:24:07.512839
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9f1c2d64'
+down_revision: Union[str, None] = '5e1a9c3d7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str) -> None:
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name: str) -> None:
+    globals()["downgrade_%s" % engine_name]()
+
+
+def add_queue_columns() -> None:
+    op.add_column('order_queue', sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('order_queue', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    op.add_column('order_queue', sa.Column('lease_token', sa.String(), nullable=True))
+
+
+def drop_queue_columns() -> None:
+    op.drop_column('order_queue', 'lease_token')
+    op.drop_column('order_queue', 'next_attempt_at')
+    op.drop_column('order_queue', 'attempts')
+
+
+def upgrade_miner_active_engine() -> None:
+    pass
+
+
+def downgrade_miner_active_engine() -> None:
+    pass
+
+
+def upgrade_validator_active_engine() -> None:
+    add_queue_columns()
+    # Unprocessed rows are due at once, processed rows leave the queue
+    op.execute("UPDATE order_queue SET next_attempt_at = last_processing_date WHERE status != 'PROCESSED'")
+    op.create_index('ix_order_queue_next_attempt_at', 'order_queue', ['next_attempt_at'], unique=False)
+
+
+def downgrade_validator_active_engine() -> None:
+    op.drop_index('ix_order_queue_next_attempt_at', table_name='order_queue')
+    op.execute("UPDATE order_queue SET status = 'ERROR' WHERE status = 'DEAD_LETTER'")
+    drop_queue_columns()
+
+
+def upgrade_miner_history_engine() -> None:
+    pass
+
+
+def downgrade_miner_history_engine() -> None:
+    pass
+
+
+def upgrade_validator_history_engine() -> None:
+    add_queue_columns()
+
+
+def downgrade_validator_history_engine() -> None:
+    drop_queue_columns()
+
+
+def upgrade_main_engine() -> None:
+    pass
+
+
+def downgrade_main_engine() -> None:
+    pass
@@ -0,0 +1,85 @@
+"""delta_sync
+
+Revision ID: 8d2e4b7c1f05
+Revises: 3f6c1d2a9b7e
+Create Date: 2026-10-19 14:37:09.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b7c1f05'
+down_revision: Union[str, None] = '3f6c1d2a9b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade(engine_name: str) -> None:
+    globals()["upgrade_%s" % engine_name]()
+
+
+def downgrade(engine_name: str) -> None:
+    globals()["downgrade_%s" % engine_name]()
+
+
+
+
+
+def upgrade_miner_active_engine() -> None:
+    pass
+
+
+def downgrade_miner_active_engine() -> None:
+    pass
+
+
+def upgrade_validator_active_engine() -> None:
+    op.add_column('miner_assignment', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE miner_assignment SET updated_at = datetime('now')")
+    op.create_index('ix_miner_assignment_updated_at_unique_id', 'miner_assignment', ['updated_at', 'unique_id'], unique=False)
+    op.create_index('ix_bitads_data_updated_at_id', 'bitads_data', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_order_queue_updated_at_id', 'order_queue', ['updated_at', 'id'], unique=False)
+    op.create_table(
+        'delta_watermarks',
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('row_id', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('source', 'table_name')
+    )
+
+
+def downgrade_validator_active_engine() -> None:
+    op.drop_table('delta_watermarks')
+    op.drop_index('ix_order_queue_updated_at_id', table_name='order_queue')
+    op.drop_index('ix_bitads_data_updated_at_id', table_name='bitads_data')
+    op.drop_index('ix_miner_assignment_updated_at_unique_id', table_name='miner_assignment')
+    op.drop_column('miner_assignment', 'updated_at')
+
+
+def upgrade_miner_history_engine() -> None:
+    pass
+
+
+def downgrade_miner_history_engine() -> None:
+    pass
+
+
+def upgrade_validator_history_engine() -> None:
+    pass
+
+
+def downgrade_validator_history_engine() -> None:
+    pass
+
+
+def upgrade_main_engine() -> None:
+    pass
+
+
+def downgrade_main_engine() -> None:
+    pass
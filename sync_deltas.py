@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+from urllib.parse import urlparse
+
+import bittensor as bt
+
+from common import dependencies
+from common.clients.delta.client import DeltaClient, catch_up
+from common.db.repositories.delta import TABLES
+from common.environ import Environ as CommonEnviron
+from common.validator import dependencies as validator_dependencies
+
+bt.logging.on()
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Catch up validator tables from peers changed since the last sync"
+    )
+    parser.add_argument("urls", nargs="+", help="Peer proxies, e.g. https://1.2.3.4")
+    parser.add_argument("--table", choices=list(TABLES), action="append")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument(
+        "--cert",
+        help="Certificate the TLS certificate of the peers is verified against, "
+        "by default the self-signed certificates of the proxies are accepted",
+    )
+    args = parser.parse_args()
+
+    database_manager = dependencies.get_database_manager(
+        "validator", CommonEnviron.SUBTENSOR_NETWORK
+    )
+    delta_service = validator_dependencies.get_delta_service(database_manager)
+    # Peers only serve deltas to validators with a permit
+    signer = dependencies.get_peer_signer(
+        bt.wallet(CommonEnviron.WALLET_NAME, CommonEnviron.WALLET_HOTKEY)
+    )
+    for url in args.urls:
+        try:
+            received = await catch_up(
+                DeltaClient(url, verify=args.cert or False, signer=signer),
+                delta_service,
+                urlparse(url).netloc or url,
+                args.table or tuple(TABLES),
+                args.limit,
+            )
+            bt.logging.info(f"Caught up from {url}: {received}")
+        except Exception as ex:
+            bt.logging.warning(f"Unable to catch up from {url}: {ex}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -55,7 +55,8 @@ class BaseMinerNeuron(BaseNeuron):
             )
 
         # The axon handles request processing, allowing validators to send this miner requests.
-        self.axon = bt.axon(wallet=self.wallet, config=self.config)
+        with self.startup.phase("axon_init"):
+            self.axon = bt.axon(wallet=self.wallet, config=self.config)
 
         # Instantiate runners
         self.should_exit: bool = False
@@ -86,18 +87,22 @@ class BaseMinerNeuron(BaseNeuron):
             Exception: For unforeseen errors during the miner's operation, which are logged for diagnosis.
         """
 
-        # Check that miner is registered on the network.
-        self.sync()
-
         # Serve passes the axon information to the network + netuid we are hosting on.
         # This will auto-update if the axon port of external ip have changed.
         bt.logging.info(
             f"Serving miner axon {self.axon} on network: {self.config.subtensor.chain_endpoint} with netuid: {self.config.netuid}"
         )
-        self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
+        with self.startup.phase("axon"):
+            self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
+
+            # Start  starts the miner's axon, making it active on the network.
+            self.axon.start()
 
-        # Start  starts the miner's axon, making it active on the network.
-        self.axon.start()
+        # Answer synapses from the persisted state right away, the rest of the
+        # startup runs in the background. The registration was checked in __init__,
+        # the first sync of the loop below resyncs the metagraph.
+        self.startup.ready()
+        self.startup.run_in_background(self.startup_stages())
 
         bt.logging.info(f"Miner starting at block: {self.block}")
 
@@ -191,3 +196,4 @@ class BaseMinerNeuron(BaseNeuron):
 
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
+        self.metagraph_index.update(self.metagraph)
@@ -16,10 +16,14 @@
 # DEALINGS IN THE SOFTWARE.
 
 import copy
+import os
+import time
 from abc import ABC, abstractmethod
+from typing import List
 
 import bittensor as bt
 
+from common import metrics, tracing
 from common.environ import Environ
 from common.helpers import const
 from neurons import __spec_version__ as spec_version
@@ -27,7 +31,9 @@ from template.mock import MockSubtensor, MockMetagraph
 
 # Sync calls set weights and also resyncs the metagraph.
 from template.utils.config import check_config, add_args, config
+from template.utils.metagraph_index import MetagraphIndex
 from template.utils.misc import ttl_get_block
+from template.utils.startup import Stage, StartupTimer
 
 
 class BaseNeuron(ABC):
@@ -88,6 +94,9 @@ class BaseNeuron(ABC):
         return ttl_get_block(self)
 
     def __init__(self, config=None):
+        # Phases of the startup, the work not needed to serve runs in the background.
+        self.startup = StartupTimer(self.neuron_type)
+
         base_config = copy.deepcopy(config or BaseNeuron.config())
         self.config = self.config()
         self.config.merge(base_config)
@@ -95,6 +104,7 @@ class BaseNeuron(ABC):
 
         # Set up logging with the provided configuration and directory.
         bt.logging(config=self.config.logging, logging_dir=self.config.logging.full_path, record_log=True)
+        self.startup.record("config", time.monotonic() - self.startup.started_at)
 
         # If a gpu is required, set the device to cuda:N (e.g. cuda:0)
         self.device = self.config.neuron.device
@@ -107,39 +117,69 @@ class BaseNeuron(ABC):
         bt.logging.info("Setting up bittensor objects.")
 
         # The wallet holds the cryptographic key pairs for the miner.
-        if self.config.mock:
-            self.wallet = bt.MockWallet(config=self.config)
-            self.subtensor = MockSubtensor(
-                self.config.netuid, wallet=self.wallet
-            )
-            self.metagraph = MockMetagraph(
-                self.config.netuid, subtensor=self.subtensor
-            )
-        else:
-            self.wallet = bt.wallet(config=self.config)
-            self.subtensor = bt.subtensor(config=self.config)
-            self.metagraph = self.subtensor.metagraph(self.config.netuid)
+        with self.startup.phase("chain"):
+            if self.config.mock:
+                self.wallet = bt.MockWallet(config=self.config)
+                self.subtensor = MockSubtensor(
+                    self.config.netuid, wallet=self.wallet
+                )
+                self.metagraph = MockMetagraph(
+                    self.config.netuid, subtensor=self.subtensor
+                )
+            else:
+                self.wallet = bt.wallet(config=self.config)
+                self.subtensor = bt.subtensor(config=self.config)
+                self.metagraph = self.subtensor.metagraph(self.config.netuid)
 
         bt.logging.info(f"Wallet: {self.wallet}")
         bt.logging.info(f"Subtensor: {self.subtensor}")
         bt.logging.info(f"Metagraph: {self.metagraph}")
 
         # Check if the miner is registered on the Bittensor network before proceeding further.
-        self.check_registered()
+        with self.startup.phase("registration"):
+            self.check_registered()
+
+        # Hotkey lookups of the metagraph, updated on every resync.
+        self.metagraph_index = MetagraphIndex(self.metagraph)
 
         # Each miner gets a unique identity (UID) in the network for differentiation.
-        self.uid = self.metagraph.hotkeys.index(
-            self.wallet.hotkey.ss58_address
-        )
+        self.uid = self.metagraph_index.get_uid(self.wallet.hotkey.ss58_address)
         bt.logging.info(
             f"Running neuron on subnet: {self.config.netuid} with uid {self.uid} using network: {self.subtensor.chain_endpoint}"
         )
         self.step = 0
 
+        if self.config.metrics.port:
+            metrics.start_http_exporter(
+                self.config.metrics.port, self.config.metrics.address
+            )
+            bt.logging.info(
+                f"Serving metrics on {self.config.metrics.address}:{self.config.metrics.port}"
+            )
+
+        if self.config.tracing.sample_rate:
+            tracing.configure(
+                self.config.tracing.path
+                or os.path.join(self.config.neuron.full_path, "trace.jsonl"),
+                self.config.tracing.sample_rate,
+                self.config.tracing.format,
+                self.config.tracing.max_bytes,
+                self.config.tracing.backup_count,
+            )
+
     @abstractmethod
     def run(self):
         ...
 
+    def startup_stages(self) -> List[Stage]:
+        """
+        Startup work run in the background once the neuron serves, see ``StartupTimer``.
+
+        The metagraph is not resynced here: it was loaded in ``__init__`` and the
+        subtensor connection is not shared between threads.
+        """
+        return []
+
     def sync(self):
         """
         Wrapper for synchronizing the state of the network for the given miner or validator.
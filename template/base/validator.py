@@ -19,7 +19,6 @@
 
 import argparse
 import asyncio
-import copy
 import os
 import signal
 import threading
@@ -49,24 +48,25 @@ class BaseValidatorNeuron(BaseNeuron):
         super().__init__(config=config)
 
         # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
-        if self.config.mock:
-            self.dendrite = MockDendrite(wallet=self.wallet)
-        else:
-            self.dendrite = bt.dendrite(wallet=self.wallet)
+        with self.startup.phase("dendrite"):
+            if self.config.mock:
+                self.dendrite = MockDendrite(wallet=self.wallet)
+            else:
+                self.dendrite = bt.dendrite(wallet=self.wallet)
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
         # Set up initial scoring weights for validation
         bt.logging.info("Building validation weights.")
 
-        # Init sync with the network. Updates the metagraph.
-        self.sync()
+        # No init sync: the metagraph was just loaded and the registration checked.
 
         # Serve axon to enable external connections.
         if not self.config.neuron.axon_off:
-            self.serve_axon()
+            with self.startup.phase("axon"):
+                self.serve_axon()
         else:
             bt.logging.warning("axon off, not serving ip to chain.")
 
@@ -128,8 +128,10 @@ class BaseValidatorNeuron(BaseNeuron):
             Exception: For unforeseen errors during the miner's operation, which are logged for diagnosis.
         """
 
-        # Check that validator is registered on the network.
-        self.sync()
+        # Validate right away, startup work the forwards do not depend on,
+        # e.g. the data migration, runs in the background.
+        self.startup.ready()
+        self.startup.run_in_background(self.startup_stages())
 
         bt.logging.info(f"Validator starting at block: {self.block}")
 
@@ -279,18 +281,16 @@ class BaseValidatorNeuron(BaseNeuron):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         bt.logging.debug("resync_metagraph()")
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
-
         # Sync the metagraph.
         self.metagraph.sync(subtensor=self.subtensor)
 
-        # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
+        # Check if the metagraph hotkeys or axon info have changed.
+        changed_uids = self.metagraph_index.update(self.metagraph)
+        if not changed_uids:
             return
 
         bt.logging.info(
-            "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
+            f"Metagraph updated for uids {changed_uids}, re-syncing hotkeys, dendrite pool and moving averages"
         )
         # Zero out all hotkeys that have been replaced.
         # for uid, hotkey in enumerate(self.hotkeys):
@@ -309,7 +309,7 @@ class BaseValidatorNeuron(BaseNeuron):
         #     self.scores = new_moving_average
 
         # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
 
     def update_scores(self, rewards, uids: List[int]):
         """Performs exponential moving average on the scores based on the rewards received from the miners."""
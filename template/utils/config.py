@@ -119,6 +119,56 @@ def add_args(cls, parser):
         default="",
     )
 
+    parser.add_argument(
+        "--metrics.port",
+        type=int,
+        help="Port of the Prometheus metrics exporter, 0 disables it.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--metrics.address",
+        type=str,
+        help="Address the Prometheus metrics exporter binds to.",
+        default="0.0.0.0",
+    )
+
+    parser.add_argument(
+        "--tracing.sample_rate",
+        type=float,
+        help="Share of forward cycles that are traced, 0 disables tracing.",
+        default=0.0,
+    )
+
+    parser.add_argument(
+        "--tracing.path",
+        type=str,
+        help="Trace file, defaults to trace.jsonl in the neuron directory.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--tracing.format",
+        type=str,
+        choices=["jsonl", "chrome"],
+        help="Trace file format, chrome can be opened in chrome://tracing or Perfetto.",
+        default="jsonl",
+    )
+
+    parser.add_argument(
+        "--tracing.max_bytes",
+        type=int,
+        help="Size at which the trace file is rotated.",
+        default=50 * 1024 * 1024,
+    )
+
+    parser.add_argument(
+        "--tracing.backup_count",
+        type=int,
+        help="Number of rotated trace files to keep.",
+        default=3,
+    )
+
 
 def add_blacklist_args(cls, parser):
     parser.add_argument(
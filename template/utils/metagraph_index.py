@@ -0,0 +1,167 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import bittensor as bt
+
+# Hotkey of a uid and the fields of its axon
+_Row = Tuple[str, Tuple]
+
+
+def _row(hotkey: str, axon: bt.AxonInfo) -> _Row:
+    return hotkey, (
+        axon.hotkey,
+        axon.coldkey,
+        axon.ip,
+        axon.port,
+        axon.ip_type,
+        axon.version,
+        axon.protocol,
+    )
+
+
+class _Snapshot(NamedTuple):
+    hotkeys: List[str]
+    hotkey_to_uid: Dict[str, int]
+    hotkey_to_axon: Dict[str, bt.AxonInfo]
+    axons: List[bt.AxonInfo]
+    stake: List[float]
+    validator_permit: List[bool]
+
+
+_EMPTY = _Snapshot([], {}, {}, [], [], [])
+
+
+class MetagraphIndex:
+    """
+    Hotkey lookups of a metagraph, built once per sync instead of per request.
+
+    The neuron keeps one instance for its lifetime and calls ``update`` after
+    every ``metagraph.sync``; everything holding the instance sees the new
+    metagraph. ``update`` swaps a single snapshot, so a lookup never sees
+    half of an update.
+
+    ``update`` compares a fingerprint of the hotkeys and axons with the one
+    of the previous sync, and only when it differs re-indexes the uids whose
+    hotkey or axon changed. Stake and validator permits are copied every time.
+
+    Args:
+        metagraph (bt.metagraph, optional): Metagraph to index.
+    """
+
+    def __init__(self, metagraph: Optional[bt.metagraph] = None):
+        self._snapshot = _EMPTY
+        self._rows: List[_Row] = []
+        self.fingerprint: Optional[int] = None
+        if metagraph is not None:
+            self.update(metagraph)
+
+    def update(self, metagraph: bt.metagraph) -> List[int]:
+        """
+        Indexes the metagraph after a sync.
+
+        Returns:
+            List[int]: Uids whose hotkey or axon changed since the previous update,
+                every uid on the first one.
+        """
+        rows = [
+            _row(hotkey, axon) for hotkey, axon in zip(metagraph.hotkeys, metagraph.axons)
+        ]
+        fingerprint = hash(tuple(rows))
+        previous = self._snapshot
+        hotkey_to_uid = previous.hotkey_to_uid
+        hotkey_to_axon = previous.hotkey_to_axon
+        changed_uids = []
+        if fingerprint != self.fingerprint or rows != self._rows:
+            changed_uids = [
+                uid
+                for uid in range(max(len(rows), len(self._rows)))
+                if uid >= len(rows)
+                or uid >= len(self._rows)
+                or rows[uid] != self._rows[uid]
+            ]
+            # Copies, the current snapshot stays untouched until the swap
+            hotkey_to_uid = dict(hotkey_to_uid)
+            hotkey_to_axon = dict(hotkey_to_axon)
+            for uid in changed_uids:
+                if uid >= len(previous.hotkeys):
+                    continue
+                hotkey, axon = previous.hotkeys[uid], previous.axons[uid]
+                if hotkey_to_uid.get(hotkey) == uid:
+                    del hotkey_to_uid[hotkey]
+                if hotkey_to_axon.get(axon.hotkey) == axon:
+                    del hotkey_to_axon[axon.hotkey]
+            for uid in changed_uids:
+                if uid >= len(rows):
+                    continue
+                hotkey, axon = metagraph.hotkeys[uid], metagraph.axons[uid]
+                hotkey_to_uid[hotkey] = uid
+                hotkey_to_axon[axon.hotkey] = axon
+        self._snapshot = _Snapshot(
+            hotkeys=list(metagraph.hotkeys),
+            hotkey_to_uid=hotkey_to_uid,
+            hotkey_to_axon=hotkey_to_axon,
+            axons=list(metagraph.axons),
+            stake=[float(stake) for stake in metagraph.S],
+            validator_permit=[bool(permit) for permit in metagraph.validator_permit],
+        )
+        self._rows = rows
+        self.fingerprint = fingerprint
+        return changed_uids
+
+    @property
+    def n(self) -> int:
+        return len(self._snapshot.hotkeys)
+
+    @property
+    def hotkeys(self) -> List[str]:
+        return self._snapshot.hotkeys
+
+    @property
+    def hotkey_to_uid(self) -> Dict[str, int]:
+        return self._snapshot.hotkey_to_uid
+
+    @property
+    def hotkey_to_axon(self) -> Dict[str, bt.AxonInfo]:
+        return self._snapshot.hotkey_to_axon
+
+    @property
+    def stake(self) -> List[float]:
+        return self._snapshot.stake
+
+    @property
+    def validator_permit(self) -> List[bool]:
+        return self._snapshot.validator_permit
+
+    def get_uid(self, hotkey: str) -> Optional[int]:
+        return self._snapshot.hotkey_to_uid.get(hotkey)
+
+    def get_axon(self, hotkey: str) -> Optional[bt.AxonInfo]:
+        return self._snapshot.hotkey_to_axon.get(hotkey)
+
+    def get_stake(self, hotkey: str) -> float:
+        """Stake of the hotkey, 0.0 if it is not registered."""
+        snapshot = self._snapshot
+        uid = snapshot.hotkey_to_uid.get(hotkey)
+        return 0.0 if uid is None else snapshot.stake[uid]
+
+    def has_validator_permit(self, hotkey: str) -> bool:
+        snapshot = self._snapshot
+        uid = snapshot.hotkey_to_uid.get(hotkey)
+        return uid is not None and snapshot.validator_permit[uid]
+
+    def get_axons(self, *hotkeys: str, exclude_uid: Optional[int] = None):
+        """
+        Axons of the given hotkeys, of every hotkey if none is given, in uid
+        order, without the axon of ``exclude_uid``.
+        """
+        snapshot = self._snapshot
+        if not hotkeys:
+            uids = range(len(snapshot.axons))
+        else:
+            uids = sorted(
+                {
+                    uid
+                    for uid in map(snapshot.hotkey_to_uid.get, hotkeys)
+                    if uid is not None
+                }
+            )
+        return [snapshot.axons[uid] for uid in uids if uid != exclude_uid]
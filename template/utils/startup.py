@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Sequence, Tuple
+
+import bittensor as bt
+
+from common import metrics
+
+# Name of a background startup stage and the coroutine function running it
+Stage = Tuple[str, Callable[[], Awaitable]]
+
+
+class StartupTimer:
+    """
+    Times the startup phases of a neuron.
+
+    Every phase is logged and set in the ``bitads_startup_phase_seconds``
+    gauge. ``ready`` records how long the neuron took to serve, and
+    ``run_in_background`` runs the startup work that is not needed for that,
+    e.g. the BitAds ping and the data migration, in a daemon thread.
+
+    Args:
+        neuron_type (str): Neuron label of the gauge.
+    """
+
+    def __init__(self, neuron_type: str):
+        self.neuron_type = neuron_type
+        self.started_at = time.monotonic()
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - started_at)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.durations[name] = seconds
+        metrics.STARTUP_PHASE_SECONDS.set(
+            seconds, neuron=self.neuron_type, phase=name
+        )
+        bt.logging.info(f"Startup phase {name} took {seconds:.2f}s")
+
+    def ready(self) -> None:
+        """Records the time from the start until the neuron serves."""
+        self.record("ready", time.monotonic() - self.started_at)
+
+    def run_in_background(self, stages: Sequence[Stage]) -> threading.Thread:
+        """
+        Runs the stages one after another on the event loop of a daemon thread,
+        each timed as a phase. A failed stage is logged and the next one runs.
+        """
+
+        async def run():
+            for name, stage in stages:
+                with self.phase(name):
+                    try:
+                        await stage()
+                    except Exception as ex:
+                        bt.logging.exception(f"Startup phase {name} failed: {ex}")
+            self.record("warm", time.monotonic() - self.started_at)
+
+        thread = threading.Thread(
+            target=asyncio.run,
+            args=(run(),),
+            name=f"{self.neuron_type}-startup",
+            daemon=True,
+        )
+        thread.start()
+        return thread
@@ -72,10 +72,9 @@ def get_axons(
     not_check_self: bool = False,
     include_hotkeys: bool = False,
 ):
-    result = [
-        self.metagraph.axons[uid]
-        for uid in range(self.metagraph.n.item())
-        if (not_check_self or uid != self.uid)
-        and (include_hotkeys or self.metagraph.axons[uid].hotkey in hotkeys)
-    ]
-    return result
+    exclude_uid = None if not_check_self else self.uid
+    if include_hotkeys:
+        return self.metagraph_index.get_axons(exclude_uid=exclude_uid)
+    if not hotkeys:
+        return []
+    return self.metagraph_index.get_axons(*hotkeys, exclude_uid=exclude_uid)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+
+class Page(NamedTuple):
+    hotkey: str
+    rows: Collection
+    # Offset of the page following this one, None if it has no rows
+    next_offset: Any
+
+
+async def drain_pages(
+    offsets: Dict[str, Any],
+    fetch: Callable[[str, Any], Awaitable[Page]],
+    write: Callable[[List[Page]], Awaitable[None]],
+    limit: int,
+    max_duration: timedelta,
+    max_rows: int,
+    concurrency: int = 30,
+) -> int:
+    """
+    Fetches pages of every hotkey starting at its offset, and the pages after
+    them while they come back full, and writes them.
+
+    The first page of every hotkey is always fetched. Following ones only
+    until ``max_duration`` passed or ``max_rows`` rows were fetched in total,
+    the rest is left for the next call. The next page of a hotkey is
+    requested as soon as its previous one is handed over for writing, so
+    fetching and writing overlap. ``write`` is called by a single task with
+    every page fetched since its previous call, pages of a hotkey in order;
+    when it fails no more pages are fetched.
+
+    Args:
+        offsets (Dict[str, Any]): Offset of the first page of every hotkey, in fetch order.
+        fetch (Callable[[str, Any], Awaitable[Page]]): Fetches the page of a hotkey at an offset.
+        write (Callable[[List[Page]], Awaitable[None]]): Writes fetched pages.
+        limit (int): Rows of a full page.
+        max_duration (timedelta): How long pages after the first ones are fetched.
+        max_rows (int): Rows fetched at most before pages after the first ones stop.
+        concurrency (int, optional): Fetches running at once.
+
+    Returns:
+        int: Rows fetched.
+    """
+    deadline = time.monotonic() + max_duration.total_seconds()
+    semaphore = asyncio.Semaphore(concurrency)
+    pages: "asyncio.Queue[Optional[Page]]" = asyncio.Queue()
+    fetched = 0
+
+    async def write_pages() -> None:
+        while True:
+            batch = [await pages.get()]
+            while not pages.empty():
+                batch.append(pages.get_nowait())
+            done = None in batch
+            batch = [page for page in batch if page is not None]
+            if batch:
+                await write(batch)
+            if done:
+                return
+
+    async def drain(hotkey: str, offset: Any) -> None:
+        nonlocal fetched
+        while True:
+            async with semaphore:
+                page = await fetch(hotkey, offset)
+            fetched += len(page.rows)
+            pages.put_nowait(page)
+            if (
+                len(page.rows) < limit
+                or writer.done()
+                or fetched >= max_rows
+                or time.monotonic() >= deadline
+            ):
+                return
+            offset = page.next_offset
+
+    writer = asyncio.create_task(write_pages())
+    try:
+        await asyncio.gather(*(drain(*item) for item in offsets.items()))
+    finally:
+        pages.put_nowait(None)
+        await writer
+    return fetched
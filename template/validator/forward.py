@@ -3,11 +3,11 @@
 # Copyright © 2023 bittensor.com
 import asyncio
 import random
-import time
 from typing import TypeVar, Dict, List
 
 import bittensor as bt
 
+from common import metrics, tracing
 from template.protocol import Dummy
 from template.utils import uids
 from template.utils.uids import get_random_uids
@@ -67,34 +67,21 @@ async def forward(self):
 async def forward_each_axon(
     self, synapse: SYNAPSE, *hotkeys, timeout: float = 12
 ) -> Dict[str, SYNAPSE]:
-    # Helper function to log elapsed time
-    def log_elapsed_time(start_time, step_name):
-        elapsed_time = time.time() - start_time
-        bt.logging.debug(f"[{step_name}] Elapsed time: {elapsed_time:.4f} seconds")
-
-    # Start timing
-    start_time = time.time()
-
-    # Step 1: Get axons
-    step_start_time = time.time()
-    hotkeys = list(hotkeys)
-    random.shuffle(hotkeys)
-    axons = uids.get_axons(self, *hotkeys)
-    log_elapsed_time(step_start_time, "Get axons")
-
-    # Step 2: Forward axons
-    step_start_time = time.time()
-    responses: List[SYNAPSE] = await self.dendrite.forward(
-        axons=axons, synapse=synapse, timeout=timeout
-    )
-    log_elapsed_time(step_start_time, "Forward axons")
-
-    # Step 3: Build and return the result dictionary
-    step_start_time = time.time()
-    result = {r.axon.hotkey: r for r in responses}
-    log_elapsed_time(step_start_time, "Build result dictionary")
-
-    # Final elapsed time
-    log_elapsed_time(start_time, "Total elapsed time")
-
-    return result
+    with tracing.span(
+        "forward_each_axon", synapse=type(synapse).__name__, hotkeys=len(hotkeys)
+    ) as span:
+        with tracing.span("get_axons"):
+            hotkeys = list(hotkeys)
+            random.shuffle(hotkeys)
+            axons = uids.get_axons(self, *hotkeys)
+
+        with tracing.span("dendrite.forward", axons=len(axons)):
+            responses: List[SYNAPSE] = await self.dendrite.forward(
+                axons=axons, synapse=synapse, timeout=timeout
+            )
+            metrics.observe_dendrite_responses(responses, timeout)
+            tracing.trace_dendrite_responses(responses, timeout)
+
+        result = {r.axon.hotkey: r for r in responses}
+        span.set_attribute("responses", len(result))
+        return result
@@ -0,0 +1,18 @@
+"""
+Offline benchmark suite for validator hot paths.
+
+Every benchmark runs against synthetic SQLite databases generated in a
+temporary directory, so the suite needs neither network access nor the
+real validator databases.
+
+Usage:
+    python -m tests.benchmarks --scale small --output bench.json
+    python -m tests.benchmarks --scale small --baseline bench.json --threshold 0.25
+
+Results are written as sorted, indented JSON so two runs can be diffed
+directly; ``--baseline`` compares medians and exits with a non-zero code
+when any benchmark regresses by more than its threshold.
+
+``tests.benchmarks.miner_proxy`` is a separate load tester for the miner
+redirect proxy, see its module docstring.
+"""
@@ -0,0 +1,90 @@
+import argparse
+import sys
+
+from tests.benchmarks import report
+from tests.benchmarks.data import SCALES, BenchmarkScale
+from tests.benchmarks.suite import get_benchmark_names, run
+
+
+def _parse_thresholds(values):
+    thresholds = {}
+    for value in values or []:
+        name, _, limit = value.partition("=")
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks",
+        description="Run validator benchmarks against synthetic SQLite databases.",
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--visits", type=int, help="Override the number of visits.")
+    parser.add_argument("--orders", type=int, help="Override the number of orders.")
+    parser.add_argument("--miners", type=int, help="Override the number of miners.")
+    parser.add_argument(
+        "--campaigns", type=int, help="Override the number of campaigns."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=get_benchmark_names(),
+        help="Run only the given benchmark, may be repeated.",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument("--baseline", help="Compare against results in this file.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown of the median, default 0.2 (20%%).",
+    )
+    parser.add_argument(
+        "--threshold-for",
+        action="append",
+        metavar="NAME=LIMIT",
+        help="Per-benchmark threshold override, may be repeated.",
+    )
+    args = parser.parse_args(argv)
+
+    overrides = {
+        k: v
+        for k, v in dict(
+            visits=args.visits,
+            orders=args.orders,
+            miners=args.miners,
+            campaigns=args.campaigns,
+        ).items()
+        if v is not None
+    }
+    scale = BenchmarkScale(**SCALES[args.scale].model_dump() | overrides)
+    results = run(
+        scale,
+        repeat=args.repeat,
+        warmup=args.warmup,
+        seed=args.seed,
+        names=args.only,
+    )
+    print(report.format_results(results))
+    if args.output:
+        report.save(results, args.output)
+
+    if not args.baseline:
+        return 0
+    comparisons = report.compare(
+        report.load(args.baseline),
+        results,
+        args.threshold,
+        _parse_thresholds(args.threshold_for),
+    )
+    print()
+    print(report.format_comparisons(comparisons))
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Minimal in-process ASGI client.
+
+Drives an ASGI application directly, without sockets or an HTTP client
+library, so endpoint benchmarks measure the application and not the
+transport.
+"""
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class AsgiResponse:
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+async def request(
+    app: Any,
+    method: str,
+    path: str,
+    params: Optional[Any] = None,
+    headers: Optional[Dict[str, str]] = None,
+    body: bytes = b"",
+    client: Tuple[str, int] = ("127.0.0.1", 50000),
+) -> AsgiResponse:
+    """
+    Sends a single HTTP request to an ASGI application.
+
+    Args:
+        app: ASGI application.
+        method (str): HTTP method.
+        path (str): Request path.
+        params (optional): Query parameters accepted by ``urlencode``.
+        headers (Dict[str, str], optional): Request headers.
+        body (bytes, optional): Request body.
+        client (Tuple[str, int], optional): Client address seen by the application.
+
+    Returns:
+        AsgiResponse: Status, headers and body of the response.
+    """
+    raw_headers = [
+        (k.lower().encode("latin-1"), v.encode("latin-1"))
+        for k, v in (headers or {}).items()
+    ]
+    if body:
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(params or {}, doseq=True).encode(),
+        "headers": raw_headers,
+        "client": client,
+        "server": ("testserver", 80),
+    }
+    request_sent = False
+    status, response_headers, chunks = 500, {}, []
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {
+                k.decode("latin-1"): v.decode("latin-1")
+                for k, v in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return AsgiResponse(status, response_headers, b"".join(chunks))
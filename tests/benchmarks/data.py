@@ -0,0 +1,399 @@
+"""
+Synthetic validator databases for benchmarks.
+
+Functions:
+    create_database_manager: Creates a DatabaseManager whose databases live in a directory.
+    build_validator_databases: Creates schemas and fills a validator database set at a given scale.
+    build_miner_databases: Creates miner schemas with campaigns and the miner hotkey in place.
+    copy_databases: Copies a generated database set so a benchmark can mutate it freely.
+    make_visits: Generates miner visits shaped like the ones synced from miners.
+    make_order_details: Generates a Shopify order payload for a visit.
+"""
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import insert
+
+from common.db.database import DatabaseManager
+from common.db.entities import (
+    Base as MainBase,
+    CampaignEntity,
+    HotkeyToBlock,
+)
+from common.miner.db.entities.active import Base as MinerActiveBase
+from common.miner.schemas import VisitorSchema
+from common.schemas.bitads import CampaignStatus
+from common.schemas.campaign import CampaignType
+from common.schemas.device import Device
+from common.schemas.sales import SalesStatus, OrderQueueStatus
+from common.schemas.shopify import (
+    OrderDetails,
+    Item,
+    CustomerInfo,
+    Address,
+    ClientInfo,
+)
+from common.validator.db.entities.active import (
+    Base as ActiveBase,
+    BitAdsData,
+    Campaign,
+    MinerAssignment,
+    OrderQueue,
+)
+from common.validator.db.entities.history import Base as HistoryBase
+
+NEURON_TYPE = "validator"
+NETWORK = "test"
+INSERT_BATCH_SIZE = 5000
+
+USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 Chrome/124.0 Mobile Safari/537.36",
+)
+
+
+class BenchmarkScale(BaseModel):
+    """
+    Size of a synthetic validator database set.
+
+    Attributes:
+        campaigns (int): Number of active CPA campaigns.
+        miners (int): Number of miners, each assigned to every campaign.
+        visits (int): Number of rows in ``bitads_data``.
+        orders (int): Number of rows in ``order_queue``.
+        batch (int): Size of a single write batch (synced visits, queue items).
+        history_days (int): Visits are spread over this many days back from now.
+        sales_ratio (float): Share of visits that carry a sale.
+    """
+
+    campaigns: int = 5
+    miners: int = 50
+    visits: int = 20_000
+    orders: int = 2_000
+    batch: int = 500
+    history_days: int = 75
+    sales_ratio: float = 0.05
+
+
+SCALES: Dict[str, BenchmarkScale] = {
+    "tiny": BenchmarkScale(
+        campaigns=2, miners=5, visits=500, orders=50, batch=50
+    ),
+    "small": BenchmarkScale(),
+    "medium": BenchmarkScale(
+        campaigns=10, miners=128, visits=200_000, orders=20_000
+    ),
+    "large": BenchmarkScale(
+        campaigns=20, miners=256, visits=1_000_000, orders=100_000, batch=2500
+    ),
+}
+
+
+def create_database_manager(
+    directory: str, neuron_type: str = NEURON_TYPE
+) -> DatabaseManager:
+    """
+    Creates a DatabaseManager whose database files live in ``directory``.
+
+    Args:
+        directory (str): Directory for the SQLite files.
+        neuron_type (str, optional): Neuron type of the database set. Defaults to "validator".
+
+    Returns:
+        DatabaseManager: Database manager bound to the files in ``directory``.
+    """
+    return DatabaseManager(
+        neuron_type,
+        NETWORK,
+        db_url_template=f"sqlite:///{directory}/{{name}}_{{network}}.db",
+    )
+
+
+def copy_databases(source: str, target: str) -> DatabaseManager:
+    """
+    Copies every database file of ``source`` into ``target``.
+
+    Args:
+        source (str): Directory with a generated database set.
+        target (str): Directory to copy the set into.
+
+    Returns:
+        DatabaseManager: Database manager bound to the copied files.
+    """
+    os.makedirs(target, exist_ok=True)
+    for name in os.listdir(source):
+        if name.endswith(".db"):
+            shutil.copyfile(os.path.join(source, name), os.path.join(target, name))
+    return create_database_manager(target)
+
+
+def hotkey(index: int) -> str:
+    return f"5Miner{index:06d}".ljust(48, "x")
+
+
+def campaign_id(index: int) -> str:
+    return f"campaign{index:04d}"
+
+
+def unique_id(campaign_index: int, miner_index: int) -> str:
+    return f"{campaign_id(campaign_index)}-{miner_index:06d}"
+
+
+def make_order_details(
+    rnd: random.Random, ip_address: str, user_agent: str, sale_date: datetime
+) -> OrderDetails:
+    """
+    Generates a Shopify order payload.
+
+    Args:
+        rnd (random.Random): Seeded random generator.
+        ip_address (str): Browser IP of the buyer.
+        user_agent (str): User agent of the buyer.
+        sale_date (datetime): Date of the sale.
+
+    Returns:
+        OrderDetails: Generated order.
+    """
+    items = frozenset(
+        Item(name=f"item-{i}", price=f"{rnd.uniform(5, 300):.2f}", quantity=1)
+        for i in range(rnd.randint(1, 3))
+    )
+    return OrderDetails(
+        totalAmount=f"{sum(float(i.price) for i in items):.2f}",
+        items=items,
+        customerInfo=CustomerInfo(
+            id=str(rnd.randint(1, 10**9)),
+            address=Address(province="CA", country="United States", countryCode="US"),
+        ),
+        clientInfo=ClientInfo(browser_ip=ip_address, user_agent=user_agent),
+        paymentMethod="card",
+        sale_date=sale_date,
+    )
+
+
+def _random_ip(rnd: random.Random) -> str:
+    return ".".join(str(rnd.randint(1, 254)) for _ in range(4))
+
+
+def make_visits(
+    rnd: random.Random,
+    scale: BenchmarkScale,
+    count: int,
+    prefix: str,
+    now: Optional[datetime] = None,
+) -> List[VisitorSchema]:
+    """
+    Generates visits as miners report them through ``SyncVisits``.
+
+    Args:
+        rnd (random.Random): Seeded random generator.
+        scale (BenchmarkScale): Scale of the database set.
+        count (int): Number of visits to generate.
+        prefix (str): Prefix of generated visit ids.
+        now (datetime, optional): Upper bound of ``created_at``. Defaults to utcnow.
+
+    Returns:
+        List[VisitorSchema]: Generated visits.
+    """
+    now = now or datetime.utcnow()
+    visits = []
+    for i in range(count):
+        c, m = rnd.randrange(scale.campaigns), rnd.randrange(scale.miners)
+        visits.append(
+            VisitorSchema(
+                id=f"{prefix}{i:09d}",
+                ip_address=_random_ip(rnd),
+                country="United States",
+                country_code="US",
+                user_agent=rnd.choice(USER_AGENTS),
+                campaign_id=campaign_id(c),
+                campaign_item=unique_id(c, m),
+                miner_hotkey=hotkey(m),
+                miner_block=rnd.randint(1, 5_000_000),
+                at=False,
+                device=rnd.choice(list(Device)),
+                is_unique=rnd.random() < 0.7,
+                return_in_site=rnd.random() < 0.1,
+                created_at=now - timedelta(seconds=rnd.randint(0, 3600)),
+            )
+        )
+    return visits
+
+
+def _bitads_rows(rnd: random.Random, scale: BenchmarkScale, now: datetime):
+    oldest = int(timedelta(days=scale.history_days).total_seconds())
+    for i in range(scale.visits):
+        c, m = rnd.randrange(scale.campaigns), rnd.randrange(scale.miners)
+        created_at = now - timedelta(seconds=rnd.randint(0, oldest))
+        ip_address, user_agent = _random_ip(rnd), rnd.choice(USER_AGENTS)
+        row = dict(
+            id=f"visit{i:09d}",
+            user_agent=user_agent,
+            ip_address=ip_address,
+            country="United States",
+            country_code="US",
+            is_unique=rnd.random() < 0.7,
+            device=rnd.choice(list(Device)),
+            created_at=created_at,
+            updated_at=created_at,
+            campaign_id=campaign_id(c),
+            sales_status=SalesStatus.NEW,
+            refund=0,
+            sales=0,
+            sale_amount=0.0,
+            order_info=None,
+            refund_info=None,
+            sale_date=None,
+            referer=None,
+            campaign_item=unique_id(c, m),
+            miner_hotkey=hotkey(m),
+            miner_block=str(rnd.randint(1, 5_000_000)),
+            return_in_site=rnd.random() < 0.1,
+        )
+        if rnd.random() < scale.sales_ratio:
+            sale_date = created_at + timedelta(minutes=rnd.randint(1, 120))
+            order = make_order_details(rnd, ip_address, user_agent, sale_date)
+            row.update(
+                sales=len(order.items),
+                sale_amount=float(order.totalAmount),
+                order_info=order,
+                sale_date=sale_date,
+                updated_at=sale_date,
+                sales_status=(
+                    SalesStatus.COMPLETED
+                    if rnd.random() < 0.5
+                    else SalesStatus.NEW
+                ),
+            )
+        yield row
+
+
+def _insert_rows(session, entity, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            session.execute(insert(entity), batch)
+            batch = []
+    if batch:
+        session.execute(insert(entity), batch)
+
+
+def build_validator_databases(
+    directory: str, scale: BenchmarkScale, seed: int = 0
+) -> DatabaseManager:
+    """
+    Creates the validator schemas in ``directory`` and fills the active database.
+
+    Args:
+        directory (str): Directory for the SQLite files.
+        scale (BenchmarkScale): Scale of the generated data.
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+
+    Returns:
+        DatabaseManager: Database manager bound to the generated files.
+    """
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    database_manager = create_database_manager(directory)
+    ActiveBase.metadata.create_all(database_manager.active_db)
+    HistoryBase.metadata.create_all(database_manager.history_db)
+    MainBase.metadata.create_all(database_manager.main_db)
+
+    with database_manager.get_session("active") as session:
+        _insert_rows(
+            session,
+            Campaign,
+            (
+                dict(
+                    id=campaign_id(c),
+                    status=True,
+                    last_active_block=1,
+                    created_at=now,
+                    updated_at=now,
+                    umax=0.0,
+                    type=CampaignType.CPA,
+                    cpa_blocks=7200,
+                )
+                for c in range(scale.campaigns)
+            ),
+        )
+        _insert_rows(
+            session,
+            MinerAssignment,
+            (
+                dict(unique_id=unique_id(c, m), hotkey=hotkey(m), campaign_id=campaign_id(c))
+                for c in range(scale.campaigns)
+                for m in range(scale.miners)
+            ),
+        )
+        _insert_rows(session, BitAdsData, _bitads_rows(rnd, scale, now))
+        visit_indexes = rnd.sample(range(scale.visits), min(scale.orders, scale.visits))
+        _insert_rows(
+            session,
+            OrderQueue,
+            (
+                dict(
+                    # every tenth order points at a visit that does not exist
+                    id=f"visit{index:09d}" if i % 10 else f"missing{i:09d}",
+                    order_info=make_order_details(
+                        rnd, _random_ip(rnd), rnd.choice(USER_AGENTS), now
+                    ),
+                    created_at=now - timedelta(minutes=i % 600),
+                    updated_at=now,
+                    last_processing_date=now - timedelta(minutes=i % 600),
+                    next_attempt_at=now - timedelta(minutes=i % 600),
+                    status=OrderQueueStatus.PENDING,
+                )
+                for i, index in enumerate(visit_indexes)
+            ),
+        )
+    return database_manager
+
+
+def build_miner_databases(
+    directory: str,
+    campaign_ids: List[str],
+    countries: List[str],
+    miner_hotkey: str = hotkey(0),
+) -> DatabaseManager:
+    """
+    Creates the miner schemas in ``directory`` with active campaigns and a miner hotkey.
+
+    Args:
+        directory (str): Directory for the SQLite files.
+        campaign_ids (List[str]): Product unique ids of the active campaigns.
+        countries (List[str]): Country codes approved for product sales.
+        miner_hotkey (str, optional): Hotkey stored as the miner's own hotkey.
+
+    Returns:
+        DatabaseManager: Database manager bound to the generated files.
+    """
+    now = datetime.utcnow()
+    database_manager = create_database_manager(directory, "miner")
+    MinerActiveBase.metadata.create_all(database_manager.active_db)
+    MinerActiveBase.metadata.create_all(database_manager.history_db)
+    MainBase.metadata.create_all(database_manager.main_db)
+    with database_manager.get_session("main") as session:
+        session.add(HotkeyToBlock(hotkey=miner_hotkey, last_block=1))
+        for i, id_ in enumerate(campaign_ids):
+            session.add(
+                CampaignEntity(
+                    id=id_,
+                    product_unique_id=id_,
+                    type=CampaignType.CPA if i % 2 else CampaignType.REGULAR,
+                    status=CampaignStatus.ACTIVATED,
+                    product_link=f"https://store.example.com/products/{id_}",
+                    countries_approved_for_product_sales=json.dumps(countries),
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+    return database_manager
@@ -0,0 +1,507 @@
+"""
+In-process load tester for the miner redirect proxy.
+
+Drives ``fetch_request_data_and_redirect`` of ``proxies.miner`` through its
+ASGI app against temporary SQLite files and a stub GeoIP service, so no
+sockets, MaxMind database or chain access are involved.
+
+Requests are sent open-loop at a target rate: request ``i`` is scheduled at
+``i / rps`` and its latency is measured from that scheduled time, so a
+stalled event loop shows up as latency instead of silently lowering the
+offered load.
+
+Every storage profile (journal mode, synchronous level, write-behind) runs
+against its own fresh database set, which makes profiles comparable.
+
+Usage:
+    python -m tests.benchmarks.miner_proxy --rps 200 --duration 10
+    python -m tests.benchmarks.miner_proxy --journal-mode delete wal --write-behind off on
+    python -m tests.benchmarks.miner_proxy --p95-budget-ms 50 --max-error-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import event, func, select
+
+from common import dependencies as common_dependencies
+from common.db.database import DatabaseManager
+from common.db.repositories import recent_activity, user_agent_activity
+from common.db.repositories.visitor import add_visitor
+from common.helpers import const
+from common.miner import dependencies as miner_dependencies
+from common.miner.db.entities.active import Visitor
+from common.miner.schemas import VisitorSchema
+from common.schemas.geoip import IpAddressInfo
+from common.services.campaign.impl import CampaignServiceImpl
+from common.services.geoip.base import GeoIpService
+from common.services.miner.base import MinerService
+from tests.benchmarks import asgi, report
+from tests.benchmarks.data import build_miner_databases, USER_AGENTS
+
+_COUNTRIES = (
+    ("US", "United States"),
+    ("GB", "United Kingdom"),
+    ("DE", "Germany"),
+    ("CA", "Canada"),
+    ("RU", "Russia"),
+    ("CN", "China"),
+)
+APPROVED_COUNTRIES = ["US", "GB", "DE", "CA"]
+
+
+class StubGeoIpService(GeoIpService):
+    """
+    Deterministic GeoIP service: the country is derived from the first octet.
+
+    Addresses starting with ``10.`` are treated as unknown.
+    """
+
+    def get_ip_info(self, ip: str) -> Optional[IpAddressInfo]:
+        first_octet = int(ip.split(".", 1)[0])
+        if first_octet == 10:
+            return None
+        code, name = _COUNTRIES[first_octet % len(_COUNTRIES)]
+        return IpAddressInfo(country_name=name, country_code=code)
+
+
+class StorageProfile(BaseModel):
+    """
+    SQLite settings a load test runs with.
+
+    Attributes:
+        journal_mode (str): Value of ``PRAGMA journal_mode``.
+        synchronous (str): Value of ``PRAGMA synchronous``.
+        write_behind (bool): Whether visits are buffered and written in batches.
+        flush_interval (float): Longest time a buffered visit waits for a flush, in seconds.
+        flush_size (int): Buffered visits that trigger an immediate flush.
+    """
+
+    journal_mode: str = "delete"
+    synchronous: str = "full"
+    write_behind: bool = False
+    flush_interval: float = 0.05
+    flush_size: int = 200
+
+    @property
+    def name(self) -> str:
+        suffix = "+write-behind" if self.write_behind else ""
+        return f"{self.journal_mode}/{self.synchronous}{suffix}"
+
+
+class TrafficMix(BaseModel):
+    """
+    Shape of the replayed click traffic.
+
+    Attributes:
+        campaigns (int): Number of active campaigns.
+        unknown_campaign_ratio (float): Share of clicks on campaigns the miner does not know.
+        test_redirect_ratio (float): Share of clicks on the test redirect item, which is not stored.
+        ip_pool (int): Number of distinct client IPs; a small pool means many repeated visitors.
+        items_per_campaign (int): Number of distinct campaign items per campaign.
+    """
+
+    campaigns: int = 10
+    unknown_campaign_ratio: float = 0.02
+    test_redirect_ratio: float = 0.01
+    ip_pool: int = 5000
+    items_per_campaign: int = 20
+
+
+class WriteBehindMinerService:
+    """
+    Miner service wrapper that buffers ``add_visit`` and writes visits in batches.
+
+    Each flush writes the buffered visits with the same repository calls as
+    ``MinerServiceImpl.add_visit``, but in a single session and transaction.
+    Every other method is delegated to the wrapped service.
+    """
+
+    def __init__(
+        self,
+        miner_service: MinerService,
+        flush_interval: float,
+        flush_size: int,
+    ):
+        self._miner_service = miner_service
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+        self._buffer: List[VisitorSchema] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.flushes = 0
+
+    def __getattr__(self, item):
+        return getattr(self._miner_service, item)
+
+    async def add_visit(self, visitor: VisitorSchema):
+        self._buffer.append(visitor)
+        if len(self._buffer) >= self._flush_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        service = self._miner_service
+        current_datetime = datetime.utcnow()
+        return_in_site_from = current_datetime - service.return_in_site_delta
+        unique_deadline = current_datetime - timedelta(
+            hours=service.settings.unique_visits_duration
+        )
+        current_date = current_datetime.date()
+        with service.database_manager.get_session("active") as session:
+            for visitor in batch:
+                add_visitor(session, visitor, return_in_site_from, unique_deadline)
+                # visitors are autoflushed lazily, make them visible to the next checks
+                session.flush()
+                recent_activity.insert_or_update(
+                    session, visitor.ip_address, current_date
+                )
+                user_agent_activity.insert_or_update(
+                    session, visitor.user_agent, current_date
+                )
+        self.flushes += 1
+
+
+def apply_storage_profile(
+    database_manager: DatabaseManager, profile: StorageProfile
+) -> None:
+    """
+    Sets the profile's pragmas on every new connection of the database set.
+
+    Args:
+        database_manager (DatabaseManager): Database manager to configure.
+        profile (StorageProfile): Profile to apply.
+    """
+    pragmas = (
+        f"PRAGMA journal_mode={profile.journal_mode}",
+        f"PRAGMA synchronous={profile.synchronous}",
+    )
+
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    for engine in (
+        database_manager.active_db,
+        database_manager.history_db,
+        database_manager.main_db,
+    ):
+        engine.dispose()
+        event.listen(engine, "connect", set_pragmas)
+
+
+def _campaign_id(index: int) -> str:
+    return f"campaign{index:04d}"
+
+
+def _campaign_item(rnd: random.Random) -> str:
+    return "".join(rnd.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=13))
+
+
+def generate_requests(
+    mix: TrafficMix, count: int, seed: int = 0
+) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Generates click requests as ``(path, headers)`` pairs.
+
+    Args:
+        mix (TrafficMix): Shape of the traffic.
+        count (int): Number of requests.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        List[Tuple[str, Dict[str, str]]]: Paths and headers of the requests.
+    """
+    rnd = random.Random(seed)
+    items = {
+        c: [_campaign_item(rnd) for _ in range(mix.items_per_campaign)]
+        for c in range(mix.campaigns)
+    }
+    ips = [
+        ".".join(str(rnd.randint(1, 254)) for _ in range(4))
+        for _ in range(mix.ip_pool)
+    ]
+    requests = []
+    for _ in range(count):
+        roll = rnd.random()
+        c = rnd.randrange(mix.campaigns)
+        campaign_id = _campaign_id(c)
+        campaign_item = rnd.choice(items[c])
+        if roll < mix.unknown_campaign_ratio:
+            campaign_id = f"unknown{rnd.randrange(10**6):06d}"
+        elif roll < mix.unknown_campaign_ratio + mix.test_redirect_ratio:
+            campaign_item = const.TEST_REDIRECT
+        headers = {
+            "user-agent": rnd.choice(USER_AGENTS),
+            "x-forwarded-for": rnd.choice(ips),
+        }
+        if rnd.random() < 0.5:
+            headers["referer"] = "https://social.example.com/post"
+        requests.append((f"/{campaign_id}/{campaign_item}", headers))
+    return requests
+
+
+def _miner_app(database_manager: DatabaseManager, miner_service):
+    # imported lazily: the proxy module builds its services at import time
+    from proxies import miner as miner_proxy
+
+    stub = StubGeoIpService()
+    miner_proxy.campaign_service = CampaignServiceImpl(database_manager)
+    miner_proxy.miner_service = miner_service
+    miner_proxy.app.dependency_overrides[
+        common_dependencies.get_geo_ip_service
+    ] = lambda: stub
+    return miner_proxy.app
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[max(0, int(round(q * len(ordered))) - 1)]
+
+
+def _count_visits(database_manager: DatabaseManager) -> int:
+    with database_manager.get_session("active") as session:
+        return session.execute(select(func.count()).select_from(Visitor)).scalar()
+
+
+async def run_load(
+    profile: StorageProfile,
+    mix: TrafficMix,
+    rps: float,
+    duration: float,
+    seed: int = 0,
+    max_in_flight: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Replays click traffic against the miner proxy with one storage profile.
+
+    Args:
+        profile (StorageProfile): Storage settings to test.
+        mix (TrafficMix): Shape of the traffic.
+        rps (float): Target request rate.
+        duration (float): Length of the test in seconds.
+        seed (int, optional): Seed of the traffic generator. Defaults to 0.
+        max_in_flight (int, optional): Requests allowed in flight before sending waits.
+
+    Returns:
+        Dict[str, Any]: Throughput, latency percentiles, error rate and write throughput.
+    """
+    requests = generate_requests(mix, max(1, int(rps * duration)), seed)
+    with tempfile.TemporaryDirectory(prefix="bitads-load-") as directory:
+        database_manager = build_miner_databases(
+            directory,
+            [_campaign_id(c) for c in range(mix.campaigns)],
+            APPROVED_COUNTRIES,
+        )
+        apply_storage_profile(database_manager, profile)
+        miner_service = miner_dependencies.get_miner_service(database_manager)
+        if profile.write_behind:
+            miner_service = WriteBehindMinerService(
+                miner_service, profile.flush_interval, profile.flush_size
+            )
+            miner_service.start()
+        app = _miner_app(database_manager, miner_service)
+
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        errors: Counter = Counter()
+        in_flight: Set[asyncio.Task] = set()
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def send(path: str, headers: Dict[str, str], scheduled: float):
+            try:
+                response = await asgi.request(app, "GET", path, headers=headers)
+                statuses[response.status] += 1
+                location = response.headers.get("location", "")
+                # the proxy turns unhandled errors into a redirect to itself
+                if response.status >= 400 or location.endswith(path):
+                    errors[response.status] += 1
+            except Exception as e:
+                errors[type(e).__name__] += 1
+            finally:
+                latencies.append(time.perf_counter() - scheduled)
+                semaphore.release()
+
+        started = time.perf_counter()
+        for i, (path, headers) in enumerate(requests):
+            scheduled = started + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await semaphore.acquire()
+            task = asyncio.create_task(send(path, headers, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        await asyncio.gather(*in_flight)
+        if profile.write_behind:
+            await miner_service.stop()
+        elapsed = time.perf_counter() - started
+        written = _count_visits(database_manager)
+        for engine in (
+            database_manager.active_db,
+            database_manager.history_db,
+            database_manager.main_db,
+        ):
+            engine.dispose()
+
+    ordered = sorted(latencies)
+    total = len(ordered)
+    return dict(
+        profile=profile.model_dump(),
+        target_rps=rps,
+        requests=total,
+        achieved_rps=round(total / elapsed, 2),
+        error_rate=round(sum(errors.values()) / total, 6) if total else 0.0,
+        errors={str(k): v for k, v in errors.items()},
+        statuses={str(k): v for k, v in sorted(statuses.items())},
+        latency_ms=dict(
+            p50=round(_percentile(ordered, 0.50) * 1000, 3),
+            p90=round(_percentile(ordered, 0.90) * 1000, 3),
+            p95=round(_percentile(ordered, 0.95) * 1000, 3),
+            p99=round(_percentile(ordered, 0.99) * 1000, 3),
+            max=round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        ),
+        visits_written=written,
+        writes_per_second=round(written / elapsed, 2),
+        elapsed_seconds=round(elapsed, 3),
+    )
+
+
+def check_budgets(
+    result: Dict[str, Any],
+    p95_ms: Optional[float] = None,
+    p99_ms: Optional[float] = None,
+    max_error_rate: Optional[float] = None,
+) -> List[str]:
+    """
+    Lists the budgets a load test result violates.
+
+    Args:
+        result (Dict[str, Any]): Result of ``run_load``.
+        p95_ms (float, optional): Budget for the 95th latency percentile.
+        p99_ms (float, optional): Budget for the 99th latency percentile.
+        max_error_rate (float, optional): Highest acceptable error rate.
+
+    Returns:
+        List[str]: Human readable violations, empty if all budgets hold.
+    """
+    violations = []
+    latency = result["latency_ms"]
+    if p95_ms is not None and latency["p95"] > p95_ms:
+        violations.append(f"p95 {latency['p95']}ms > {p95_ms}ms")
+    if p99_ms is not None and latency["p99"] > p99_ms:
+        violations.append(f"p99 {latency['p99']}ms > {p99_ms}ms")
+    if max_error_rate is not None and result["error_rate"] > max_error_rate:
+        violations.append(f"error rate {result['error_rate']} > {max_error_rate}")
+    return violations
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    lines = [
+        f"{'profile':<32} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'errors':>8} {'writes/s':>9}"
+    ]
+    for r in results:
+        name = StorageProfile(**r["profile"]).name
+        latency = r["latency_ms"]
+        lines.append(
+            f"{name:<32} {r['achieved_rps']:>8.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+            f"{latency['p99']:>8.2f} {r['error_rate']:>8.4f} {r['writes_per_second']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.miner_proxy",
+        description="Replay click traffic against the miner redirect proxy in-process.",
+    )
+    parser.add_argument("--rps", type=float, default=100)
+    parser.add_argument("--duration", type=float, default=10, help="Seconds.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--campaigns", type=int, default=10)
+    parser.add_argument("--ip-pool", type=int, default=5000)
+    parser.add_argument(
+        "--journal-mode", nargs="+", default=["delete"], metavar="MODE"
+    )
+    parser.add_argument("--synchronous", nargs="+", default=["full"], metavar="LEVEL")
+    parser.add_argument(
+        "--write-behind", nargs="+", choices=["off", "on"], default=["off"]
+    )
+    parser.add_argument("--p95-budget-ms", type=float)
+    parser.add_argument("--p99-budget-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    parser.add_argument(
+        "--proxy-logs",
+        action="store_true",
+        help="Keep the proxy's per-request INFO logs.",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.proxy_logs:
+        logging.disable(logging.WARNING)
+
+    mix = TrafficMix(campaigns=args.campaigns, ip_pool=args.ip_pool)
+    profiles = [
+        StorageProfile(
+            journal_mode=journal_mode,
+            synchronous=synchronous,
+            write_behind=write_behind == "on",
+        )
+        for journal_mode, synchronous, write_behind in itertools.product(
+            args.journal_mode, args.synchronous, args.write_behind
+        )
+    ]
+    results = [
+        asyncio.run(run_load(profile, mix, args.rps, args.duration, args.seed))
+        for profile in profiles
+    ]
+    print(format_results(results))
+    if args.output:
+        report.save(dict(mix=mix.model_dump(), results=results), args.output)
+
+    failed = False
+    for result in results:
+        violations = check_budgets(
+            result, args.p95_budget_ms, args.p99_budget_ms, args.max_error_rate
+        )
+        for violation in violations:
+            print(f"{StorageProfile(**result['profile']).name}: {violation}")
+        failed = failed or bool(violations)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
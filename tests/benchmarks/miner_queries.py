@@ -0,0 +1,304 @@
+"""
+Query plans and timings of the miner visitor lookups with and without indexes.
+
+A miner active database is filled with synthetic visits and visitor activity,
+then every lookup of the miner proxy and axon runs through its repository
+function, first on the bare tables and then after the indexes declared on the
+entities are created. The statement a function executes is captured and its
+``EXPLAIN QUERY PLAN`` is reported next to the timings, so a plan change shows
+up as ``SCAN`` turning into ``SEARCH ... USING INDEX``.
+
+Usage:
+    python -m tests.benchmarks.miner_queries --visits 1000000
+    python -m tests.benchmarks.miner_queries --visits 200000 --repeat 20 --output plans.json
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import Engine, event, insert
+from sqlalchemy.orm import Session
+
+from common.db.repositories import recent_activity, visitor
+from common.miner.db.entities.active import (
+    Base as MinerActiveBase,
+    Visitor,
+    VisitorActivity,
+)
+from common.schemas.device import Device
+from common.schemas.visit import VisitStatus
+from tests.benchmarks import report
+from tests.benchmarks.data import (
+    INSERT_BATCH_SIZE,
+    USER_AGENTS,
+    campaign_id,
+    create_database_manager,
+    hotkey,
+    unique_id,
+)
+
+
+class QueryScale(BaseModel):
+    """
+    Size of the synthetic miner database.
+
+    Attributes:
+        visits (int): Number of rows in ``visitors``.
+        campaigns (int): Number of campaigns the visits are spread over.
+        items (int): Number of campaign items per campaign.
+        ip_pool (int): Number of distinct visitor IPs.
+        days (int): Visits are spread over this many days back from now.
+    """
+
+    visits: int = 1_000_000
+    campaigns: int = 20
+    items: int = 50
+    ip_pool: int = 200_000
+    days: int = 30
+
+
+def _ip(index: int) -> str:
+    return f"{(index >> 24) % 223 + 1}.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+
+
+def _visitor_rows(rnd: random.Random, scale: QueryScale, now: datetime):
+    oldest = int(timedelta(days=scale.days).total_seconds())
+    for i in range(scale.visits):
+        c, m = rnd.randrange(scale.campaigns), rnd.randrange(scale.items)
+        yield dict(
+            id=f"visit{i:09d}",
+            referer=None,
+            ip_address=_ip(rnd.randrange(scale.ip_pool)),
+            country="United States",
+            country_code="US",
+            user_agent=rnd.choice(USER_AGENTS),
+            campaign_id=campaign_id(c),
+            campaign_item=unique_id(c, m),
+            miner_hotkey=hotkey(0),
+            miner_block=rnd.randint(1, 5_000_000),
+            at=False,
+            device=rnd.choice(list(Device)),
+            is_unique=rnd.random() < 0.7,
+            return_in_site=rnd.random() < 0.1,
+            status=VisitStatus.new,
+            created_at=now - timedelta(seconds=rnd.randint(0, oldest)),
+        )
+
+
+def _activity_rows(rnd: random.Random, scale: QueryScale, now: datetime):
+    today = now.date()
+    for i in range(scale.ip_pool):
+        for day in rnd.sample(range(scale.days), min(3, scale.days)):
+            yield dict(
+                ip=_ip(i),
+                created_at=today - timedelta(days=day),
+                count=rnd.randint(1, 20),
+            )
+
+
+def _insert_rows(session: Session, entity, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_SIZE:
+            session.execute(insert(entity), batch)
+            batch = []
+    if batch:
+        session.execute(insert(entity), batch)
+
+
+def _indexes():
+    return [
+        index
+        for entity in (Visitor, VisitorActivity)
+        for index in entity.__table__.indexes
+    ]
+
+
+def build_database(directory: str, scale: QueryScale, seed: int = 0) -> Engine:
+    """
+    Creates a miner active database in ``directory`` without the secondary indexes.
+
+    Args:
+        directory (str): Directory for the SQLite files.
+        scale (QueryScale): Scale of the generated data.
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+
+    Returns:
+        Engine: Engine of the active database.
+    """
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    engine = create_database_manager(directory, "miner").active_db
+    MinerActiveBase.metadata.create_all(engine)
+    for index in _indexes():
+        index.drop(engine)
+    with Session(engine) as session:
+        _insert_rows(session, Visitor, _visitor_rows(rnd, scale, now))
+        _insert_rows(session, VisitorActivity, _activity_rows(rnd, scale, now))
+        session.commit()
+    return engine
+
+
+def get_queries(
+    scale: QueryScale, seed: int = 0
+) -> Dict[str, Callable[[Session], Any]]:
+    """
+    Lookups of the miner proxy and axon with parameters drawn from the generated data.
+
+    Returns:
+        Dict[str, Callable[[Session], Any]]: Repository calls by name.
+    """
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    ip_address = _ip(rnd.randrange(scale.ip_pool))
+    campaign = campaign_id(rnd.randrange(scale.campaigns))
+    item = unique_id(rnd.randrange(scale.campaigns), rnd.randrange(scale.items))
+    return {
+        "is_visitor_unique": lambda session: visitor.is_visitor_unique(
+            session, ip_address, campaign, now - timedelta(days=1)
+        ),
+        "is_return_in_site": lambda session: visitor.is_return_in_site(
+            session, ip_address, campaign, now
+        ),
+        "get_visits_after": lambda session: visitor.get_visits_after(
+            session, now - timedelta(hours=1), 500
+        ),
+        "get_visits_by_campaign_item": lambda session: visitor.get_visits_by_campaign_item(
+            session, item, 500
+        ),
+        "get_visits_by_ip": lambda session: visitor.get_visits_by_ip(
+            session, ip_address
+        ),
+        "get_recent_activity": lambda session: recent_activity.get_recent_activity(
+            session, 15, 50, 1
+        ),
+        "clean_old_data": lambda session: recent_activity.clean_old_data(
+            session, scale.days - 1
+        ),
+    }
+
+
+def explain(engine: Engine, query: Callable[[Session], Any]) -> List[str]:
+    """
+    Runs a repository call and returns the plan of the last statement it executed.
+
+    Changes made by the call are rolled back.
+    """
+    executed: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as session:
+            query(session)
+            session.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = executed[-1]
+    with engine.connect() as conn:
+        cursor = conn.connection.cursor()
+        rows = cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        cursor.close()
+    return [row[-1] for row in rows]
+
+
+def measure(
+    engine: Engine, query: Callable[[Session], Any], repeat: int
+) -> Dict[str, float]:
+    """
+    Times a repository call, changes made by the call are rolled back.
+
+    Returns:
+        Dict[str, float]: Median and maximum duration in seconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        with Session(engine) as session:
+            started = time.perf_counter()
+            query(session)
+            samples.append(time.perf_counter() - started)
+            session.rollback()
+    return dict(median=statistics.median(samples), max=max(samples))
+
+
+def run(scale: QueryScale, repeat: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """
+    Builds a database and reports plans and timings before and after indexing.
+
+    Returns:
+        Dict[str, Any]: Results by query name, each with ``before`` and ``after``.
+    """
+    queries = get_queries(scale, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_database(directory, scale, seed)
+        try:
+            results = {
+                name: dict(
+                    before=dict(
+                        plan=explain(engine, query), **measure(engine, query, repeat)
+                    )
+                )
+                for name, query in queries.items()
+            }
+            started = time.perf_counter()
+            for index in _indexes():
+                index.create(engine)
+            index_seconds = time.perf_counter() - started
+            for name, query in queries.items():
+                results[name]["after"] = dict(
+                    plan=explain(engine, query), **measure(engine, query, repeat)
+                )
+        finally:
+            engine.dispose()
+    return dict(scale=scale.model_dump(), index_seconds=index_seconds, queries=results)
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = [f"{'query':<30} {'before ms':>10} {'after ms':>10} {'speedup':>9}"]
+    for name, result in results["queries"].items():
+        before, after = result["before"]["median"], result["after"]["median"]
+        lines.append(
+            f"{name:<30} {before * 1000:>10.3f} {after * 1000:>10.3f} "
+            f"{before / after if after else float('inf'):>8.1f}x"
+        )
+    lines.append(f"indexes created in {results['index_seconds']:.2f}s")
+    for name, result in results["queries"].items():
+        lines.append("")
+        lines.append(f"{name}:")
+        for label in ("before", "after"):
+            for step in result[label]["plan"]:
+                lines.append(f"  {label:<7} {step}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.benchmarks.miner_queries",
+        description="Compare plans and timings of miner visitor lookups before and after indexing.",
+    )
+    parser.add_argument("--visits", type=int, default=QueryScale().visits)
+    parser.add_argument("--ip-pool", type=int, default=QueryScale().ip_pool)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    scale = QueryScale(visits=args.visits, ip_pool=args.ip_pool)
+    results = run(scale, args.repeat, args.seed)
+    print(format_results(results))
+    if args.output:
+        report.save(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Saving, loading and comparing benchmark results.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class Comparison(BaseModel):
+    """
+    Comparison of one benchmark between a baseline and a current run.
+
+    Attributes:
+        name (str): Benchmark name.
+        baseline (float): Baseline value of the compared metric, in seconds.
+        current (float): Current value of the compared metric, in seconds.
+        ratio (float): ``current / baseline``.
+        threshold (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+        regressed (bool): Whether ``ratio`` exceeds ``1 + threshold``.
+    """
+
+    name: str
+    baseline: float
+    current: float
+    ratio: float
+    threshold: float
+    regressed: bool
+
+
+def save(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.2,
+    thresholds: Optional[Dict[str, float]] = None,
+    metric: str = "median",
+) -> List[Comparison]:
+    """
+    Compares benchmarks present in both result sets.
+
+    Args:
+        baseline (Dict[str, Any]): Results of the reference run.
+        current (Dict[str, Any]): Results of the run under test.
+        threshold (float, optional): Default allowed relative slowdown. Defaults to 0.2.
+        thresholds (Dict[str, float], optional): Per-benchmark overrides of ``threshold``.
+        metric (str, optional): Statistic to compare. Defaults to "median".
+
+    Returns:
+        List[Comparison]: One comparison per benchmark, sorted by name.
+    """
+    thresholds = thresholds or {}
+    comparisons = []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before = baseline["results"][name][metric]
+        after = current["results"][name][metric]
+        ratio = after / before if before else float("inf") if after else 1.0
+        limit = thresholds.get(name, threshold)
+        comparisons.append(
+            Comparison(
+                name=name,
+                baseline=before,
+                current=after,
+                ratio=round(ratio, 4),
+                threshold=limit,
+                regressed=ratio > 1 + limit,
+            )
+        )
+    return comparisons
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    lines = [f"{'benchmark':<40} {'median':>10} {'p95':>10} {'min':>10}"]
+    for name, stats in sorted(results["results"].items()):
+        lines.append(
+            f"{name:<40} {stats['median']:>10.4f} {stats['p95']:>10.4f} {stats['min']:>10.4f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparisons(comparisons: List[Comparison]) -> str:
+    lines = [f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'ratio':>8}"]
+    for c in comparisons:
+        flag = "  REGRESSION" if c.regressed else ""
+        lines.append(
+            f"{c.name:<40} {c.baseline:>10.4f} {c.current:>10.4f} {c.ratio:>8.3f}{flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,372 @@
+"""
+Benchmark registry and runner.
+
+Benchmarks are async functions registered with the ``benchmark`` decorator.
+Each one receives a ``BenchmarkContext`` bound to a synthetic database set
+and a ``Timer``; only the code executed inside ``with timer:`` is measured,
+so setup such as loading queue items stays out of the numbers.
+
+Benchmarks registered with ``mutates=True`` get a fresh copy of the database
+set for every run, read-only benchmarks share the generated set.
+"""
+import asyncio
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Any
+
+from common.db.database import DatabaseManager
+from common.db.repositories import order_queue
+from common.seen_ids import SeenIds
+from common.services.bitads.impl import BitAdsServiceImpl
+from common.services.migration.validator import ValidatorMigrationService
+from common.services.validator.impl import ValidatorServiceImpl
+from common.validator.environ import Environ
+from tests.benchmarks import asgi
+from tests.benchmarks.data import (
+    BenchmarkScale,
+    build_validator_databases,
+    campaign_id,
+    copy_databases,
+    create_database_manager,
+    make_visits,
+    unique_id,
+)
+
+CURRENT_BLOCK = 5_000_000
+VALIDATOR_HOTKEY = "5Validator".ljust(48, "x")
+
+
+class Timer:
+    """
+    Accumulates the wall time spent inside ``with timer:`` blocks.
+    """
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self._started
+        self._started = None
+
+
+class BenchmarkContext:
+    """
+    State handed to a single benchmark run.
+
+    Attributes:
+        database_manager (DatabaseManager): Database manager bound to the run's database set.
+        scale (BenchmarkScale): Scale the database set was generated with.
+        rnd (random.Random): Random generator seeded per benchmark and run.
+        now (datetime): Time the database set was generated at.
+    """
+
+    def __init__(
+        self,
+        database_manager: DatabaseManager,
+        scale: BenchmarkScale,
+        rnd: random.Random,
+        now: datetime,
+    ):
+        self.database_manager = database_manager
+        self.scale = scale
+        self.rnd = rnd
+        self.now = now
+
+
+Benchmark = Callable[[BenchmarkContext, Timer], Awaitable[None]]
+
+_BENCHMARKS: Dict[str, Benchmark] = {}
+_MUTATING: set = set()
+
+
+def benchmark(name: str, mutates: bool = False):
+    """
+    Registers an async benchmark function under ``name``.
+
+    Args:
+        name (str): Name of the benchmark in results.
+        mutates (bool, optional): Whether the benchmark writes to the database set. Defaults to False.
+    """
+
+    def decorator(func: Benchmark) -> Benchmark:
+        _BENCHMARKS[name] = func
+        if mutates:
+            _MUTATING.add(name)
+        return func
+
+    return decorator
+
+
+def get_benchmark_names() -> List[str]:
+    return sorted(_BENCHMARKS)
+
+
+def summarize(timings: List[float]) -> Dict[str, Any]:
+    """
+    Builds the statistics stored for a benchmark.
+
+    Args:
+        timings (List[float]): Wall times of the measured runs in seconds.
+
+    Returns:
+        Dict[str, Any]: Runs and their min, max, mean, median, p95 and stdev.
+    """
+    ordered = sorted(timings)
+    p95_index = max(0, int(round(0.95 * len(ordered))) - 1)
+    return dict(
+        runs=len(ordered),
+        min=round(ordered[0], 6),
+        max=round(ordered[-1], 6),
+        mean=round(statistics.fmean(ordered), 6),
+        median=round(statistics.median(ordered), 6),
+        p95=round(ordered[p95_index], 6),
+        stdev=round(statistics.pstdev(ordered), 6),
+    )
+
+
+def _dispose(database_manager: DatabaseManager) -> None:
+    for engine in (
+        database_manager.active_db,
+        database_manager.history_db,
+        database_manager.main_db,
+    ):
+        engine.dispose()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_suite(
+    scale: BenchmarkScale,
+    repeat: int = 5,
+    warmup: int = 1,
+    seed: int = 0,
+    names: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Generates a database set and runs the selected benchmarks against it.
+
+    Args:
+        scale (BenchmarkScale): Scale of the generated database set.
+        repeat (int, optional): Measured runs per benchmark. Defaults to 5.
+        warmup (int, optional): Unmeasured runs before the measured ones. Defaults to 1.
+        seed (int, optional): Seed for data generation and benchmarks. Defaults to 0.
+        names (List[str], optional): Benchmarks to run. Defaults to all registered.
+
+    Returns:
+        Dict[str, Any]: ``meta`` describing the run and ``results`` keyed by benchmark name.
+
+    Raises:
+        ValueError: If an unknown benchmark name is requested.
+    """
+    names = names or get_benchmark_names()
+    unknown = set(names) - set(_BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bitads-bench-") as workdir:
+        source = os.path.join(workdir, "source")
+        os.makedirs(source)
+        now = datetime.utcnow()
+        generate_started = time.perf_counter()
+        _dispose(build_validator_databases(source, scale, seed))
+        generate_elapsed = time.perf_counter() - generate_started
+
+        for name in names:
+            timings = []
+            for run in range(warmup + repeat):
+                target = os.path.join(workdir, f"{name}-{run}")
+                if name in _MUTATING:
+                    database_manager = copy_databases(source, target)
+                else:
+                    database_manager = create_database_manager(source)
+                context = BenchmarkContext(
+                    database_manager, scale, random.Random(f"{seed}-{name}-{run}"), now
+                )
+                timer = Timer()
+                try:
+                    await _BENCHMARKS[name](context, timer)
+                finally:
+                    _dispose(database_manager)
+                    shutil.rmtree(target, ignore_errors=True)
+                if run >= warmup:
+                    timings.append(timer.elapsed)
+            results[name] = summarize(timings)
+
+    return dict(
+        meta=dict(
+            scale=scale.model_dump(),
+            repeat=repeat,
+            warmup=warmup,
+            seed=seed,
+            generate_seconds=round(generate_elapsed, 3),
+            git_commit=_git_commit(),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            created_at=now.isoformat(timespec="seconds"),
+        ),
+        results=results,
+    )
+
+
+# region validator service
+
+
+@benchmark("validator.calculate_ratings")
+async def calculate_ratings(context: BenchmarkContext, timer: Timer) -> None:
+    service = ValidatorServiceImpl(context.database_manager)
+    with timer:
+        await service.calculate_ratings(to_block=CURRENT_BLOCK)
+
+
+@benchmark("bitads.add_by_visits", mutates=True)
+async def add_by_visits(context: BenchmarkContext, timer: Timer) -> None:
+    # a quarter of every synced page is already known, as with overlapping offsets
+    known = context.scale.batch // 4
+    visits = set(
+        make_visits(context.rnd, context.scale, context.scale.batch - known, "sync")
+    ) | set(make_visits(context.rnd, context.scale, known, "visit"))
+    service = BitAdsServiceImpl(context.database_manager)
+    with timer:
+        await service.add_by_visits(visits)
+
+
+@benchmark("bitads.add_by_visits.overlapping", mutates=True)
+async def add_overlapping_visits(context: BenchmarkContext, timer: Timer) -> None:
+    # the next page repeats three quarters of the previous one
+    batch = context.scale.batch
+    previous = make_visits(context.rnd, context.scale, batch, "sync")
+    following = previous[batch // 4 :] + make_visits(
+        context.rnd, context.scale, batch // 4, "next"
+    )
+    service = BitAdsServiceImpl(context.database_manager, seen_visits=SeenIds())
+    await service.add_by_visits(previous)
+    with timer:
+        await service.add_by_visits(following)
+
+
+@benchmark("bitads.add_by_queue_items", mutates=True)
+async def add_by_queue_items(context: BenchmarkContext, timer: Timer) -> None:
+    with context.database_manager.get_session("active") as session:
+        items = order_queue.claim(session, context.scale.batch, timedelta(minutes=5))
+    service = BitAdsServiceImpl(context.database_manager)
+    with timer:
+        await service.add_by_queue_items(CURRENT_BLOCK, VALIDATOR_HOTKEY, items)
+
+
+@benchmark("bitads.complete_sales", mutates=True)
+async def complete_sales(context: BenchmarkContext, timer: Timer) -> None:
+    cutoffs = {
+        campaign_id(c): context.now - timedelta(days=14)
+        for c in range(context.scale.campaigns)
+    }
+    service = BitAdsServiceImpl(context.database_manager)
+    with timer:
+        await service.complete_sales(cutoffs)
+
+
+@benchmark("migration.transfer_data", mutates=True)
+async def transfer_data(context: BenchmarkContext, timer: Timer) -> None:
+    created_at_from = datetime.utcnow() - timedelta(
+        seconds=Environ.MR_DAYS.total_seconds() * 2
+    )
+    with timer:
+        await ValidatorMigrationService(context.database_manager).migrate(
+            created_at_from
+        )
+    context.database_manager.history_partitions.dispose()
+
+
+# endregion
+
+# region validator proxy
+
+
+def _validator_app(database_manager: DatabaseManager):
+    # imported lazily: the proxy module builds its services at import time
+    from proxies import validator as validator_proxy
+
+    validator_proxy.bitads_service = BitAdsServiceImpl(database_manager)
+    return validator_proxy.app
+
+
+async def _get(app, path: str, params=None) -> asgi.AsgiResponse:
+    response = await asgi.request(app, "GET", path, params)
+    if response.status != 200:
+        raise RuntimeError(f"GET {path} returned {response.status}")
+    return response
+
+
+@benchmark("proxy.tracking_data")
+async def tracking_data(context: BenchmarkContext, timer: Timer) -> None:
+    app = _validator_app(context.database_manager)
+    params = dict(updated_from=(context.now - timedelta(days=7)).isoformat())
+    with timer:
+        for page_number in range(1, 6):
+            await _get(app, "/tracking_data", params | dict(page_number=page_number))
+
+
+@benchmark("proxy.tracking_data_paged")
+async def tracking_data_paged(context: BenchmarkContext, timer: Timer) -> None:
+    app = _validator_app(context.database_manager)
+    params = dict(updated_from=(context.now - timedelta(days=7)).isoformat())
+    with timer:
+        for page_number in range(1, 6):
+            await _get(
+                app, "/tracking_data/paged", params | dict(page_number=page_number)
+            )
+
+
+@benchmark("proxy.tracking_data_by_campaign_item")
+async def tracking_data_by_campaign_item(
+    context: BenchmarkContext, timer: Timer
+) -> None:
+    app = _validator_app(context.database_manager)
+    scale = context.scale
+    params = [
+        dict(campaign_item=unique_id(c, context.rnd.randrange(scale.miners)))
+        for c in range(scale.campaigns)
+    ]
+    with timer:
+        for p in params:
+            await _get(app, "/tracking_data/by_campaign_item", p)
+
+
+@benchmark("proxy.tracking_data_by_id")
+async def tracking_data_by_id(context: BenchmarkContext, timer: Timer) -> None:
+    app = _validator_app(context.database_manager)
+    ids = [
+        f"visit{context.rnd.randrange(context.scale.visits):09d}"
+        for _ in range(100)
+    ]
+    with timer:
+        for id_ in ids:
+            await _get(app, f"/tracking_data/{id_}")
+
+
+# endregion
+
+
+def run(scale: BenchmarkScale, **kwargs) -> Dict[str, Any]:
+    return asyncio.run(run_suite(scale, **kwargs))
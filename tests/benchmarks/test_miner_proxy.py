@@ -0,0 +1,76 @@
+import asyncio
+import re
+import unittest
+
+from parameterized import parameterized
+
+from tests.benchmarks.miner_proxy import (
+    StorageProfile,
+    StubGeoIpService,
+    TrafficMix,
+    check_budgets,
+    generate_requests,
+    run_load,
+)
+
+
+class TestTraffic(unittest.TestCase):
+    def test_generate_requests_then_deterministic(self):
+        mix = TrafficMix(campaigns=3, ip_pool=10)
+
+        self.assertEqual(
+            generate_requests(mix, 50, seed=1), generate_requests(mix, 50, seed=1)
+        )
+
+    def test_generate_requests_then_valid_campaign_items(self):
+        for path, headers in generate_requests(TrafficMix(), 200):
+            self.assertRegex(path, re.compile(r"^/\w+/[a-zA-Z0-9]{13}$"))
+            self.assertIn("user-agent", headers)
+            self.assertIn("x-forwarded-for", headers)
+
+    @parameterized.expand([("10.0.0.1", None), ("12.0.0.1", "US"), ("16.0.0.1", "RU")])
+    def test_stub_geoip(self, ip, country_code):
+        info = StubGeoIpService().get_ip_info(ip)
+
+        self.assertEqual(country_code, info.country_code if info else None)
+
+
+class TestRunLoad(unittest.TestCase):
+    def test_run_load_with_and_without_write_behind_then_same_writes(self):
+        mix = TrafficMix(campaigns=2, ip_pool=20)
+        results = [
+            asyncio.run(
+                run_load(StorageProfile(write_behind=write_behind), mix, 100, 0.3)
+            )
+            for write_behind in (False, True)
+        ]
+
+        for result in results:
+            self.assertEqual(30, result["requests"])
+            self.assertEqual(0.0, result["error_rate"])
+            self.assertGreater(result["visits_written"], 0)
+        self.assertEqual(
+            results[0]["visits_written"], results[1]["visits_written"]
+        )
+
+
+class TestBudgets(unittest.TestCase):
+    result = dict(latency_ms=dict(p95=20.0, p99=40.0), error_rate=0.01)
+
+    @parameterized.expand(
+        [
+            (None, None, None, 0),
+            (25.0, 50.0, 0.05, 0),
+            (10.0, None, None, 1),
+            (10.0, 30.0, 0.001, 3),
+        ]
+    )
+    def test_check_budgets(self, p95_ms, p99_ms, max_error_rate, violations):
+        self.assertEqual(
+            violations,
+            len(check_budgets(self.result, p95_ms, p99_ms, max_error_rate)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
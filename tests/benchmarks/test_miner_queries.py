@@ -0,0 +1,27 @@
+import unittest
+
+from tests.benchmarks.miner_queries import QueryScale, run
+
+
+class TestMinerQueries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.results = run(QueryScale(visits=2000, ip_pool=400), repeat=1)
+
+    def test_before_indexes_then_tables_scanned(self):
+        for name, result in self.results["queries"].items():
+            with self.subTest(name):
+                self.assertTrue(
+                    any(step.startswith("SCAN visitor") for step in result["before"]["plan"])
+                )
+
+    def test_after_indexes_then_tables_searched_by_index(self):
+        for name, result in self.results["queries"].items():
+            with self.subTest(name):
+                plan = result["after"]["plan"]
+                self.assertFalse(any(step.startswith("SCAN visitor") for step in plan))
+                self.assertTrue(any("USING INDEX ix_visitor" in step for step in plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from common.validator.db.entities.active import BitAdsData, OrderQueue
+from tests.benchmarks import report
+from tests.benchmarks.data import SCALES, build_validator_databases
+from tests.benchmarks.suite import get_benchmark_names, run, summarize
+
+
+def _results(**medians):
+    return dict(results={k: dict(median=v) for k, v in medians.items()})
+
+
+class TestBenchmarkData(unittest.TestCase):
+    def test_build_validator_databases_then_scale_respected(self):
+        scale = SCALES["tiny"]
+        with tempfile.TemporaryDirectory() as directory:
+            database_manager = build_validator_databases(directory, scale)
+            with database_manager.get_session("active") as session:
+                self.assertEqual(scale.visits, session.query(BitAdsData).count())
+                self.assertEqual(scale.orders, session.query(OrderQueue).count())
+            database_manager.active_db.dispose()
+            database_manager.history_db.dispose()
+            database_manager.main_db.dispose()
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_run_then_every_benchmark_reported(self):
+        results = run(SCALES["tiny"], repeat=1, warmup=0)
+
+        self.assertEqual(get_benchmark_names(), sorted(results["results"]))
+        for stats in results["results"].values():
+            self.assertEqual(1, stats["runs"])
+            self.assertGreaterEqual(stats["median"], 0)
+
+    def test_run_with_unknown_benchmark_then_value_error(self):
+        with self.assertRaises(ValueError):
+            run(SCALES["tiny"], names=["unknown"])
+
+    def test_summarize(self):
+        stats = summarize([0.3, 0.1, 0.2])
+
+        self.assertEqual(0.1, stats["min"])
+        self.assertEqual(0.2, stats["median"])
+        self.assertEqual(0.3, stats["p95"])
+
+
+class TestReport(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (1.0, 1.1, 0.2, False),
+            (1.0, 1.3, 0.2, True),
+            (1.0, 1.3, 0.5, False),
+            (1.0, 0.5, 0.2, False),
+        ]
+    )
+    def test_compare(self, baseline, current, threshold, regressed):
+        comparisons = report.compare(
+            _results(a=baseline), _results(a=current), threshold
+        )
+
+        self.assertEqual(1, len(comparisons))
+        self.assertEqual(regressed, comparisons[0].regressed)
+
+    def test_compare_with_override_then_override_used(self):
+        comparisons = report.compare(
+            _results(a=1.0, b=1.0),
+            _results(a=1.5, b=1.5),
+            0.2,
+            thresholds={"b": 1.0},
+        )
+
+        self.assertEqual([True, False], [c.regressed for c in comparisons])
+
+    def test_compare_only_common_benchmarks(self):
+        comparisons = report.compare(_results(a=1.0, b=1.0), _results(b=1.0, c=1.0))
+
+        self.assertEqual(["b"], [c.name for c in comparisons])
+
+    def test_save_and_load(self):
+        results = _results(a=1.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.json")
+            report.save(results, path)
+
+            self.assertEqual(results, report.load(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from bitads_cli.readonly import MainDatabase
+from common.db.database import DatabaseManager
+from common.db.entities import Base
+from common.schemas.bitads import Campaign, MinerUniqueLinkSchema, TwoFactorRequest
+from common.services.campaign.impl import CampaignServiceImpl
+from common.services.two_factor.impl import TwoFactorServiceImpl
+from common.services.unique_link.impl import MinerUniqueLinkServiceImpl
+
+
+class TestMainDatabase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "test_neuron",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        Base.metadata.create_all(self.database_manager.main_db)
+        self.database = MainDatabase(
+            os.path.join(self.directory.name, "main_test.db")
+        )
+
+    def tearDown(self) -> None:
+        self.database_manager.active_db.dispose()
+        self.database_manager.main_db.dispose()
+        self.directory.cleanup()
+
+    def test_campaigns_then_same_as_service(self) -> None:
+        service = CampaignServiceImpl(self.database_manager)
+        asyncio.run(
+            service.set_campaigns(
+                [
+                    Campaign(
+                        id="1",
+                        product_unique_id="active",
+                        status=1,
+                        product_name="Product",
+                        created_at=datetime(2024, 11, 1, 12, 30),
+                        date_started=datetime(2024, 11, 2),
+                        countries_approved_for_product_sales='["US"]',
+                    ),
+                    Campaign(id="2", product_unique_id="inactive", status=0),
+                ]
+            )
+        )
+
+        expected = asyncio.run(service.get_active_campaigns())
+        actual = asyncio.run(self.database.get_active_campaigns())
+
+        self.assertEqual(1, len(actual))
+        for name in (
+            "product_unique_id",
+            "product_name",
+            "created_at",
+            "date_started",
+            "date_approved",
+            "countries_approved_for_product_sales",
+        ):
+            self.assertEqual(getattr(expected[0], name), getattr(actual[0], name))
+        self.assertEqual(
+            "2", asyncio.run(self.database.get_campaign_by_id("inactive")).id
+        )
+        self.assertIsNone(asyncio.run(self.database.get_campaign_by_id("missing")))
+
+    def test_unique_links_then_newest_first(self) -> None:
+        service = MinerUniqueLinkServiceImpl(self.database_manager)
+        for day in (1, 3, 2):
+            asyncio.run(
+                service.add_unique_link(
+                    MinerUniqueLinkSchema(
+                        id=str(day),
+                        created_at=datetime(2024, 11, day),
+                        campaign_id="campaign",
+                        hotkey="miner",
+                        link=f"https://example.com/{day}",
+                    )
+                )
+            )
+
+        expected = asyncio.run(service.get_unique_links_for_campaign("campaign"))
+        actual = asyncio.run(self.database.get_unique_links_for_campaign("campaign"))
+
+        self.assertEqual(
+            [(link.id, link.created_at, link.link) for link in expected],
+            [(link.id, link.created_at, link.link) for link in actual],
+        )
+
+    def test_codes_then_same_as_service(self) -> None:
+        service = TwoFactorServiceImpl(self.database_manager)
+        for code in ("111111", "222222"):
+            asyncio.run(
+                service.add_from_request(
+                    TwoFactorRequest(
+                        ip_address="127.0.0.1",
+                        user_agent="agent",
+                        hotkey="miner",
+                        code=code,
+                    )
+                )
+            )
+
+        expected = asyncio.run(service.get_last_codes(limit=1))
+        actual = asyncio.run(self.database.get_last_codes(limit=1))
+
+        self.assertEqual(
+            [(code.code, code.created_at, code.ip_address) for code in expected],
+            [(code.code, code.created_at, code.ip_address) for code in actual],
+        )
+
+    def test_missing_file_then_empty(self) -> None:
+        database = MainDatabase(os.path.join(self.directory.name, "missing.db"))
+
+        self.assertEqual([], asyncio.run(database.get_active_campaigns()))
+        self.assertIsNone(asyncio.run(database.get_campaign_by_id("active")))
+        self.assertFalse(os.path.exists(database.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
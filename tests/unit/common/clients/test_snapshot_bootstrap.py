@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import timedelta
+
+from common.clients.snapshot.bootstrap import SnapshotBootstrapper
+from common.clients.snapshot.client import SnapshotClient
+from common.db.database import DatabaseManager
+from common.db.repositories.miner_ping import add_miner_ping
+from common.services.snapshot.impl import SnapshotServiceImpl
+from common.validator.db.entities.active import Base as VABase
+
+
+class FakeSnapshotClient(SnapshotClient):
+    def __init__(self, name, manifests, data, corrupt=False, failing=False):
+        super().__init__(f"https://{name}")
+        self.manifests = manifests
+        self.data = data
+        self.corrupt = corrupt
+        self.failing = failing
+        self.requests = 0
+
+    def get_manifests(self):
+        if self.failing:
+            raise ConnectionError("timeout")
+        return self.manifests
+
+    def get_range(self, manifest, start, end):
+        self.requests += 1
+        if self.failing:
+            raise ConnectionError("timeout")
+        data = self.data[start:end + 1]
+        return bytes(reversed(data)) if self.corrupt else data
+
+
+class TestSnapshotBootstrapper(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        database_manager = DatabaseManager(
+            "validator",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(database_manager.active_db)
+        with database_manager.get_session("active") as session:
+            for block in range(300):
+                add_miner_ping(session, f"hotkey{block}", block)
+        service = SnapshotServiceImpl(
+            database_manager,
+            os.path.join(self.directory.name, "snapshots"),
+            databases=("active",),
+            chunk_size=512,
+        )
+        self.manifest = service.create_snapshot("active")
+        with open(service.get_path(self.manifest), "rb") as file:
+            self.data = file.read()
+        for engine in (
+            database_manager.active_db,
+            database_manager.history_db,
+            database_manager.main_db,
+        ):
+            engine.dispose()
+        self.path = os.path.join(self.directory.name, "bootstrap.db")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _client(self, name, **kwargs) -> FakeSnapshotClient:
+        return FakeSnapshotClient(name, [self.manifest], self.data, **kwargs)
+
+    def _count_pings(self) -> int:
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute("SELECT count(*) FROM miner_pings").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_bootstrap_then_chunks_from_several_peers(self) -> None:
+        clients = [self._client(f"peer{i}") for i in range(3)]
+
+        fetched = SnapshotBootstrapper(clients, workers=4).bootstrap(
+            dict(active=self.path)
+        )
+
+        self.assertEqual({"active"}, fetched)
+        self.assertEqual(300, self._count_pings())
+        self.assertTrue(all(client.requests for client in clients))
+        self.assertEqual(
+            len(self.manifest.chunks), sum(client.requests for client in clients)
+        )
+        self.assertFalse(os.path.exists(f"{self.path}.gz.part"))
+
+    def test_bootstrap_corrupt_and_failing_peers_then_verified_copy(self) -> None:
+        clients = [
+            self._client("corrupt", corrupt=True),
+            self._client("failing", failing=True),
+            self._client("good"),
+        ]
+
+        fetched = SnapshotBootstrapper(clients, workers=2).bootstrap(
+            dict(active=self.path)
+        )
+
+        self.assertEqual({"active"}, fetched)
+        self.assertEqual(300, self._count_pings())
+
+    def test_download_resumed_then_only_missing_chunks_requested(self) -> None:
+        with open(f"{self.path}.gz.part", "wb") as file:
+            file.write(self.data[: 3 * 512])
+        client = self._client("peer")
+
+        SnapshotBootstrapper([client]).download(self.manifest, [client], self.path)
+
+        self.assertEqual(len(self.manifest.chunks) - 3, client.requests)
+        self.assertEqual(300, self._count_pings())
+
+    def test_download_failed_then_partial_file_kept(self) -> None:
+        with self.assertRaises(RuntimeError):
+            client = self._client("failing", failing=True)
+            SnapshotBootstrapper([client]).download(self.manifest, [client], self.path)
+
+        self.assertTrue(os.path.exists(f"{self.path}.gz.part"))
+        self.assertFalse(os.path.exists(self.path))
+
+    def _other_snapshot(self, name: str, created_at):
+        return self.manifest.model_copy(update=dict(sha256=name, created_at=created_at))
+
+    def test_select_then_snapshot_of_most_peers(self) -> None:
+        future = self._other_snapshot(
+            "future", self.manifest.created_at + timedelta(days=365)
+        )
+        clients = [self._client("peer1"), self._client("peer2")]
+        future_client = self._client("future")
+
+        manifest, selected = SnapshotBootstrapper.select(
+            [(c, self.manifest) for c in clients] + [(future_client, future)]
+        )
+
+        self.assertEqual(self.manifest.sha256, manifest.sha256)
+        self.assertEqual(clients, selected)
+
+    def test_select_tie_then_freshest_snapshot(self) -> None:
+        old = self._other_snapshot("old", self.manifest.created_at - timedelta(hours=1))
+        old_client, fresh_client = self._client("old"), self._client("fresh")
+
+        manifest, selected = SnapshotBootstrapper.select(
+            [(old_client, old), (fresh_client, self.manifest)]
+        )
+
+        self.assertEqual(self.manifest.sha256, manifest.sha256)
+        self.assertEqual([fresh_client], selected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from parameterized import parameterized
+from sqlalchemy import select
+
+from common.db.database import DatabaseManager
+from common.db.repositories import bitads_data
+from common.schemas.sales import SalesStatus
+from common.validator.db.entities.active import (
+    Base as VABase,
+    BitAdsData,
+    BitAdsRollupDirtyDay,
+)
+
+START = datetime(2024, 11, 1)
+CAMPAIGN_IDS = ["campaign0", "campaign1", "campaign2"]
+
+
+class TestCompleteSales(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "test_neuron",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        rnd = random.Random(11)
+        with self.database_manager.get_session("active") as session:
+            for i in range(600):
+                created_at = START + timedelta(minutes=rnd.randrange(30 * 24 * 60))
+                session.add(
+                    BitAdsData(
+                        id=f"id{i}",
+                        user_agent="agent",
+                        ip_address="127.0.0.1",
+                        is_unique=True,
+                        created_at=created_at,
+                        updated_at=created_at,
+                        campaign_id=rnd.choice(CAMPAIGN_IDS),
+                        sales_status=rnd.choice(list(SalesStatus)),
+                        sale_date=(
+                            created_at + timedelta(hours=rnd.randrange(48))
+                            if rnd.random() < 0.5
+                            else None
+                        ),
+                    )
+                )
+
+    def tearDown(self) -> None:
+        self.database_manager.active_db.dispose()
+        self.database_manager.main_db.dispose()
+        self.directory.cleanup()
+
+    def _rows(self):
+        with self.database_manager.get_session("active") as session:
+            return {
+                row.id: (
+                    row.campaign_id,
+                    row.sales_status,
+                    row.sale_date,
+                    row.updated_at,
+                    row.created_at,
+                )
+                for row in session.scalars(select(BitAdsData))
+            }
+
+    @parameterized.expand(
+        [
+            ({"campaign0": START + timedelta(days=10)},),
+            (
+                {
+                    "campaign0": START + timedelta(days=10),
+                    "campaign1": START + timedelta(days=20),
+                    "missing": START + timedelta(days=40),
+                },
+            ),
+        ]
+    )
+    def test_complete_sales_then_only_new_sales_before_cutoff(self, cutoffs) -> None:
+        before = self._rows()
+        expected = {
+            id_
+            for id_, (campaign_id, sales_status, sale_date, *_) in before.items()
+            if campaign_id in cutoffs
+            and sales_status == SalesStatus.NEW
+            and sale_date is not None
+            and sale_date < cutoffs[campaign_id]
+        }
+
+        with self.database_manager.get_session("active") as session:
+            completed = bitads_data.complete_sales(session, cutoffs)
+            dirty_days = set(session.scalars(select(BitAdsRollupDirtyDay.day)))
+
+        after = self._rows()
+        self.assertEqual(len(expected), completed)
+        self.assertTrue(expected)
+        for id_, (_, sales_status, _, updated_at, _) in after.items():
+            if id_ in expected:
+                self.assertEqual(SalesStatus.COMPLETED, sales_status)
+                self.assertGreater(updated_at, before[id_][3])
+            else:
+                self.assertEqual(before[id_], after[id_])
+        self.assertEqual({before[id_][4].date() for id_ in expected}, dirty_days)
+
+    def test_complete_sales_twice_then_nothing_left(self) -> None:
+        cutoffs = {campaign_id: START + timedelta(days=40) for campaign_id in CAMPAIGN_IDS}
+        with self.database_manager.get_session("active") as session:
+            first = bitads_data.complete_sales(session, cutoffs)
+            second = bitads_data.complete_sales(session, cutoffs)
+
+        self.assertGreater(first, 0)
+        self.assertEqual(0, second)
+
+    def test_complete_sales_without_campaigns_then_noop(self) -> None:
+        before = self._rows()
+
+        with self.database_manager.get_session("active") as session:
+            self.assertEqual(0, bitads_data.complete_sales(session, {}))
+
+        self.assertEqual(before, self._rows())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from parameterized import parameterized
+
+from common.db.database import DatabaseManager
+from common.db.repositories import bitads_data, bitads_rollup
+from common.schemas.bitads import BitAdsDataSchema
+from common.schemas.sales import SalesStatus
+from common.services.validator.impl import ValidatorServiceImpl
+from common.validator.db.entities.active import Base as VABase, MinerAssignment
+
+START = datetime(2024, 11, 1)
+CAMPAIGN_IDS = ["campaign0", "campaign1"]
+
+
+def _random_row(rnd: random.Random, i: int) -> BitAdsDataSchema:
+    created_at = START + timedelta(seconds=rnd.randrange(40 * 24 * 3600))
+    completed = rnd.random() < 0.5
+    sale_date = (
+        created_at + timedelta(seconds=rnd.randrange(5 * 24 * 3600))
+        if rnd.random() < 0.6
+        else None
+    )
+    return BitAdsDataSchema(
+        id=f"id{i}",
+        user_agent="agent",
+        ip_address="127.0.0.1",
+        is_unique=rnd.random() < 0.3,
+        created_at=created_at,
+        campaign_id=rnd.choice(CAMPAIGN_IDS),
+        campaign_item=f"item{rnd.randrange(12)}",
+        sales_status=SalesStatus.COMPLETED if completed else SalesStatus.NEW,
+        sales=rnd.randrange(4),
+        refund=rnd.randrange(2),
+        sale_amount=round(rnd.uniform(0, 100), 2),
+        sale_date=sale_date,
+    )
+
+
+class TestBitAdsRollup(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "test_neuron",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        self.service = ValidatorServiceImpl(self.database_manager)
+        self.rnd = random.Random(42)
+        with self.database_manager.get_session("active") as session:
+            # item10 and item11 are not assigned to any miner
+            for i in range(10):
+                session.add(
+                    MinerAssignment(
+                        unique_id=f"item{i}",
+                        hotkey=f"hotkey{i % 4}",
+                        campaign_id=CAMPAIGN_IDS[i % 2],
+                    )
+                )
+            for i in range(1000):
+                bitads_data.add_or_update(session, _random_row(self.rnd, i))
+
+    def tearDown(self) -> None:
+        for engine in (
+            self.database_manager.active_db,
+            self.database_manager.history_db,
+            self.database_manager.main_db,
+        ):
+            engine.dispose()
+        self.directory.cleanup()
+
+    def _assert_exact(self, campaign_ids, sale_from, sale_to) -> None:
+        with self.database_manager.get_session("active") as session:
+            bitads_rollup.refresh(session)
+        with self.database_manager.get_session("active") as session:
+            expected = bitads_data.get_aggregated_data(
+                session, *campaign_ids, from_date=sale_from, to_date=sale_to
+            )
+            expected_reputation = bitads_data.get_miners_reputation(
+                session, *campaign_ids, from_date=sale_from, to_date=sale_to
+            )
+
+        actual = self.service._get_aggregated_data(
+            *campaign_ids, sale_from=sale_from, sale_to=sale_to
+        )
+        actual_reputation = self.service._get_miners_reputation(
+            *campaign_ids, sale_from=sale_from, sale_to=sale_to
+        )
+
+        self.assertTrue(expected.data)
+        self.assertEqual(
+            {c: set(m) for c, m in expected.data.items()},
+            {c: set(m) for c, m in actual.data.items()},
+        )
+        for campaign_id, miners in expected.data.items():
+            for hotkey, aggregation in miners.items():
+                other = actual.data[campaign_id][hotkey]
+                self.assertEqual(aggregation.visits, other.visits)
+                self.assertEqual(aggregation.visits_unique, other.visits_unique)
+                self.assertEqual(aggregation.total_sales, other.total_sales)
+                self.assertEqual(aggregation.total_refunds, other.total_refunds)
+                self.assertAlmostEqual(aggregation.sales_amount, other.sales_amount)
+        self.assertEqual(expected_reputation, actual_reputation)
+
+    @parameterized.expand(
+        [
+            ((), START + timedelta(days=3, hours=7, minutes=13), START + timedelta(days=35, hours=5)),
+            (("campaign1",), START + timedelta(days=3, hours=7, minutes=13), START + timedelta(days=35, hours=5)),
+            ((), START + timedelta(days=2), START + timedelta(days=30)),
+            ((), START + timedelta(days=5, hours=1), START + timedelta(days=5, hours=20)),
+        ]
+    )
+    def test_rollups_then_same_as_raw(self, campaign_ids, sale_from, sale_to) -> None:
+        self._assert_exact(campaign_ids, sale_from, sale_to)
+
+    def test_updates_after_refresh_then_same_as_raw(self) -> None:
+        sale_from = START + timedelta(days=3, hours=7, minutes=13)
+        sale_to = START + timedelta(days=35, hours=5)
+        self._assert_exact((), sale_from, sale_to)
+
+        with self.database_manager.get_session("active") as session:
+            for i in self.rnd.sample(range(1000), 200):
+                data = bitads_data.get_data(session, f"id{i}")
+                bitads_data.add_or_update(
+                    session,
+                    data.model_copy(
+                        update=dict(
+                            sales_status=SalesStatus.COMPLETED,
+                            sales=self.rnd.randrange(4),
+                            sale_date=data.created_at
+                            + timedelta(days=self.rnd.randrange(10)),
+                        )
+                    ),
+                )
+            for i in range(1000, 1100):
+                bitads_data.add_data(session, _random_row(self.rnd, i))
+            bitads_data.complete_sales_less_than_date(
+                session, "campaign0", START + timedelta(days=20)
+            )
+
+        self._assert_exact((), sale_from, sale_to)
+
+
+if __name__ == "__main__":
+    unittest.main()
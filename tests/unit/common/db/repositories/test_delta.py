@@ -0,0 +1,254 @@
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from common.clients.delta.client import catch_up
+from common.db.database import DatabaseManager
+from common.db.repositories import delta
+from common.schemas.sales import OrderQueueStatus, SalesStatus
+from common.services.delta.impl import DeltaServiceImpl
+from common.validator.db.entities.active import (
+    Base as VABase,
+    BitAdsData,
+    MinerAssignment,
+    OrderQueue,
+)
+from tests.benchmarks.data import make_order_details
+
+NOW = datetime.utcnow() - timedelta(minutes=10)
+
+
+class FakeDeltaClient:
+    def __init__(self, database_manager):
+        self.database_manager = database_manager
+        self.batches = 0
+
+    def get_batch(self, table, after=None, limit=1000):
+        self.batches += 1
+        with self.database_manager.get_session("active") as session:
+            return delta.export_rows(session, table, after, limit)
+
+
+class TestDelta(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = self._create_database_manager("source")
+        self.target = self._create_database_manager("target")
+        rnd = random.Random(7)
+        with self.source.get_session("active") as session:
+            for i in range(25):
+                updated_at = NOW - timedelta(minutes=i % 10)
+                order_info = make_order_details(rnd, "127.0.0.1", "agent", NOW)
+                session.add(
+                    BitAdsData(
+                        id=f"id{i}",
+                        user_agent="agent",
+                        ip_address="127.0.0.1",
+                        is_unique=bool(i % 2),
+                        created_at=NOW - timedelta(days=i),
+                        updated_at=updated_at,
+                        campaign_id="campaign",
+                        campaign_item=f"item{i % 3}",
+                        sales_status=SalesStatus.COMPLETED,
+                        sales=i,
+                        sale_amount=i * 1.5,
+                        order_info=order_info,
+                        sale_date=NOW,
+                    )
+                )
+                session.add(
+                    OrderQueue(
+                        id=f"order{i}",
+                        order_info=order_info,
+                        created_at=updated_at,
+                        updated_at=updated_at,
+                        status=OrderQueueStatus.PROCESSED,
+                    )
+                )
+            for i in range(3):
+                session.add(
+                    MinerAssignment(
+                        unique_id=f"item{i}", hotkey=f"hotkey{i}", updated_at=NOW
+                    )
+                )
+
+    def _create_database_manager(self, name: str) -> DatabaseManager:
+        database_manager = DatabaseManager(
+            "validator",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", name + "_{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(database_manager.active_db)
+        return database_manager
+
+    def tearDown(self) -> None:
+        for database_manager in (self.source, self.target):
+            for engine in (
+                database_manager.active_db,
+                database_manager.history_db,
+                database_manager.main_db,
+            ):
+                engine.dispose()
+        self.directory.cleanup()
+
+    def _catch_up(self, limit=10):
+        client = FakeDeltaClient(self.source)
+        received = asyncio.run(
+            catch_up(client, DeltaServiceImpl(self.target), "peer", limit=limit)
+        )
+        return client, received
+
+    def _rows(self, database_manager, entity, exclude=()):
+        with database_manager.get_session("active") as session:
+            return {
+                row.id: tuple(
+                    getattr(row, column.key)
+                    for column in entity.__table__.columns
+                    if column.key not in exclude
+                )
+                for row in session.scalars(select(entity))
+            }
+
+    def test_catch_up_then_tables_equal(self) -> None:
+        client, received = self._catch_up()
+
+        self.assertEqual(
+            dict(bitads_data=25, order_queue=25, miner_assignment=3), received
+        )
+        # 3 pages of 10 for each of the large tables, 1 for miner_assignment
+        self.assertEqual(7, client.batches)
+        self.assertEqual(
+            self._rows(self.source, BitAdsData), self._rows(self.target, BitAdsData)
+        )
+        queue_state = {
+            "status", "attempts", "next_attempt_at", "lease_token", "last_processing_date"
+        }
+        self.assertEqual(
+            self._rows(self.source, OrderQueue, queue_state),
+            self._rows(self.target, OrderQueue, queue_state),
+        )
+        with self.target.get_session("active") as session:
+            self.assertEqual(
+                {"item0": "hotkey0", "item1": "hotkey1", "item2": "hotkey2"},
+                dict(
+                    session.execute(
+                        select(MinerAssignment.unique_id, MinerAssignment.hotkey)
+                    ).all()
+                ),
+            )
+            watermark = delta.get_watermark(session, "peer", "bitads_data")
+        self.assertEqual(NOW, watermark.updated_at)
+
+    def test_catch_up_twice_then_idempotent(self) -> None:
+        self._catch_up()
+        expected = self._rows(self.target, BitAdsData)
+
+        self._catch_up()
+
+        self.assertEqual(expected, self._rows(self.target, BitAdsData))
+
+    def test_apply_older_batch_then_newer_local_row_kept(self) -> None:
+        with self.source.get_session("active") as session:
+            batch = delta.export_rows(session, "bitads_data", limit=100)
+        with self.target.get_session("active") as session:
+            delta.apply_batch(session, batch)
+            row = session.get(BitAdsData, "id0")
+            row.sales = 1000
+            row.updated_at = NOW + timedelta(minutes=1)
+
+        with self.target.get_session("active") as session:
+            delta.apply_batch(session, batch)
+
+        with self.target.get_session("active") as session:
+            self.assertEqual(1000, session.get(BitAdsData, "id0").sales)
+
+    def test_apply_newer_batch_then_local_sales_kept(self) -> None:
+        with self.target.get_session("active") as session:
+            session.add(
+                BitAdsData(
+                    id="id0",
+                    user_agent="local",
+                    ip_address="127.0.0.1",
+                    is_unique=True,
+                    created_at=NOW,
+                    updated_at=NOW - timedelta(days=1),
+                    campaign_id="campaign",
+                    sales_status=SalesStatus.NEW,
+                    sales=0,
+                    sale_amount=0.0,
+                )
+            )
+            session.add(
+                MinerAssignment(
+                    unique_id="item0", hotkey="local", updated_at=NOW - timedelta(days=1)
+                )
+            )
+
+        self._catch_up()
+
+        with self.target.get_session("active") as session:
+            row = session.get(BitAdsData, "id0")
+            self.assertEqual(
+                ("agent", NOW, SalesStatus.NEW, 0, 0.0, None),
+                (
+                    row.user_agent,
+                    row.updated_at,
+                    row.sales_status,
+                    row.sales,
+                    row.sale_amount,
+                    row.order_info,
+                ),
+            )
+            self.assertEqual("local", session.get(MinerAssignment, "item0").hotkey)
+            self.assertEqual(1, session.get(BitAdsData, "id1").sales)
+
+    def test_catch_up_then_local_queue_state_kept(self) -> None:
+        with self.target.get_session("active") as session:
+            session.add(
+                OrderQueue(
+                    id="order0",
+                    order_info=make_order_details(random.Random(1), "", "", NOW),
+                    created_at=NOW - timedelta(days=1),
+                    updated_at=NOW - timedelta(days=1),
+                    status=OrderQueueStatus.PENDING,
+                    attempts=1,
+                    next_attempt_at=NOW + timedelta(minutes=5),
+                    lease_token="local",
+                )
+            )
+
+        self._catch_up()
+
+        with self.target.get_session("active") as session:
+            leased = session.get(OrderQueue, "order0")
+            self.assertEqual(NOW, leased.updated_at)
+            self.assertEqual(
+                (OrderQueueStatus.PENDING, 1, "local"),
+                (leased.status, leased.attempts, leased.lease_token),
+            )
+            received = session.get(OrderQueue, "order1")
+            self.assertEqual(
+                (OrderQueueStatus.PENDING, 0, None),
+                (received.status, received.attempts, received.lease_token),
+            )
+            self.assertIsNotNone(received.next_attempt_at)
+
+    def test_export_then_recent_rows_left_for_next_batch(self) -> None:
+        with self.source.get_session("active") as session:
+            session.get(MinerAssignment, "item0").hotkey = "changed"
+
+        with self.source.get_session("active") as session:
+            batch = delta.export_rows(session, "miner_assignment")
+
+        self.assertEqual(["item1", "item2"], [row[0] for row in batch.rows])
+
+
+if __name__ == "__main__":
+    unittest.main()
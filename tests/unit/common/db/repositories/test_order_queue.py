@@ -0,0 +1,194 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from parameterized import parameterized
+from sqlalchemy import text
+
+from common.db.database import DatabaseManager
+from common.db.repositories import order_queue
+from common.schemas.sales import OrderQueueStatus
+from common.validator.db.entities.active import Base as VABase
+from tests.benchmarks.data import make_order_details
+
+LEASE = timedelta(minutes=5)
+BACKOFF = dict(
+    max_attempts=3,
+    retry_backoff=timedelta(minutes=1),
+    max_backoff=timedelta(minutes=3),
+)
+
+
+class TestOrderQueueRepository(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "validator",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        rnd = random.Random(3)
+        with self.database_manager.get_session("active") as session:
+            for i in range(5):
+                order_queue.add_data(
+                    session,
+                    f"order{i}",
+                    make_order_details(rnd, "127.0.0.1", "agent", datetime.utcnow()),
+                )
+
+    def tearDown(self) -> None:
+        self.database_manager.active_db.dispose()
+        self.database_manager.main_db.dispose()
+        self.directory.cleanup()
+
+    def _claim(self, limit: int = 10, now: datetime = None):
+        with self.database_manager.get_session("active") as session:
+            return order_queue.claim(session, limit, LEASE, now)
+
+    def _complete(self, items, status: OrderQueueStatus, now: datetime = None):
+        with self.database_manager.get_session("active") as session:
+            return [
+                order_queue.complete(
+                    session, item.id, item.lease_token, status, now=now, **BACKOFF
+                )
+                for item in items
+            ]
+
+    def test_claim_leases_rows_once(self) -> None:
+        first = self._claim(3)
+        second = self._claim()
+
+        self.assertEqual(3, len(first))
+        self.assertEqual(2, len(second))
+        self.assertFalse({item.id for item in first} & {item.id for item in second})
+        self.assertEqual([1] * 3, [item.attempts for item in first])
+        self.assertEqual([], self._claim())
+
+    def test_claim_returns_rows_of_expired_leases(self) -> None:
+        first = self._claim()
+
+        again = self._claim(now=datetime.utcnow() + LEASE * 2)
+
+        self.assertEqual({item.id for item in first}, {item.id for item in again})
+        self.assertEqual({2}, {item.attempts for item in again})
+        # the lease of the first processor is gone
+        self.assertEqual([None] * 5, self._complete(first, OrderQueueStatus.PROCESSED))
+
+    def test_processed_rows_leave_the_queue(self) -> None:
+        items = self._claim()
+
+        statuses = self._complete(items, OrderQueueStatus.PROCESSED)
+
+        self.assertEqual([OrderQueueStatus.PROCESSED] * 5, statuses)
+        self.assertEqual([], self._claim(now=datetime.utcnow() + timedelta(days=30)))
+
+    @parameterized.expand(
+        [
+            (OrderQueueStatus.VISIT_NOT_FOUND,),
+            (OrderQueueStatus.ERROR,),
+        ]
+    )
+    def test_failed_rows_back_off_then_dead_letter(self, status) -> None:
+        now = datetime.utcnow()
+        delays = []
+        for attempt in range(BACKOFF["max_attempts"]):
+            items = self._claim(now=now)
+            self.assertEqual(5, len(items))
+            self.assertEqual([], self._claim(now=now))
+            statuses = self._complete(items, status, now)
+            with self.database_manager.get_session("active") as session:
+                item = order_queue.get_by_id(session, items[0].id)
+            if attempt < BACKOFF["max_attempts"] - 1:
+                self.assertEqual([status] * 5, statuses)
+                delays.append(item.next_attempt_at - now)
+                now = item.next_attempt_at
+            else:
+                self.assertEqual([OrderQueueStatus.DEAD_LETTER] * 5, statuses)
+                self.assertIsNone(item.next_attempt_at)
+
+        self.assertEqual([timedelta(minutes=1), timedelta(minutes=2)], delays)
+        self.assertEqual([], self._claim(now=now + timedelta(days=30)))
+
+    @parameterized.expand(
+        [
+            (1, timedelta(minutes=1)),
+            (2, timedelta(minutes=2)),
+            (3, timedelta(minutes=3)),
+            (10, timedelta(minutes=3)),
+        ]
+    )
+    def test_get_backoff(self, attempts, expected) -> None:
+        self.assertEqual(
+            expected,
+            order_queue.get_backoff(
+                attempts, BACKOFF["retry_backoff"], BACKOFF["max_backoff"]
+            ),
+        )
+
+    def test_update_data_resets_attempts_and_drops_the_lease(self) -> None:
+        items = self._claim(1)
+        self._complete(self._claim(), OrderQueueStatus.PROCESSED)
+        with self.database_manager.get_session("active") as session:
+            order_queue.update_data(session, items[0].id, items[0].order_info)
+
+        statuses = self._complete(items[:1], OrderQueueStatus.PROCESSED)
+
+        self.assertEqual([None], statuses)
+        # still held until the lease of the running processor expires
+        self.assertEqual([], self._claim())
+        again = self._claim(now=datetime.utcnow() + LEASE * 2)
+        self.assertEqual([items[0].id], [item.id for item in again])
+        self.assertEqual(1, again[0].attempts)
+
+    def test_requeue_makes_dead_letters_due(self) -> None:
+        now = datetime.utcnow()
+        for _ in range(BACKOFF["max_attempts"]):
+            self._complete(self._claim(now=now), OrderQueueStatus.ERROR, now)
+            now += BACKOFF["max_backoff"]
+        with self.database_manager.get_session("active") as session:
+            self.assertEqual(
+                {OrderQueueStatus.DEAD_LETTER: 5}, order_queue.count_by_status(session)
+            )
+            order_queue.requeue(session, ["order0", "order1"])
+
+        items = self._claim()
+
+        self.assertEqual(["order0", "order1"], sorted(item.id for item in items))
+        self.assertEqual({1}, {item.attempts for item in items})
+
+    def test_get_stats(self) -> None:
+        now = datetime.utcnow() + timedelta(seconds=30)
+        self._complete(self._claim(2), OrderQueueStatus.PROCESSED)
+        self._claim(1)
+
+        with self.database_manager.get_session("active") as session:
+            stats = order_queue.get_stats(session, now)
+            depth = order_queue.count_by_status(session)
+
+        self.assertEqual(2, stats.ready)
+        self.assertEqual(1, stats.leased)
+        self.assertGreaterEqual(stats.oldest_ready_seconds, 30)
+        self.assertEqual(
+            {OrderQueueStatus.PENDING: 3, OrderQueueStatus.PROCESSED: 2}, depth
+        )
+
+    def test_claim_uses_next_attempt_at_index(self) -> None:
+        with self.database_manager.get_session("active") as session:
+            plan = session.execute(
+                text(
+                    "EXPLAIN QUERY PLAN SELECT id FROM order_queue "
+                    "WHERE next_attempt_at <= :now ORDER BY next_attempt_at LIMIT 10"
+                ),
+                dict(now=datetime.utcnow()),
+            ).all()
+
+        self.assertIn("ix_order_queue_next_attempt_at", " ".join(row[-1] for row in plan))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+
+from parameterized import parameterized
+from sqlalchemy import inspect, select
+
+from common.db.database import DatabaseManager
+from common.db.partitions import partition_key
+from common.miner.db.entities.active import Base as MinerBase, VisitorActivity
+from common.services.migration.miner import MinerMigrationService
+from common.services.migration.validator import ValidatorMigrationService
+from common.validator.db.entities.active import (
+    Base as ValidatorBase,
+    BitAdsData,
+    OrderQueue,
+)
+
+CREATED_AT = [
+    datetime(2024, 11, 30, 23, 59),
+    datetime(2024, 12, 1),
+    datetime(2024, 12, 15),
+    datetime(2025, 1, 2),
+]
+
+
+def _bitads_data(id_: str, created_at: datetime) -> BitAdsData:
+    return BitAdsData(
+        id=id_,
+        user_agent="agent",
+        ip_address="127.0.0.1",
+        is_unique=True,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+def _select_ids(session):
+    return list(
+        session.scalars(select(BitAdsData.id).order_by(BitAdsData.created_at))
+    )
+
+
+class TestHistoryPartitions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = self._create_database_manager("validator")
+        ValidatorBase.metadata.create_all(self.database_manager.active_db)
+        ValidatorBase.metadata.create_all(self.database_manager.history_db)
+
+    def _create_database_manager(self, neuron_type: str) -> DatabaseManager:
+        return DatabaseManager(
+            neuron_type,
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+
+    def tearDown(self) -> None:
+        self.database_manager.history_partitions.dispose()
+        for engine in (
+            self.database_manager.active_db,
+            self.database_manager.history_db,
+            self.database_manager.main_db,
+        ):
+            engine.dispose()
+        self.directory.cleanup()
+
+    def _migrate(self) -> None:
+        with self.database_manager.get_session("active") as session:
+            for i, created_at in enumerate(CREATED_AT):
+                session.add(_bitads_data(f"id{i}", created_at))
+        asyncio.run(
+            ValidatorMigrationService(self.database_manager).migrate(
+                datetime(2025, 2, 1)
+            )
+        )
+
+    @parameterized.expand(
+        [
+            (date(2024, 1, 31), "2024_01"),
+            (datetime(2024, 12, 1, 0, 0), "2024_12"),
+        ]
+    )
+    def test_partition_key(self, value, expected) -> None:
+        self.assertEqual(expected, partition_key(value))
+
+    def test_migrate_then_rows_in_monthly_partitions(self) -> None:
+        self._migrate()
+        partitions = self.database_manager.history_partitions
+
+        self.assertEqual(["2024_11", "2024_12", "2025_01"], partitions.list_partitions())
+        with partitions.get_session("2024_12") as session:
+            self.assertEqual(["id1", "id2"], _select_ids(session))
+        with self.database_manager.get_session("active") as session:
+            self.assertEqual([], _select_ids(session))
+
+    def test_migrate_twice_then_no_duplicates(self) -> None:
+        self._migrate()
+        self._migrate()
+
+        ids = self.database_manager.history_partitions.query(_select_ids)
+
+        self.assertEqual(["id0", "id1", "id2", "id3"], ids)
+
+    @parameterized.expand(
+        [
+            (None, None, None, ["legacy", "id0", "id1", "id2", "id3"]),
+            (datetime(2024, 12, 1), None, None, ["legacy", "id1", "id2", "id3"]),
+            (datetime(2024, 12, 1), datetime(2024, 12, 31), None, ["legacy", "id1", "id2"]),
+            (None, None, 2, ["legacy", "id0"]),
+        ]
+    )
+    def test_query_then_partitions_merged(
+        self, created_at_from, created_at_to, limit, expected
+    ) -> None:
+        with self.database_manager.get_session("history") as session:
+            session.add(_bitads_data("legacy", datetime(2024, 1, 1)))
+        self._migrate()
+
+        ids = self.database_manager.history_partitions.query(
+            _select_ids, created_at_from, created_at_to, limit=limit
+        )
+
+        self.assertEqual(expected, ids)
+
+    def test_query_with_order_by_then_sorted_across_partitions(self) -> None:
+        self._migrate()
+
+        ids = self.database_manager.history_partitions.query(
+            _select_ids, order_by=lambda id_: id_, include_legacy=False
+        )
+
+        self.assertEqual(sorted(ids), ids)
+
+    def test_drop_and_archive_then_files_moved(self) -> None:
+        self._migrate()
+        partitions = self.database_manager.history_partitions
+        archive = os.path.join(self.directory.name, "archive")
+
+        partitions.drop("2024_11")
+        archived = partitions.archive("2024_12", archive)
+
+        self.assertEqual(["2025_01"], partitions.list_partitions())
+        self.assertTrue(os.path.isfile(archived))
+
+    def test_migrate_composite_primary_key(self) -> None:
+        database_manager = self._create_database_manager("miner")
+        MinerBase.metadata.create_all(database_manager.active_db)
+        with database_manager.get_session("active") as session:
+            session.add(VisitorActivity(ip="1.1.1.1", created_at=date(2024, 12, 1)))
+            session.add(VisitorActivity(ip="1.1.1.1", created_at=date(2024, 12, 2)))
+
+        asyncio.run(MinerMigrationService(database_manager).migrate(datetime(2025, 1, 1)))
+
+        partitions = database_manager.history_partitions
+        with partitions.get_session("2024_12") as session:
+            self.assertEqual(2, session.query(VisitorActivity).count())
+        partitions.dispose()
+        for engine in (
+            database_manager.active_db,
+            database_manager.history_db,
+            database_manager.main_db,
+        ):
+            engine.dispose()
+
+    def test_get_session_then_new_columns_added_to_existing_partition(self) -> None:
+        partitions = self.database_manager.history_partitions
+        engine = partitions.get_engine("2024_12")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "CREATE TABLE order_queue (id VARCHAR PRIMARY KEY, status VARCHAR)"
+            )
+
+        with partitions.get_session("2024_12", OrderQueue.__table__):
+            pass
+
+        columns = {column["name"] for column in inspect(engine).get_columns("order_queue")}
+        self.assertEqual({column.name for column in OrderQueue.__table__.columns}, columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from common.db.database import DatabaseManager
+from common.db.entities import Base as MBase
+from common.db.profiler import QueryProfiler, fingerprint
+from common.db.repositories.miner_ping import add_miner_ping, get_miner_pings
+from common.validator.db.entities.active import Base as VABase
+
+
+class TestFingerprint(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("SELECT * FROM t WHERE id = 5", "SELECT * FROM t WHERE id = ?"),
+            ("SELECT * FROM t WHERE name = 'a''b'", "SELECT * FROM t WHERE name = ?"),
+            ("SELECT * FROM t WHERE id IN (?, ?, ?)", "SELECT * FROM t WHERE id IN (?...)"),
+            ("SELECT *\n  FROM table1", "SELECT * FROM table1"),
+        ]
+    )
+    def test_fingerprint(self, statement, expected) -> None:
+        self.assertEqual(expected, fingerprint(statement))
+
+
+class TestQueryProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "test_neuron",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        MBase.metadata.create_all(self.database_manager.main_db)
+        self.profiler = QueryProfiler(slow_query_seconds=0)
+        self.profiler.attach(self.database_manager)
+
+    def tearDown(self) -> None:
+        for engine in (
+            self.database_manager.active_db,
+            self.database_manager.history_db,
+            self.database_manager.main_db,
+        ):
+            engine.dispose()
+        self.directory.cleanup()
+
+    def _by_caller(self):
+        return {q["caller"]: q for q in self.profiler.snapshot()["queries"]}
+
+    def test_repository_calls_then_attributed_with_rows(self) -> None:
+        with self.database_manager.get_session("active") as session:
+            for block in range(3):
+                add_miner_ping(session, "hotkey", block)
+        with self.database_manager.get_session("active") as session:
+            get_miner_pings(session, "hotkey", None, None)
+            get_miner_pings(session, "hotkey", None, None)
+
+        queries = self._by_caller()
+
+        self.assertEqual(2, queries["miner_ping.get_miner_pings"]["count"])
+        self.assertEqual(6, queries["miner_ping.get_miner_pings"]["rows"])
+        self.assertEqual("active", queries["miner_ping.get_miner_pings"]["db_type"])
+        self.assertEqual(3, queries["miner_ping.add_miner_ping"]["count"])
+
+    def test_slow_queries_then_plan_captured(self) -> None:
+        with self.database_manager.get_session("active") as session:
+            get_miner_pings(session, "hotkey", None, None)
+
+        slow_queries = self.profiler.snapshot()["slow_queries"]
+
+        self.assertTrue(slow_queries)
+        self.assertTrue(all(q["plan"] for q in slow_queries))
+
+    def test_reset_then_empty(self) -> None:
+        with self.database_manager.get_session("active") as session:
+            get_miner_pings(session, "hotkey", None, None)
+
+        self.profiler.reset()
+
+        snapshot = self.profiler.snapshot()
+        self.assertEqual([], snapshot["queries"])
+        self.assertEqual([], snapshot["slow_queries"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from common.db.database import DatabaseManager
+from common.miner.schemas import VisitorSchema
+from common.seen_ids import SeenIds
+from common.services.bitads.impl import BitAdsServiceImpl
+from common.validator.db.entities.active import Base as VABase, BitAdsData
+
+
+def _visit(id_: str) -> VisitorSchema:
+    return VisitorSchema(
+        id=id_,
+        ip_address="127.0.0.1",
+        user_agent="agent",
+        campaign_id="campaign",
+        campaign_item="item",
+        miner_hotkey="miner",
+        miner_block=1,
+        at=False,
+        is_unique=True,
+        created_at=datetime(2024, 11, 1),
+    )
+
+
+class TestAddByVisits(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "test_neuron",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        self.path = os.path.join(self.directory.name, "seen_visits.bin")
+        self.service = BitAdsServiceImpl(
+            self.database_manager, seen_visits=SeenIds(self.path, capacity=100)
+        )
+
+    def tearDown(self) -> None:
+        self.database_manager.active_db.dispose()
+        self.database_manager.main_db.dispose()
+        self.directory.cleanup()
+
+    def _stored_ids(self):
+        with self.database_manager.get_session("active") as session:
+            return set(session.scalars(select(BitAdsData.id)))
+
+    def _count(self) -> int:
+        with self.database_manager.get_session("active") as session:
+            return session.scalar(select(func.count()).select_from(BitAdsData))
+
+    def test_overlapping_pages_then_each_visit_stored_once(self) -> None:
+        asyncio.run(self.service.add_by_visits(map(_visit, ["a", "b", "c"])))
+        asyncio.run(self.service.add_by_visits(map(_visit, ["b", "c", "d", "d"])))
+
+        self.assertEqual({"a", "b", "c", "d"}, self._stored_ids())
+        self.assertEqual(4, self._count())
+
+    def test_restarted_then_known_visits_checked_against_database(self) -> None:
+        asyncio.run(self.service.add_by_visits(map(_visit, ["a", "b"])))
+        service = BitAdsServiceImpl(
+            self.database_manager, seen_visits=SeenIds(self.path, capacity=100)
+        )
+
+        asyncio.run(service.add_by_visits(map(_visit, ["a", "b", "c"])))
+
+        self.assertEqual({"a", "b", "c"}, self._stored_ids())
+
+    def test_database_restored_behind_filter_then_visits_stored_again(self) -> None:
+        asyncio.run(self.service.add_by_visits(map(_visit, ["a", "b"])))
+        with self.database_manager.get_session("active") as session:
+            session.query(BitAdsData).delete()
+        service = BitAdsServiceImpl(
+            self.database_manager, seen_visits=SeenIds(self.path, capacity=100)
+        )
+
+        asyncio.run(service.add_by_visits(map(_visit, ["a", "b"])))
+
+        self.assertEqual({"a", "b"}, self._stored_ids())
+
+    def test_filter_forgot_stored_visits_then_retried_with_database_check(
+        self,
+    ) -> None:
+        asyncio.run(self.service.add_by_visits(map(_visit, ["a", "b"])))
+        service = BitAdsServiceImpl(
+            self.database_manager, seen_visits=SeenIds(capacity=100)
+        )
+
+        with self.assertLogs("common.services.bitads.impl", "WARNING"):
+            asyncio.run(service.add_by_visits(map(_visit, ["a", "c"])))
+
+        self.assertEqual({"a", "b", "c"}, self._stored_ids())
+
+    def test_without_filter(self) -> None:
+        service = BitAdsServiceImpl(self.database_manager)
+
+        asyncio.run(service.add_by_visits(map(_visit, ["a", "b"])))
+        asyncio.run(service.add_by_visits(map(_visit, ["b", "c"])))
+
+        self.assertEqual({"a", "b", "c"}, self._stored_ids())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import unittest
+from datetime import timedelta
+from types import SimpleNamespace
+
+from parameterized import parameterized
+
+from common.services.metagraph.exceptions import MetagraphNotReady
+from common.services.metagraph.impl import BittensorMetagraphService
+
+
+def _metagraph(*hotkeys: str):
+    return SimpleNamespace(
+        hotkeys=list(hotkeys),
+        axons=[
+            SimpleNamespace(ip=f"10.0.0.{uid}", coldkey=f"coldkey{uid}")
+            for uid in range(len(hotkeys))
+        ],
+        total_stake=[float(uid * 100) for uid in range(len(hotkeys))],
+        validator_permit=[uid % 2 == 0 for uid in range(len(hotkeys))],
+    )
+
+
+class StubChain:
+    def __init__(self, *metagraphs):
+        self.metagraphs = list(metagraphs)
+        self.calls = 0
+        self.released = asyncio.Event()
+        self.released.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.released.wait()
+        if not self.metagraphs:
+            raise ConnectionError("subtensor unavailable")
+        return self.metagraphs.pop(0)
+
+
+class TestMetagraphService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.chain = StubChain(_metagraph("a", "b", "c"), _metagraph("c", "d"))
+        self.service = BittensorMetagraphService(
+            self.chain,
+            refresh_period=timedelta(minutes=5),
+            retry_period=timedelta(0),
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self.service.close()
+
+    async def test_before_first_refresh_then_not_ready(self) -> None:
+        with self.assertRaises(MetagraphNotReady):
+            await self.service.get_axon_data("a")
+        with self.assertRaises(MetagraphNotReady):
+            await self.service.get_hotkey_to_uid_json()
+
+    @parameterized.expand(
+        [
+            (("b",), dict(exists=True, stake=100.0)),
+            (("b", "10.0.0.1", "coldkey1"), dict(exists=True, stake=100.0)),
+            (("b", "10.0.0.2"), dict(exists=False)),
+            (("b", None, "coldkey2"), dict(exists=False)),
+            (("unknown",), dict(exists=False)),
+        ]
+    )
+    async def test_get_axon_data(self, args, expected) -> None:
+        await self.service.refresh()
+
+        self.assertEqual(expected, await self.service.get_axon_data(*args))
+
+    async def test_hotkey_to_uid_json(self) -> None:
+        await self.service.refresh()
+
+        self.assertEqual(
+            [dict(uid=0, hotkey="a"), dict(uid=1, hotkey="b"), dict(uid=2, hotkey="c")],
+            json.loads(await self.service.get_hotkey_to_uid_json()),
+        )
+
+    async def test_has_validator_permit(self) -> None:
+        await self.service.refresh()
+
+        self.assertEqual(
+            [True, False, True, False],
+            [
+                await self.service.has_validator_permit(hotkey)
+                for hotkey in ("a", "b", "c", "unknown")
+            ],
+        )
+
+    async def test_requests_during_refresh_then_served_from_previous_snapshot(
+        self,
+    ) -> None:
+        await self.service.refresh()
+        self.chain.released.clear()
+
+        refresh = asyncio.create_task(self.service.refresh())
+        await asyncio.sleep(0)
+        during = await asyncio.wait_for(self.service.get_axon_data("a"), timeout=1)
+        self.chain.released.set()
+        await refresh
+
+        self.assertEqual(dict(exists=True, stake=0.0), during)
+        self.assertEqual(dict(exists=False), await self.service.get_axon_data("a"))
+        self.assertEqual(
+            dict(exists=True, stake=100.0), await self.service.get_axon_data("d")
+        )
+
+    async def test_failed_refresh_then_previous_snapshot_kept(self) -> None:
+        await self.service.refresh()
+        await self.service.refresh()
+
+        with self.assertRaises(ConnectionError):
+            await self.service.refresh()
+
+        self.assertEqual(
+            dict(exists=True, stake=0.0), await self.service.get_axon_data("c")
+        )
+
+    async def test_start_then_refreshed_in_background(self) -> None:
+        await self.service.start()
+        for _ in range(100):
+            try:
+                data = await self.service.get_axon_data("c")
+                break
+            except MetagraphNotReady:
+                await asyncio.sleep(0.01)
+
+        self.assertEqual(dict(exists=True, stake=200.0), data)
+        self.assertEqual(1, self.chain.calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from fastapi import HTTPException
+from parameterized import parameterized
+
+from common.db.database import DatabaseManager
+from common.db.repositories.miner_ping import add_miner_ping
+from common.services.snapshot.impl import SnapshotServiceImpl
+from common.validator.db.entities.active import Base as VABase
+from proxies.apis.get_database import parse_range
+
+
+class TestSnapshotService(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "validator",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        VABase.metadata.create_all(self.database_manager.history_db)
+        with self.database_manager.get_session("active") as session:
+            for block in range(500):
+                add_miner_ping(session, f"hotkey{block}", block)
+        self.service = SnapshotServiceImpl(
+            self.database_manager,
+            os.path.join(self.directory.name, "snapshots"),
+            chunk_size=1024,
+        )
+
+    def tearDown(self) -> None:
+        self.database_manager.history_partitions.dispose()
+        for engine in (
+            self.database_manager.active_db,
+            self.database_manager.history_db,
+            self.database_manager.main_db,
+        ):
+            engine.dispose()
+        self.directory.cleanup()
+
+    def _read_snapshot(self, manifest) -> bytes:
+        with open(self.service.get_path(manifest), "rb") as file:
+            return file.read()
+
+    def test_create_snapshots_then_consistent_copy_with_checksums(self) -> None:
+        manifests = asyncio.run(self.service.create_snapshots())
+
+        self.assertEqual(["active", "history"], [m.db for m in manifests])
+        manifest = self.service.get_manifest("active")
+        data = self._read_snapshot(manifest)
+        self.assertEqual(manifest.size, len(data))
+        self.assertEqual(manifest.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(
+            manifest.chunks,
+            [
+                hashlib.sha256(data[i:i + 1024]).hexdigest()
+                for i in range(0, len(data), 1024)
+            ],
+        )
+        raw = gzip.decompress(data)
+        self.assertEqual(manifest.raw_sha256, hashlib.sha256(raw).hexdigest())
+        copy_path = os.path.join(self.directory.name, "copy.db")
+        with open(copy_path, "wb") as file:
+            file.write(raw)
+        connection = sqlite3.connect(copy_path)
+        try:
+            self.assertEqual(
+                500, connection.execute("SELECT count(*) FROM miner_pings").fetchone()[0]
+            )
+        finally:
+            connection.close()
+
+    def test_write_during_stepped_copy_then_not_blocked(self) -> None:
+        self.service.backup_pages = 1
+        self.service.backup_sleep = 0.05
+        path = self.database_manager.active_db.url.database
+
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(self.service.create_snapshot, "active")
+            time.sleep(0.05)
+            writer = sqlite3.connect(path, timeout=0.5)
+            try:
+                with writer:
+                    writer.execute(
+                        "INSERT INTO miner_pings (hot_key, block, created_at) "
+                        "VALUES ('late', 1, '2024-11-01 00:00:00')"
+                    )
+            finally:
+                writer.close()
+            manifest = future.result()
+
+        copy_path = os.path.join(self.directory.name, "copy.db")
+        with open(copy_path, "wb") as file:
+            file.write(gzip.decompress(self._read_snapshot(manifest)))
+        connection = sqlite3.connect(copy_path)
+        try:
+            self.assertEqual(
+                501, connection.execute("SELECT count(*) FROM miner_pings").fetchone()[0]
+            )
+        finally:
+            connection.close()
+
+    def test_restarts_over_cap_then_copied_in_one_step(self) -> None:
+        self.service.backup_pages = 1
+        self.service.max_backup_restarts = 0
+        path = self.database_manager.active_db.url.database
+        writes = []
+
+        def sleep(_) -> None:
+            # Every step is followed by a write, the stepped copy never ends
+            writer = sqlite3.connect(path)
+            try:
+                with writer:
+                    writer.execute(
+                        "INSERT INTO miner_pings (hot_key, block, created_at) "
+                        "VALUES ('late', 1, '2024-11-01 00:00:00')"
+                    )
+            finally:
+                writer.close()
+            writes.append(1)
+
+        with mock.patch("common.services.snapshot.impl.time.sleep", sleep):
+            with self.assertLogs("common.services.snapshot.impl", "WARNING"):
+                manifest = self.service.create_snapshot("active")
+
+        copy_path = os.path.join(self.directory.name, "copy.db")
+        with open(copy_path, "wb") as file:
+            file.write(gzip.decompress(self._read_snapshot(manifest)))
+        connection = sqlite3.connect(copy_path)
+        try:
+            self.assertEqual(
+                500 + len(writes),
+                connection.execute("SELECT count(*) FROM miner_pings").fetchone()[0],
+            )
+        finally:
+            connection.close()
+
+    def test_create_snapshot_twice_then_unchanged_database_skipped(self) -> None:
+        first = self.service.create_snapshot("active")
+        second = self.service.create_snapshot("active")
+
+        self.assertEqual(first.created_at, second.created_at)
+
+    def test_history_partitions_then_snapshotted(self) -> None:
+        with self.database_manager.history_partitions.get_session(
+            "2024_12", *VABase.metadata.sorted_tables
+        ):
+            pass
+
+        asyncio.run(self.service.create_snapshots())
+
+        self.assertIsNotNone(self.service.get_manifest("history_2024_12"))
+
+    @parameterized.expand(["../active", "unknown", "history_2024_13"])
+    def test_get_manifest_unknown_database_then_none(self, db) -> None:
+        asyncio.run(self.service.create_snapshots())
+
+        self.assertIsNone(self.service.get_manifest(db))
+
+
+class TestParseRange(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (None, None),
+            ("bytes=0-99", (0, 99)),
+            ("bytes=100-", (100, 999)),
+            ("bytes=-100", (900, 999)),
+            ("bytes=900-2000", (900, 999)),
+            ("bytes=0-1,5-6", None),
+            ("items=0-1", None),
+        ]
+    )
+    def test_parse_range(self, header, expected) -> None:
+        self.assertEqual(expected, parse_range(header, 1000))
+
+    @parameterized.expand(["bytes=1000-", "bytes=5-1"])
+    def test_parse_range_not_satisfiable_then_416(self, header) -> None:
+        with self.assertRaises(HTTPException) as context:
+            parse_range(header, 1000)
+
+        self.assertEqual(416, context.exception.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
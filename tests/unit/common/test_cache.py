@@ -0,0 +1,172 @@
+import asyncio
+import unittest
+from datetime import timedelta
+
+from common import metrics
+from common.cache import AsyncTTLCache, cached
+
+
+class Loader:
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self, value=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ValueError("subtensor unavailable")
+        return value if value is not None else self.calls
+
+
+class Service:
+    def __init__(self, name: str):
+        self.name = name
+        self.loads = []
+
+    @cached(ttl=timedelta(minutes=5))
+    async def lookup(self, key: str) -> str:
+        self.loads.append(key)
+        return f"{self.name}:{key}"
+
+
+class TestAsyncTTLCache(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_misses_then_one_load(self) -> None:
+        cache = AsyncTTLCache("test", ttl=timedelta(minutes=5))
+        load = Loader()
+
+        results = await asyncio.gather(*(cache.get("key", load) for _ in range(20)))
+
+        self.assertEqual([1] * 20, results)
+        self.assertEqual(1, load.calls)
+        self.assertEqual(20, cache.misses)
+        self.assertEqual(1, await cache.get("key", load))
+        self.assertEqual(1, cache.hits)
+
+    async def test_failed_load_then_raised_to_every_caller_and_not_cached(self) -> None:
+        cache = AsyncTTLCache("test", ttl=timedelta(minutes=5))
+        load = Loader()
+        load.fail = True
+
+        results = await asyncio.gather(
+            *(cache.get("key", load) for _ in range(3)), return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(1, load.calls)
+        load.fail = False
+        self.assertEqual(2, await cache.get("key", load))
+
+    async def test_expired_value_then_served_stale_and_refreshed(self) -> None:
+        cache = AsyncTTLCache(
+            "test", ttl=timedelta(0), stale_ttl=timedelta(minutes=5)
+        )
+        load = Loader()
+        self.assertEqual(1, await cache.get("key", load))
+
+        stale = await asyncio.gather(*(cache.get("key", load) for _ in range(5)))
+        await asyncio.sleep(load.delay * 5)
+
+        self.assertEqual([1] * 5, stale)
+        self.assertEqual(5, cache.stale_hits)
+        self.assertEqual(2, load.calls)
+        self.assertEqual(2, await cache.get("key", load))
+
+    async def test_failed_refresh_then_stale_value_kept(self) -> None:
+        cache = AsyncTTLCache(
+            "test", ttl=timedelta(0), stale_ttl=timedelta(minutes=5)
+        )
+        load = Loader()
+        await cache.get("key", load)
+        load.fail = True
+
+        with self.assertLogs("common.cache", "WARNING"):
+            self.assertEqual(1, await cache.get("key", load))
+            await asyncio.sleep(load.delay * 5)
+
+        self.assertEqual(1, await cache.get("key", load))
+
+    async def test_expired_beyond_stale_ttl_then_loaded(self) -> None:
+        cache = AsyncTTLCache("test", ttl=timedelta(0))
+        load = Loader()
+
+        self.assertEqual([1, 2], [await cache.get("key", load) for _ in range(2)])
+
+    async def test_least_recently_used_key_evicted(self) -> None:
+        cache = AsyncTTLCache("test", ttl=timedelta(minutes=5), max_size=2)
+        load = Loader(delay=0)
+        for key in ("a", "b", "a", "c"):
+            await cache.get(key, lambda: load(key))
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual("a", await cache.get("a", lambda: load("new")))
+        self.assertEqual("new", await cache.get("b", lambda: load("new")))
+
+    async def test_counts_recorded_in_metrics(self) -> None:
+        cache = AsyncTTLCache("metrics_test", ttl=timedelta(minutes=5))
+        load = Loader(delay=0)
+
+        for _ in range(3):
+            await cache.get("key", load)
+
+        self.assertEqual(
+            2, metrics.CACHE_REQUESTS.get(cache="metrics_test", result="hit")
+        )
+        self.assertEqual(
+            1, metrics.CACHE_REQUESTS.get(cache="metrics_test", result="miss")
+        )
+
+
+class TestCached(unittest.IsolatedAsyncioTestCase):
+    async def test_method_then_cached_per_instance(self) -> None:
+        first, second = Service("first"), Service("second")
+
+        results = [
+            await first.lookup("a"),
+            await first.lookup("a"),
+            await first.lookup("b"),
+            await second.lookup("a"),
+        ]
+
+        self.assertEqual(["first:a", "first:a", "first:b", "second:a"], results)
+        self.assertEqual(["a", "b"], first.loads)
+        self.assertEqual(["a"], second.loads)
+
+    async def test_cache_cleared_then_loaded_again(self) -> None:
+        service = Service("service")
+        await service.lookup("a")
+
+        service.lookup.cache.clear()
+        await service.lookup("a")
+
+        self.assertEqual(["a", "a"], service.loads)
+
+    async def test_cleared_during_load_then_loaded_value_not_cached(self) -> None:
+        cache = AsyncTTLCache("test", ttl=timedelta(minutes=5))
+        load = Loader()
+
+        in_flight = asyncio.ensure_future(cache.get("key", load))
+        await asyncio.sleep(0)
+        cache.clear()
+
+        self.assertEqual(1, await in_flight)
+        self.assertEqual(2, await cache.get("key", load))
+        self.assertEqual(2, await cache.get("key", load))
+
+    async def test_function_with_key(self) -> None:
+        load = Loader(delay=0)
+
+        @cached(ttl=timedelta(minutes=5), key=lambda value, **_: value)
+        async def lookup(value, trace_id=None):
+            return await load(value)
+
+        await lookup("a", trace_id=1)
+        await lookup("a", trace_id=2)
+
+        self.assertEqual(1, load.calls)
+        self.assertEqual(1, lookup.cache.hits)
+
+
+if __name__ == "__main__":
+    unittest.main()
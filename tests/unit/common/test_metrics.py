@@ -0,0 +1,103 @@
+import unittest
+import urllib.request
+from types import SimpleNamespace
+
+from parameterized import parameterized
+
+from common.metrics import (
+    CONTENT_TYPE,
+    Registry,
+    observe_dendrite_responses,
+    start_http_exporter,
+    DENDRITE_FAILURES,
+    DENDRITE_REQUEST_SECONDS,
+)
+
+
+class SyncVisitsStub(SimpleNamespace):
+    pass
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = Registry()
+
+    def test_counter_render_then_prometheus_text(self) -> None:
+        counter = self.registry.counter("requests_total", "Requests.", ("route",))
+        counter.inc(route="/a")
+        counter.inc(2, route="/a")
+
+        self.assertEqual(
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{route="/a"} 3\n',
+            self.registry.render(),
+        )
+
+    def test_histogram_observe_then_cumulative_buckets(self) -> None:
+        histogram = self.registry.histogram("latency", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        lines = self.registry.render().splitlines()
+
+        self.assertIn('latency_bucket{le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{le="1.0"} 2', lines)
+        self.assertIn('latency_bucket{le="+Inf"} 3', lines)
+        self.assertIn("latency_count 3", lines)
+        self.assertEqual(3, histogram.get_count())
+        self.assertAlmostEqual(5.55, histogram.get_sum())
+
+    def test_gauge_set_and_dec(self) -> None:
+        gauge = self.registry.gauge("depth", "Depth.", ("status",))
+        gauge.set(5, status="PENDING")
+        gauge.dec(2, status="PENDING")
+
+        self.assertEqual(3, gauge.get(status="PENDING"))
+
+    @parameterized.expand([({},), ({"route": "/a", "method": "GET"},), ({"other": "x"},)])
+    def test_labels_mismatch_then_value_error(self, labels) -> None:
+        counter = self.registry.counter("requests_total", "Requests.", ("route",))
+
+        with self.assertRaises(ValueError):
+            counter.inc(**labels)
+
+    def test_register_twice_then_value_error(self) -> None:
+        self.registry.counter("requests_total", "Requests.")
+
+        with self.assertRaises(ValueError):
+            self.registry.counter("requests_total", "Requests.")
+
+    def test_observe_dendrite_responses_then_failures_counted(self) -> None:
+        ok = SyncVisitsStub(dendrite=SimpleNamespace(process_time=0.2, status_code=200))
+        timed_out = SyncVisitsStub(
+            dendrite=SimpleNamespace(process_time=None, status_code=408)
+        )
+        count = DENDRITE_REQUEST_SECONDS.get_count(synapse="SyncVisitsStub")
+        failures = DENDRITE_FAILURES.get(synapse="SyncVisitsStub", status_code="408")
+
+        observe_dendrite_responses([ok, timed_out], timeout=12)
+
+        self.assertEqual(
+            count + 2, DENDRITE_REQUEST_SECONDS.get_count(synapse="SyncVisitsStub")
+        )
+        self.assertEqual(
+            failures + 1,
+            DENDRITE_FAILURES.get(synapse="SyncVisitsStub", status_code="408"),
+        )
+
+    def test_start_http_exporter_then_metrics_served(self) -> None:
+        self.registry.counter("requests_total", "Requests.").inc()
+        server = start_http_exporter(0, "127.0.0.1", self.registry)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                self.assertEqual(CONTENT_TYPE, response.headers["Content-Type"])
+                self.assertIn("requests_total 1", response.read().decode())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from datetime import datetime
+import unittest
+from unittest import mock
+from urllib.parse import urlsplit
+
+import bittensor as bt
+from parameterized import parameterized
+
+from common.clients.delta.client import DeltaClient
+from common.clients.snapshot.client import SnapshotClient
+from common.peer_auth import (
+    NONCE_HEADER,
+    TIMESTAMP_HEADER,
+    PeerAuthError,
+    PeerSigner,
+    PeerVerifier,
+)
+from common.schemas.delta import Watermark
+
+VALIDATOR = bt.Keypair.create_from_uri("//Alice")
+OTHER = bt.Keypair.create_from_uri("//Bob")
+
+
+class TestPeerAuth(unittest.TestCase):
+    def setUp(self) -> None:
+        async def is_permitted(hotkey: str) -> bool:
+            return hotkey == VALIDATOR.ss58_address
+
+        self.verifier = PeerVerifier(is_permitted)
+
+    def _verify(self, headers, path="/get_database", query="db=active", **kwargs):
+        return asyncio.run(
+            self.verifier.verify("GET", path, query, headers, **kwargs)
+        )
+
+    def test_signed_request_then_hotkey_returned(self) -> None:
+        headers = PeerSigner(VALIDATOR).get_headers("GET", "/get_database", "db=active")
+
+        self.assertEqual(VALIDATOR.ss58_address, self._verify(headers))
+
+    @parameterized.expand(
+        [
+            ("other_query", dict(query="db=history")),
+            ("other_path", dict(path="/delta/bitads_data")),
+            ("expired", dict(now=time.time() + 120)),
+        ]
+    )
+    def test_changed_request_then_rejected(self, _, request) -> None:
+        headers = PeerSigner(VALIDATOR).get_headers("GET", "/get_database", "db=active")
+
+        with self.assertRaises(PeerAuthError):
+            self._verify(headers, **request)
+
+    def test_unsigned_or_forged_request_then_rejected(self) -> None:
+        headers = PeerSigner(VALIDATOR).get_headers("GET", "/get_database", "db=active")
+
+        with self.assertRaises(PeerAuthError):
+            self._verify({})
+        with self.assertRaises(PeerAuthError):
+            self._verify({**headers, NONCE_HEADER: "other"})
+        with self.assertRaises(PeerAuthError):
+            self._verify({**headers, TIMESTAMP_HEADER: "not a time"})
+
+    def test_replayed_request_then_rejected(self) -> None:
+        headers = PeerSigner(VALIDATOR).get_headers("GET", "/get_database", "db=active")
+        self._verify(headers)
+
+        with self.assertRaises(PeerAuthError):
+            self._verify(headers)
+
+    def test_hotkey_without_permit_then_rejected(self) -> None:
+        headers = PeerSigner(OTHER).get_headers("GET", "/get_database", "db=active")
+
+        with self.assertRaises(PeerAuthError):
+            self._verify(headers)
+
+    def test_snapshot_client_request_then_verified_as_sent(self) -> None:
+        client = SnapshotClient("https://10.0.0.1", signer=PeerSigner(VALIDATOR))
+        response = mock.Mock(status_code=200)
+        response.json.return_value = []
+
+        with mock.patch.object(client._session, "get", return_value=response) as get:
+            client.get_manifests()
+            client._get("/get_database", params=dict(db="history_2024_12"))
+
+        for call in get.call_args_list:
+            url = urlsplit(call.args[0])
+            self.assertEqual(
+                VALIDATOR.ss58_address,
+                self._verify(call.kwargs["headers"], url.path, url.query),
+            )
+
+    def test_delta_client_request_then_verified_as_sent(self) -> None:
+        client = DeltaClient("https://10.0.0.1", signer=PeerSigner(VALIDATOR))
+        response = mock.Mock(status_code=200)
+        response.content = b'{"table": "bitads_data", "columns": [], "rows": []}'
+
+        with mock.patch.object(client._session, "get", return_value=response) as get:
+            client.get_batch(
+                "bitads_data", Watermark(updated_at=datetime(2024, 12, 1), id="id 0")
+            )
+
+        url = urlsplit(get.call_args.args[0])
+        self.assertEqual("/delta/bitads_data", url.path)
+        self.assertFalse(get.call_args.kwargs["verify"])
+        self.assertEqual(
+            VALIDATOR.ss58_address,
+            self._verify(get.call_args.kwargs["headers"], url.path, url.query),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
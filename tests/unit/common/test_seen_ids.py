@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from common.seen_ids import BloomFilter, SeenIds
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_added_ids_then_always_contained(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        ids = [f"visit{i}" for i in range(1000)]
+
+        for id_ in ids:
+            bloom.add(id_)
+
+        self.assertTrue(all(id_ in bloom for id_ in ids))
+        self.assertTrue(bloom.full)
+
+    def test_full_filter_then_error_rate_kept(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"visit{i}")
+
+        false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+
+        self.assertLess(false_positives, 300)
+
+
+class TestSeenIds(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "seen", "visits.bin")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_partition(self) -> None:
+        seen = SeenIds(capacity=100, recent_size=2)
+        seen.add(["a", "b", "c"])
+
+        new, maybe_seen = seen.partition(["b", "c", "d"])
+
+        self.assertEqual({"d"}, new)
+        self.assertEqual(set(), maybe_seen)
+        self.assertEqual((set(), {"a"}), seen.partition(["a"]))
+
+    def test_full_generations_then_oldest_forgotten(self) -> None:
+        seen = SeenIds(capacity=10, recent_size=0)
+        seen.add(f"old{i}" for i in range(10))
+        seen.add(f"middle{i}" for i in range(10))
+        seen.add(f"new{i}" for i in range(10))
+
+        new, maybe_seen = seen.partition(
+            [f"middle{i}" for i in range(10)] + [f"new{i}" for i in range(10)]
+        )
+
+        self.assertEqual(set(), new)
+        self.assertEqual(20, len(maybe_seen))
+        self.assertGreater(len(seen.partition(f"old{i}" for i in range(10))[0]), 5)
+
+    def test_saved_then_loaded_without_recent_ids(self) -> None:
+        seen = SeenIds(self.path, capacity=100)
+        seen.add(["a", "b"])
+        seen.save()
+
+        loaded = SeenIds(self.path, capacity=100)
+
+        self.assertEqual(({"c"}, {"a", "b"}), loaded.partition(["a", "b", "c"]))
+
+    @parameterized.expand(
+        [
+            ("other_capacity", lambda path: SeenIds(path, capacity=200)),
+            ("truncated", None),
+            ("garbage", b"not a bloom filter"),
+        ]
+    )
+    def test_file_of_another_format_then_ignored(self, _, other) -> None:
+        seen = SeenIds(self.path, capacity=100)
+        seen.add(["a"])
+        seen.save()
+        if callable(other):
+            other(self.path).save()
+        else:
+            with open(self.path, "rb") as file:
+                data = file.read()
+            with open(self.path, "wb") as file:
+                file.write(other if other is not None else data[:-1])
+
+        with self.assertLogs("common.seen_ids", "WARNING"):
+            loaded = SeenIds(self.path, capacity=100)
+
+        self.assertEqual(({"a"}, set()), loaded.partition(["a"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
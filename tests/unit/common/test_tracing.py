@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from common.tracing import FORMAT_CHROME, FORMAT_JSONL, FileExporter, Tracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = ListExporter()
+        self.tracer = Tracer(self.exporter, sample_rate=1.0)
+
+    def test_nested_spans_then_parent_linked(self) -> None:
+        with self.tracer.span("forward", step=1):
+            with self.tracer.span("sync_visits") as span:
+                span.set_attribute("rows", 10)
+
+        child, root = self.exporter.spans
+        self.assertEqual("sync_visits", child.name)
+        self.assertEqual(root.span_id, child.parent_id)
+        self.assertEqual(root.trace_id, child.trace_id)
+        self.assertIsNone(root.parent_id)
+        self.assertEqual({"rows": 10}, child.attributes)
+        self.assertGreaterEqual(root.duration, child.duration)
+
+    def test_spans_in_gathered_tasks_then_children_of_current_span(self) -> None:
+        async def call(hotkey):
+            with self.tracer.span("dendrite.call", hotkey=hotkey):
+                await asyncio.sleep(0)
+
+        async def forward():
+            with self.tracer.span("forward"):
+                await asyncio.gather(call("a"), call("b"))
+
+        asyncio.run(forward())
+
+        root = self.exporter.spans[-1]
+        children = self.exporter.spans[:-1]
+        self.assertEqual(2, len(children))
+        self.assertTrue(all(c.parent_id == root.span_id for c in children))
+
+    @parameterized.expand([(0.0, 0.0, 0), (0.5, 0.7, 0), (0.8, 0.7, 1), (1.0, 0.99, 1)])
+    def test_sampling(self, sample_rate, random_value, expected_traces) -> None:
+        tracer = Tracer(self.exporter, sample_rate, random_func=lambda: random_value)
+
+        with tracer.span("forward"):
+            with tracer.span("stage") as span:
+                span.set_attribute("rows", 1)
+                tracer.record("dendrite.call", 0.1)
+
+        self.assertEqual(expected_traces * 3, len(self.exporter.spans))
+
+    def test_exception_then_error_attribute(self) -> None:
+        with self.assertRaises(ValueError):
+            with self.tracer.span("forward"):
+                raise ValueError("boom")
+
+        self.assertIn("boom", self.exporter.spans[0].attributes["error"])
+
+    def test_record_then_finished_child_span(self) -> None:
+        with self.tracer.span("forward"):
+            self.tracer.record("dendrite.call", 0.25, hotkey="a")
+
+        child = self.exporter.spans[0]
+        self.assertEqual(0.25, child.duration)
+        self.assertEqual({"hotkey": "a"}, child.attributes)
+
+
+class TestFileExporter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.jsonl")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _trace(self, exporter: FileExporter, spans: int = 1) -> None:
+        tracer = Tracer(exporter, sample_rate=1.0)
+        for _ in range(spans):
+            with tracer.span("forward", step=1):
+                pass
+        exporter.close()
+
+    def test_jsonl_then_one_span_per_line(self) -> None:
+        self._trace(FileExporter(self.path, FORMAT_JSONL), spans=2)
+
+        with open(self.path) as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual(["forward", "forward"], [line["name"] for line in lines])
+        self.assertEqual({"step": 1}, lines[0]["attributes"])
+
+    def test_chrome_then_trace_event_array(self) -> None:
+        self._trace(FileExporter(self.path, FORMAT_CHROME))
+
+        with open(self.path) as file:
+            events = json.loads(file.read().rstrip().rstrip(",") + "]")
+        self.assertEqual("X", events[0]["ph"])
+        self.assertEqual(1, events[0]["args"]["step"])
+
+    def test_max_bytes_then_rotated(self) -> None:
+        self._trace(FileExporter(self.path, max_bytes=1, backup_count=2), spans=4)
+
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertTrue(os.path.exists(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+
+    def test_unknown_format_then_value_error(self) -> None:
+        with self.assertRaises(ValueError):
+            FileExporter(self.path, "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
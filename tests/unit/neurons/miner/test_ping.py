@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from typing import List
+
+from common.schemas.bitads import (
+    GetMinerUniqueIdResponse,
+    MinerUniqueLinkSchema,
+    UniqueIdData,
+)
+from neurons.miner.operations.ping import PingOperation
+
+HOTKEY = "miner_hotkey"
+
+
+class FakeUniqueLinkService:
+    def __init__(self, links: List[MinerUniqueLinkSchema]):
+        self.links = links
+        self.loads = 0
+
+    async def get_unique_links_for_hotkey(self, hotkey: str):
+        self.loads += 1
+        return list(self.links)
+
+    async def add_unique_link(self, link: MinerUniqueLinkSchema):
+        self.links.append(link)
+
+
+class FakeBitAdsClient:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_miner_unique_id(self, campaign_id: str):
+        with self.lock:
+            self.calls.append(campaign_id)
+        time.sleep(0.05)
+        return GetMinerUniqueIdResponse(
+            data=UniqueIdData(link=f"link_{campaign_id}", minerUniqueId=f"id_{campaign_id}")
+        )
+
+
+def _synapse(*campaign_ids: str):
+    return SimpleNamespace(
+        active_campaigns=[
+            SimpleNamespace(product_unique_id=campaign_id) for campaign_id in campaign_ids
+        ],
+        submitted_tasks=[],
+        result=None,
+        dendrite=SimpleNamespace(hotkey="validator_hotkey"),
+    )
+
+
+class TestPingOperation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.service = FakeUniqueLinkService(
+            [
+                MinerUniqueLinkSchema(
+                    id="id_known", campaign_id="known", hotkey=HOTKEY, link="link_known"
+                )
+            ]
+        )
+        self.client = FakeBitAdsClient()
+        self.operation = PingOperation(
+            metagraph=None,
+            config=None,
+            bit_ads_client=self.client,
+            unique_link_service=self.service,
+            wallet=SimpleNamespace(
+                get_hotkey=lambda: SimpleNamespace(ss58_address=HOTKEY)
+            ),
+        )
+
+    def test_known_link_then_sent_and_loaded_once(self) -> None:
+        async def run():
+            return [await self.operation.forward(_synapse("known")) for _ in range(3)]
+
+        synapses = asyncio.run(run())
+
+        self.assertEqual(1, self.service.loads)
+        for synapse in synapses:
+            self.assertEqual(
+                ["id_known"], [t.data.miner_unique_id for t in synapse.submitted_tasks]
+            )
+            self.assertTrue(synapse.result)
+
+    def test_concurrent_pings_then_one_request_per_campaign(self) -> None:
+        async def run():
+            synapses = await asyncio.gather(
+                *(self.operation.forward(_synapse("new", "known")) for _ in range(10))
+            )
+            await asyncio.gather(*self.operation._in_flight.values())
+            return synapses, await self.operation.forward(_synapse("new"))
+
+        synapses, later = asyncio.run(run())
+
+        self.assertEqual(["new"], self.client.calls)
+        self.assertEqual(2, len(self.service.links))
+        self.assertEqual(1, self.service.loads)
+        for synapse in synapses:
+            self.assertEqual(1, len(synapse.submitted_tasks))
+        self.assertEqual(
+            ["id_new"], [t.data.miner_unique_id for t in later.submitted_tasks]
+        )
+        self.assertEqual({}, self.operation._in_flight)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from common.db.database import DatabaseManager
+from common.miner.db.entities.active import Base as MinerBase
+from common.miner.schemas import VisitorSchema
+from common.services.miner.impl import MinerServiceImpl
+from neurons.miner.operations.sync_visits import SyncVisitsOperation
+
+START = datetime(2024, 12, 1)
+
+
+def _visit(i: int) -> VisitorSchema:
+    return VisitorSchema(
+        id=f"visit{i}",
+        ip_address="127.0.0.1",
+        user_agent="agent",
+        campaign_id="campaign",
+        campaign_item="item",
+        miner_hotkey="miner_hotkey",
+        miner_block=1,
+        at=False,
+        is_unique=True,
+        created_at=START + timedelta(minutes=i),
+    )
+
+
+def _synapse(offset=None, limit=2):
+    return SimpleNamespace(
+        offset=offset,
+        limit=limit,
+        visits=set(),
+        dendrite=SimpleNamespace(hotkey="validator_hotkey"),
+    )
+
+
+class TestSyncVisitsOperation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "miner",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        MinerBase.metadata.create_all(self.database_manager.active_db)
+        self.service = MinerServiceImpl(self.database_manager, timedelta(hours=1))
+        self.queries = 0
+        get_visits_after = self.service.get_visits_after
+
+        async def counting_get_visits_after(*args):
+            self.queries += 1
+            return await get_visits_after(*args)
+
+        self.service.get_visits_after = counting_get_visits_after
+        asyncio.run(self.service.add_visits({_visit(i) for i in range(3)}))
+
+    def tearDown(self) -> None:
+        for engine in (
+            self.database_manager.active_db,
+            self.database_manager.history_db,
+            self.database_manager.main_db,
+        ):
+            engine.dispose()
+        self.directory.cleanup()
+
+    def _operation(self, cache_ttl: float = 60) -> SyncVisitsOperation:
+        return SyncVisitsOperation(
+            metagraph=None,
+            config=None,
+            miner_service=self.service,
+            cache_ttl=cache_ttl,
+        )
+
+    def test_concurrent_requests_then_one_query_per_page(self) -> None:
+        operation = self._operation()
+
+        async def run():
+            return await asyncio.gather(
+                *(operation.forward(_synapse()) for _ in range(10)),
+                *(operation.forward(_synapse(START)) for _ in range(10)),
+            )
+
+        synapses = asyncio.run(run())
+
+        self.assertEqual(2, self.queries)
+        self.assertEqual({"visit0", "visit1"}, {v.id for v in synapses[0].visits})
+        self.assertEqual({"visit1", "visit2"}, {v.id for v in synapses[-1].visits})
+
+    def test_new_visit_then_pages_invalidated(self) -> None:
+        operation = self._operation()
+
+        async def run():
+            await operation.forward(_synapse(START + timedelta(minutes=1)))
+            await self.service.add_visits({_visit(3)})
+            return await operation.forward(_synapse(START + timedelta(minutes=1)))
+
+        synapse = asyncio.run(run())
+
+        self.assertEqual(2, self.queries)
+        self.assertEqual({"visit2", "visit3"}, {v.id for v in synapse.visits})
+
+    def test_expired_page_then_reloaded(self) -> None:
+        operation = self._operation(cache_ttl=0)
+
+        async def run():
+            await operation.forward(_synapse())
+            await operation.forward(_synapse())
+
+        asyncio.run(run())
+
+        self.assertEqual(2, self.queries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime
+
+from common.db.database import DatabaseManager
+from common.schemas.sales import OrderQueueSchema, OrderQueueStatus
+from common.schemas.shopify import SaleData
+from common.services.queue.exceptions import RefundNotExpectedWithoutOrder
+from common.services.queue.impl import OrderQueueServiceImpl
+from common.validator.db.entities.active import Base as VABase, OrderQueue
+from common.validator.schemas import Action
+from proxies.utils.batching import IdempotencyCache, MicroBatcher, OrderIngestion
+from tests.benchmarks.data import make_order_details
+
+
+class CountingOrderQueue(OrderQueueServiceImpl):
+    def __init__(self, database_manager):
+        super().__init__(database_manager)
+        self.batches = []
+
+    async def add_batch_to_queue(self, items):
+        self.batches.append(len(items))
+        return await super().add_batch_to_queue(items)
+
+
+class TestMicroBatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_items_then_flushed_together(self):
+        batches = []
+
+        async def flush(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(flush, max_size=100, max_delay=0.01)
+
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+        self.assertEqual([i * 2 for i in range(10)], results)
+        self.assertEqual([list(range(10))], batches)
+
+    async def test_full_batch_then_flushed_without_delay(self):
+        batches = []
+
+        async def flush(items):
+            batches.append(len(items))
+            return items
+
+        batcher = MicroBatcher(flush, max_size=4, max_delay=60)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(8))), timeout=1
+        )
+
+        self.assertEqual([4, 4], batches)
+
+    async def test_flush_fails_then_every_item_fails(self):
+        async def flush(items):
+            raise ValueError("database is locked")
+
+        batcher = MicroBatcher(flush, max_size=100, max_delay=0.001)
+
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+class TestIdempotencyCache(unittest.TestCase):
+    def test_oldest_key_dropped_when_full(self):
+        cache = IdempotencyCache(ttl=60, max_size=2)
+        for key in ("a", "b", "c"):
+            cache.add(key)
+
+        self.assertEqual([False, True, True], [key in cache for key in "abc"])
+
+    def test_expired_key_then_not_seen(self):
+        cache = IdempotencyCache(ttl=0, max_size=2)
+        cache.add("a")
+
+        self.assertNotIn("a", cache)
+        self.assertEqual(0, len(cache))
+
+
+class TestOrderIngestion(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_manager = DatabaseManager(
+            "validator",
+            "test",
+            db_url_template=os.path.join(
+                f"sqlite:///{self.directory.name}", "{name}_{network}.db"
+            ),
+        )
+        VABase.metadata.create_all(self.database_manager.active_db)
+        self.order_queue = CountingOrderQueue(self.database_manager)
+        self.ingestion = OrderIngestion(
+            self.order_queue,
+            max_size=100,
+            max_delay=0.01,
+            idempotency_ttl=60,
+            idempotency_size=1000,
+        )
+        self.rnd = random.Random(5)
+
+    async def asyncTearDown(self) -> None:
+        await self.ingestion.close()
+        self.database_manager.active_db.dispose()
+        self.database_manager.main_db.dispose()
+        self.directory.cleanup()
+
+    def _sale_data(self, action: Action = Action.sale) -> SaleData:
+        return SaleData(
+            order_hash="order",
+            visit_hash="visit",
+            order_details=make_order_details(
+                self.rnd, "127.0.0.1", "agent", datetime.utcnow()
+            ),
+            type=action,
+        )
+
+    def _rows(self):
+        with self.database_manager.get_session("active") as session:
+            return {
+                row.id: OrderQueueSchema.model_validate(row)
+                for row in session.query(OrderQueue).all()
+            }
+
+    async def test_concurrent_webhooks_then_one_batch(self):
+        sales = {f"order{i}": self._sale_data() for i in range(20)}
+
+        await asyncio.gather(
+            *(self.ingestion.add(id_, sale) for id_, sale in sales.items())
+        )
+
+        self.assertEqual([20], self.order_queue.batches)
+        rows = self._rows()
+        self.assertEqual(set(sales), set(rows))
+        for id_, sale in sales.items():
+            self.assertEqual(sale.order_details, rows[id_].order_info)
+
+    async def test_retried_webhook_then_skipped(self):
+        sale = self._sale_data()
+        await self.ingestion.add("order0", sale)
+
+        await self.ingestion.add("order0", sale)
+        await self.ingestion.add_many([("order0", sale)])
+
+        self.assertEqual([1], self.order_queue.batches)
+
+    async def test_refund_without_order_then_rejected(self):
+        with self.assertRaises(RefundNotExpectedWithoutOrder):
+            await self.ingestion.add("order0", self._sale_data(Action.refund))
+
+        self.assertEqual({}, self._rows())
+
+    async def test_sale_and_refund_in_one_batch_then_both_applied(self):
+        sale, refund = self._sale_data(), self._sale_data(Action.refund)
+
+        accepted = await self.ingestion.add_many(
+            [
+                ("order0", refund),
+                ("order0", sale),
+                ("order0", refund),
+                ("order1", refund),
+            ]
+        )
+
+        self.assertEqual([False, True, True, False], accepted)
+        row = self._rows()["order0"]
+        self.assertEqual(sale.order_details, row.order_info)
+        self.assertEqual(refund.order_details, row.refund_info)
+
+    async def test_refund_of_processed_order_then_requeued(self):
+        sale, refund = self._sale_data(), self._sale_data(Action.refund)
+        await self.ingestion.add("order0", sale)
+        items = await self.order_queue.get_data_to_process(10)
+        await self.order_queue.update_queue_status(
+            {"order0": OrderQueueStatus.PROCESSED}, items[0].lease_token
+        )
+
+        await self.ingestion.add("order0", refund)
+
+        row = self._rows()["order0"]
+        self.assertEqual(OrderQueueStatus.PENDING, row.status)
+        self.assertEqual(0, row.attempts)
+        self.assertEqual(sale.order_details, row.order_info)
+        self.assertEqual(refund.order_details, row.refund_info)
+        items = await self.order_queue.get_data_to_process(10)
+        self.assertEqual(["order0"], [item.id for item in items])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import bittensor as bt
+from fastapi import HTTPException
+from parameterized import parameterized
+from starlette.requests import Request
+
+from common.peer_auth import PeerSigner, PeerVerifier
+from common.services.metagraph.exceptions import MetagraphNotReady
+
+from proxies.apis.delta import router as delta_router
+from proxies.apis.get_database import router as database_router
+from proxies.utils.validation import validate_peer
+
+
+class TestSignedRoutes(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (database_router, "/get_database/manifest", validate_peer),
+            (database_router, "/get_database", validate_peer),
+            (delta_router, "/delta/{table}", validate_peer),
+        ]
+    )
+    def test_database_export_then_signature_required(
+        self, router, path, validate
+    ) -> None:
+        route = next(route for route in router.routes if route.path == path)
+
+        self.assertIn(
+            validate, [dependency.dependency for dependency in route.dependencies]
+        )
+
+
+    @parameterized.expand(
+        [
+            ("permitted", True, None),
+            ("not_permitted", False, 401),
+            ("metagraph_not_ready", None, 503),
+        ]
+    )
+    def test_validate_peer(self, _, permitted, status_code) -> None:
+        async def is_permitted(hotkey: str) -> bool:
+            if permitted is None:
+                raise MetagraphNotReady
+            return permitted
+
+        keypair = bt.Keypair.create_from_uri("//Alice")
+        headers = PeerSigner(keypair).get_headers("GET", "/get_database", "db=active")
+        app = SimpleNamespace(
+            state=SimpleNamespace(peer_verifier=PeerVerifier(is_permitted))
+        )
+        request = Request(
+            dict(
+                type="http",
+                method="GET",
+                path="/get_database",
+                query_string=b"db=active",
+                headers=[(k.lower().encode(), v.encode()) for k, v in headers.items()],
+                app=app,
+            )
+        )
+
+        if status_code is None:
+            self.assertEqual(keypair.ss58_address, asyncio.run(validate_peer(request)))
+        else:
+            with self.assertRaises(HTTPException) as raised:
+                asyncio.run(validate_peer(request))
+            self.assertEqual(status_code, raised.exception.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import stat
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from common.db.database import DatabaseManager
+from common.services.metagraph.impl import (
+    BittensorMetagraphService,
+    SharedMetagraphService,
+)
+from proxies.writer import (
+    RemoteWrites,
+    WriterClient,
+    WriterServer,
+    enable_wal,
+    set_read_only,
+)
+
+
+class FakeService:
+    def __init__(self):
+        self.items = []
+        self.running = 0
+        self.max_running = 0
+
+    async def add(self, item: str) -> int:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.001)
+        self.items.append(item)
+        self.running -= 1
+        return len(self.items)
+
+    async def fail(self) -> None:
+        raise ValueError("invalid item")
+
+    async def get_items(self):
+        return list(self.items)
+
+
+class TestWriter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "writer.sock")
+        self.service = FakeService()
+        self.server = WriterServer(dict(service=self.service), self.path)
+        await self.server.start()
+        self.clients = [WriterClient(self.path, timeout=5) for _ in range(3)]
+
+    async def asyncTearDown(self) -> None:
+        for client in self.clients:
+            await client.close()
+        await self.server.close()
+        self.directory.cleanup()
+
+    async def test_concurrent_calls_from_several_workers_then_run_one_at_a_time(self):
+        results = await asyncio.gather(
+            *(
+                client.call("service", "add", f"{i}-{j}")
+                for i, client in enumerate(self.clients)
+                for j in range(20)
+            )
+        )
+
+        self.assertEqual(list(range(1, 61)), sorted(results))
+        self.assertEqual(60, len(self.service.items))
+        self.assertEqual(1, self.service.max_running)
+
+    async def test_start_then_socket_private_to_user(self):
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    async def test_failed_call_then_exception_raised_in_worker(self):
+        with self.assertRaises(ValueError):
+            await self.clients[0].call("service", "fail")
+
+        self.assertEqual(1, await self.clients[0].call("service", "add", "item"))
+
+    async def test_remote_writes_then_reads_stay_local(self):
+        local = FakeService()
+        service = RemoteWrites(local, "service", self.clients[0], ["add"])
+
+        await service.add("item")
+
+        self.assertEqual([], await service.get_items())
+        self.assertEqual(["item"], self.service.items)
+
+    async def test_shared_metagraph_then_snapshot_copied_from_writer(self):
+        async def source():
+            return SimpleNamespace(
+                hotkeys=["a", "b"],
+                axons=[SimpleNamespace(ip="10.0.0.1", coldkey="coldkey")] * 2,
+                total_stake=[1.0, 2.0],
+                validator_permit=[True, False],
+            )
+
+        metagraph_service = BittensorMetagraphService(source)
+        await metagraph_service.refresh()
+        self.server.services["metagraph_service"] = metagraph_service
+        remote = RemoteWrites(
+            metagraph_service, "metagraph_service", self.clients[0], ["get_snapshot"]
+        )
+        shared = SharedMetagraphService(remote.get_snapshot)
+
+        await shared.refresh()
+
+        self.assertEqual(
+            dict(exists=True, stake=2.0), await shared.get_axon_data("b")
+        )
+        self.assertTrue(await shared.has_validator_permit("a"))
+
+
+class TestReadOnlyConnections(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        url = os.path.join(f"sqlite:///{self.directory.name}", "{name}_{network}.db")
+        self.writer_manager = DatabaseManager("miner", "test", db_url_template=url)
+        self.worker_manager = DatabaseManager("miner", "test", db_url_template=url)
+        with self.writer_manager.get_session("main") as session:
+            session.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+
+    def tearDown(self) -> None:
+        for database_manager in (self.writer_manager, self.worker_manager):
+            for engine in (
+                database_manager.active_db,
+                database_manager.history_db,
+                database_manager.main_db,
+            ):
+                engine.dispose()
+        self.directory.cleanup()
+
+    def test_worker_write_then_rejected_and_writer_commits(self):
+        enable_wal(self.writer_manager)
+        set_read_only(self.worker_manager)
+
+        with self.assertRaises(OperationalError):
+            with self.worker_manager.get_session("main") as session:
+                session.execute(text("INSERT INTO items VALUES (1)"))
+        with self.writer_manager.get_session("main") as session:
+            session.execute(text("INSERT INTO items VALUES (2)"))
+        with self.worker_manager.get_session("main") as session:
+            ids = session.execute(text("SELECT id FROM items")).scalars().all()
+            mode = session.execute(text("PRAGMA journal_mode")).scalar()
+
+        self.assertEqual([2], ids)
+        self.assertEqual("wal", mode)
+
+
+if __name__ == "__main__":
+    unittest.main()
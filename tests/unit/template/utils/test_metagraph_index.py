@@ -0,0 +1,188 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from parameterized import parameterized
+
+from neurons.base.operations import BaseOperation
+from template.utils import uids
+from template.utils.metagraph_index import MetagraphIndex
+
+
+def _axon(hotkey: str, uid: int, ip: str = "0.0.0.0"):
+    return SimpleNamespace(
+        hotkey=hotkey,
+        uid=uid,
+        coldkey=f"coldkey_{hotkey}",
+        ip=ip,
+        port=8091,
+        ip_type=4,
+        version=1,
+        protocol=4,
+    )
+
+
+def _metagraph(*hotkeys: str):
+    return SimpleNamespace(
+        hotkeys=list(hotkeys),
+        axons=[_axon(hotkey, uid) for uid, hotkey in enumerate(hotkeys)],
+        S=[float(uid * 10) for uid in range(len(hotkeys))],
+        validator_permit=[uid % 2 == 0 for uid in range(len(hotkeys))],
+    )
+
+
+def _synapse(hotkey: str):
+    return SimpleNamespace(dendrite=SimpleNamespace(hotkey=hotkey))
+
+
+class Operation(BaseOperation):
+    async def forward(self, synapse):
+        return synapse
+
+
+class TestMetagraphIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.metagraph = _metagraph("a", "b", "c", "d")
+        self.index = MetagraphIndex(self.metagraph)
+
+    def test_lookups(self) -> None:
+        self.assertEqual(4, self.index.n)
+        self.assertEqual(2, self.index.get_uid("c"))
+        self.assertIsNone(self.index.get_uid("unknown"))
+        self.assertEqual("d", self.index.get_axon("d").hotkey)
+        self.assertEqual(30.0, self.index.get_stake("d"))
+        self.assertEqual(0.0, self.index.get_stake("unknown"))
+        self.assertTrue(self.index.has_validator_permit("c"))
+        self.assertFalse(self.index.has_validator_permit("b"))
+        self.assertFalse(self.index.has_validator_permit("unknown"))
+
+    def test_update_then_seen_through_the_same_instance(self) -> None:
+        self.metagraph.hotkeys[1] = "e"
+        self.metagraph.axons[1] = _axon("e", 1)
+
+        self.index.update(self.metagraph)
+
+        self.assertIsNone(self.index.get_uid("b"))
+        self.assertIsNone(self.index.get_axon("b"))
+        self.assertEqual(1, self.index.get_uid("e"))
+        self.assertEqual("e", self.index.get_axon("e").hotkey)
+
+    def test_first_update_then_every_uid_changed(self) -> None:
+        self.assertEqual([0, 1, 2, 3], MetagraphIndex().update(self.metagraph))
+
+    def test_unchanged_metagraph_then_no_uids_changed(self) -> None:
+        fingerprint = self.index.fingerprint
+        lookups = self.index.hotkey_to_uid
+        self.metagraph.axons = [_axon(a.hotkey, a.uid) for a in self.metagraph.axons]
+        self.metagraph.S = [100.0] * 4
+
+        self.assertEqual([], self.index.update(self.metagraph))
+        self.assertEqual(fingerprint, self.index.fingerprint)
+        self.assertIs(lookups, self.index.hotkey_to_uid)
+        self.assertEqual(100.0, self.index.get_stake("a"))
+
+    def test_changed_uids_then_only_their_entries_replaced(self) -> None:
+        lookups = self.index.hotkey_to_uid
+        self.metagraph.axons[2] = _axon("c", 2, ip="10.0.0.2")
+        self.metagraph.hotkeys[3] = "e"
+        self.metagraph.axons[3] = _axon("e", 3)
+        self.metagraph.hotkeys.append("f")
+        self.metagraph.axons.append(_axon("f", 4))
+        self.metagraph.S.append(0.0)
+        self.metagraph.validator_permit.append(False)
+
+        changed_uids = self.index.update(self.metagraph)
+
+        self.assertEqual([2, 3, 4], changed_uids)
+        self.assertNotEqual(lookups, self.index.hotkey_to_uid)
+        self.assertEqual(
+            {"a": 0, "b": 1, "c": 2, "e": 3, "f": 4}, self.index.hotkey_to_uid
+        )
+        self.assertEqual("10.0.0.2", self.index.get_axon("c").ip)
+        self.assertIsNone(self.index.get_axon("d"))
+        # the previous lookups are left as they were
+        self.assertEqual({"a": 0, "b": 1, "c": 2, "d": 3}, lookups)
+
+    def test_shrunk_metagraph_then_removed_uids_changed(self) -> None:
+        changed_uids = self.index.update(_metagraph("a", "b"))
+
+        self.assertEqual([2, 3], changed_uids)
+        self.assertEqual({"a": 0, "b": 1}, self.index.hotkey_to_uid)
+        self.assertEqual({"a", "b"}, set(self.index.hotkey_to_axon))
+
+    @parameterized.expand(
+        [
+            (("d", "a", "unknown"), None, [0, 3]),
+            (("d", "a"), 0, [3]),
+            ((), 1, [0, 2, 3]),
+        ]
+    )
+    def test_get_axons(self, hotkeys, exclude_uid, expected) -> None:
+        axons = self.index.get_axons(*hotkeys, exclude_uid=exclude_uid)
+
+        self.assertEqual(expected, [axon.uid for axon in axons])
+
+    @parameterized.expand(
+        [
+            ((), False, False, []),
+            (("b", "a"), False, False, [1]),
+            (("b", "a"), True, False, [0, 1]),
+            (("b",), False, True, [1, 2, 3]),
+        ]
+    )
+    def test_neuron_get_axons(
+        self, hotkeys, not_check_self, include_hotkeys, expected
+    ) -> None:
+        neuron = SimpleNamespace(uid=0, metagraph_index=self.index)
+
+        axons = uids.get_axons(
+            neuron,
+            *hotkeys,
+            not_check_self=not_check_self,
+            include_hotkeys=include_hotkeys,
+        )
+
+        self.assertEqual(expected, [axon.uid for axon in axons])
+
+
+class TestBaseOperation(unittest.TestCase):
+    def _operation(self, allow_non_registered: bool, force_validator_permit: bool):
+        return Operation(
+            metagraph=None,
+            config=SimpleNamespace(
+                blacklist=SimpleNamespace(
+                    allow_non_registered=allow_non_registered,
+                    force_validator_permit=force_validator_permit,
+                )
+            ),
+            metagraph_index=MetagraphIndex(_metagraph("a", "b")),
+        )
+
+    @parameterized.expand(
+        [
+            ("a", False, True, False),
+            ("b", False, True, True),
+            ("b", False, False, False),
+            ("unknown", False, False, True),
+            ("unknown", True, False, False),
+            ("unknown", True, True, True),
+        ]
+    )
+    def test_blacklist(
+        self, hotkey, allow_non_registered, force_validator_permit, expected
+    ) -> None:
+        operation = self._operation(allow_non_registered, force_validator_permit)
+
+        blacklisted, _ = asyncio.run(operation.blacklist(_synapse(hotkey)))
+
+        self.assertEqual(expected, blacklisted)
+
+    @parameterized.expand([("a", 0.0), ("b", 10.0), ("unknown", 0.0)])
+    def test_priority(self, hotkey, expected) -> None:
+        operation = self._operation(False, False)
+
+        self.assertEqual(expected, asyncio.run(operation.priority(_synapse(hotkey))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import unittest
+from datetime import timedelta
+
+from common import metrics
+from common.utils import execute_periodically
+from template.utils.startup import StartupTimer
+
+
+class TestStartupTimer(unittest.TestCase):
+    def test_phase_then_recorded_in_metrics(self) -> None:
+        startup = StartupTimer("test_neuron")
+
+        with startup.phase("services"):
+            pass
+        startup.ready()
+
+        self.assertEqual(["services", "ready"], list(startup.durations))
+        self.assertEqual(
+            startup.durations["ready"],
+            metrics.STARTUP_PHASE_SECONDS.get(neuron="test_neuron", phase="ready"),
+        )
+
+    def test_background_stages_then_run_in_order_past_failures(self) -> None:
+        startup = StartupTimer("test_neuron")
+        calls = []
+
+        async def ping():
+            calls.append(("ping", threading.current_thread().name))
+            raise ConnectionError("BitAds unavailable")
+
+        async def migrate():
+            calls.append(("migrate", threading.current_thread().name))
+
+        startup.run_in_background([("ping", ping), ("migrate", migrate)]).join(5)
+
+        self.assertEqual(
+            [("ping", "test_neuron-startup"), ("migrate", "test_neuron-startup")],
+            calls,
+        )
+        self.assertEqual(["ping", "migrate", "warm"], list(startup.durations))
+
+
+class TestExecutePeriodically(unittest.TestCase):
+    def test_call_while_running_in_another_thread_then_skipped(self) -> None:
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @execute_periodically(timedelta(minutes=5))
+        async def migrate():
+            calls.append(threading.current_thread().name)
+            started.set()
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+        thread = threading.Thread(target=asyncio.run, args=(migrate(),), name="startup")
+        thread.start()
+        started.wait(5)
+
+        skipped = asyncio.run(migrate())
+        release.set()
+        thread.join(5)
+
+        self.assertIsNone(skipped)
+        self.assertEqual(["startup"], calls)
+        self.assertIsNone(asyncio.run(migrate()))
+        self.assertEqual(["startup"], calls)
+
+    def test_failed_call_then_run_again(self) -> None:
+        calls = []
+
+        @execute_periodically(timedelta(minutes=5))
+        async def ping():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise ConnectionError("BitAds unavailable")
+
+        with self.assertRaises(ConnectionError):
+            asyncio.run(ping())
+        asyncio.run(ping())
+
+        self.assertEqual([0, 1], calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
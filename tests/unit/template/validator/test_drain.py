@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from datetime import timedelta
+
+from parameterized import parameterized
+
+from template.validator.drain import Page, drain_pages
+
+LIMIT = 3
+
+
+class StubMiners:
+    """Miners serving ``rows`` integer rows each, a page is the rows after the offset."""
+
+    def __init__(self, **rows: int):
+        self.rows = rows
+        self.requests = []
+        self.written = []
+        self.events = []
+        self.fetch_delay = 0.0
+        self.write_delay = 0.0
+        self.fail_writes = False
+
+    async def fetch(self, hotkey: str, offset) -> Page:
+        self.requests.append((hotkey, offset))
+        self.events.append(("fetch", hotkey, offset))
+        await asyncio.sleep(self.fetch_delay)
+        start = 0 if offset is None else offset + 1
+        rows = list(range(start, min(start + LIMIT, self.rows.get(hotkey, 0))))
+        return Page(hotkey, rows, rows[-1] if rows else None)
+
+    async def write(self, pages):
+        self.events.append(("write", [(page.hotkey, page.next_offset) for page in pages]))
+        await asyncio.sleep(self.write_delay)
+        if self.fail_writes:
+            raise ConnectionError("database unavailable")
+        self.events.append(("written",))
+        self.written.extend(pages)
+
+
+class TestDrainPages(unittest.TestCase):
+    def _drain(self, miners: StubMiners, offsets=None, **budget) -> int:
+        budget.setdefault("max_duration", timedelta(minutes=1))
+        budget.setdefault("max_rows", 1000)
+        return asyncio.run(
+            drain_pages(
+                offsets or {hotkey: None for hotkey in miners.rows},
+                miners.fetch,
+                miners.write,
+                limit=LIMIT,
+                **budget,
+            )
+        )
+
+    def test_full_pages_then_drained_until_partial_page(self) -> None:
+        miners = StubMiners(backlog=8, quiet=1, empty=0)
+
+        fetched = self._drain(miners)
+
+        self.assertEqual(9, fetched)
+        self.assertEqual(
+            [("backlog", None), ("backlog", 2), ("backlog", 5)],
+            [r for r in miners.requests if r[0] == "backlog"],
+        )
+        self.assertEqual(
+            list(range(8)),
+            [row for p in miners.written if p.hotkey == "backlog" for row in p.rows],
+        )
+        self.assertEqual(5, len(miners.written))
+
+    def test_started_at_offsets(self) -> None:
+        miners = StubMiners(backlog=7)
+
+        fetched = self._drain(miners, offsets={"backlog": 4})
+
+        self.assertEqual(2, fetched)
+        self.assertEqual([("backlog", 4)], miners.requests)
+
+    @parameterized.expand(
+        [
+            ("rows", dict(max_rows=LIMIT)),
+            ("duration", dict(max_duration=timedelta(0))),
+        ]
+    )
+    def test_budget_spent_then_only_first_pages(self, _, budget) -> None:
+        miners = StubMiners(first=100, second=100)
+
+        fetched = self._drain(miners, **budget)
+
+        self.assertEqual(2 * LIMIT, fetched)
+        self.assertEqual([("first", None), ("second", None)], miners.requests)
+
+    def test_next_page_requested_while_previous_written(self) -> None:
+        miners = StubMiners(backlog=7)
+        miners.write_delay = 0.05
+
+        self._drain(miners)
+
+        first_written = miners.events.index(("written",))
+        self.assertIn(("fetch", "backlog", 2), miners.events[:first_written])
+        self.assertIn(("fetch", "backlog", 5), miners.events[:first_written])
+        self.assertEqual(
+            [
+                ("write", [("backlog", 2)]),
+                ("write", [("backlog", 5), ("backlog", 6)]),
+            ],
+            [event for event in miners.events if event[0] == "write"],
+        )
+
+    def test_failed_write_then_raised_and_fetching_stopped(self) -> None:
+        miners = StubMiners(backlog=100)
+        miners.fail_writes = True
+        miners.fetch_delay = miners.write_delay = 0.01
+
+        with self.assertRaises(ConnectionError):
+            self._drain(miners)
+
+        self.assertLess(len(miners.requests), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()